@@ -1,11 +1,40 @@
 #!/usr/bin/env python3
+"""Golden checks and trace generation for shake_core.v.
+
+Without options, checks the testbench's ``shake128_output.hex`` /
+``shake256_output.hex`` against the batched Keccak model in
+``100.kyber/golden/keccak.py`` (itself cross-checked with hashlib).
+
+``--generate`` writes expected outputs for any message and squeeze lengths
+(``--message-lens``, ``--out-len``, ``--batch`` random messages per length,
+all hashed as one batch) to ``--out-dir``, plus for the first ``--trace``
+messages the padded absorb blocks, squeezed rate blocks, the 24 per-round
+states of every permutation and the ``data_out`` beats the core emits.
+The vector file marks which messages the current core can run: its absorb
+FSM takes whole 16-byte words and never permutes between rate blocks.
+
+``--sizing`` turns a sampler demand (``--demand`` bytes/cycle) into the
+rounds per cycle the permutation needs, for the current sequential
+squeeze/permute schedule and for one that permutes while squeezing.
+
+Run through ``100.kyber/golden/run.py`` (``python 100.kyber/golden/run.py
+0.SHAKE/test/shake_golden.py [options]``), which makes ``golden`` importable.
+"""
+import argparse
 import hashlib
 import math
 from pathlib import Path
 
+import numpy as np
+
+from golden import compare, keccak
+
 ROOT = Path(__file__).resolve().parent
 
 MESSAGE = bytes(range(32))
+WORD_BYTES = 16  # data_in / data_out width
+PERMUTE_OVERHEAD = 2  # permute_start and the WAIT_PERM capture cycle around the round pipeline
+ROUNDS_PER_CYCLE = (1, 2, 3, 4, 6, 8, 12, 24)
 
 TARGET_OUTPUTS = {
     "shake128": {
@@ -47,23 +76,103 @@ def chi_square_statistic(data: bytes) -> float:
     return total
 
 
+def reference_digest(name, message, length):
+    """Keccak model output, asserted equal to hashlib."""
+    expected = keccak.shake_bytes(message, length, name)
+    if expected != getattr(hashlib, name.replace("shake", "shake_"))(message).digest(length):
+        raise AssertionError(f"{name}: Keccak model disagrees with hashlib")
+    return expected
+
+
+def rtl_supported(message_len, mode):
+    """Whether shake_core.v can absorb the message: whole words within one rate block."""
+    rate = keccak.RATES[mode]
+    return message_len > 0 and message_len % WORD_BYTES == 0 and message_len <= rate // WORD_BYTES * WORD_BYTES
+
+
+def rtl_output_beats(digest, rate):
+    """``data_out`` words in order: 16-byte chunks, cut short at each rate-block boundary."""
+    beats = []
+    for start in range(0, len(digest), rate):
+        block = digest[start : start + rate]
+        beats.extend(block[offset : offset + WORD_BYTES] for offset in range(0, len(block), WORD_BYTES))
+    return beats
+
+
+def beat_lines(beats):
+    """One ``%032x`` data_out word per line (byte 0 in bits 7:0)."""
+    return "".join(f"{int.from_bytes(beat, 'little'):032x}\n" for beat in beats)
+
+
+def block_lines(trace, index):
+    """``absorb k <block>`` / ``squeeze k <rate bytes>`` lines, bytes in state order."""
+    lines = [f"absorb {k} {trace.absorb_blocks[index, k].tobytes().hex()}\n" for k in range(trace.block_counts[index])]
+    lines += [f"squeeze {k} {block.tobytes().hex()}\n" for k, block in enumerate(trace.squeeze_blocks[index])]
+    return "".join(lines)
+
+
+def generate(modes, message_lens, out_len, batch, traces, out_dir, seed):
+    rng = np.random.default_rng(seed)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    messages = [rng.integers(0, 256, size=length, dtype=np.uint8).tobytes() for length in message_lens for _ in range(batch)]
+    width = max(max(message_lens), 1) * 2
+    for mode in modes:
+        digests, trace = keccak.shake(messages, out_len, mode, rounds=traces > 0)
+        for index in (0, len(messages) - 1):
+            if digests[index].tobytes() != reference_digest(mode, messages[index], out_len):
+                raise AssertionError(f"{mode}: batched output differs from the single-message model")
+        rate = keccak.RATES[mode]
+        with (out_dir / f"{mode}_vectors.txt").open("w") as fp:
+            fp.write("// msg_len out_len permutations rtl message(zero-padded) digest\n")
+            for index, message in enumerate(messages):
+                count = len(message) // rate + max(-(-out_len // rate), 1)
+                fp.write(
+                    f"{len(message):04x} {out_len:04x} {count:04x} {int(rtl_supported(len(message), mode))} "
+                    f"{message.hex().ljust(width, '0') or '00'} {digests[index].tobytes().hex() or '00'}\n"
+                )
+        for index in range(min(traces, len(messages))):
+            (out_dir / f"{mode}_blocks_{index}.txt").write_text(block_lines(trace, index))
+            (out_dir / f"{mode}_rounds_{index}.txt").write_bytes(trace.lines(index))
+            beats = rtl_output_beats(digests[index].tobytes(), rate)
+            (out_dir / f"{mode}_beats_{index}.hex").write_text(beat_lines(beats))
+        print(f"[PASS] {mode}: {len(messages)} messages -> {out_dir}")
+
+
+def sizing(demand, modes, rounds_per_cycle=ROUNDS_PER_CYCLE):
+    """Squeeze bandwidth (bytes/cycle) per rounds-per-cycle option."""
+    print(f"{'mode':>9} {'rounds/cyc':>10} {'perm cyc':>8} {'seq B/cyc':>9} {'overlap B/cyc':>13}")
+    for mode in modes:
+        rate = keccak.RATES[mode]
+        beats = -(-rate // WORD_BYTES)
+        need_seq = need_overlap = None
+        for rpc in rounds_per_cycle:
+            permute = -(-keccak.ROUNDS // rpc) + PERMUTE_OVERHEAD
+            sequential = rate / (permute + beats)
+            overlapped = rate / max(permute, beats)
+            if need_seq is None and sequential >= demand:
+                need_seq = rpc
+            if need_overlap is None and overlapped >= demand:
+                need_overlap = rpc
+            print(f"{mode:>9} {rpc:>10} {permute:>8} {sequential:>9.2f} {overlapped:>13.2f}")
+        for label, need in (("sequential", need_seq), ("overlapped", need_overlap)):
+            verdict = f"needs {need} rounds/cycle" if need else "cannot be met by one core"
+            print(f"[INFO] {mode} {label}: {demand:g} B/cycle {verdict}")
+
+
 def run_test():
     success = True
     for name, cfg in TARGET_OUTPUTS.items():
-        mode = cfg["mode"]
         length = cfg["length"]
         output_file = cfg["file"]
-        if mode == "shake_128":
-            expected = hashlib.shake_128(MESSAGE).digest(length)
-        else:
-            expected = hashlib.shake_256(MESSAGE).digest(length)
+        expected = reference_digest(name, MESSAGE, length)
 
         if not output_file.exists():
             raise FileNotFoundError(f"Missing simulation output file: {output_file}")
         observed = load_output(output_file, length)
 
-        if observed != expected:
-            print(f"[FAIL] {name}: output mismatch")
+        report = compare.compare(expected, observed, name=name)
+        if not report.passed:
+            print(report.summary())
             print(f"Expected: {expected.hex()}")
             print(f"Observed: {observed.hex()}")
             success = False
@@ -84,5 +193,27 @@ def run_test():
         raise SystemExit(1)
 
 
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--generate", action="store_true", help="Write expected outputs and traces")
+    parser.add_argument("--modes", nargs="+", choices=sorted(keccak.RATES), default=sorted(keccak.RATES))
+    parser.add_argument("--message-lens", type=int, nargs="+", default=[32, 160, 168, 500])
+    parser.add_argument("--out-len", type=int, default=512, help="Squeezed bytes per message")
+    parser.add_argument("--batch", type=int, default=4, help="Random messages per length")
+    parser.add_argument("--trace", type=int, default=1, help="Messages to dump round/block/beat traces for")
+    parser.add_argument("--out-dir", type=Path, default=ROOT / "vectors")
+    parser.add_argument("--seed", type=int, default=2024)
+    parser.add_argument("--sizing", action="store_true", help="Rounds-per-cycle needed for --demand")
+    parser.add_argument("--demand", type=float, default=16.0, help="Sampler demand in bytes/cycle")
+    args = parser.parse_args()
+
+    if args.generate:
+        generate(args.modes, args.message_lens, args.out_len, args.batch, args.trace, args.out_dir, args.seed)
+    elif args.sizing:
+        sizing(args.demand, args.modes)
+    else:
+        run_test()
+
+
 if __name__ == "__main__":
-    run_test()
+    main()
@@ -8,12 +8,28 @@ This script serves two purposes:
 2. Verify that the hardware output produced by the Verilog testbench matches
    the expected results and perform a basic chi-squared goodness of fit test on
    the accepted samples.
+
+``cbd_lane_model`` / ``compute_lane_outputs`` are the scalar reference; the
+``*_array`` variants evaluate the same lane model on NumPy arrays (128-bit
+randoms as little-endian uint64 limbs, popcount via lookup table) and drive
+vector generation.  ``--exhaustive`` enumerates every (threshold, lane random)
+pair to give the exact acceptance rate and output distribution of one lane and
+its statistical distance from the ideal CBD.
+
+Run through ``100.kyber/golden/run.py`` (``python 100.kyber/golden/run.py
+1.CBD/test/cbd_golden.py [options]``), which makes ``golden`` importable.
 """
 
 import argparse
 import pathlib
 import random
+import time
 from collections import Counter
+from fractions import Fraction
+
+import numpy as np
+
+from golden import compare
 
 LANES = 4
 RAND_WIDTH = 128
@@ -32,22 +48,50 @@ print(f"当前工作目录: {pathlib.Path.cwd()}")
 print(f"脚本所在目录: {pathlib.Path(__file__).parent}")
 print(f"输入文件绝对路径: {INPUT_FILE.absolute()}")
 
+LIMBS = (RAND_WIDTH + 63) // 64
+POPCOUNT = np.array([bin(value).count("1") for value in range(1 << ETA)], dtype=np.int64)
+_HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+
+
 def generate_vectors(vectors: int, seed: int) -> None:
     print(f"开始生成 {vectors} 个向量，种子: {seed}")
     print(f"输入文件路径: {INPUT_FILE}")
     print(f"期望文件路径: {EXPECTED_FILE}")
-    rng = random.Random(seed)
-    max_rand = 1 << RAND_WIDTH
-    with INPUT_FILE.open("w", encoding="utf-8") as input_fp, EXPECTED_FILE.open(
-        "w", encoding="utf-8"
-    ) as expected_fp:
-        input_fp.write(f"{vectors}\n")
-        for _ in range(vectors):
-            threshold = rng.randrange(1 << BERN_WIDTH)
-            random_value = rng.randrange(max_rand)
-            input_fp.write(f"{threshold:02x} {random_value:032x}\n")
-            accept_mask, sample_value = compute_lane_outputs(threshold, random_value)
-            expected_fp.write(f"{accept_mask:0{LANES // 4 + (1 if LANES % 4 else 0)}x} {sample_value:0{(LANES*CAND_BITS + 3)//4}x}\n")
+    start = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    thresholds = rng.integers(0, 1 << BERN_WIDTH, size=vectors, dtype=np.uint64)
+    randoms = rng.integers(0, 1 << 64, size=(vectors, LIMBS), dtype=np.uint64, endpoint=False)
+    if RAND_WIDTH % 64:
+        randoms[:, -1] &= np.uint64((1 << (RAND_WIDTH % 64)) - 1)
+    accept_mask, sample_value = compute_lane_outputs_array(thresholds, randoms)
+
+    random_columns = [_hex_column(randoms[:, limb], 16) for limb in reversed(range(LIMBS))]
+    random_text = np.concatenate(random_columns, axis=1)[:, -((RAND_WIDTH + 3) // 4) :]
+    input_rows = _join_columns([_hex_column(thresholds, (BERN_WIDTH + 3) // 4), random_text])
+    expected_rows = _join_columns(
+        [_hex_column(accept_mask, (LANES + 3) // 4), _hex_column(sample_value, (LANES * CAND_BITS + 3) // 4)]
+    )
+    INPUT_FILE.write_bytes(f"{vectors}\n".encode() + input_rows)
+    EXPECTED_FILE.write_bytes(expected_rows)
+    elapsed = time.perf_counter() - start
+    print(f"{vectors / elapsed:,.0f} vectors/s")
+
+
+def _hex_column(values: np.ndarray, digits: int) -> np.ndarray:
+    """Fixed-width lowercase hex of uint64 ``values`` as an ``(n, digits)`` byte array."""
+    values = np.asarray(values, dtype=np.uint64)
+    shifts = np.uint64(4) * np.arange(digits - 1, -1, -1, dtype=np.uint64)
+    return _HEX_DIGITS[((values[:, np.newaxis] >> shifts) & np.uint64(0xF)).astype(np.intp)]
+
+
+def _join_columns(columns: list) -> bytes:
+    rows = len(columns[0])
+    parts = []
+    for index, column in enumerate(columns):
+        parts.append(column)
+        separator = b"\n" if index == len(columns) - 1 else b" "
+        parts.append(np.full((rows, 1), separator[0], dtype=np.uint8))
+    return np.concatenate(parts, axis=1).tobytes()
 
 
 def compute_lane_outputs(threshold: int, random_value: int) -> tuple[int, int]:
@@ -87,58 +131,140 @@ def cbd_lane_model(threshold: int, lane_random: int) -> tuple[int, bool]:
     return sample_encoded, accept
 
 
+def lane_slices_array(randoms: np.ndarray) -> np.ndarray:
+    """Split ``(n, LIMBS)`` little-endian uint64 limbs into ``(n, LANES)`` lane slices."""
+    lane_width = RAND_WIDTH // LANES
+    mask = np.uint64((1 << lane_width) - 1)
+    randoms = np.asarray(randoms, dtype=np.uint64)
+    lanes = np.empty((len(randoms), LANES), dtype=np.uint64)
+    for lane in range(LANES):
+        limb, shift = divmod(lane * lane_width, 64)
+        value = randoms[:, limb] >> np.uint64(shift)
+        if shift + lane_width > 64:
+            value |= randoms[:, limb + 1] << np.uint64(64 - shift)
+        lanes[:, lane] = value & mask
+    return lanes
+
+
+def cbd_lane_model_array(threshold: np.ndarray, lane_random: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Array form of ``cbd_lane_model``; ``threshold`` broadcasts against ``lane_random``."""
+    lane_random = np.asarray(lane_random, dtype=np.uint64)
+    mask_eta = np.uint64((1 << ETA) - 1)
+    a_bits = (lane_random & mask_eta).astype(np.intp)
+    b_bits = ((lane_random >> np.uint64(ETA)) & mask_eta).astype(np.intp)
+    bern_random = ((lane_random >> np.uint64(2 * ETA)) & np.uint64((1 << BERN_WIDTH) - 1)).astype(np.int64)
+    rej_random = ((lane_random >> np.uint64(2 * ETA + BERN_WIDTH)) & np.uint64((1 << REJ_WIDTH) - 1)).astype(np.int64)
+
+    diff = POPCOUNT[a_bits] - POPCOUNT[b_bits]
+    signed_value = np.where(bern_random < np.asarray(threshold, dtype=np.int64), diff, -diff)
+    dynamic_limit = np.maximum(BASE_LIMIT - (np.abs(signed_value) << SHIFT_FACTOR), 0)
+    accept = rej_random < (dynamic_limit & ((1 << REJ_WIDTH) - 1))
+    return signed_value & ((1 << CAND_BITS) - 1), accept
+
+
+def compute_lane_outputs_array(threshold: np.ndarray, randoms: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Array form of ``compute_lane_outputs``: ``(accept_mask, packed_samples)`` per vector."""
+    samples, accepted = cbd_lane_model_array(np.asarray(threshold)[:, np.newaxis], lane_slices_array(randoms))
+    lane = np.arange(LANES, dtype=np.uint64)
+    accept_mask = (accepted.astype(np.uint64) << lane).sum(axis=1, dtype=np.uint64)
+    packed = (samples.astype(np.uint64) << (lane * np.uint64(CAND_BITS))).sum(axis=1, dtype=np.uint64)
+    return accept_mask, packed
+
+
+def exhaustive_distribution() -> dict[int, tuple[int, dict[int, int]]]:
+    """Exact per-threshold lane statistics.
+
+    Covers every threshold and every value of the lane-random bits the model
+    reads (``2*ETA + BERN_WIDTH + REJ_WIDTH``; the remaining lane bits are
+    ignored and only scale all counts).  The rejection field is uniform and
+    only compared against the limit, so each (a, b, bern) pattern is weighted
+    by the number of accepting ``rej`` values instead of enumerating them.
+    Returns ``{threshold: (accepted count, {signed sample: count})}`` out of
+    ``2**used_bits`` lane randoms each.
+    """
+    lane_random = np.arange(1 << (2 * ETA + BERN_WIDTH), dtype=np.uint64)
+    rej_values = 1 << REJ_WIDTH
+    sign_bit = 1 << (CAND_BITS - 1)
+    result = {}
+    for threshold in range(1 << BERN_WIDTH):
+        samples, _ = cbd_lane_model_array(threshold, lane_random)
+        decoded = (samples ^ sign_bit) - sign_bit
+        limit = np.maximum(BASE_LIMIT - (np.abs(decoded) << SHIFT_FACTOR), 0) & (rej_values - 1)
+        weights = np.bincount(decoded + sign_bit, weights=limit, minlength=2 * sign_bit).astype(np.int64)
+        counts = {value - sign_bit: int(weight) for value, weight in enumerate(weights) if weight}
+        result[threshold] = (int(limit.sum()), counts)
+    return result
+
+
+def exhaustive_report() -> None:
+    """Print exact acceptance rate and statistical distance from CBD(ETA) per threshold."""
+    used_bits = 2 * ETA + BERN_WIDTH + REJ_WIDTH
+    ideal = {value: Fraction(count, 1 << (2 * ETA)) for value, count in cbd_counts(ETA).items()}
+    start = time.perf_counter()
+    table = exhaustive_distribution()
+    elapsed = time.perf_counter() - start
+    total = 1 << used_bits
+    print(f"Exhaustive lane model: {len(table)} thresholds x 2^{used_bits} lane randoms in {elapsed:.2f} s")
+    worst = (Fraction(0), 0)
+    averaged: Counter = Counter()
+    averaged_accept = 0
+    for threshold, (accepted, counts) in table.items():
+        averaged_accept += accepted
+        averaged.update(counts)
+        distance = statistical_distance(counts, ideal)
+        worst = max(worst, (distance, threshold))
+        if threshold % 32 == 0 or threshold == (1 << BERN_WIDTH) - 1:
+            print(f"  threshold {threshold:3d}: accept {accepted / total:.6f}, SD from CBD({ETA}) {float(distance):.6f}")
+    print(f"Worst threshold {worst[1]}: SD {float(worst[0]):.6f}")
+    print(
+        f"Uniform threshold: accept {averaged_accept / (total * len(table)):.6f}, "
+        f"SD from CBD({ETA}) {float(statistical_distance(averaged, ideal)):.6f}"
+    )
+
+
+def statistical_distance(counts: dict[int, int], ideal: dict[int, Fraction]) -> Fraction:
+    """Exact total-variation distance between the normalised ``counts`` and ``ideal``."""
+    total = sum(counts.values())
+    support = set(counts) | set(ideal)
+    return sum(
+        (abs(Fraction(counts.get(value, 0), total) - ideal.get(value, Fraction(0))) for value in support),
+        Fraction(0),
+    ) / 2
+
+
+def self_check(vectors: int = 4096, seed: int = 0) -> None:
+    """Compare the array model with the scalar reference on random vectors."""
+    rng = random.Random(seed)
+    thresholds = [rng.randrange(1 << BERN_WIDTH) for _ in range(vectors)]
+    randoms = [rng.randrange(1 << RAND_WIDTH) for _ in range(vectors)]
+    limbs = np.array([[(value >> (64 * limb)) & ((1 << 64) - 1) for limb in range(LIMBS)] for value in randoms], dtype=np.uint64)
+    accept_mask, packed = compute_lane_outputs_array(np.array(thresholds, dtype=np.uint64), limbs)
+    for index, (threshold, value) in enumerate(zip(thresholds, randoms)):
+        if (int(accept_mask[index]), int(packed[index])) != compute_lane_outputs(threshold, value):
+            raise AssertionError(f"Array lane model disagrees with scalar model on vector {index}")
+    print(f"Array lane model matches scalar model on {vectors} vectors.")
+
+
 def verify_results() -> None:
     if not EXPECTED_FILE.exists():
         raise FileNotFoundError("Expected results missing, run with --generate first")
     if not HW_OUTPUT_FILE.exists():
         raise FileNotFoundError("Hardware output missing, run the simulator first")
 
-    expected_lines = EXPECTED_FILE.read_text(encoding="utf-8").strip().splitlines()
-    hw_lines = HW_OUTPUT_FILE.read_text(encoding="utf-8").strip().splitlines()
-
-    if len(expected_lines) != len(hw_lines):
-        raise ValueError(
-            f"Line count mismatch between expected ({len(expected_lines)}) and hardware ({len(hw_lines)})"
-        )
-
-    mismatches = []
-    accepted_samples = []
-
-    for idx, (exp_line, hw_line) in enumerate(zip(expected_lines, hw_lines)):
-        exp_accept_hex, exp_sample_hex = exp_line.split()
-        hw_accept_hex, hw_sample_hex = hw_line.split()
-        if exp_accept_hex.lower() != hw_accept_hex.lower() or exp_sample_hex.lower() != hw_sample_hex.lower():
-            mismatches.append((idx, exp_line, hw_line))
-        accept_mask = int(hw_accept_hex, 16)
-        sample_value = int(hw_sample_hex, 16)
-        accepted_samples.extend(extract_samples(accept_mask, sample_value))
-
-    if mismatches:
-        mismatch_str = "\n".join(
-            f"Vector {idx}: expected {exp} got {hw}" for idx, exp, hw in mismatches
-        )
-        raise AssertionError(f"Hardware results mismatch expected values:\n{mismatch_str}")
-
-    if not accepted_samples:
+    # Columns: accept mask, then one CAND_BITS-wide sample per lane.
+    lane_spec = dict(lane_bits=[None, CAND_BITS], lanes=[None, LANES])
+    expected = compare.load_stream(EXPECTED_FILE, **lane_spec)
+    observed = compare.load_stream(HW_OUTPUT_FILE, **lane_spec)
+    lane_names = ["accept"] + [f"sample{lane}" for lane in range(LANES)]
+    compare.compare(expected, observed, name="cbd", lane_names=lane_names).check()
+
+    accepted = ((observed[:, :1] >> np.arange(LANES)) & 1).astype(bool)
+    sign_bit = 1 << (CAND_BITS - 1)
+    accepted_samples = (observed[:, 1:][accepted] ^ sign_bit) - sign_bit
+    if not accepted_samples.size:
         raise AssertionError("No accepted samples produced by the hardware")
 
-    distribution_summary(accepted_samples)
-
-
-def extract_samples(accept_mask: int, packed_samples: int) -> list[int]:
-    samples = []
-    mask = (1 << CAND_BITS) - 1
-    for lane in range(LANES):
-        if accept_mask & (1 << lane):
-            value = packed_samples >> (lane * CAND_BITS)
-            decoded = twos_complement(value & mask, CAND_BITS)
-            samples.append(decoded)
-    return samples
-
-
-def twos_complement(value: int, bits: int) -> int:
-    sign_bit = 1 << (bits - 1)
-    return (value ^ sign_bit) - sign_bit
+    distribution_summary(accepted_samples.tolist())
 
 
 def distribution_summary(samples: list[int]) -> None:
@@ -165,18 +291,19 @@ def distribution_summary(samples: list[int]) -> None:
     print(f"Sample mean: {mean:.4f}, variance: {variance:.4f}")
 
 
-def cbd_pmf(eta: int) -> dict[int, float]:
-    pmf = Counter()
+def cbd_counts(eta: int) -> dict[int, int]:
+    counts = Counter()
     for a in range(1 << eta):
         pop_a = bin(a).count("1")
         for b in range(1 << eta):
             pop_b = bin(b).count("1")
-            diff = pop_a - pop_b
-            pmf[diff] += 1
+            counts[pop_a - pop_b] += 1
+    return dict(counts)
+
+
+def cbd_pmf(eta: int) -> dict[int, float]:
     total = 1 << (2 * eta)
-    for key in list(pmf.keys()):
-        pmf[key] /= total
-    return dict(pmf)
+    return {value: count / total for value, count in cbd_counts(eta).items()}
 
 
 def main() -> None:
@@ -185,10 +312,17 @@ def main() -> None:
     parser.add_argument("--seed", type=int, default=2024, help="PRNG seed for reproducibility")
     parser.add_argument("--generate", action="store_true", help="Generate stimulus and expected results")
     parser.add_argument("--verify", action="store_true", help="Verify hardware output and report statistics")
+    parser.add_argument("--exhaustive", action="store_true", help="Exact lane distribution over all inputs")
+    parser.add_argument("--self-check", action="store_true", help="Cross-check array and scalar lane models")
     args = parser.parse_args()
 
+    if args.self_check:
+        self_check()
+    if args.exhaustive:
+        exhaustive_report()
+
     # 如果没有指定任何操作，默认执行生成操作
-    if not args.generate and not args.verify:
+    if not args.generate and not args.verify and not args.exhaustive and not args.self_check:
         args.generate = True  # 默认生成
     
     if args.generate:
@@ -0,0 +1,426 @@
+"""Vectorised hardware-vs-golden stream comparison.
+
+Module testbenches dump one line per cycle (or per output word) and the
+golden scripts used to diff those dumps line by line as strings.  This module
+loads both streams into ``(rows, lanes)`` integer arrays and compares them in
+bulk:
+
+* ``load_stream`` parses whitespace-separated hex/decimal columns, optionally
+  splitting wide words into fixed-width lanes (e.g. a 128-bit NTT word into
+  eight 16-bit coefficients).  Lanes holding ``x``/``z`` digits are masked
+  (the array is then a ``numpy.ma.MaskedArray``), so every 64-bit value stays
+  a valid word and an unknown lane never matches;
+* ``compare`` aligns the streams (fixed or searched latency offset, optional
+  valid masks that drop bubble cycles), stops after ``max_failures``
+  mismatching rows and returns a ``CompareReport`` with the first mismatch,
+  mismatch counts and per-lane / per-coefficient histograms.
+
+Example::
+
+    expected = compare.load_stream("ntt_expected.hex", lane_bits=16)
+    observed = compare.load_stream("ntt_output_hw.hex", lane_bits=16)
+    compare.compare(expected, observed, name="ntt", record_rows=32).check()
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+CHUNK_ROWS = 1 << 16
+
+_NIBBLE = np.full(256, 0xFF, dtype=np.uint8)
+_NIBBLE[np.frombuffer(b"0123456789abcdef", dtype=np.uint8)] = np.arange(16)
+_NIBBLE[np.frombuffer(b"ABCDEF", dtype=np.uint8)] = np.arange(10, 16)
+_NIBBLE[np.frombuffer(b"xXzZ", dtype=np.uint8)] = 0x10
+
+LaneSpec = Union[None, int, Sequence[Optional[int]]]
+
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+
+
+def _per_field(spec: LaneSpec, fields: int) -> List[Optional[int]]:
+    if spec is None or isinstance(spec, int):
+        return [spec] * fields
+    if len(spec) != fields:
+        raise ValueError(f"Expected {fields} per-field entries, got {len(spec)}")
+    return list(spec)
+
+
+def parse_hex_tokens(
+    tokens: Sequence[bytes], lane_bits: Optional[int] = None, lanes: Optional[int] = None
+) -> np.ndarray:
+    """Decode hex tokens into a ``(len(tokens), lanes)`` int64 array (one lane unless split).
+
+    Lanes with ``x``/``z`` digits come back masked (see ``unknown_mask``).
+    """
+    column = np.array(tokens)
+    count, width = len(column), column.dtype.itemsize
+    raw = column.view(np.uint8).reshape(count, width)
+    lengths = np.char.str_len(column)
+    # right[:, i] = i-th hex digit counted from the least significant end.
+    position = lengths[:, np.newaxis] - 1 - np.arange(width)
+    right = _NIBBLE[np.take_along_axis(raw, np.clip(position, 0, None), axis=1)]
+    right[position < 0] = 0
+    if (right == 0xFF).any():
+        bad = tokens[int(np.flatnonzero((right == 0xFF).any(axis=1))[0])]
+        raise ValueError(f"Invalid hex token {bad!r}")
+    digits = width if lane_bits is None else lane_bits // 4
+    if lane_bits is not None and (lane_bits % 4 or lane_bits <= 0):
+        raise ValueError("lane_bits must be a positive multiple of 4 for hex streams")
+    if digits > 16:
+        raise ValueError(f"{4 * digits}-bit words need lane_bits to fit in 64 bits")
+    lanes = lanes or -(-width // digits)
+    if right.shape[1] < lanes * digits:
+        right = np.pad(right, ((0, 0), (0, lanes * digits - right.shape[1])))
+    right = right[:, : lanes * digits].reshape(count, lanes, digits)
+    unknown = (right == 0x10).any(axis=2)
+    values = np.zeros((count, lanes), dtype=np.uint64)
+    for digit in range(digits):
+        values |= (right[:, :, digit] & 0xF).astype(np.uint64) << np.uint64(4 * digit)
+    values = values.view(np.int64)
+    if unknown.any():
+        return np.ma.MaskedArray(values, mask=unknown)
+    return values
+
+
+def unknown_mask(stream) -> np.ndarray:
+    """Boolean ``(rows, lanes)`` mask of the lanes that held ``x``/``z``."""
+    return np.ma.getmaskarray(stream)
+
+
+def _dec_field(tokens: Sequence[bytes], lane_bits: Optional[int], lanes: Optional[int]) -> np.ndarray:
+    values = np.array(tokens).astype(np.int64)[:, np.newaxis]
+    if lane_bits is None:
+        return values
+    lanes = lanes or 1
+    shifts = np.arange(lanes, dtype=np.int64) * lane_bits
+    return (values >> shifts) & ((1 << lane_bits) - 1)
+
+
+def load_stream(
+    path: Union[str, Path],
+    *,
+    radix: LaneSpec = 16,
+    lane_bits: LaneSpec = None,
+    lanes: LaneSpec = None,
+) -> np.ndarray:
+    """Load a text dump as an ``(rows, lanes)`` int64 array.
+
+    Each line holds the same number of whitespace-separated fields.  A field
+    with ``lane_bits`` set is split into ``lanes`` little-endian lanes (lane 0
+    is the least significant); ``radix`` (16 or 10), ``lane_bits`` and
+    ``lanes`` may be given per field.  Blank lines and ``//`` or ``#`` comments are skipped.
+    """
+    data = Path(path).read_bytes()
+    if b"//" in data or b"#" in data:
+        data = b"\n".join(line.split(b"//")[0].split(b"#")[0] for line in data.splitlines())
+    lines = data.split(b"\n", 1)
+    while lines[0].strip() == b"" and len(lines) > 1:
+        lines = lines[1].split(b"\n", 1)
+    fields = len(lines[0].split())
+    tokens = data.split()
+    if not tokens:
+        return np.zeros((0, 0), dtype=np.int64)
+    if len(tokens) % fields:
+        raise ValueError(f"{path}: ragged lines (expected {fields} fields per line)")
+    parsers = [{16: parse_hex_tokens, 10: _dec_field}.get(base) for base in _per_field(radix, fields)]
+    if None in parsers:
+        raise ValueError("radix must be 10 or 16")
+    specs = zip(parsers, _per_field(lane_bits, fields), _per_field(lanes, fields))
+    columns = [parse(tokens[index::fields], bits, count) for index, (parse, bits, count) in enumerate(specs)]
+    if any(isinstance(column, np.ma.MaskedArray) for column in columns):
+        return np.ma.concatenate(columns, axis=1)
+    return np.concatenate(columns, axis=1)
+
+
+_HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+
+
+def format_hex_rows(columns: Sequence, digits: Sequence[int]) -> bytes:
+    """Render equal-length integer columns as space-separated fixed-width hex lines.
+
+    The inverse of ``load_stream`` for dumps written by the golden scripts;
+    ``digits[i]`` is the hex width of column ``i``.  Words wider than 64 bits
+    are given as ``(rows, limbs)`` arrays of little-endian uint64 limbs.
+    """
+    if len(columns) != len(digits):
+        raise ValueError("Expected one digit count per column")
+    rows = len(columns[0])
+    parts = []
+    for column, width in zip(columns, digits):
+        values = np.asarray(column).astype(np.uint64).reshape(rows, -1)
+        limb_digits = 16 if values.shape[1] > 1 else width
+        shifts = np.uint64(4) * np.arange(limb_digits - 1, -1, -1, dtype=np.uint64)
+        text = _HEX_DIGITS[((values[:, ::-1, np.newaxis] >> shifts) & np.uint64(0xF)).astype(np.intp)]
+        parts.append(text.reshape(rows, -1)[:, -width:])
+        parts.append(np.full((rows, 1), ord(" "), dtype=np.uint8))
+    parts[-1][:] = ord("\n")
+    return np.concatenate(parts, axis=1).tobytes()
+
+
+def as_stream(values) -> np.ndarray:
+    """Coerce golden values (list of ints, list of rows, bytes) to ``(rows, lanes)``; masks are kept."""
+    if isinstance(values, np.ma.MaskedArray):
+        data = as_stream(np.ma.getdata(values))
+        return np.ma.MaskedArray(data, mask=np.ma.getmaskarray(values).reshape(data.shape))
+    if isinstance(values, (bytes, bytearray, memoryview)):
+        values = np.frombuffer(values, dtype=np.uint8)
+    array = np.asarray(values, dtype=np.int64)
+    if array.ndim == 1:
+        array = array[:, np.newaxis]
+    if array.ndim != 2:
+        raise ValueError("Streams must be 1-D or 2-D")
+    return array
+
+
+# ---------------------------------------------------------------------------
+# Comparison
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class Mismatch:
+    row: int  # index into the aligned (valid-only) stream
+    cycle: int  # observed cycle / line index
+    lane: int
+    expected: Optional[int]  # None for x/z
+    observed: Optional[int]
+
+    def describe(self, lane_names: Optional[Sequence[str]] = None) -> str:
+        lane = lane_names[self.lane] if lane_names else f"lane {self.lane}"
+        expected, observed = _format_word(self.expected), _format_word(self.observed)
+        return f"row {self.row} (cycle {self.cycle}) {lane}: expected {expected} observed {observed}"
+
+
+def _format_word(value: Optional[int]) -> str:
+    if value is None:
+        return "x"
+    return f"0x{value:x}" if value >= 0 else str(value)
+
+
+def _parts(stream) -> Tuple[np.ndarray, np.ndarray]:
+    """Plain values and x/z mask of a stream."""
+    return np.ma.getdata(stream), np.ma.getmaskarray(stream)
+
+
+def _differs(expected, expected_unknown, observed, observed_unknown) -> np.ndarray:
+    return (expected != observed) | expected_unknown | observed_unknown
+
+
+@dataclass
+class CompareReport:
+    name: str
+    rows_expected: int
+    rows_observed: int
+    rows_compared: int
+    latency: int
+    mismatch_rows: int
+    mismatch_words: int
+    lane_histogram: np.ndarray
+    coeff_histogram: Optional[np.ndarray] = None
+    mismatches: List[Mismatch] = field(default_factory=list)  # first ``report_limit`` words
+    stopped_early: bool = False
+    lane_names: Optional[Sequence[str]] = None
+
+    @property
+    def length_mismatch(self) -> bool:
+        return self.rows_expected != self.rows_observed
+
+    @property
+    def passed(self) -> bool:
+        return self.mismatch_rows == 0 and not self.length_mismatch
+
+    @property
+    def first(self) -> Optional[Mismatch]:
+        return self.mismatches[0] if self.mismatches else None
+
+    def summary(self) -> str:
+        label = f"{self.name}: " if self.name else ""
+        if self.passed:
+            return f"[PASS] {label}{self.rows_compared} rows match (latency {self.latency})"
+        lines = []
+        if self.length_mismatch:
+            lines.append(
+                f"[FAIL] {label}length mismatch: expected {self.rows_expected} rows, observed {self.rows_observed}"
+            )
+        if self.mismatch_rows:
+            scope = "first " if self.stopped_early else ""
+            lines.append(
+                f"[FAIL] {label}{self.mismatch_rows} mismatching rows ({self.mismatch_words} words) in "
+                f"{scope}{self.rows_compared} compared (latency {self.latency})"
+            )
+            lines.extend(f"  {mismatch.describe(self.lane_names)}" for mismatch in self.mismatches)
+            hot = np.flatnonzero(self.lane_histogram)
+            lines.append("  per-lane: " + ", ".join(f"{lane}={self.lane_histogram[lane]}" for lane in hot))
+            if self.coeff_histogram is not None:
+                worst = np.argsort(self.coeff_histogram, kind="stable")[::-1][:8]
+                worst = [index for index in worst if self.coeff_histogram[index]]
+                lines.append("  worst coefficients: " + ", ".join(f"{i}={self.coeff_histogram[i]}" for i in worst))
+        return "\n".join(lines)
+
+    def check(self) -> "CompareReport":
+        """Print the summary; raise ``AssertionError`` when the streams differ."""
+        if not self.passed:
+            raise AssertionError(self.summary())
+        print(self.summary())
+        return self
+
+
+def find_latency(
+    expected, observed, max_latency: int, window: int = 1024, *, valid=None, expected_valid=None
+) -> int:
+    """Offset into ``observed`` (0..max_latency) with the fewest mismatches over ``window`` rows.
+
+    ``valid`` / ``expected_valid`` are applied as in ``compare``, so only
+    flagged beats are aligned.
+    """
+    expected, expected_unknown = _parts(as_stream(expected))
+    observed, observed_unknown = _parts(as_stream(observed))
+    if expected_valid is not None:
+        keep = np.asarray(expected_valid, dtype=bool)
+        expected, expected_unknown = expected[keep], expected_unknown[keep]
+    expected, expected_unknown = expected[:window], expected_unknown[:window]
+    best, best_errors = 0, None
+    for latency in range(max_latency + 1):
+        if valid is None:
+            beats = np.arange(latency, min(latency + window, len(observed)))
+        else:
+            beats = np.flatnonzero(np.asarray(valid, dtype=bool)[latency:])[:window] + latency
+        rows = min(len(expected), len(beats))
+        if rows <= 0:
+            break
+        beats = beats[:rows]
+        diff = _differs(expected[:rows], expected_unknown[:rows], observed[beats], observed_unknown[beats])
+        errors = int(diff.any(axis=1).sum())
+        if best_errors is None or errors < best_errors:
+            best, best_errors = latency, errors
+            if errors == 0:
+                break
+    return best
+
+
+def compare(
+    expected,
+    observed,
+    *,
+    name: str = "",
+    latency: Optional[int] = 0,
+    max_latency: int = 0,
+    valid=None,
+    expected_valid=None,
+    max_failures: Optional[int] = None,
+    report_limit: int = 10,
+    record_rows: Optional[int] = None,
+    cycle_offset: int = 0,
+    lane_names: Optional[Sequence[str]] = None,
+) -> CompareReport:
+    """Compare two ``(rows, lanes)`` streams.
+
+    ``observed`` row ``latency + i`` is matched with ``expected`` row ``i``;
+    ``latency=None`` searches ``0..max_latency``.  ``valid`` /
+    ``expected_valid`` are boolean masks over the (shifted) observed and the
+    expected rows; only flagged rows are compared, in order.  Comparison runs
+    in chunks and stops once ``max_failures`` (at least 1; ``None`` for no
+    limit) rows have mismatched.  Lanes that held ``x``/``z`` never match.
+    ``record_rows`` folds rows into records (e.g. 32 words per polynomial) to
+    build a per-coefficient histogram of ``record_rows * lanes`` bins.
+    """
+    if max_failures is not None and max_failures < 1:
+        raise ValueError("max_failures must be at least 1 (None for no limit)")
+    expected, observed = as_stream(expected), as_stream(observed)
+    if expected.shape[1] != observed.shape[1]:
+        raise ValueError(f"Lane count mismatch: expected {expected.shape[1]}, observed {observed.shape[1]}")
+    if latency is None:
+        latency = find_latency(expected, observed, max_latency, valid=valid, expected_valid=expected_valid)
+    expected, expected_unknown = _parts(expected)
+    observed, observed_unknown = _parts(observed)
+    observed, observed_unknown = observed[latency:], observed_unknown[latency:]
+    cycles = np.arange(len(observed), dtype=np.int64) + latency + cycle_offset
+    if valid is not None:
+        mask = np.asarray(valid, dtype=bool)[latency:]
+        observed, observed_unknown, cycles = observed[mask], observed_unknown[mask], cycles[mask]
+    if expected_valid is not None:
+        mask = np.asarray(expected_valid, dtype=bool)
+        expected, expected_unknown = expected[mask], expected_unknown[mask]
+
+    lanes = expected.shape[1]
+    total = min(len(expected), len(observed))
+    lane_histogram = np.zeros(lanes, dtype=np.int64)
+    coeff_histogram = None if record_rows is None else np.zeros(record_rows * lanes, dtype=np.int64)
+    mismatches: List[Mismatch] = []
+    mismatch_rows = mismatch_words = 0
+    compared = 0
+    stopped_early = False
+    for start in range(0, total, CHUNK_ROWS):
+        stop = min(start + CHUNK_ROWS, total)
+        diff = _differs(
+            expected[start:stop], expected_unknown[start:stop], observed[start:stop], observed_unknown[start:stop]
+        )
+        bad_rows = np.flatnonzero(diff.any(axis=1))
+        if max_failures is not None and mismatch_rows + len(bad_rows) >= max_failures:
+            keep = max_failures - mismatch_rows
+            stop = start + int(bad_rows[keep - 1]) + 1
+            diff, bad_rows = diff[: stop - start], bad_rows[:keep]
+            stopped_early = stop < total
+        compared = stop
+        if len(bad_rows):
+            mismatch_rows += len(bad_rows)
+            mismatch_words += int(diff.sum())
+            lane_histogram += diff.sum(axis=0)
+            if coeff_histogram is not None:
+                row_index, lane_index = np.nonzero(diff)
+                coeff = ((row_index + start) % record_rows) * lanes + lane_index
+                coeff_histogram += np.bincount(coeff, minlength=coeff_histogram.size)
+            if len(mismatches) < report_limit:
+                row_index, lane_index = np.nonzero(diff[bad_rows[: report_limit - len(mismatches)]])
+                for row, lane in zip(bad_rows[row_index] + start, lane_index):
+                    if len(mismatches) == report_limit:
+                        break
+                    want = None if expected_unknown[row, lane] else int(expected[row, lane])
+                    got = None if observed_unknown[row, lane] else int(observed[row, lane])
+                    mismatches.append(Mismatch(int(row), int(cycles[row]), int(lane), want, got))
+        if stopped_early or (max_failures is not None and mismatch_rows >= max_failures):
+            break
+    return CompareReport(
+        name=name,
+        rows_expected=len(expected),
+        rows_observed=len(observed),
+        rows_compared=compared,
+        latency=latency,
+        mismatch_rows=mismatch_rows,
+        mismatch_words=mismatch_words,
+        lane_histogram=lane_histogram,
+        coeff_histogram=coeff_histogram,
+        mismatches=mismatches,
+        stopped_early=stopped_early,
+        lane_names=lane_names,
+    )
+
+
+def compare_files(
+    expected_path: Union[str, Path],
+    observed_path: Union[str, Path],
+    *,
+    radix: int = 16,
+    lane_bits: LaneSpec = None,
+    lanes: LaneSpec = None,
+    **kwargs,
+) -> CompareReport:
+    """``load_stream`` both files and ``compare`` them."""
+    expected = load_stream(expected_path, radix=radix, lane_bits=lane_bits, lanes=lanes)
+    observed = load_stream(observed_path, radix=radix, lane_bits=lane_bits, lanes=lanes)
+    kwargs.setdefault("name", Path(observed_path).name)
+    return compare(expected, observed, **kwargs)
+
+
+def split_lanes(words: Sequence[int], lane_bits: int, lanes: int) -> np.ndarray:
+    """Split integers (possibly wider than 64 bits) into ``(len(words), lanes)`` lanes."""
+    mask = (1 << lane_bits) - 1
+    return np.array([[(word >> (lane * lane_bits)) & mask for lane in range(lanes)] for word in words], dtype=np.int64)
+
@@ -0,0 +1,505 @@
+"""Simulator-in-the-loop co-simulation bridge.
+
+Instead of writing stimulus files, launching ``vvp`` and parsing output files
+per vector set, the bridge keeps one simulator process running and streams
+records to it while golden results are computed concurrently and compared as
+responses arrive.
+
+Wire protocol (text, so a plain Verilog testbench can speak it with
+``$fscanf`` / ``$fdisplay``)::
+
+    stimulus  one record per line: ``words`` space-separated fixed-width hex words
+    response  one line per stimulus record, same encoding, in order
+    end       the driver closes its write side; the simulator sees EOF ($feof),
+              drains and exits
+
+Transports:
+
+* ``fifo``  -- two named pipes; the simulator is started with
+  ``+stim=<path> +resp=<path>`` and must open ``stim`` (read) before ``resp``
+  (write);
+* ``socket`` -- one Unix-domain stream socket; the simulator (e.g. a VPI shim)
+  is started with ``+sock=<path>`` and connects to it.
+
+A simulator that sends nothing for ``response_timeout`` seconds (default
+``CONNECT_TIMEOUT``) while responses are outstanding fails the run with a
+``TimeoutError`` instead of hanging the bridge.
+
+``python -m golden.cosim standin`` is a software stand-in simulator speaking
+the same protocol (NTT/INTT/echo models, optional fault injection) so the
+bridge can be exercised without Icarus installed::
+
+    python -m golden.cosim run --model ntt --count 100000 --transport socket
+"""
+from __future__ import annotations
+
+import argparse
+import errno
+import os
+import queue
+import select
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import compare, ntt_golden
+
+ROOT = Path(__file__).resolve().parents[1]
+TRANSPORTS = ("fifo", "socket")
+CONNECT_TIMEOUT = 30.0
+
+_HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+
+
+# ---------------------------------------------------------------------------
+# Record encoding
+# ---------------------------------------------------------------------------
+
+
+def encode_records(records: np.ndarray, word_bits: int) -> bytes:
+    """Encode ``(count, words)`` unsigned words as protocol lines."""
+    digits = word_bits // 4
+    records = np.asarray(records, dtype=np.uint64)
+    count, words = records.shape
+    text = np.empty((count, words, digits + 1), dtype=np.uint8)
+    for digit in range(digits):
+        shift = np.uint64(4 * (digits - 1 - digit))
+        text[:, :, digit] = _HEX_DIGITS[((records >> shift) & np.uint64(0xF)).astype(np.intp)]
+    text[:, :, digits] = ord(" ")
+    text[:, -1, digits] = ord("\n")
+    return text.tobytes()
+
+
+def decode_records(lines: Sequence[bytes], words: int) -> np.ndarray:
+    """Decode protocol lines into a ``(len(lines), words)`` int64 array."""
+    tokens = b" ".join(lines).split()
+    if len(tokens) != len(lines) * words:
+        raise ValueError(f"Expected {words} words per response line")
+    if not tokens:
+        return np.zeros((0, words), dtype=np.int64)
+    return compare.parse_hex_tokens(tokens).reshape(len(lines), words)
+
+
+# ---------------------------------------------------------------------------
+# Models shared by the stand-in simulator and the golden side
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class CosimModel:
+    name: str
+    words: int  # stimulus words per record
+    response_words: int
+    word_bits: int
+    golden: Callable[[np.ndarray], np.ndarray]
+    stimulus: Callable[[np.random.Generator, int], np.ndarray]
+
+
+def _random_polys(rng: np.random.Generator, count: int) -> np.ndarray:
+    return rng.integers(0, ntt_golden.KYBER_Q, size=(count, ntt_golden.KYBER_N), dtype=np.int64)
+
+
+def _random_words(rng: np.random.Generator, count: int) -> np.ndarray:
+    return rng.integers(0, 1 << 16, size=(count, 8), dtype=np.int64)
+
+
+MODELS: Dict[str, CosimModel] = {
+    "ntt": CosimModel("ntt", 256, 256, 16, ntt_golden.ntt_many, _random_polys),
+    "intt": CosimModel("intt", 256, 256, 16, ntt_golden.intt_many, _random_polys),
+    "echo": CosimModel("echo", 8, 8, 16, lambda batch: np.asarray(batch, dtype=np.int64), _random_words),
+}
+
+
+def stimulus_batches(model: CosimModel, count: int, batch: int, seed: int = 0) -> Iterator[np.ndarray]:
+    """``count`` random records for ``model`` in chunks of ``batch``."""
+    rng = np.random.default_rng(seed)
+    for start in range(0, count, batch):
+        yield model.stimulus(rng, min(batch, count - start))
+
+
+# ---------------------------------------------------------------------------
+# Transports
+# ---------------------------------------------------------------------------
+
+
+class ResponseReader:
+    """Line reader over the response fd that gives up after ``timeout`` s without data."""
+
+    def __init__(self, fd: int, timeout: float = CONNECT_TIMEOUT, owner: Optional[object] = None) -> None:
+        self.fd = fd
+        self.timeout = timeout
+        self._owner = owner  # keeps a socket alive while its fd is read
+        self._buffer = b""
+        self._start = 0
+        self._eof = False
+
+    def readline(self) -> bytes:
+        """Next line including ``\n``; the remainder at EOF, then ``b""``."""
+        while True:
+            end = self._buffer.find(b"\n", self._start)
+            if end >= 0:
+                line, self._start = self._buffer[self._start : end + 1], end + 1
+                return line
+            if self._eof:
+                line, self._buffer, self._start = self._buffer[self._start :], b"", 0
+                return line
+            ready, _, _ = select.select([self.fd], [], [], self.timeout)
+            if not ready:
+                raise TimeoutError(f"No response from the simulator for {self.timeout} s")
+            chunk = os.read(self.fd, 1 << 16)
+            self._buffer, self._start = self._buffer[self._start :] + chunk, 0
+            self._eof = not chunk
+
+    def close(self) -> None:
+        if self._owner is None:
+            os.close(self.fd)
+
+
+class _Transport:
+    plusargs: List[str]
+
+    def connect(self, proc: subprocess.Popen) -> Tuple[BinaryIO, ResponseReader]:
+        """Return ``(stimulus writer, response reader)`` once the simulator is attached."""
+        raise NotImplementedError
+
+    def close_stimulus(self, writer: BinaryIO) -> None:
+        writer.close()
+
+    def cleanup(self) -> None:
+        pass
+
+
+def _wait(proc: subprocess.Popen, deadline: float, what: str) -> None:
+    if proc.poll() is not None:
+        raise RuntimeError(f"Simulator exited with {proc.returncode} before {what}")
+    if time.monotonic() > deadline:
+        raise TimeoutError(f"Timed out after {CONNECT_TIMEOUT} s waiting for the simulator before {what}")
+    time.sleep(0.01)
+
+
+class FifoTransport(_Transport):
+    def __init__(self, directory: Path) -> None:
+        self.stim = directory / "stim.fifo"
+        self.resp = directory / "resp.fifo"
+        os.mkfifo(self.stim)
+        os.mkfifo(self.resp)
+        self.plusargs = [f"+stim={self.stim}", f"+resp={self.resp}"]
+
+    def connect(self, proc: subprocess.Popen) -> Tuple[BinaryIO, BinaryIO]:
+        deadline = time.monotonic() + CONNECT_TIMEOUT
+        while True:
+            # A non-blocking write open fails with ENXIO until the simulator opens the read side.
+            try:
+                fd = os.open(self.stim, os.O_WRONLY | os.O_NONBLOCK)
+                break
+            except OSError as exc:
+                if exc.errno != errno.ENXIO:
+                    raise
+                _wait(proc, deadline, "opening the stimulus pipe")
+        os.set_blocking(fd, True)
+        writer = os.fdopen(fd, "wb")
+        reader = ResponseReader(os.open(self.resp, os.O_RDONLY))  # blocks until the simulator opens its write side
+        return writer, reader
+
+    def cleanup(self) -> None:
+        for path in (self.stim, self.resp):
+            path.unlink(missing_ok=True)
+
+
+class SocketTransport(_Transport):
+    def __init__(self, directory: Path) -> None:
+        self.path = directory / "cosim.sock"
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(str(self.path))
+        self.server.listen(1)
+        self.server.settimeout(0.1)
+        self.plusargs = [f"+sock={self.path}"]
+        self.conn: Optional[socket.socket] = None
+
+    def connect(self, proc: subprocess.Popen) -> Tuple[BinaryIO, ResponseReader]:
+        deadline = time.monotonic() + CONNECT_TIMEOUT
+        while self.conn is None:
+            try:
+                self.conn, _ = self.server.accept()
+            except socket.timeout:
+                _wait(proc, deadline, "connecting to the socket")
+        self.conn.settimeout(None)
+        return self.conn.makefile("wb"), ResponseReader(self.conn.fileno(), owner=self.conn)
+
+    def close_stimulus(self, writer: BinaryIO) -> None:
+        writer.close()
+        self.conn.shutdown(socket.SHUT_WR)
+
+    def cleanup(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+        self.server.close()
+        self.path.unlink(missing_ok=True)
+
+
+# ---------------------------------------------------------------------------
+# Bridge
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class CosimResult:
+    vectors_sent: int = 0
+    vectors_checked: int = 0
+    mismatch_rows: int = 0
+    mismatch_words: int = 0
+    mismatches: List[compare.Mismatch] = field(default_factory=list)
+    wall_time: float = 0.0
+    returncode: Optional[int] = None
+    error: Optional[str] = None
+
+    @property
+    def passed(self) -> bool:
+        return (
+            self.error is None
+            and self.mismatch_rows == 0
+            and self.vectors_checked == self.vectors_sent
+            and self.returncode in (0, None)
+        )
+
+    @property
+    def throughput(self) -> float:
+        return self.vectors_checked / self.wall_time if self.wall_time else 0.0
+
+    def summary(self) -> str:
+        tag = "PASS" if self.passed else "FAIL"
+        lines = [
+            f"[{tag}] {self.vectors_checked}/{self.vectors_sent} vectors checked, "
+            f"{self.mismatch_rows} mismatching ({self.throughput:,.0f} vectors/s)"
+        ]
+        lines += [f"  {mismatch.describe()}" for mismatch in self.mismatches]
+        if self.error:
+            lines.append(f"  error: {self.error}")
+        return "\n".join(lines)
+
+
+class CosimBridge:
+    """Drive one long-running simulator process over a streaming transport."""
+
+    def __init__(
+        self,
+        command: Sequence[str],
+        *,
+        words: int,
+        word_bits: int,
+        response_words: Optional[int] = None,
+        transport: str = "fifo",
+        cwd: Optional[Path] = None,
+        max_failures: Optional[int] = 10,
+        report_limit: int = 10,
+        golden_workers: int = 1,
+        response_timeout: float = CONNECT_TIMEOUT,
+    ) -> None:
+        if transport not in TRANSPORTS:
+            raise ValueError(f"Unknown transport {transport!r}; expected one of {TRANSPORTS}")
+        self.command = list(command)
+        self.words = words
+        self.word_bits = word_bits
+        self.response_words = response_words or words
+        self.transport = transport
+        self.cwd = cwd
+        self.max_failures = max_failures
+        self.report_limit = report_limit
+        self.golden_workers = golden_workers
+        self.response_timeout = response_timeout
+
+    def run(self, batches: Iterable[np.ndarray], golden: Callable[[np.ndarray], np.ndarray]) -> CosimResult:
+        """Stream ``batches`` to the simulator and compare responses with ``golden(batch)``."""
+        result = CosimResult()
+        start = time.perf_counter()
+        with tempfile.TemporaryDirectory(prefix="cosim-") as tmp:
+            channel = (FifoTransport if self.transport == "fifo" else SocketTransport)(Path(tmp))
+            proc = subprocess.Popen(self.command + channel.plusargs, cwd=self.cwd)
+            try:
+                writer, reader = channel.connect(proc)
+                reader.timeout = self.response_timeout
+                if self._stream(channel, writer, reader, batches, golden, result):
+                    result.returncode = proc.wait(timeout=CONNECT_TIMEOUT)
+                reader.close()
+            except Exception as exc:  # noqa: BLE001 - surfaced through the result
+                result.error = f"{type(exc).__name__}: {exc}"
+            finally:
+                if proc.poll() is None:
+                    proc.kill()
+                    proc.wait()
+                channel.cleanup()
+        result.wall_time = time.perf_counter() - start
+        return result
+
+    def _stream(self, channel, writer, reader, batches, golden, result: CosimResult) -> bool:
+        """Returns False when stopped early; the caller then kills the simulator."""
+        pending: "queue.Queue[Optional[Tuple[int, Future]]]" = queue.Queue(maxsize=64)
+        stop = threading.Event()
+        failure: List[BaseException] = []
+
+        def feed(pool: ThreadPoolExecutor) -> None:
+            try:
+                for batch in batches:
+                    if stop.is_set():
+                        break
+                    batch = np.asarray(batch)
+                    pending.put((len(batch), pool.submit(golden, batch)))
+                    writer.write(encode_records(batch, self.word_bits))
+                    writer.flush()
+                    result.vectors_sent += len(batch)
+            except BaseException as exc:  # noqa: BLE001 - re-raised by the reader
+                failure.append(exc)
+            finally:
+                pending.put(None)
+                try:
+                    channel.close_stimulus(writer)
+                except OSError:
+                    pass
+
+        with ThreadPoolExecutor(max_workers=self.golden_workers) as pool:
+            feeder = threading.Thread(target=feed, args=(pool,), daemon=True)
+            feeder.start()
+            while True:
+                item = pending.get()
+                if item is None:
+                    break
+                count, expected = item
+                try:
+                    lines = [reader.readline() for _ in range(count)]
+                except TimeoutError:
+                    stop.set()
+                    raise
+                lines = [line for line in lines if line]
+                observed = decode_records(lines, self.response_words)
+                report = compare.compare(
+                    expected.result()[: len(observed)],
+                    observed,
+                    cycle_offset=result.vectors_checked,
+                    max_failures=None if self.max_failures is None else self.max_failures - result.mismatch_rows,
+                    report_limit=self.report_limit - len(result.mismatches),
+                )
+                if report.mismatches:
+                    for mismatch in report.mismatches:
+                        mismatch.row += result.vectors_checked
+                    result.mismatches.extend(report.mismatches)
+                result.mismatch_rows += report.mismatch_rows
+                result.mismatch_words += report.mismatch_words
+                result.vectors_checked += report.rows_compared
+                if len(observed) < count:
+                    raise RuntimeError("Simulator closed the response stream early")
+                if self.max_failures is not None and result.mismatch_rows >= self.max_failures:
+                    # The feeder may be blocked on a full pipe; killing the simulator releases it.
+                    stop.set()
+                    return False
+            feeder.join()
+        if failure:
+            raise failure[0]
+        return True
+
+
+def standin_command(model: str, *, batch: int = 256, fault_every: int = 0) -> List[str]:
+    """Command line of the software stand-in simulator (run with ``cwd=ROOT``)."""
+    return [
+        sys.executable,
+        "-m",
+        "golden.cosim",
+        "standin",
+        "--model",
+        model,
+        "--batch",
+        str(batch),
+        "--fault-every",
+        str(fault_every),
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Software stand-in simulator
+# ---------------------------------------------------------------------------
+
+
+def _plusargs(argv: Sequence[str]) -> Dict[str, str]:
+    return dict(arg[1:].split("=", 1) for arg in argv if arg.startswith("+") and "=" in arg)
+
+
+def standin(model: CosimModel, plusargs: Dict[str, str], batch: int, fault_every: int) -> None:
+    """Serve ``model`` over the transport described by ``plusargs`` until EOF."""
+    conn = None
+    if "sock" in plusargs:
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conn.connect(plusargs["sock"])
+        reader, writer = conn.makefile("rb"), conn.makefile("wb")
+    else:
+        # Same open order a Verilog testbench uses: stimulus first, then responses.
+        reader = open(plusargs["stim"], "rb")
+        writer = open(plusargs["resp"], "wb")
+    served = 0
+    while True:
+        lines = []
+        for _ in range(batch):
+            line = reader.readline()
+            if not line:
+                break
+            lines.append(line)
+        if not lines:
+            break
+        response = np.array(model.golden(decode_records(lines, model.words)), dtype=np.int64)
+        if fault_every:
+            faulty = np.arange(served, served + len(lines)) % fault_every == fault_every - 1
+            response[faulty, 0] ^= 1
+        writer.write(encode_records(response, model.word_bits))
+        writer.flush()
+        served += len(lines)
+    writer.close()
+    reader.close()
+    if conn is not None:
+        conn.close()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="stream random vectors through a simulator")
+    run.add_argument("--model", choices=sorted(MODELS), default="ntt")
+    run.add_argument("--count", type=int, default=10000)
+    run.add_argument("--batch", type=int, default=256)
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--transport", choices=TRANSPORTS, default="fifo")
+    run.add_argument("--sim", nargs=argparse.REMAINDER, help="simulator command (default: software stand-in)")
+    run.add_argument("--fault-every", type=int, default=0, help="stand-in: corrupt every N-th response")
+    serve = sub.add_parser("standin", help="software stand-in simulator")
+    serve.add_argument("--model", choices=sorted(MODELS), required=True)
+    serve.add_argument("--batch", type=int, default=256)
+    serve.add_argument("--fault-every", type=int, default=0)
+    args = parser.parse_args([arg for arg in argv if not arg.startswith("+")])
+
+    if args.command == "standin":
+        standin(MODELS[args.model], _plusargs(argv), args.batch, args.fault_every)
+        return
+    model = MODELS[args.model]
+    command = args.sim or standin_command(model.name, batch=args.batch, fault_every=args.fault_every)
+    bridge = CosimBridge(
+        command,
+        words=model.words,
+        word_bits=model.word_bits,
+        response_words=model.response_words,
+        transport=args.transport,
+        cwd=None if args.sim else ROOT,
+    )
+    result = bridge.run(stimulus_batches(model, args.count, args.batch, args.seed), model.golden)
+    print(result.summary())
+    sys.exit(0 if result.passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Loader for the in-tree FIPS 203 (ML-KEM) golden model.
+
+The pure-Python model lives in ``200.great_golden/1.CRYSTALS-kyber`` and uses
+flat ``from module import *`` imports, so its directory is put on ``sys.path``
+once and the three modules are imported by their own names.
+"""
+from __future__ import annotations
+
+import sys
+from functools import lru_cache
+from pathlib import Path
+from types import SimpleNamespace
+
+FIPS203_DIR = Path(__file__).resolve().parents[2] / "200.great_golden" / "1.CRYSTALS-kyber" / "CRYSTALS-kyber_code"
+
+
+@lru_cache(maxsize=None)
+def load() -> SimpleNamespace:
+    """Import the golden model; raises ``RuntimeError`` if it cannot be loaded."""
+    if not (FIPS203_DIR / "ML_KEM_internal.py").is_file():
+        raise RuntimeError(f"FIPS 203 golden model not found under {FIPS203_DIR}")
+    path = str(FIPS203_DIR)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+    try:
+        import ML_KEM_internal  # type: ignore
+        import auxiliary_function  # type: ignore
+        import kyber_k_PKE  # type: ignore
+    except ImportError as exc:  # pragma: no cover - pycryptodome missing
+        raise RuntimeError(f"FIPS 203 golden model unavailable: {exc}") from exc
+    return SimpleNamespace(
+        auxiliary_function=auxiliary_function,
+        k_pke=kyber_k_PKE,
+        internal=ML_KEM_internal,
+        params={2: auxiliary_function.params512, 3: auxiliary_function.params768, 4: auxiliary_function.params1024},
+    )
+
+
+def params_for(k: int):
+    """Return the golden model's parameter tuple for ``k`` in {2, 3, 4}."""
+    try:
+        return load().params[k]
+    except KeyError as exc:
+        raise ValueError(f"Unsupported security level k={k}") from exc
@@ -0,0 +1,50 @@
+"""Loader for the in-tree FIPS 204 (ML-DSA) golden model.
+
+Like ``fips203``, the model in ``200.great_golden/2.CRYSTALS-Dilithium`` uses
+flat ``from module import *`` imports.  Its ``auxiliary_function`` module has
+the same name as the ML-KEM one, so the modules are imported with the
+ML-DSA directory first on ``sys.path`` and then taken out of ``sys.modules``
+again; both models can be loaded in one process.
+"""
+from __future__ import annotations
+
+import importlib
+import sys
+from functools import lru_cache
+from pathlib import Path
+from types import SimpleNamespace
+
+FIPS204_DIR = Path(__file__).resolve().parents[2] / "200.great_golden" / "2.CRYSTALS-Dilithium" / "ML_DSA_code"
+_MODULES = ("auxiliary_function", "ML_DSA_internal")
+
+
+@lru_cache(maxsize=None)
+def load() -> SimpleNamespace:
+    """Import the golden model; raises ``RuntimeError`` if it cannot be loaded."""
+    if not (FIPS204_DIR / "ML_DSA_internal.py").is_file():
+        raise RuntimeError(f"FIPS 204 golden model not found under {FIPS204_DIR}")
+    saved = {name: sys.modules.pop(name) for name in _MODULES if name in sys.modules}
+    sys.path.insert(0, str(FIPS204_DIR))
+    try:
+        internal = importlib.import_module("ML_DSA_internal")
+        auxiliary_function = sys.modules["auxiliary_function"]
+    except ImportError as exc:  # pragma: no cover - pycryptodome missing
+        raise RuntimeError(f"FIPS 204 golden model unavailable: {exc}") from exc
+    finally:
+        sys.path.remove(str(FIPS204_DIR))
+        for name in _MODULES:
+            sys.modules.pop(name, None)
+        sys.modules.update(saved)
+    return SimpleNamespace(
+        auxiliary_function=auxiliary_function,
+        internal=internal,
+        params={44: auxiliary_function.ML_DSA_44, 65: auxiliary_function.ML_DSA_65, 87: auxiliary_function.ML_DSA_87},
+    )
+
+
+def params_for(level: int):
+    """Return the golden model's parameter tuple for ML-DSA-``level`` (44, 65 or 87)."""
+    try:
+        return load().params[level]
+    except KeyError as exc:
+        raise ValueError(f"Unsupported ML-DSA level {level}") from exc
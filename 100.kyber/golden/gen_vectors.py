@@ -1,39 +1,77 @@
-"""Utility to generate simulation vectors for Kyber hardware modules."""
+"""Utility to generate simulation vectors for Kyber hardware modules.
+
+Two entry points share this module:
+
+* ``write_smoke_vectors()`` keeps the original single-vector JSON set
+  (``cbd_eta2.json``, ``uniform_q.json``, ``mlkem512.json``) used by
+  ``scripts/run_kat_verify.py``;
+* the bulk CLI generates ``N`` fixed-layout records per module from a master
+  seed, fans the work out over a process pool and streams the records to disk
+  as ``$readmemh`` hex, raw little-endian binary, NumPy ``.npy`` or an indexed
+  ``.kvec`` container (see ``golden.vecfile``), together
+  with a ``<module>.json`` manifest describing the record layout.
+
+Example (from ``100.kyber``)::
+
+    python -m golden.gen_vectors --modules cbd ntt kem2 --count 100000 --format npy
+"""
 from __future__ import annotations
 
+import argparse
+import hashlib
 import json
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, Tuple
+from typing import BinaryIO, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-from . import kyber_ref, sample_golden
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from . import kyber_ref, ntt_golden, poly_golden, sample_golden
+
+KYBER_Q = 3329
+KYBER_N = 256
+VECTOR_SEED_BYTES = 32
+CBD_INPUT_BYTES = 64 * 2  # SamplePolyCBD consumes 64 * eta bytes; records use eta=2
+UNIFORM_INPUT_BYTES = 768
+DEFAULT_DATA_DIR = Path(__file__).resolve().parents[1] / "test" / "data"
+FORMATS = ("hex", "bin", "npy", "kvec")
 
 
 def generate_cbd_vectors(seed: bytes, eta: int) -> Dict[str, Iterable[int]]:
-    stream = sample_golden.shake128(seed, 256)
+    stream = sample_golden.shake128(seed, 64 * eta)
     coeffs = sample_golden.cbd(stream, eta)
     return {"seed": list(seed), "coeffs": coeffs}
 
 
 def generate_uniform_vectors(seed: bytes, bound: int) -> Dict[str, Iterable[int]]:
-    stream = sample_golden.shake128(seed, 512)
+    # 2 bytes per 12-bit candidate, ~81% acceptance: 768 bytes covers 256 coefficients.
+    stream = sample_golden.shake128(seed, UNIFORM_INPUT_BYTES)
     coeffs = sample_golden.uniform(stream, bound)
     return {"seed": list(seed), "coeffs": coeffs}
 
 
 def dump_vectors(path: Path, data: Dict[str, object]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(data, indent=2))
+    path.write_text(json.dumps(data, separators=(",", ":")))
 
 
-def main() -> None:
-    base = Path(__file__).resolve().parents[1] / "test" / "data"
+def write_smoke_vectors(base: Path = DEFAULT_DATA_DIR) -> None:
+    """Write the original one-vector-per-module JSON smoke set."""
     seed = bytes(range(48))
     dump_vectors(base / "cbd_eta2.json", generate_cbd_vectors(seed, eta=2))
-    dump_vectors(base / "uniform_q.json", generate_uniform_vectors(seed, bound=3329))
-    artifacts = kyber_ref.full_flow(2)
+    dump_vectors(base / "uniform_q.json", generate_uniform_vectors(seed, bound=KYBER_Q))
+    artifacts = kyber_ref.full_flow(2, bytes(range(96)))
     dump_vectors(
         base / "mlkem512.json",
         {
+            "seed": list(artifacts.seed),
             "pk": list(artifacts.public_key),
             "sk": list(artifacts.secret_key),
             "ct": list(artifacts.ciphertext),
@@ -42,5 +80,288 @@ def main() -> None:
     )
 
 
+# ---------------------------------------------------------------------------
+# Bulk record builders: per-vector seeds -> (count, record_words) array
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class ModuleSpec:
+    """Fixed record layout of one module's vectors."""
+
+    name: str
+    word_bits: int
+    fields: Tuple[Tuple[str, int], ...]  # (field name, words) in record order
+    build: Callable[[Sequence[bytes]], "np.ndarray"]
+
+    @property
+    def record_words(self) -> int:
+        return sum(words for _, words in self.fields)
+
+    @property
+    def dtype(self) -> "np.dtype":
+        return np.dtype("<u2") if self.word_bits == 16 else np.dtype("u1")
+
+
+def derive_seed(master: bytes, module: str, index: int) -> bytes:
+    """Per-vector seed: SHAKE256(master || module || index)."""
+    data = master + module.encode() + index.to_bytes(8, "little")
+    return hashlib.shake_256(data).digest(VECTOR_SEED_BYTES)
+
+
+# Domain bytes appended to a vector seed, one per stimulus polynomial, so no two
+# modules (or operands) draw the same polynomial from the same seed.
+NTT_DOMAIN = b"\x00"
+INTT_DOMAIN = b"\x01"
+POLY_A_DOMAIN = b"\x02"
+POLY_B_DOMAIN = b"\x03"
+
+
+def _random_polys(seeds: Sequence[bytes], domain: bytes) -> "np.ndarray":
+    # Stimulus polynomials: 16-bit SHAKE128 samples reduced mod q.
+    raw = b"".join(sample_golden.shake128(seed + domain, 2 * KYBER_N) for seed in seeds)
+    return (np.frombuffer(raw, dtype="<u2").reshape(len(seeds), KYBER_N) % KYBER_Q).astype(np.int64)
+
+
+def _bytes_as_words(chunks: Sequence[bytes]) -> "np.ndarray":
+    return np.frombuffer(b"".join(chunks), dtype="<u2").reshape(len(chunks), -1)
+
+
+def _build_cbd(seeds: Sequence[bytes]) -> "np.ndarray":
+    streams = [sample_golden.shake128(seed, CBD_INPUT_BYTES) for seed in seeds]
+    coeffs = sample_golden.cbd_many(b"".join(streams), 2).astype(np.uint16)
+    return np.hstack([_bytes_as_words(streams), coeffs])
+
+
+def _build_uniform(seeds: Sequence[bytes]) -> "np.ndarray":
+    streams = [sample_golden.shake128(seed, UNIFORM_INPUT_BYTES) for seed in seeds]
+    coeffs = np.array([sample_golden.uniform(stream, KYBER_Q) for stream in streams], dtype=np.uint16)
+    return np.hstack([_bytes_as_words(streams), coeffs])
+
+
+def _build_ntt(seeds: Sequence[bytes]) -> "np.ndarray":
+    polys = _random_polys(seeds, NTT_DOMAIN)
+    return np.hstack([polys, ntt_golden.ntt_many(polys)]).astype(np.uint16)
+
+
+def _build_intt(seeds: Sequence[bytes]) -> "np.ndarray":
+    polys = _random_polys(seeds, INTT_DOMAIN)
+    return np.hstack([polys, ntt_golden.intt_many(polys)]).astype(np.uint16)
+
+
+def _build_poly(seeds: Sequence[bytes]) -> "np.ndarray":
+    a = _random_polys(seeds, POLY_A_DOMAIN)
+    b = _random_polys(seeds, POLY_B_DOMAIN)
+    rows = [
+        list(x) + list(y) + poly_golden.add(x, y) + poly_golden.sub(x, y)
+        for x, y in zip(a.tolist(), b.tolist())
+    ]
+    return np.array(rows, dtype=np.uint16)
+
+
+def _kem_builder(k: int) -> Callable[[Sequence[bytes]], "np.ndarray"]:
+    def build(seeds: Sequence[bytes]) -> "np.ndarray":
+        rows = []
+        for seed in seeds:
+            flow_seed = hashlib.shake_256(seed).digest(kyber_ref.SEED_BYTES + kyber_ref.MESSAGE_BYTES)
+            art = kyber_ref.full_flow(k, flow_seed, backend="fips203")
+            rows.append(flow_seed + art.public_key + art.secret_key + art.ciphertext + art.shared_secret)
+        return np.frombuffer(b"".join(rows), dtype=np.uint8).reshape(len(seeds), -1)
+
+    return build
+
+
+def _kem_spec(k: int) -> ModuleSpec:
+    du, dv = (11, 5) if k == 4 else (10, 4)
+    return ModuleSpec(
+        name=f"kem{k}",
+        word_bits=8,
+        fields=(
+            ("seed", kyber_ref.SEED_BYTES + kyber_ref.MESSAGE_BYTES),
+            ("pk", 384 * k + 32),
+            ("sk", 768 * k + 96),
+            ("ct", 32 * (du * k + dv)),
+            ("ss", 32),
+        ),
+        build=_kem_builder(k),
+    )
+
+
+MODULE_SPECS: Dict[str, ModuleSpec] = {
+    spec.name: spec
+    for spec in (
+        ModuleSpec("cbd", 16, (("prf", CBD_INPUT_BYTES // 2), ("coeffs", KYBER_N)), _build_cbd),
+        ModuleSpec("uniform", 16, (("stream", UNIFORM_INPUT_BYTES // 2), ("coeffs", KYBER_N)), _build_uniform),
+        ModuleSpec("ntt", 16, (("poly", KYBER_N), ("ntt", KYBER_N)), _build_ntt),
+        ModuleSpec("intt", 16, (("poly", KYBER_N), ("intt", KYBER_N)), _build_intt),
+        ModuleSpec(
+            "poly", 16, (("a", KYBER_N), ("b", KYBER_N), ("add", KYBER_N), ("sub", KYBER_N)), _build_poly
+        ),
+        _kem_spec(2),
+        _kem_spec(3),
+        _kem_spec(4),
+    )
+}
+
+
+def _generate_chunk(task: Tuple[str, bytes, int, int]) -> "np.ndarray":
+    module, master, start, stop = task
+    spec = MODULE_SPECS[module]
+    seeds = [derive_seed(master, module, index) for index in range(start, stop)]
+    records = spec.build(seeds)
+    if records.shape != (stop - start, spec.record_words):
+        raise AssertionError(f"{module}: record shape {records.shape} does not match layout")
+    return records.astype(spec.dtype, copy=False)
+
+
+# ---------------------------------------------------------------------------
+# Streaming writers
+# ---------------------------------------------------------------------------
+
+
+class _VectorWriter:
+    """Appends record chunks to ``path`` in one of ``FORMATS``."""
+
+    def __init__(self, path: Path, spec: ModuleSpec, count: int, fmt: str) -> None:
+        self.spec = spec
+        self.fmt = fmt
+        self._row = 0
+        self._handle: Optional[BinaryIO] = None
+        self._memmap = None
+        self._kvec = None
+        self._hex_table = None
+        if fmt == "npy":
+            self._memmap = np.lib.format.open_memmap(
+                path, mode="w+", dtype=spec.dtype, shape=(count, spec.record_words)
+            )
+        elif fmt == "kvec":
+            from .vecfile import VectorFileWriter
+
+            self._kvec = VectorFileWriter(
+                path, module=spec.name, word_bits=spec.word_bits, record_words=spec.record_words
+            )
+        else:
+            self._handle = path.open("wb")
+        if fmt == "hex":
+            # $readmemh: one word per line, fixed-width hex; built once per file, indexed per chunk.
+            digits = spec.word_bits // 4
+            self._hex_table = np.array([f"{value:0{digits}x}\n".encode() for value in range(1 << spec.word_bits)])
+
+    def write(self, records: "np.ndarray") -> None:
+        if self._memmap is not None:
+            self._memmap[self._row : self._row + len(records)] = records
+        elif self._kvec is not None:
+            self._kvec.extend(records)
+        elif self.fmt == "bin":
+            self._handle.write(records.tobytes())
+        else:
+            self._handle.write(b"".join(self._hex_table[records.ravel()]))
+        self._row += len(records)
+
+    def close(self) -> None:
+        if self._memmap is not None:
+            self._memmap.flush()
+            del self._memmap
+            self._memmap = None
+        if self._kvec is not None:
+            self._kvec.close()
+            self._kvec = None
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+def manifest(spec: ModuleSpec, count: int, fmt: str, master: bytes) -> Dict[str, object]:
+    offset = 0
+    fields = []
+    for name, words in spec.fields:
+        fields.append({"name": name, "offset": offset, "words": words})
+        offset += words
+    return {
+        "module": spec.name,
+        "count": count,
+        "format": fmt,
+        "word_bits": spec.word_bits,
+        "record_words": spec.record_words,
+        "fields": fields,
+        "master_seed": master.hex(),
+        "seed_derivation": "SHAKE256(master || module || index_le64)[:32]",
+    }
+
+
+def _chunk_tasks(module: str, master: bytes, count: int, chunk: int) -> Iterator[Tuple[str, bytes, int, int]]:
+    for start in range(0, count, chunk):
+        yield module, master, start, min(start + chunk, count)
+
+
+def generate_module(
+    module: str,
+    count: int,
+    out_dir: Path,
+    *,
+    master: bytes,
+    fmt: str = "npy",
+    workers: Optional[int] = None,
+    chunk: int = 512,
+) -> Path:
+    """Generate ``count`` records for ``module`` and stream them to ``out_dir``."""
+    if np is None:
+        raise RuntimeError("NumPy is required for bulk vector generation")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of {FORMATS}")
+    spec = MODULE_SPECS[module]
+    out_dir.mkdir(parents=True, exist_ok=True)
+    path = out_dir / f"{module}.{fmt}"
+    writer = _VectorWriter(path, spec, count, fmt)
+    tasks = _chunk_tasks(module, master, count, chunk)
+    try:
+        if workers == 1:
+            for records in map(_generate_chunk, tasks):
+                writer.write(records)
+        else:
+            # At most two chunks per worker in flight: memory stays bounded however large
+            # ``count`` is, and results are written in submission (index) order.
+            window = 2 * (workers or os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending: Deque[Future] = deque()
+                for task in tasks:
+                    pending.append(pool.submit(_generate_chunk, task))
+                    if len(pending) >= window:
+                        writer.write(pending.popleft().result())
+                while pending:
+                    writer.write(pending.popleft().result())
+    finally:
+        writer.close()
+    (out_dir / f"{module}.json").write_text(json.dumps(manifest(spec, count, fmt, master), indent=2))
+    return path
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Kyber hardware test-vector factory")
+    parser.add_argument("--modules", nargs="*", choices=sorted(MODULE_SPECS), default=[],
+                        help="Modules to generate (omit to write the JSON smoke set)")
+    parser.add_argument("--count", type=int, default=1000, help="Vectors per module")
+    parser.add_argument("--seed", default="00" * 32, help="Master seed (hex)")
+    parser.add_argument("--format", choices=FORMATS, default="npy")
+    parser.add_argument("--out", type=Path, default=DEFAULT_DATA_DIR)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk", type=int, default=512, help="Vectors per worker task")
+    args = parser.parse_args(argv)
+
+    if not args.modules:
+        write_smoke_vectors(args.out)
+        print(f"[INFO] Wrote JSON smoke vectors to {args.out}")
+        return
+    master = bytes.fromhex(args.seed)
+    for module in args.modules:
+        start = time.perf_counter()
+        path = generate_module(
+            module, args.count, args.out, master=master, fmt=args.format, workers=args.workers, chunk=args.chunk
+        )
+        elapsed = time.perf_counter() - start
+        size = path.stat().st_size
+        print(f"[INFO] {module}: {args.count} vectors -> {path} ({size} bytes, {elapsed:.2f} s)")
+
+
 if __name__ == "__main__":
     main()
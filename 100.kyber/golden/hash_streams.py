@@ -0,0 +1,465 @@
+"""Real SHAKE/SHA-3 streams for the ``hash_stub`` simulation model.
+
+``RTL/hash_stub.v`` stands in for the Keccak core: it dumps the 32 seed bytes
+and the nonce it was given to ``sim_hash_stub/test-hash_stub.txt`` (one byte
+per line), writes ``1`` to ``hash.flag`` and waits for ``hash2.flag`` to read
+``1``, then loads ``mem{0..3}_hash_stub.hex`` into its output banks.  This
+module precomputes every hash stream of a batch of ML-KEM operations
+(KeyGen followed by Encaps, as the FIPS 203 golden model computes them) and
+serves them to the stub:
+
+* ``G``   -- ``G(d || k)`` (KeyGen) and ``G(m || H(ek))`` (Encaps), SHA3-512;
+* ``H``   -- ``H(ek)`` (KeyGen; Encaps recomputes the same digest), SHA3-256;
+* ``XOF`` -- ``XOF(rho, j, i)``, SHAKE128, index ``256 * j + i``; whole rate
+  blocks covering what ``sampleNTT`` reads from every stream of the batch
+  (Encaps samples the same matrix);
+* ``PRF`` -- ``PRF(sigma, N)`` (KeyGen) and ``PRF(r, N)`` (Encaps), SHAKE256,
+  ``64 * eta`` bytes, index ``N``.
+
+The KeyGen ``G`` input is built by ``kyber_ref.keygen_g_input`` (``d``
+followed by ``k`` as one byte, FIPS 203 Alg. 13), the helper the reference
+backend uses too.  The SHAKE streams of all operations are squeezed together
+by the batched Keccak model; only ``ek`` (the input of ``H``) needs the
+golden K-PKE.KeyGen, which runs in a process pool.
+
+``generate`` writes one ``$readmemh`` file per stream (``index.txt`` lists
+them): ``<name>.hex`` holds the output of every operation back to back, one
+byte per line, so operation ``op`` starts at address ``op * stride``;
+``<name>_in.hex`` holds the hash inputs the same way.  ``seeds.hex`` holds
+``d || z || m`` and ``coins.hex`` the Encaps coins ``r`` (32 bytes per
+operation, the seed ``tb_kyber_pke_enc.v +din=`` feeds to the stub).
+``serve`` answers the stub's flag handshake in ``--sim-dir`` (the
+simulator's ``+hash_dir=``) from such a set, looking streams up by their
+hash input.  The stub only sends 32 RAM bytes and a nonce, so it can reach
+the PRF and KeyGen ``G`` streams; XOF (34-byte input), Encaps ``G`` (64
+bytes) and ``H`` (``ek``) are only served by ``pipe``.  An input the set
+does not hold stops the service with ``[FAIL]`` unless ``--allow-miss``
+hashes it with SHAKE256 and reports it.  ``pipe`` answers text requests (``op phase function index`` or
+a hash input in hex) with the stream as one hex word, byte 0 in the low bits,
+and ``x`` (logged on stderr) for requests the set cannot answer::
+
+    python -m golden.hash_streams generate --ops 4096 --level 768 --out-dir streams
+    python -m golden.hash_streams serve --streams streams --sim-dir ../sim_hash_stub
+    python -m golden.hash_streams pipe --streams streams --requests req.fifo --responses resp.fifo
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+import numpy as np
+
+from . import fips203, keccak, kyber_ref, vecfile
+from .xof_meter import KEM_LEVELS
+
+ROOT = Path(__file__).resolve().parents[1]
+SIM_DIR = ROOT.parent / "sim_hash_stub"
+SEED_BYTES = 96  # d || z || m
+Q = 3329
+N = 256
+XOF_BLOCKS = 3  # squeezed before checking that sampleNTT has enough bytes
+STUB_BANKS = 4
+STUB_BYTES = STUB_BANKS * (1 << 5)  # four dual_ram #(5, 8) output banks
+STUB_REQUEST = 33  # 32 seed bytes and the nonce
+
+Key = Tuple[str, str, int]  # (phase, function, index)
+
+
+def stream_name(phase: str, function: str, index: int) -> str:
+    """File stem of a stream, e.g. ``prf_encaps_03`` or ``xof_keygen_0102``."""
+    if function in ("G", "H"):
+        return f"{function.lower()}_{phase}"
+    return f"{function.lower()}_{phase}_{index:0{4 if function == 'XOF' else 2}x}"
+
+
+def sample_ntt_bytes(streams: np.ndarray) -> np.ndarray:
+    """Bytes ``sampleNTT`` reads from each row of ``(count, length)`` streams; -1 if it runs out."""
+    usable = streams.shape[1] // 3 * 3
+    groups = streams[:, :usable].reshape(len(streams), -1, 3).astype(np.int32)
+    d1 = groups[..., 0] + 256 * (groups[..., 1] & 15)
+    d2 = (groups[..., 1] >> 4) + 16 * groups[..., 2]
+    accepted = np.stack([d1, d2], axis=2).reshape(len(streams), -1) < Q
+    done = np.cumsum(accepted, axis=1) >= N
+    first = np.argmax(done, axis=1)
+    return np.where(done.any(axis=1), 3 * (first // 2 + 1), -1)
+
+
+def stub_banks(data: bytes) -> List[bytes]:
+    """Bank contents for ``hash_stub``: word ``a`` = bytes ``4a..4a+3``, byte ``4a`` in bits 7:0.
+
+    ``hash_dout`` puts bank 0 in the top byte, so bank ``b`` holds bytes ``4a + 3 - b``.
+    """
+    words = np.frombuffer(bytes(data).ljust(-(-len(data) // STUB_BANKS) * STUB_BANKS, b"\0"), dtype=np.uint8)
+    words = words.reshape(-1, STUB_BANKS)
+    return [words[:, STUB_BANKS - 1 - bank].tobytes() for bank in range(STUB_BANKS)]
+
+
+def _byte_lines(data: bytes) -> str:
+    return "".join(f"{value:02x}\n" for value in data)
+
+
+def _encapsulation_key(args: Tuple[int, bytes]) -> bytes:
+    k, d = args
+    return fips203.load().k_pke.k_PKE_KeyGen(d, fips203.params_for(k))[0]
+
+
+@dataclass
+class StreamSet:
+    """Hash inputs and outputs of ``ops`` operations, ``(ops, bytes)`` arrays per stream."""
+
+    k: int
+    seeds: np.ndarray  # (ops, 96) d || z || m
+    inputs: Dict[Key, np.ndarray] = field(default_factory=dict)
+    outputs: Dict[Key, np.ndarray] = field(default_factory=dict)
+    _by_input: Optional[Dict[bytes, Tuple[int, Key]]] = field(default=None, repr=False)
+
+    @property
+    def ops(self) -> int:
+        return len(self.seeds)
+
+    def add(self, key: Key, inputs: np.ndarray, outputs: np.ndarray) -> None:
+        self.inputs[key] = np.ascontiguousarray(inputs, dtype=np.uint8)
+        self.outputs[key] = np.ascontiguousarray(outputs, dtype=np.uint8)
+        self._by_input = None
+
+    def stream(self, op: int, phase: str, function: str, index: int = 0) -> bytes:
+        """Output of one hash call; ``KeyError`` if the set has no such stream."""
+        return self.outputs[(phase, function, index)][op].tobytes()
+
+    def lookup(self, message: bytes) -> Optional[Tuple[int, Key]]:
+        """``(op, key)`` of the stream whose hash input is ``message``, if any."""
+        if self._by_input is None:
+            self._by_input = {}
+            for key, inputs in self.inputs.items():
+                for op, row in enumerate(inputs):
+                    self._by_input.setdefault(row.tobytes(), (op, key))
+        return self._by_input.get(bytes(message))
+
+    def coins(self) -> np.ndarray:
+        """Encaps coins ``r`` of every operation (the second half of ``G(m || H(ek))``)."""
+        return self.outputs[("encaps", "G", 0)][:, 32:]
+
+    def keys(self) -> Iterator[Key]:
+        return iter(sorted(self.outputs, key=lambda key: (key[0] != "keygen", "GXPH".index(key[1][0]), key[2])))
+
+    def write(self, out_dir: Path) -> None:
+        """Write the ``$readmemh`` file set and ``index.txt``."""
+        out_dir.mkdir(parents=True, exist_ok=True)
+        vecfile.write_hex_words(out_dir / "seeds.hex", self.seeds.reshape(-1), 8)
+        vecfile.write_hex_words(out_dir / "coins.hex", self.coins().reshape(-1), 8)
+        lines = [f"// k={self.k} ops={self.ops}; name phase function index stride input_bytes\n"]
+        for key in self.keys():
+            name = stream_name(*key)
+            vecfile.write_hex_words(out_dir / f"{name}.hex", self.outputs[key].reshape(-1), 8)
+            vecfile.write_hex_words(out_dir / f"{name}_in.hex", self.inputs[key].reshape(-1), 8)
+            phase, function, index = key
+            lines.append(
+                f"{name} {phase} {function} {index} {self.outputs[key].shape[1]} {self.inputs[key].shape[1]}\n"
+            )
+        (out_dir / "index.txt").write_text("".join(lines))
+
+    @classmethod
+    def read(cls, out_dir: Path) -> "StreamSet":
+        """Load a file set written by ``write``."""
+        lines = (out_dir / "index.txt").read_text().splitlines()
+        k = int(lines[0].split("k=")[1].split()[0])
+        seeds = vecfile.read_hex_words(out_dir / "seeds.hex", 8).reshape(-1, SEED_BYTES)
+        streams = cls(k, seeds)
+        for line in lines[1:]:
+            name, phase, function, index, stride, input_bytes = line.split()
+            outputs = vecfile.read_hex_words(out_dir / f"{name}.hex", 8).reshape(-1, int(stride))
+            inputs = vecfile.read_hex_words(out_dir / f"{name}_in.hex", 8).reshape(-1, int(input_bytes))
+            streams.add((phase, function, int(index)), inputs, outputs)
+        return streams
+
+
+def _sha3(name: str, messages: np.ndarray) -> np.ndarray:
+    digests = b"".join(hashlib.new(name, row.tobytes()).digest() for row in messages)
+    return np.frombuffer(digests, dtype=np.uint8).reshape(len(messages), -1)
+
+
+def _shake(messages: np.ndarray, out_len: int, mode: str) -> np.ndarray:
+    return keccak.shake([row.tobytes() for row in messages], out_len, mode)[0]
+
+
+def _with_index(seeds: np.ndarray, suffix: Sequence[int]) -> np.ndarray:
+    return np.concatenate([seeds, np.tile(np.array(suffix, dtype=np.uint8), (len(seeds), 1))], axis=1)
+
+
+def _add_prf(streams: StreamSet, phase: str, seed: np.ndarray, etas: Sequence[int]) -> None:
+    """``PRF(seed, N)`` for ``N < len(etas)``, one batched SHAKE256 run per output length."""
+    for eta in sorted(set(etas)):
+        nonces = [nonce for nonce, value in enumerate(etas) if value == eta]
+        prf_in = np.concatenate([_with_index(seed, [nonce]) for nonce in nonces])
+        prf_out = _shake(prf_in, 64 * eta, "shake256")
+        for number, nonce in enumerate(nonces):
+            rows = slice(number * len(seed), (number + 1) * len(seed))
+            streams.add((phase, "PRF", nonce), prf_in[rows], prf_out[rows])
+
+
+def generate(k: int, seeds: np.ndarray, workers: Optional[int] = None) -> StreamSet:
+    """All hash streams of KeyGen(d || z) then Encaps(ek, m) for every row of ``seeds``."""
+    params = fips203.params_for(k)
+    seeds = np.ascontiguousarray(seeds, dtype=np.uint8).reshape(-1, SEED_BYTES)
+    streams = StreamSet(k, seeds)
+    d, m = seeds[:, :32], seeds[:, 64:]
+
+    g_in = np.frombuffer(b"".join(kyber_ref.keygen_g_input(row.tobytes(), k) for row in d), dtype=np.uint8)
+    g_in = g_in.reshape(len(d), -1)
+    g_out = _sha3("sha3_512", g_in)
+    streams.add(("keygen", "G", 0), g_in, g_out)
+    rho, sigma = g_out[:, :32], g_out[:, 32:]
+
+    pairs = [(j, i) for i in range(k) for j in range(k)]
+    xof_in = np.concatenate([_with_index(rho, pair) for pair in pairs])
+    blocks = XOF_BLOCKS
+    while True:
+        xof_out = _shake(xof_in, blocks * keccak.RATES["shake128"], "shake128")
+        if (sample_ntt_bytes(xof_out) >= 0).all():
+            break
+        blocks += 1
+    for number, (j, i) in enumerate(pairs):
+        rows = slice(number * len(seeds), (number + 1) * len(seeds))
+        streams.add(("keygen", "XOF", 256 * j + i), xof_in[rows], xof_out[rows])
+
+    _add_prf(streams, "keygen", sigma, [params.eta1] * 2 * k)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        ek = list(pool.map(_encapsulation_key, [(k, row.tobytes()) for row in d], chunksize=64))
+    ek = np.frombuffer(b"".join(ek), dtype=np.uint8).reshape(len(seeds), -1)
+    if not (ek[:, -32:] == rho).all():
+        raise AssertionError("Golden K-PKE.KeyGen used a different rho")
+    h_out = _sha3("sha3_256", ek)
+    streams.add(("keygen", "H", 0), ek, h_out)
+
+    g_in = np.concatenate([m, h_out], axis=1)
+    streams.add(("encaps", "G", 0), g_in, _sha3("sha3_512", g_in))
+    _add_prf(streams, "encaps", streams.coins(), [params.eta1] * k + [2] * (k + 1))
+    return streams
+
+
+def random_seeds(ops: int, seed: int) -> np.ndarray:
+    return np.random.default_rng(seed).integers(0, 256, size=(ops, SEED_BYTES), dtype=np.uint8)
+
+
+def check(streams: StreamSet, ops: Sequence[int]) -> bool:
+    """Compare the streams of ``ops`` with the golden model's own hash calls and results."""
+    golden = fips203.load()
+    aux = golden.auxiliary_function
+    params = fips203.params_for(streams.k)
+    ok = True
+    for op in ops:
+        seed = streams.seeds[op].tobytes()
+        ek, _ = golden.internal.ML_KEM_KeyGen_internal(seed[:64], params)
+        shared, _ = golden.internal.ML_KEM_Encaps_internal(ek, seed[64:], params)
+        expected = {("keygen", "H", 0): aux.H(ek), ("encaps", "G", 0): b"".join(aux.G(seed[64:] + aux.H(ek)))}
+        for key in streams.keys():
+            phase, function, index = key
+            message = streams.inputs[key][op].tobytes()
+            length = streams.outputs[key].shape[1]
+            if function == "XOF":
+                expected.setdefault(key, aux.XOF(message[:32], index >> 8, index & 0xFF).read(length))
+            elif function == "PRF":
+                expected.setdefault(key, aux.PRF(message[:32], index).read(length))
+            elif function == "G":
+                expected.setdefault(key, b"".join(aux.G(message)))
+        bad = [stream_name(*key) for key, value in expected.items() if streams.stream(op, *key) != value]
+        if streams.stream(op, "encaps", "G")[:32] != shared:
+            bad.append("shared secret")
+        if bad:
+            print(f"[FAIL] op {op}: {', '.join(bad)} differ from the golden model")
+            ok = False
+    if ok:
+        print(f"[PASS] ops {', '.join(map(str, ops))}: {len(list(streams.keys()))} streams match the golden model")
+    return ok
+
+
+# ---------------------------------------------------------------------------
+# Serving
+# ---------------------------------------------------------------------------
+
+
+def respond(
+    streams: StreamSet, message: bytes, length: Optional[int] = None, *, allow_miss: bool = False
+) -> Optional[Tuple[bytes, str]]:
+    """Output for a stub request and where it came from.
+
+    ``None`` for an input the set does not hold (a wrong request would
+    otherwise look like a hash mismatch); with ``allow_miss`` it is hashed
+    with SHAKE256 instead and reported as a miss.
+    """
+    found = streams.lookup(message)
+    if found is None:
+        if not allow_miss:
+            return None
+        return keccak.shake_bytes(message, length or STUB_BYTES, "shake256"), f"miss {bytes(message).hex()}"
+    op, key = found
+    return streams.stream(op, *key), f"op {op} {stream_name(*key)}"
+
+
+def _read_flag(path: Path) -> str:
+    try:
+        return path.read_text()[:1]
+    except OSError:
+        return ""
+
+
+def _replace(path: Path, text: str) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+def _rewrite(path: Path, text: str) -> None:
+    # hash_stub.v keeps hash2.flag open and re-reads it with $rewind: a rename
+    # would leave it on the old file (and fails on Windows while it is open).
+    with open(path, "r+" if path.exists() else "w") as flag:
+        flag.seek(0)
+        flag.write(text)
+        flag.truncate()
+        flag.flush()
+
+
+def _wait(path: Path, ready, poll: float, deadline: Optional[float]) -> bool:
+    while not ready(_read_flag(path)):
+        if deadline is not None and time.monotonic() > deadline:
+            return False
+        time.sleep(poll)
+    return True
+
+
+def serve(
+    streams: StreamSet,
+    sim_dir: Path = SIM_DIR,
+    *,
+    poll: float = 1e-3,
+    timeout: Optional[float] = None,
+    limit: Optional[int] = None,
+    allow_miss: bool = False,
+) -> int:
+    """Answer ``hash_stub``'s flag handshake until ``limit`` requests or ``timeout`` s idle.
+
+    The stub only sends 33-byte requests (32 RAM bytes and the nonce), so only
+    PRF and KeyGen ``G`` streams can match.  A request the set cannot answer
+    is reported with ``[FAIL]`` and exits with status 1 unless ``allow_miss``.
+    """
+    request, flag_in, flag_out = sim_dir / "test-hash_stub.txt", sim_dir / "hash.flag", sim_dir / "hash2.flag"
+    _rewrite(flag_out, "0")
+    served = 0
+    while limit is None or served < limit:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if not _wait(flag_in, lambda flag: flag == "1", poll, deadline):
+            break
+        message = bytes(int(line, 16) for line in request.read_text().split()[:STUB_REQUEST])
+        answer = respond(streams, message, allow_miss=allow_miss)
+        if answer is None:
+            print(f"[FAIL] request {served + 1}: no stream has input {message.hex()}")
+            raise SystemExit(1)
+        data, source = answer
+        if source.startswith("miss"):
+            print(f"[WARN] request {served + 1}: {source}, hashed with SHAKE256")
+        if len(data) > STUB_BYTES:
+            print(f"[WARN] {source}: {len(data)} bytes, the stub holds {STUB_BYTES}; truncated")
+        for bank, content in enumerate(stub_banks(data[:STUB_BYTES])):
+            _replace(sim_dir / f"mem{bank}_hash_stub.hex", _byte_lines(content))
+        _rewrite(flag_out, "1")
+        # The stub reads hash2.flag every cycle: clear it once hash.flag drops so the
+        # next request does not see a stale done.
+        deadline = None if timeout is None else time.monotonic() + timeout
+        dropped = _wait(flag_in, lambda flag: flag != "1", poll, deadline)
+        _rewrite(flag_out, "0")
+        served += 1
+        print(f"[INFO] request {served}: {source}")
+        if not dropped:
+            print(f"[WARN] hash.flag still 1 after {timeout} s; stopping")
+            break
+    return served
+
+
+def pipe(streams: StreamSet, src: TextIO, dst: TextIO) -> int:
+    """Answer one request per line until EOF; ``x`` for requests the set cannot answer."""
+    answered = 0
+    for line in src:
+        fields = line.split("//", 1)[0].split()
+        if not fields:
+            continue
+        try:
+            if len(fields) == 1:
+                answer = respond(streams, bytes.fromhex(fields[0]))
+                if answer is None:
+                    raise KeyError(f"no stream has input {fields[0]}")
+                data = answer[0]
+            else:
+                data = streams.stream(int(fields[0]), fields[1], fields[2], int(fields[3], 0) if len(fields) > 3 else 0)
+            dst.write(f"{int.from_bytes(data, 'little'):0{2 * len(data)}x}\n")
+        except (KeyError, IndexError, ValueError) as exc:
+            print(f"[WARN] {line.strip()}: {exc.args[0] if exc.args else exc}", file=sys.stderr)
+            dst.write("x\n")
+        dst.flush()
+        answered += 1
+    return answered
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    gen = sub.add_parser("generate", help="Precompute the streams of a batch of operations")
+    gen.add_argument("--ops", type=int, default=1024)
+    gen.add_argument("--level", type=int, choices=sorted(KEM_LEVELS), default=768)
+    gen.add_argument("--seed", type=int, default=2024)
+    gen.add_argument("--workers", type=int, default=None, help="Processes for the golden K-PKE.KeyGen")
+    gen.add_argument("--check", type=int, default=2, help="Operations to cross-check against the golden model")
+    gen.add_argument("--out-dir", type=Path, default=ROOT / "sim" / "hash_streams")
+
+    for name, help_text in (("serve", "Answer the hash_stub flag handshake"), ("pipe", "Answer text requests")):
+        cmd = sub.add_parser(name, help=help_text)
+        cmd.add_argument("--streams", type=Path, default=ROOT / "sim" / "hash_streams", help="generate --out-dir")
+    serve_cmd = sub.choices["serve"]
+    serve_cmd.add_argument("--sim-dir", type=Path, default=SIM_DIR, help="hash_stub.v +hash_dir=")
+    serve_cmd.add_argument("--poll", type=float, default=1e-3, help="Flag polling interval in seconds")
+    serve_cmd.add_argument("--timeout", type=float, default=None, help="Stop after this many idle seconds")
+    serve_cmd.add_argument("--limit", type=int, default=None, help="Stop after this many requests")
+    serve_cmd.add_argument("--allow-miss", action="store_true", help="Hash unknown requests instead of stopping")
+    pipe_cmd = sub.choices["pipe"]
+    pipe_cmd.add_argument("--requests", type=argparse.FileType("r"), default=sys.stdin)
+    pipe_cmd.add_argument("--responses", type=argparse.FileType("w"), default=sys.stdout)
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        k = KEM_LEVELS[args.level]
+        start = time.perf_counter()
+        streams = generate(k, random_seeds(args.ops, args.seed), args.workers)
+        elapsed = time.perf_counter() - start
+        xof = np.concatenate([streams.outputs[key] for key in streams.keys() if key[1] == "XOF"])
+        print(
+            f"[INFO] ML-KEM-{args.level}: {args.ops} operations, {args.ops * len(streams.outputs)} streams "
+            f"in {elapsed:.1f} s; XOF streams {xof.shape[1]} bytes (sampleNTT reads at most "
+            f"{sample_ntt_bytes(xof).max()})"
+        )
+        streams.write(args.out_dir)
+        print(f"[PASS] wrote {len(streams.outputs)} streams -> {args.out_dir}")
+        ops = sorted({0, args.ops - 1})[: max(args.check, 0)]
+        if ops and not check(streams, ops):
+            raise SystemExit(1)
+    else:
+        streams = StreamSet.read(args.streams)
+        if args.command == "serve":
+            served = serve(
+                streams, args.sim_dir, poll=args.poll, timeout=args.timeout, limit=args.limit,
+                allow_miss=args.allow_miss,
+            )
+            print(f"[INFO] served {served} requests")
+        else:
+            pipe(streams, args.requests, args.responses)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""Round-level Keccak-f[1600] and SHAKE sponge model, batched over messages.
+
+States are ``(batch, 25)`` uint64 arrays with lane ``x + 5 * y`` at index
+``5 * y + x`` (the byte order of ``shake_core.v``'s ``state_reg``: byte ``i``
+is bits ``8i +: 8``), so every step of the permutation is one numpy
+operation across the whole batch.  ``shake`` pads, absorbs and squeezes any
+number of independent messages of any lengths at once; with ``trace=True``
+it records every permutation (absorb or squeeze, block index, which
+messages it applies to) and, with ``rounds=True``, the state after each of
+the 24 rounds, as the RTL's round pipeline produces them stage by stage.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import compare
+
+ROUNDS = 24
+STATE_BYTES = 200
+RATES = {"shake128": 168, "shake256": 136}
+SHAKE_PAD = 0x1F
+
+ROUND_CONSTANTS = np.array(
+    [
+        0x0000000000000001, 0x0000000000008082, 0x800000000000808A, 0x8000000080008000,
+        0x000000000000808B, 0x0000000080000001, 0x8000000080008081, 0x8000000000008009,
+        0x000000000000008A, 0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
+        0x000000008000808B, 0x800000000000008B, 0x8000000000008089, 0x8000000000008003,
+        0x8000000000008002, 0x8000000000000080, 0x000000000000800A, 0x800000008000000A,
+        0x8000000080008081, 0x8000000000008080, 0x0000000080000001, 0x8000000080008008,
+    ],
+    dtype=np.uint64,
+)
+
+# ROTATIONS[x][y]: rho offset of lane (x, y).
+ROTATIONS = [
+    [0, 36, 3, 41, 18],
+    [1, 44, 10, 45, 2],
+    [62, 6, 43, 15, 61],
+    [28, 55, 25, 21, 56],
+    [27, 20, 39, 8, 14],
+]
+
+
+def _rho_pi_tables() -> Tuple[np.ndarray, np.ndarray]:
+    """Flat source index and rotation for every destination lane of rho followed by pi."""
+    source = np.zeros(25, dtype=np.intp)
+    shift = np.zeros(25, dtype=np.uint64)
+    for x in range(5):
+        for y in range(5):
+            dest = 5 * ((2 * x + 3 * y) % 5) + y  # B[y, 2x + 3y] = rot(A[x, y])
+            source[dest] = 5 * y + x
+            shift[dest] = ROTATIONS[x][y]
+    return source, shift
+
+
+_PI_SOURCE, _RHO_SHIFT = _rho_pi_tables()
+_RHO_BACK = (np.uint64(64) - _RHO_SHIFT) % np.uint64(64)
+
+
+def _rotl(lanes: np.ndarray, shift) -> np.ndarray:
+    return (lanes << shift) | (lanes >> ((np.uint64(64) - shift) % np.uint64(64)))
+
+
+def keccak_round(state: np.ndarray, round_index: int) -> np.ndarray:
+    """One theta-rho-pi-chi-iota round on ``(batch, 25)`` states."""
+    grid = state.reshape(-1, 5, 5)  # [batch, y, x]
+    column = np.bitwise_xor.reduce(grid, axis=1)
+    theta = np.roll(column, 1, axis=1) ^ _rotl(np.roll(column, -1, axis=1), np.uint64(1))
+    lanes = (grid ^ theta[:, np.newaxis, :]).reshape(-1, 25)
+    moved = lanes[:, _PI_SOURCE]
+    b = ((moved << _RHO_SHIFT) | (moved >> _RHO_BACK)).reshape(-1, 5, 5)
+    out = b ^ (~np.roll(b, -1, axis=2) & np.roll(b, -2, axis=2))
+    out = out.reshape(-1, 25)
+    out[:, 0] ^= ROUND_CONSTANTS[round_index]
+    return out
+
+
+def keccak_f1600(state: np.ndarray, rounds: Optional[List[np.ndarray]] = None) -> np.ndarray:
+    """The full permutation; appends each round's output state to ``rounds`` when given."""
+    state = np.asarray(state, dtype=np.uint64).reshape(-1, 25)
+    for index in range(ROUNDS):
+        state = keccak_round(state, index)
+        if rounds is not None:
+            rounds.append(state)
+    return state
+
+
+def state_bytes(state: np.ndarray) -> np.ndarray:
+    """``(batch, 200)`` little-endian bytes of ``(batch, 25)`` states."""
+    return np.ascontiguousarray(state, dtype="<u8").view(np.uint8).reshape(-1, STATE_BYTES)
+
+
+def bytes_state(data: np.ndarray) -> np.ndarray:
+    """Inverse of ``state_bytes`` for ``(batch, n <= 200)`` byte arrays (zero-filled)."""
+    data = np.asarray(data, dtype=np.uint8)
+    full = np.zeros((len(data), STATE_BYTES), dtype=np.uint8)
+    full[:, : data.shape[1]] = data
+    return full.view("<u8").astype(np.uint64)
+
+
+@dataclass
+class Permutation:
+    """One Keccak-f call of the batch."""
+
+    phase: str  # "absorb" or "squeeze"
+    block: int  # absorb block index, or squeeze block index (0 = first output block)
+    active: np.ndarray  # (batch,) messages this permutation belongs to
+    state_in: np.ndarray  # (batch, 25) after the block was XORed in
+    state_out: np.ndarray
+    rounds: Optional[np.ndarray] = None  # (24, batch, 25) round outputs
+
+
+@dataclass
+class SpongeTrace:
+    mode: str
+    rate: int
+    message_bytes: np.ndarray  # (batch,)
+    absorb_blocks: np.ndarray  # (batch, max_blocks, rate) padded input blocks
+    block_counts: np.ndarray  # (batch,)
+    squeeze_blocks: np.ndarray  # (batch, squeeze_blocks, rate) rate part of each output state
+    permutations: List[Permutation] = field(default_factory=list)
+
+    def permutation_counts(self) -> np.ndarray:
+        """Keccak-f calls per message (absorb blocks plus extra squeeze blocks)."""
+        return self.block_counts + self.squeeze_blocks.shape[1] - 1
+
+    def lines(self, index: int) -> bytes:
+        """Round-level dump of message ``index``: ``perm round lane0 .. lane24`` per line.
+
+        Round ``0`` is the permutation input (block already absorbed),
+        rounds ``1..24`` the outputs of the round stages; requires ``rounds=True``.
+        """
+        rows = []
+        for number, perm in enumerate(p for p in self.permutations if p.active[index]):
+            if perm.rounds is None:
+                raise ValueError("Trace was recorded without round states")
+            states = np.concatenate([perm.state_in[index][np.newaxis], perm.rounds[:, index]])
+            labels = np.column_stack([np.full(ROUNDS + 1, number), np.arange(ROUNDS + 1)]).astype(np.uint64)
+            rows.append(np.concatenate([labels, states], axis=1))
+        table = np.concatenate(rows)
+        return compare.format_hex_rows(list(table.T), [4, 2] + [16] * 25)
+
+
+def pad_messages(messages: Sequence[bytes], rate: int, pad: int = SHAKE_PAD) -> Tuple[np.ndarray, np.ndarray]:
+    """``(batch, max_blocks, rate)`` pad10*1 blocks and the block count of each message."""
+    lengths = np.array([len(message) for message in messages], dtype=np.int64)
+    counts = lengths // rate + 1
+    blocks = np.zeros((len(messages), int(counts.max(initial=1)) * rate), dtype=np.uint8)
+    for row, message in enumerate(messages):
+        blocks[row, : len(message)] = np.frombuffer(bytes(message), dtype=np.uint8)
+    rows = np.arange(len(messages))
+    blocks[rows, lengths] ^= pad
+    blocks[rows, counts * rate - 1] ^= 0x80
+    return blocks.reshape(len(messages), -1, rate), counts
+
+
+def shake(
+    messages: Sequence[bytes],
+    out_len: int,
+    mode: str = "shake128",
+    *,
+    trace: bool = False,
+    rounds: bool = False,
+) -> Tuple[np.ndarray, Optional[SpongeTrace]]:
+    """SHAKE128/256 of every message: ``(batch, out_len)`` uint8 outputs and the optional trace.
+
+    ``rounds=True`` implies ``trace=True``.
+    """
+    rate = RATES[mode]
+    trace = trace or rounds
+    blocks, counts = pad_messages(messages, rate)
+    batch = len(messages)
+    state = np.zeros((batch, 25), dtype=np.uint64)
+    perms: List[Permutation] = []
+
+    def permute(phase, block, active, state):
+        history: Optional[List[np.ndarray]] = [] if rounds else None
+        out = keccak_f1600(state, history)
+        out = np.where(active[:, np.newaxis], out, state)
+        if trace:
+            perms.append(Permutation(phase, block, active, state, out, np.stack(history) if rounds else None))
+        return out
+
+    for block in range(blocks.shape[1]):
+        active = counts > block
+        absorbed = state ^ np.where(active[:, np.newaxis], bytes_state(blocks[:, block]), np.uint64(0))
+        state = permute("absorb", block, active, absorbed)
+
+    squeezed = max(-(-out_len // rate), 1)
+    output = np.zeros((batch, squeezed, rate), dtype=np.uint8)
+    everyone = np.ones(batch, dtype=bool)
+    for block in range(squeezed):
+        if block:
+            state = permute("squeeze", block, everyone, state)
+        output[:, block] = state_bytes(state)[:, :rate]
+    digest = output.reshape(batch, -1)[:, :out_len]
+    if not trace:
+        return digest, None
+    return digest, SpongeTrace(mode, rate, np.array([len(m) for m in messages]), blocks, counts, output, perms)
+
+
+def shake_bytes(message: bytes, out_len: int, mode: str = "shake128") -> bytes:
+    """Single-message convenience wrapper."""
+    return shake([message], out_len, mode)[0][0].tobytes()
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict
+from typing import Dict, Optional
 
 from . import kyber_ref
 
@@ -32,5 +32,6 @@ class KatDatabase:
             raise RuntimeError(f"KAT for k={k} not loaded") from exc
 
 
-def run_reference_flow(k: int) -> kyber_ref.KyberArtifacts:
-    return kyber_ref.full_flow(k)
+def run_reference_flow(k: int, seed: Optional[bytes] = None) -> kyber_ref.KyberArtifacts:
+    """Run the reference KEM flow; a 96-byte ``seed`` (d || z || m) makes it reproducible."""
+    return kyber_ref.full_flow(k, seed)
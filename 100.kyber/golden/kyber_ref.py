@@ -1,20 +1,42 @@
 """High-level Kyber reference wrapper.
 
 This module exposes helpers to run ML-KEM key generation, encapsulation, and
-decapsulation using the reference PQClean implementation.  It is intentionally
-light-weight so that hardware verification scripts can import without pulling in
-full Python dependencies unless needed.
+decapsulation through a small backend registry.  Two backends are provided:
+
+* ``pqclean`` -- the PQClean C implementation (fast, randomised only), used
+  when the optional ``pqclean`` package is installed;
+* ``fips203`` -- the in-tree pure-Python FIPS 203 golden model under
+  ``200.great_golden/1.CRYSTALS-kyber`` (deterministic, always available).
+
+Both produce FIPS 203 keys: K-PKE.KeyGen expands ``d`` with the one-byte
+domain separator, ``G(d || k)`` (``keygen_g_input``), so a seeded ``fips203``
+keygen interoperates with ``pqclean`` and NIST ML-KEM KATs.  ``self_check``
+verifies this against SHA3-512 directly and, when PQClean is installed,
+across backends.
+
+``get_backend()`` picks the highest-priority available backend that satisfies
+the request (seeded calls require a deterministic backend).  The module is
+intentionally light-weight so that hardware verification scripts can import
+it without pulling in either backend until a KEM operation is requested.
 """
 from __future__ import annotations
 
+import hashlib
+import os
+import random
 from dataclasses import dataclass
-from typing import Tuple
+from typing import Callable, Dict, List, Optional, Tuple
+
+from . import fips203
 
 try:
     from pqclean import mlkem512, mlkem768, mlkem1024  # type: ignore
 except ImportError:  # pragma: no cover - optional dependency
     mlkem512 = mlkem768 = mlkem1024 = None
 
+SEED_BYTES = 64  # d || z
+MESSAGE_BYTES = 32
+
 
 @dataclass
 class KyberArtifacts:
@@ -22,6 +44,56 @@ class KyberArtifacts:
     secret_key: bytes
     ciphertext: bytes
     shared_secret: bytes
+    seed: Optional[bytes] = None  # d || z || m when the flow was seeded
+
+
+@dataclass
+class KyberBackend:
+    """Callable table for one ML-KEM implementation."""
+
+    name: str
+    priority: int
+    deterministic: bool
+    keygen: Callable[[int, Optional[bytes]], Tuple[bytes, bytes]]
+    encapsulate: Callable[[int, bytes, Optional[bytes]], Tuple[bytes, bytes]]
+    decapsulate: Callable[[int, bytes, bytes], bytes]
+
+
+# name -> factory returning the backend, or None when it is unavailable
+_REGISTRY: Dict[str, Callable[[], Optional[KyberBackend]]] = {}
+
+
+def register_backend(name: str, factory: Callable[[], Optional[KyberBackend]]) -> None:
+    """Register (or replace) a backend factory under ``name``."""
+    _REGISTRY[name] = factory
+
+
+def available_backends() -> List[KyberBackend]:
+    """Available backends, fastest (highest priority) first."""
+    backends = [backend for backend in (factory() for factory in _REGISTRY.values()) if backend is not None]
+    return sorted(backends, key=lambda backend: -backend.priority)
+
+
+def get_backend(name: Optional[str] = None, *, deterministic: bool = False) -> KyberBackend:
+    """Return backend ``name`` or the fastest available one."""
+    if name is not None:
+        if name not in _REGISTRY:
+            raise ValueError(f"Unknown Kyber backend {name!r}")
+        backend = _REGISTRY[name]()
+        if backend is None:
+            raise RuntimeError(f"Kyber backend {name!r} not available")
+        if deterministic and not backend.deterministic:
+            raise RuntimeError(f"Kyber backend {name!r} does not support seeded operation")
+        return backend
+    for backend in available_backends():
+        if backend.deterministic or not deterministic:
+            return backend
+    raise RuntimeError("No Kyber backend available")
+
+
+# ---------------------------------------------------------------------------
+# PQClean backend
+# ---------------------------------------------------------------------------
 
 
 def _select_impl(k: int):
@@ -34,30 +106,243 @@ def _select_impl(k: int):
     raise ValueError(f"Unsupported security level k={k}")
 
 
-def keygen(k: int) -> Tuple[bytes, bytes]:
-    impl = _select_impl(k)
-    if impl is None:
-        raise RuntimeError("PQClean Kyber implementation not available")
-    return impl.keypair()
+def _pqclean_keygen(k: int, seed: Optional[bytes]) -> Tuple[bytes, bytes]:
+    return _select_impl(k).keypair()
+
+
+def _pqclean_encapsulate(k: int, public_key: bytes, message: Optional[bytes]) -> Tuple[bytes, bytes]:
+    return _select_impl(k).enc(public_key)
+
+
+def _pqclean_decapsulate(k: int, secret_key: bytes, ciphertext: bytes) -> bytes:
+    return _select_impl(k).dec(ciphertext, secret_key)
+
+
+def _pqclean_factory() -> Optional[KyberBackend]:
+    if mlkem512 is None:
+        return None
+    return KyberBackend(
+        name="pqclean",
+        priority=100,
+        deterministic=False,
+        keygen=_pqclean_keygen,
+        encapsulate=_pqclean_encapsulate,
+        decapsulate=_pqclean_decapsulate,
+    )
+
+
+# ---------------------------------------------------------------------------
+# In-tree FIPS 203 backend
+# ---------------------------------------------------------------------------
+
+
+def _fips_keygen(k: int, seed: Optional[bytes]) -> Tuple[bytes, bytes]:
+    seed = os.urandom(SEED_BYTES) if seed is None else bytes(seed)
+    if len(seed) != SEED_BYTES:
+        raise ValueError("Keygen seed must be d || z (64 bytes)")
+    return fips203.load().internal.ML_KEM_KeyGen_internal(seed, fips203.params_for(k))
+
+
+def _fips_encapsulate(k: int, public_key: bytes, message: Optional[bytes]) -> Tuple[bytes, bytes]:
+    message = os.urandom(MESSAGE_BYTES) if message is None else bytes(message)
+    if len(message) != MESSAGE_BYTES:
+        raise ValueError("Encapsulation randomness m must be 32 bytes")
+    shared, ciphertext = fips203.load().internal.ML_KEM_Encaps_internal(public_key, message, fips203.params_for(k))
+    return ciphertext, shared
+
+
+def _fips_decapsulate(k: int, secret_key: bytes, ciphertext: bytes) -> bytes:
+    return fips203.load().internal.ML_KEM_Decaps_internal(secret_key, ciphertext, fips203.params_for(k))
+
 
+def _fips_factory() -> Optional[KyberBackend]:
+    try:
+        fips203.load()
+    except RuntimeError:
+        return None
+    return KyberBackend(
+        name="fips203",
+        priority=10,
+        deterministic=True,
+        keygen=_fips_keygen,
+        encapsulate=_fips_encapsulate,
+        decapsulate=_fips_decapsulate,
+    )
 
-def encapsulate(k: int, public_key: bytes) -> Tuple[bytes, bytes]:
-    impl = _select_impl(k)
-    if impl is None:
-        raise RuntimeError("PQClean Kyber implementation not available")
-    return impl.enc(public_key)
 
+register_backend("pqclean", _pqclean_factory)
+register_backend("fips203", _fips_factory)
 
-def decapsulate(k: int, secret_key: bytes, ciphertext: bytes) -> bytes:
-    impl = _select_impl(k)
-    if impl is None:
-        raise RuntimeError("PQClean Kyber implementation not available")
-    return impl.dec(ciphertext, secret_key)
 
+# ---------------------------------------------------------------------------
+# Public KEM API
+# ---------------------------------------------------------------------------
 
-def full_flow(k: int) -> KyberArtifacts:
-    pk, sk = keygen(k)
-    ct, ss_enc = encapsulate(k, pk)
-    ss_dec = decapsulate(k, sk, ct)
+
+def keygen(k: int, seed: Optional[bytes] = None, *, backend: Optional[str] = None) -> Tuple[bytes, bytes]:
+    """Return ``(pk, sk)``; ``seed`` (d || z) forces a deterministic backend."""
+    _select_impl(k)
+    return get_backend(backend, deterministic=seed is not None).keygen(k, seed)
+
+
+def encapsulate(
+    k: int, public_key: bytes, message: Optional[bytes] = None, *, backend: Optional[str] = None
+) -> Tuple[bytes, bytes]:
+    """Return ``(ct, ss)``; ``message`` (32-byte m) forces a deterministic backend."""
+    _select_impl(k)
+    return get_backend(backend, deterministic=message is not None).encapsulate(k, public_key, message)
+
+
+def decapsulate(k: int, secret_key: bytes, ciphertext: bytes, *, backend: Optional[str] = None) -> bytes:
+    _select_impl(k)
+    return get_backend(backend).decapsulate(k, secret_key, ciphertext)
+
+
+def full_flow(k: int, seed: Optional[bytes] = None, *, backend: Optional[str] = None) -> KyberArtifacts:
+    """Keygen + encaps + decaps; ``seed`` is d || z || m (96 bytes) for a reproducible flow."""
+    if seed is not None and len(seed) != SEED_BYTES + MESSAGE_BYTES:
+        raise ValueError("Flow seed must be d || z || m (96 bytes)")
+    _select_impl(k)
+    # One backend for the whole flow so artifacts are mutually consistent.
+    impl = get_backend(backend, deterministic=seed is not None)
+    key_seed = None if seed is None else seed[:SEED_BYTES]
+    message = None if seed is None else seed[SEED_BYTES:]
+    pk, sk = impl.keygen(k, key_seed)
+    ct, ss_enc = impl.encapsulate(k, pk, message)
+    ss_dec = impl.decapsulate(k, sk, ct)
     assert ss_enc == ss_dec, "Reference stack self-check failed"
-    return KyberArtifacts(public_key=pk, secret_key=sk, ciphertext=ct, shared_secret=ss_enc)
+    return KyberArtifacts(public_key=pk, secret_key=sk, ciphertext=ct, shared_secret=ss_enc, seed=seed)
+
+
+# ---------------------------------------------------------------------------
+# Intermediate values for sub-module vector dumps (FIPS 203 backend only)
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class KeyGenTrace:
+    """K-PKE.KeyGen intermediates; polynomials are lists of 256 coefficients."""
+
+    rho: bytes
+    sigma: bytes
+    a_hat: List[List[List[int]]]  # a_hat[i][j], NTT domain
+    s: List[List[int]]
+    e: List[List[int]]
+    s_hat: List[List[int]]
+    t_hat: List[List[int]]
+    public_key: bytes
+    secret_key: bytes
+
+
+@dataclass
+class EncapsTrace:
+    """K-PKE.Encrypt intermediates (``y`` is the FIPS 203 vector r)."""
+
+    message: bytes
+    shared_secret: bytes
+    r: bytes
+    a_hat: List[List[List[int]]]
+    y: List[List[int]]
+    e1: List[List[int]]
+    e2: List[int]
+    u: List[List[int]]  # before compression
+    v: List[int]  # before compression
+    ciphertext: bytes
+
+
+def keygen_g_input(d: bytes, k: int) -> bytes:
+    """Input of K-PKE.KeyGen's ``G``: ``d`` followed by ``k`` as one byte (FIPS 203, Alg. 13)."""
+    return bytes(d) + bytes([k])
+
+
+def _vec_lists(vec) -> List[List[int]]:
+    return [list(poly.cs) for poly in vec.ps]
+
+
+def keygen_trace(k: int, seed: bytes) -> KeyGenTrace:
+    """Deterministic ML-KEM.KeyGen_internal exposing A_hat, s, e and t_hat."""
+    if len(seed) != SEED_BYTES:
+        raise ValueError("Keygen seed must be d || z (64 bytes)")
+    golden = fips203.load()
+    aux = golden.auxiliary_function
+    params = fips203.params_for(k)
+    rho, sigma = aux.G(keygen_g_input(seed[:32], k))
+    a_hat = aux.sampleMatrix(rho, k)
+    s = aux.sampleNoise(sigma, params.eta1, 0, k)
+    e = aux.sampleNoise(sigma, params.eta1, k, k)
+    s_hat = s.NTT()
+    t_hat = a_hat.Matrix_Mul_DotNTT(s_hat) + e.NTT()
+    ek = aux.EncodeVec(t_hat, 12) + rho
+    dk = aux.EncodeVec(s_hat, 12) + ek + aux.H(ek) + seed[32:]
+    return KeyGenTrace(
+        rho=rho,
+        sigma=sigma,
+        a_hat=[[list(poly.cs) for poly in row] for row in a_hat.cs],
+        s=_vec_lists(s),
+        e=_vec_lists(e),
+        s_hat=_vec_lists(s_hat),
+        t_hat=_vec_lists(t_hat),
+        public_key=ek,
+        secret_key=dk,
+    )
+
+
+def encaps_trace(k: int, public_key: bytes, message: bytes) -> EncapsTrace:
+    """Deterministic ML-KEM.Encaps_internal exposing A_hat, y, e1, e2, u and v."""
+    if len(message) != MESSAGE_BYTES:
+        raise ValueError("Encapsulation randomness m must be 32 bytes")
+    golden = fips203.load()
+    aux = golden.auxiliary_function
+    params = fips203.params_for(k)
+    shared, r = aux.G(message + aux.H(public_key))
+    t_hat = aux.DecodeVec(public_key[:-32], k, 12)
+    a_hat = aux.sampleMatrix(public_key[-32:], k)
+    y = aux.sampleNoise(r, params.eta1, 0, k)
+    e1 = aux.sampleNoise(r, aux.eta2, k, k)
+    e2 = aux.sampleNoise(r, aux.eta2, 2 * k, 1).ps[0]
+    y_hat = y.NTT()
+    u = a_hat.T().Matrix_Mul_DotNTT(y_hat).INTT() + e1
+    mu = aux.Poly(aux.ByteDecode(message, 1)).Decompress(1)
+    v = t_hat.Vec_DotNTT(y_hat).INTT() + e2 + mu
+    ciphertext = u.Compress(params.du).ByteEncode(params.du) + v.Compress(params.dv).ByteEncode(params.dv)
+    return EncapsTrace(
+        message=message,
+        shared_secret=shared,
+        r=r,
+        a_hat=[[list(poly.cs) for poly in row] for row in a_hat.cs],
+        y=_vec_lists(y),
+        e1=_vec_lists(e1),
+        e2=list(e2.cs),
+        u=_vec_lists(u),
+        v=list(v.cs),
+        ciphertext=ciphertext,
+    )
+
+
+def self_check(seed: int = 0) -> None:
+    """Check seeded keygen against FIPS 203's ``G(d || k)`` and, if available, against PQClean."""
+    rng = random.Random(seed)
+    for k in (2, 3, 4):
+        flow_seed = bytes(rng.randrange(256) for _ in range(SEED_BYTES + MESSAGE_BYTES))
+        d = flow_seed[:32]
+        rho = hashlib.sha3_512(d + bytes([k])).digest()[:32]
+        pk, sk = keygen(k, flow_seed[:SEED_BYTES], backend="fips203")
+        if pk[-32:] != rho:
+            raise AssertionError(f"k={k}: fips203 keygen rho is not SHA3-512(d || k)[:32]")
+        trace = keygen_trace(k, flow_seed[:SEED_BYTES])
+        if (trace.public_key, trace.secret_key) != (pk, sk):
+            raise AssertionError(f"k={k}: keygen_trace disagrees with the fips203 backend")
+        if mlkem512 is not None:
+            # PQClean is FIPS 203 conformant: each side must decapsulate the other's ciphertext.
+            ct, ss = encapsulate(k, pk, backend="pqclean")
+            if decapsulate(k, sk, ct, backend="fips203") != ss:
+                raise AssertionError(f"k={k}: fips203 keys do not interoperate with pqclean")
+            pq_pk, pq_sk = keygen(k, backend="pqclean")
+            ct, ss = encapsulate(k, pq_pk, flow_seed[SEED_BYTES:], backend="fips203")
+            if decapsulate(k, pq_sk, ct, backend="pqclean") != ss:
+                raise AssertionError(f"k={k}: pqclean keys do not interoperate with fips203")
+
+
+if __name__ == "__main__":
+    self_check()
+    print("[PASS] kyber_ref fips203 backend follows FIPS 203 G(d || k)" + ("" if mlkem512 is None else " and matches pqclean"))
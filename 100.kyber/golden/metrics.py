@@ -0,0 +1,360 @@
+"""Throughput / latency metrics extracted from RTL simulation runs.
+
+``docs/test_plan.md`` asks for start-to-done latency, sustained throughput and
+stall behaviour of every run.  ``collect_vcd`` makes one streaming pass over a
+VCD dump, sampling the tracked signals just before every rising clock edge:
+
+* operations -- a ``start`` pulse opens an operation, the next ``done`` pulse
+  closes it (latency in cycles); ``busy`` high cycles give the busy ratio;
+* streams -- every ``<port>_tvalid`` / ``<port>_tready`` pair (the AXI-Stream
+  ports of ``docs/interface_spec.md``, discovered automatically) is split into
+  transfer, stall (valid && !ready) and starve (ready && !valid) cycles.
+
+Testbench logs contribute ``[METRIC] key=value`` lines.  The resulting JSON
+report carries the git commit so runs can be diffed across commits::
+
+    python -m golden.metrics collect --vcd sim/kem_tb.vcd --log sim/kem_tb.log --out metrics.json
+    python -m golden.metrics diff baseline.json metrics.json --tolerance 0.02
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import statistics
+import subprocess
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from .vcd import VcdHeader, VcdReader, VcdVar
+
+METRIC_LINE = re.compile(rb"\[METRIC\]\s+(?P<key>[\w.:/-]+)\s*=\s*(?P<value>[-+0-9.eE]+)")
+DEFAULT_OPERATION = ("core", "start", "done", "busy")
+
+
+@dataclass
+class OperationStats:
+    name: str
+    latencies: List[int] = field(default_factory=list)  # cycles, start edge -> done edge
+    busy_cycles: int = 0
+    cycles: int = 0
+
+    @property
+    def count(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def busy_ratio(self) -> float:
+        return self.busy_cycles / self.cycles if self.cycles else 0.0
+
+    def summary(self, clock_period: float) -> Dict[str, float]:
+        if not self.latencies:
+            return {"count": 0, "busy_ratio": self.busy_ratio}
+        mean = statistics.fmean(self.latencies)
+        return {
+            "count": self.count,
+            "latency_min": min(self.latencies),
+            "latency_mean": mean,
+            "latency_max": max(self.latencies),
+            "busy_ratio": self.busy_ratio,
+            "ops_per_mcycle": 1e6 * self.count / self.cycles if self.cycles else 0.0,
+            "ops_per_second": 1.0 / (mean * clock_period) if clock_period else 0.0,
+        }
+
+
+@dataclass
+class StreamStats:
+    name: str
+    transfers: int = 0
+    stalls: int = 0  # valid && !ready: back-pressure from the sink
+    starves: int = 0  # ready && !valid: the source has nothing to send
+    cycles: int = 0
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "transfers": self.transfers,
+            "stall_cycles": self.stalls,
+            "starve_cycles": self.starves,
+            "beats_per_cycle": self.transfers / self.cycles if self.cycles else 0.0,
+            "stall_ratio": self.stalls / (self.stalls + self.transfers) if self.stalls + self.transfers else 0.0,
+        }
+
+
+@dataclass
+class MetricsReport:
+    source: str
+    commit: Optional[str] = None
+    clock_period: float = 0.0  # seconds, measured from the clock in the dump
+    cycles: int = 0
+    operations: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    streams: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    log: Dict[str, float] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, object]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, object]) -> "MetricsReport":
+        return cls(**payload)
+
+    def summary(self) -> str:
+        lines = [f"[INFO] {self.source}: {self.cycles} cycles @ {self.clock_period * 1e9:.3g} ns"]
+        for name, stats in self.operations.items():
+            if stats["count"]:
+                lines.append(
+                    f"[INFO]   op {name}: {stats['count']} x latency {stats['latency_mean']:.1f} cycles "
+                    f"(min {stats['latency_min']}, max {stats['latency_max']}), busy {stats['busy_ratio']:.1%}, "
+                    f"{stats['ops_per_second']:,.0f} ops/s"
+                )
+            else:
+                lines.append(f"[INFO]   op {name}: no completed operations")
+        for name, stats in self.streams.items():
+            lines.append(
+                f"[INFO]   stream {name}: {stats['transfers']} beats, {stats['beats_per_cycle']:.3f} beats/cycle, "
+                f"{stats['stall_cycles']} stall / {stats['starve_cycles']} starve cycles"
+            )
+        for key, value in self.log.items():
+            lines.append(f"[INFO]   log {key} = {value:g}")
+        return "\n".join(lines)
+
+
+# ---------------------------------------------------------------------------
+# Collection
+# ---------------------------------------------------------------------------
+
+
+def discover_streams(header: VcdHeader) -> Dict[str, Tuple[VcdVar, VcdVar]]:
+    """``<port>_tvalid``/``<port>_tready`` pairs, shallowest scope per port name."""
+    streams: Dict[str, Tuple[VcdVar, VcdVar]] = {}
+    for var in sorted(header.vars.values(), key=lambda v: (v.depth, v.name)):
+        if not var.leaf.endswith("_tvalid"):
+            continue
+        port = var.leaf[: -len("_tvalid")]
+        ready = header.vars.get(f"{var.scope}.{port}_tready" if var.scope else f"{port}_tready")
+        if ready is not None and port not in streams:
+            streams[port] = (var, ready)
+    return streams
+
+
+def _optional(header: VcdHeader, pattern: Optional[str]) -> Optional[VcdVar]:
+    if not pattern:
+        return None
+    try:
+        return header.resolve(pattern)
+    except KeyError:
+        return None
+
+
+def _high(value: Optional[bytes]) -> bool:
+    return value is not None and value.strip(b"0") != b"" and not value.strip(b"01")
+
+
+def git_commit(cwd: Optional[Path] = None) -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, cwd=cwd, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def collect_vcd(
+    path: Union[str, Path],
+    *,
+    clock: str = "clk",
+    reset: Optional[str] = "rst",
+    operations: Sequence[Tuple[str, str, str, Optional[str]]] = (DEFAULT_OPERATION,),
+    streams: Optional[Sequence[str]] = None,
+) -> MetricsReport:
+    """One streaming pass over ``path``; see the module docstring for definitions.
+
+    ``operations`` holds ``(name, start, done, busy)`` signal patterns (busy may
+    be ``None``); operations whose start/done signals are missing are skipped.
+    ``streams`` restricts the AXI-Stream ports (default: all discovered).
+    Cycles with ``reset`` high are not counted.
+    """
+    reader = VcdReader(path)
+    header = reader.header
+    clk = header.resolve(clock)
+    rst = _optional(header, reset)
+    ops = []
+    for name, start, done, busy in operations:
+        start_var, done_var = _optional(header, start), _optional(header, done)
+        if start_var and done_var:
+            ops.append((OperationStats(name), start_var.code, done_var.code, _optional(header, busy)))
+    ports = discover_streams(header)
+    if streams is not None:
+        ports = {name: pair for name, pair in ports.items() if name in streams}
+    stream_stats = [(StreamStats(name), valid.code, ready.code) for name, (valid, ready) in ports.items()]
+
+    codes = {clk.code}
+    codes.update(code for _, start, done, busy in ops for code in (start, done) + ((busy.code,) if busy else ()))
+    codes.update(code for _, valid, ready in stream_stats for code in (valid, ready))
+    if rst is not None:
+        codes.add(rst.code)
+
+    # Start/done edges are found once per signal and then fanned out, so operations
+    # sharing a handshake signal all see the same edge.
+    edge_codes = {code for _, start, done, _ in ops for code in (start, done)}
+    values: Dict[bytes, bytes] = {}
+    previous: Dict[bytes, bool] = {}
+    open_starts: Dict[str, List[int]] = {stats.name: [] for stats, *_ in ops}
+    cycle = 0
+    edges: List[int] = []
+    for time, changes in reader.blocks(codes):
+        rising = values.get(clk.code) == b"0" and any(code == clk.code and value == b"1" for code, value in changes)
+        if rising:
+            if len(edges) < 2:
+                edges.append(time)
+            # Sample the state settled before the edge.
+            if rst is None or not _high(values.get(rst.code)):
+                levels = {code: _high(values.get(code)) for code in edge_codes}
+                rose = {code for code, high in levels.items() if high and not previous.get(code)}
+                previous = levels
+                for stats, start, done, busy in ops:
+                    stats.cycles += 1
+                    if start in rose:
+                        open_starts[stats.name].append(cycle)
+                    if done in rose and open_starts[stats.name]:
+                        stats.latencies.append(cycle - open_starts[stats.name].pop(0))
+                    if busy is not None:
+                        stats.busy_cycles += _high(values.get(busy.code))
+                for stats, valid, ready in stream_stats:
+                    stats.cycles += 1
+                    valid_high, ready_high = _high(values.get(valid)), _high(values.get(ready))
+                    if valid_high and ready_high:
+                        stats.transfers += 1
+                    elif valid_high:
+                        stats.stalls += 1
+                    elif ready_high:
+                        stats.starves += 1
+                cycle += 1
+        for code, value in changes:
+            values[code] = value
+
+    period = (edges[1] - edges[0]) * header.timescale if len(edges) == 2 else 0.0
+    for stats, start, done, busy in ops:
+        if busy is None:
+            stats.busy_cycles = sum(stats.latencies)
+    return MetricsReport(
+        source=str(path),
+        clock_period=period,
+        cycles=cycle,
+        operations={stats.name: stats.summary(period) for stats, *_ in ops},
+        streams={stats.name: stats.summary() for stats, *_ in stream_stats},
+    )
+
+
+def parse_log(path: Union[str, Path]) -> Dict[str, float]:
+    """``[METRIC] key=value`` lines of a simulator log (last value wins)."""
+    metrics: Dict[str, float] = {}
+    with Path(path).open("rb") as handle:
+        for line in handle:
+            match = METRIC_LINE.search(line)
+            if match:
+                metrics[match["key"].decode()] = float(match["value"])
+    return metrics
+
+
+def collect(
+    vcd: Optional[Union[str, Path]] = None, log: Optional[Union[str, Path]] = None, **kwargs
+) -> MetricsReport:
+    """Metrics from a VCD dump and/or a simulator log, stamped with the current commit."""
+    report = collect_vcd(vcd, **kwargs) if vcd else MetricsReport(source=str(log))
+    if log:
+        report.log = parse_log(log)
+    report.commit = git_commit(Path(__file__).resolve().parent)
+    return report
+
+
+# ---------------------------------------------------------------------------
+# Cross-commit comparison
+# ---------------------------------------------------------------------------
+
+# Metric name -> +1 if larger is better, -1 if smaller is better.
+_DIRECTION = {
+    "latency_mean": -1,
+    "latency_max": -1,
+    "ops_per_second": 1,
+    "ops_per_mcycle": 1,
+    "beats_per_cycle": 1,
+    "stall_ratio": -1,
+}
+
+
+def diff_reports(baseline: MetricsReport, current: MetricsReport, tolerance: float = 0.0) -> List[str]:
+    """Regressions of ``current`` against ``baseline`` beyond ``tolerance`` (relative)."""
+    regressions = []
+    for section in ("operations", "streams"):
+        old_section, new_section = getattr(baseline, section), getattr(current, section)
+        for name, old in old_section.items():
+            new = new_section.get(name)
+            if new is None:
+                regressions.append(f"{section[:-1]} {name}: missing from current run")
+                continue
+            for metric, direction in _DIRECTION.items():
+                if metric not in old or metric not in new or not old[metric]:
+                    continue
+                change = (new[metric] - old[metric]) / abs(old[metric])
+                if direction * change < -tolerance:
+                    regressions.append(f"{section[:-1]} {name}: {metric} {old[metric]:.4g} -> {new[metric]:.4g} ({change:+.1%})")
+    return regressions
+
+
+def load_report(path: Union[str, Path]) -> MetricsReport:
+    return MetricsReport.from_dict(json.loads(Path(path).read_text()))
+
+
+def write_report(report: MetricsReport, path: Union[str, Path]) -> None:
+    Path(path).write_text(json.dumps(report.to_dict(), indent=2))
+
+
+def _parse_operation(text: str) -> Tuple[str, str, str, Optional[str]]:
+    parts = text.split(":")
+    if len(parts) not in (3, 4):
+        raise argparse.ArgumentTypeError("operation must be name:start:done[:busy]")
+    return (parts[0], parts[1], parts[2], parts[3] if len(parts) == 4 else None)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("collect", help="extract metrics from a VCD and/or log")
+    run.add_argument("--vcd", type=Path)
+    run.add_argument("--log", type=Path)
+    run.add_argument("--clock", default="clk")
+    run.add_argument("--reset", default="rst")
+    run.add_argument("--op", action="append", type=_parse_operation, help="name:start:done[:busy] signal patterns")
+    run.add_argument("--stream", action="append", help="restrict to these AXI-Stream ports")
+    run.add_argument("--out", type=Path)
+    diff = sub.add_parser("diff", help="compare two metrics reports")
+    diff.add_argument("baseline", type=Path)
+    diff.add_argument("current", type=Path)
+    diff.add_argument("--tolerance", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    if args.command == "collect":
+        if not args.vcd and not args.log:
+            parser.error("collect needs --vcd and/or --log")
+        report = collect(
+            args.vcd,
+            args.log,
+            clock=args.clock,
+            reset=args.reset,
+            operations=args.op or (DEFAULT_OPERATION,),
+            streams=args.stream,
+        )
+        print(report.summary())
+        if args.out:
+            write_report(report, args.out)
+        return
+    regressions = diff_reports(load_report(args.baseline), load_report(args.current), args.tolerance)
+    for line in regressions:
+        print(f"[FAIL] {line}")
+    if regressions:
+        raise SystemExit(1)
+    print("[PASS] no metric regressions")
+
+
+if __name__ == "__main__":
+    main()
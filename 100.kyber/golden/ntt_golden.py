@@ -1,42 +1,64 @@
 """Reference Number-Theoretic Transform for Kyber."""
 from __future__ import annotations
 
-from typing import Iterable, List
+import random
+from typing import Iterable, List, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from . import fips203
 
 KYBER_Q = 3329
 KYBER_N = 256
+KYBER_ZETA = 17  # primitive 256-th root of unity mod q
+MONT_R = (1 << 16) % KYBER_Q
+QINV = 62209  # q^-1 mod 2^16
+BARRETT_V = ((1 << 26) + KYBER_Q // 2) // KYBER_Q
+
+
+def bitrev7(value: int) -> int:
+    """Reverse the 7 low bits of ``value``."""
+    return int(f"{value & 0x7F:07b}"[::-1], 2)
+
 
-# Precomputed twiddle factors from reference implementation (Montgomery domain).
-# The list is intentionally partial; populate during bring-up using PQClean tables.
-ZETAS = [
-    2285,  2571,  2647,  1425,  573,  2004,  1730,  3009,
-    3289,  264,   2456,  1846,  3113,  652,   908,   2298,
-]
+def _generate_zetas() -> List[int]:
+    # ZETAS[k] = R * zeta^bitrev7(k) mod q, i.e. the PQClean table reduced to [0, q).
+    return [(MONT_R * pow(KYBER_ZETA, bitrev7(k), KYBER_Q)) % KYBER_Q for k in range(KYBER_N // 2)]
+
+
+# Montgomery-domain twiddles consumed by ntt() from index 1 upwards.
+ZETAS = _generate_zetas()
+# Inverse twiddles in intt() consumption order: ZETAS_INV[k] = -ZETAS[127 - k] mod q.
+ZETAS_INV = [(KYBER_Q - ZETAS[KYBER_N // 2 - 1 - k]) % KYBER_Q for k in range(KYBER_N // 2)]
+# montgomery_reduce(x * INV_N_MONT) = x / 128 mod q (PQClean's 1441 would leave x in Montgomery form).
+INV_N_MONT = (MONT_R * pow(KYBER_N // 2, -1, KYBER_Q)) % KYBER_Q
 
 
 def montgomery_reduce(a: int) -> int:
     """Perform Montgomery reduction in software."""
-    u = (a * 62209) & 0xFFFF
+    u = (a * QINV) & 0xFFFF
     t = (u * KYBER_Q)
     return (a - t) >> 16
 
 
 def barrett_reduce(a: int) -> int:
     """Perform Barrett reduction."""
-    v = ((1 << 26) + KYBER_Q // 2) // KYBER_Q
-    t = (v * a) >> 26
+    t = (BARRETT_V * a) >> 26
     t *= KYBER_Q
     return a - t
 
 
 def ntt(poly: Iterable[int]) -> List[int]:
-    """Compute the forward NTT of a polynomial."""
+    """Compute the forward NTT of a polynomial (FIPS 203 Algorithm 9 ordering)."""
     vec = list(poly)
     if len(vec) != KYBER_N:
         raise ValueError("Polynomial length must be 256")
-    k = 0
+    k = 1
     length = 128
-    while length >= 1:
+    while length >= 2:
         for start in range(0, KYBER_N, 2 * length):
             zeta = ZETAS[k]
             k += 1
@@ -49,21 +71,119 @@ def ntt(poly: Iterable[int]) -> List[int]:
 
 
 def intt(poly: Iterable[int]) -> List[int]:
-    """Compute the inverse NTT (normalized)."""
+    """Compute the inverse NTT (normalized, FIPS 203 Algorithm 10)."""
     vec = list(poly)
     if len(vec) != KYBER_N:
         raise ValueError("Polynomial length must be 256")
-    k = len(ZETAS) - 1
-    length = 1
+    k = 0
+    length = 2
     while length < KYBER_N:
         for start in range(0, KYBER_N, 2 * length):
-            zeta = ZETAS[k]
-            k -= 1
+            zeta = ZETAS_INV[k]
+            k += 1
             for j in range(start, start + length):
                 t = vec[j]
                 vec[j] = barrett_reduce(t + vec[j + length])
                 vec[j + length] = montgomery_reduce(zeta * (t - vec[j + length]))
         length *= 2
-    # Multiply by n^{-1} = 1441 mod q
-    inv_n = 1441
-    return [montgomery_reduce(x * inv_n) % KYBER_Q for x in vec]
+    return [montgomery_reduce(x * INV_N_MONT) % KYBER_Q for x in vec]
+
+
+# ---------------------------------------------------------------------------
+# Batched array implementation (bit-exact with ntt()/intt() above)
+# ---------------------------------------------------------------------------
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("NumPy is required for batched NTT helpers")
+
+
+def _as_batch(polys) -> "np.ndarray":
+    _require_numpy()
+    batch = np.array(polys, dtype=np.int64)
+    if batch.ndim == 1:
+        batch = batch[np.newaxis, :]
+    if batch.ndim != 2 or batch.shape[1] != KYBER_N:
+        raise ValueError("Expected an array of shape (count, 256)")
+    return batch
+
+
+def _montgomery_reduce_array(a: "np.ndarray") -> "np.ndarray":
+    u = (a * QINV) & 0xFFFF
+    return (a - u * KYBER_Q) >> 16
+
+
+def _barrett_reduce_array(a: "np.ndarray") -> "np.ndarray":
+    return a - ((BARRETT_V * a) >> 26) * KYBER_Q
+
+
+def ntt_many(polys) -> "np.ndarray":
+    """Forward NTT of a ``(count, 256)`` batch; row ``i`` equals ``ntt(polys[i])``."""
+    vec = _as_batch(polys)
+    count = vec.shape[0]
+    zetas = np.array(ZETAS, dtype=np.int64)
+    k = 1
+    length = 128
+    while length >= 2:
+        groups = KYBER_N // (2 * length)
+        view = vec.reshape(count, groups, 2, length)
+        zeta = zetas[k : k + groups].reshape(1, groups, 1)
+        k += groups
+        t = _montgomery_reduce_array(zeta * view[:, :, 1, :])
+        a = view[:, :, 0, :]
+        view[:, :, 1, :] = _barrett_reduce_array(a - t)
+        view[:, :, 0, :] = _barrett_reduce_array(a + t)
+        length //= 2
+    return vec % KYBER_Q
+
+
+def intt_many(polys) -> "np.ndarray":
+    """Inverse NTT of a ``(count, 256)`` batch; row ``i`` equals ``intt(polys[i])``."""
+    vec = _as_batch(polys)
+    count = vec.shape[0]
+    zetas_inv = np.array(ZETAS_INV, dtype=np.int64)
+    k = 0
+    length = 2
+    while length < KYBER_N:
+        groups = KYBER_N // (2 * length)
+        view = vec.reshape(count, groups, 2, length)
+        zeta = zetas_inv[k : k + groups].reshape(1, groups, 1)
+        k += groups
+        a = view[:, :, 0, :].copy()
+        b = view[:, :, 1, :]
+        view[:, :, 0, :] = _barrett_reduce_array(a + b)
+        view[:, :, 1, :] = _montgomery_reduce_array(zeta * (a - b))
+        length *= 2
+    return _montgomery_reduce_array(vec * INV_N_MONT) % KYBER_Q
+
+
+# ---------------------------------------------------------------------------
+# Cross-check against the FIPS 203 golden model
+# ---------------------------------------------------------------------------
+
+
+def self_check(count: int = 32, seed: int = 0) -> None:
+    """Compare ntt/intt and the batched variants with the FIPS 203 golden ``Poly`` class."""
+    fips = fips203.load().auxiliary_function
+    rng = random.Random(seed)
+    polys: List[Sequence[int]] = [[rng.randrange(KYBER_Q) for _ in range(KYBER_N)] for _ in range(count)]
+    expected_ntt = [list(fips.Poly(p).NTT().cs) for p in polys]
+    expected_intt = [list(fips.Poly(p).INTT().cs) for p in polys]
+    for poly, want_ntt, want_intt in zip(polys, expected_ntt, expected_intt):
+        if ntt(poly) != want_ntt:
+            raise AssertionError("ntt() disagrees with FIPS 203 NTT")
+        if intt(poly) != want_intt:
+            raise AssertionError("intt() disagrees with FIPS 203 NTT^-1")
+        if intt(ntt(poly)) != list(poly):
+            raise AssertionError("intt(ntt(x)) != x")
+    if np is not None:
+        if ntt_many(polys).tolist() != expected_ntt:
+            raise AssertionError("ntt_many() disagrees with FIPS 203 NTT")
+        if intt_many(polys).tolist() != expected_intt:
+            raise AssertionError("intt_many() disagrees with FIPS 203 NTT^-1")
+
+
+if __name__ == "__main__":
+    self_check()
+    print("[PASS] ntt_golden matches the FIPS 203 golden model")
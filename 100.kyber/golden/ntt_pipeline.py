@@ -0,0 +1,408 @@
+"""Cycle-accurate model of the LANES-parameterised NTT/INTT pipeline.
+
+The model follows ``docs/microarch_ntt.md``:
+
+* read addresses are issued ``read_latency`` (default 2) cycles ahead of
+  Stage 0 to hide the BRAM latency;
+* Stage 0 fetches twiddles from a per-lane zeta ROM and latches operands;
+* Stage 1 is the Montgomery multiplier, Stage 2 the add/sub pair with
+  conditional subtraction by ``q`` (INTT routes operands through add/sub
+  first and multiplies the difference, sharing the same two units);
+* Stage 3 writes ``(a', b')`` back to the opposite half of ``2P`` ping-pong
+  banks.
+
+Every issue slot carries ``LANES`` butterflies (butterfly index increments by
+``P`` per cycle).  A slot that maps more than one access onto a bank port is
+serialised (bank-conflict stall) and a read of a coefficient whose previous
+level has not been written back yet is held (RAW hazard stall).  The
+simulation yields per-transform cycle counts, stall breakdown and a per-cycle
+trace of the Stage 2 / Stage 3 taps that the RTL testbench can compare
+against.
+
+Run ``python -m golden.ntt_pipeline`` from ``100.kyber`` for a LANES sweep.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .ntt_golden import INV_N_MONT, KYBER_N, KYBER_Q, KYBER_ZETA, ZETAS, bitrev7, montgomery_reduce
+
+LANE_OPTIONS = (1, 2, 4)
+NTT_LEVELS = 7  # Kyber stops at length-2 butterflies (degree-1 residues).
+# Stage-3 writeback happens ``read_latency + WRITEBACK_OFFSET`` cycles after the read issue.
+WRITEBACK_OFFSET = 3
+
+
+# ---------------------------------------------------------------------------
+# Bank mappings: index -> (bank, address within one ping-pong half)
+# ---------------------------------------------------------------------------
+
+BankMap = Callable[[int, int], Tuple[int, int]]
+
+
+def _map_parity(index: int, lanes: int) -> Tuple[int, int]:
+    # Low log2(P) bits select the lane bank, parity of the remaining bits picks
+    # the even/odd bank group: butterfly partners always differ in one bit above
+    # log2(P), so every slot touches 2P distinct banks.
+    shift = lanes.bit_length() - 1
+    upper = index >> shift
+    parity = bin(upper).count("1") & 1
+    return (parity << shift) | (index & (lanes - 1)), upper >> 1
+
+
+def _map_blocked(index: int, lanes: int) -> Tuple[int, int]:
+    # docs/mem_map.md: bank_sel = (index / stride) mod 2P, addr = index % stride.
+    stride = KYBER_N // (2 * lanes)
+    return (index // stride) % (2 * lanes), index % stride
+
+
+def _map_cyclic(index: int, lanes: int) -> Tuple[int, int]:
+    return index % (2 * lanes), index // (2 * lanes)
+
+
+BANK_MAPPINGS: Dict[str, BankMap] = {
+    "parity": _map_parity,
+    "blocked": _map_blocked,
+    "cyclic": _map_cyclic,
+}
+
+
+@dataclass(frozen=True)
+class PipelineConfig:
+    lanes: int = 4
+    bank_mapping: str = "parity"
+    read_latency: int = 2
+
+    def __post_init__(self) -> None:
+        if self.lanes not in LANE_OPTIONS:
+            raise ValueError(f"LANES must be one of {LANE_OPTIONS}")
+        if self.bank_mapping not in BANK_MAPPINGS:
+            raise ValueError(f"Unknown bank mapping {self.bank_mapping!r}")
+        if self.read_latency < 1:
+            raise ValueError("read_latency must be at least 1")
+
+    @property
+    def banks(self) -> int:
+        return 2 * self.lanes
+
+    @property
+    def bank_depth(self) -> int:
+        # Two ping-pong halves of N / 2P coefficients each.
+        return KYBER_N // self.lanes
+
+    def locate(self, index: int, half: int) -> Tuple[int, int]:
+        bank, addr = BANK_MAPPINGS[self.bank_mapping](index, self.lanes)
+        return bank, addr + half * (KYBER_N // self.banks)
+
+
+@dataclass
+class CycleRecord:
+    """Per-cycle activity; lists hold one entry per active lane operation."""
+
+    cycle: int
+    stall: Optional[str] = None
+    reads: List[Tuple[int, int]] = field(default_factory=list)
+    twiddles: List[int] = field(default_factory=list)
+    stage1: List[Tuple[int, ...]] = field(default_factory=list)
+    stage2: List[Tuple[int, ...]] = field(default_factory=list)
+    writes: List[Tuple[int, int, int]] = field(default_factory=list)
+
+
+@dataclass
+class PipelineReport:
+    config: PipelineConfig
+    inverse: bool
+    slots: int
+    issue_cycles: int
+    conflict_stalls: int
+    hazard_stalls: int
+    bank_conflicts: int
+    hazards: List[Tuple[int, int]]
+    latency: int
+    output: List[int]
+    trace: List[CycleRecord]
+
+    @property
+    def initiation_interval(self) -> float:
+        """Average cycles between consecutive issue slots (1.0 means II=1)."""
+        return self.issue_cycles / self.slots
+
+    @property
+    def cycles_per_transform(self) -> int:
+        """Steady-state cost when the next transform issues while this one drains."""
+        return self.issue_cycles
+
+
+@dataclass
+class _Op:
+    """One lane operation inside an issue slot."""
+
+    reads: Tuple[int, ...]
+    zeta: Optional[int]
+
+
+def _butterfly_slots(lanes: int, inverse: bool) -> List[Tuple[int, List[_Op]]]:
+    """Issue order of (level, ops) slots, butterfly index incrementing by P per cycle."""
+    slots: List[Tuple[int, List[_Op]]] = []
+    lengths = [KYBER_N >> (level + 1) for level in range(NTT_LEVELS)]
+    if inverse:
+        lengths.reverse()
+    for level, length in enumerate(lengths):
+        groups = KYBER_N // (2 * length)
+        # Forward uses zetas[1..127] in order; inverse walks them backwards per level.
+        zeta_base = groups if not inverse else 2 * groups - 1
+        for base in range(0, KYBER_N // 2, lanes):
+            ops = []
+            for bfly in range(base, base + lanes):
+                group, offset = divmod(bfly, length)
+                j = group * 2 * length + offset
+                zeta_idx = zeta_base + group if not inverse else zeta_base - group
+                ops.append(_Op(reads=(j, j + length), zeta=zeta_idx))
+            slots.append((level, ops))
+    if inverse:
+        for base in range(0, KYBER_N, lanes):
+            slots.append((NTT_LEVELS, [_Op(reads=(idx,), zeta=None) for idx in range(base, base + lanes)]))
+    return slots
+
+
+def _canonical(value: int) -> int:
+    return value + KYBER_Q if value < 0 else value
+
+
+def _mont_mul(x: int, zeta: int) -> int:
+    return _canonical(montgomery_reduce(x * zeta))
+
+
+def _mod_add(x: int, y: int) -> int:
+    s = x + y
+    return s - KYBER_Q if s >= KYBER_Q else s
+
+
+def _mod_sub(x: int, y: int) -> int:
+    d = x - y
+    return d + KYBER_Q if d < 0 else d
+
+
+def simulate(
+    poly: Iterable[int],
+    config: PipelineConfig = PipelineConfig(),
+    *,
+    inverse: bool = False,
+    zetas: Optional[Sequence[int]] = None,
+) -> PipelineReport:
+    """Run one transform through the pipeline model and collect cycle statistics."""
+    coeffs = [int(c) % KYBER_Q for c in poly]
+    if len(coeffs) != KYBER_N:
+        raise ValueError("Polynomial length must be 256")
+    rom = list(zetas) if zetas is not None else ZETAS
+    lanes = config.lanes
+    records: Dict[int, CycleRecord] = {}
+
+    def record(cycle: int) -> CycleRecord:
+        if cycle not in records:
+            records[cycle] = CycleRecord(cycle)
+        return records[cycle]
+
+    ready_at = [0] * KYBER_N
+    next_issue = 0
+    conflict_stalls = hazard_stalls = bank_conflicts = 0
+    hazards: List[Tuple[int, int]] = []
+    last_write = 0
+    slots = _butterfly_slots(lanes, inverse)
+
+    for level, ops in slots:
+        src_half, dst_half = level & 1, (level + 1) & 1
+        read_locs = [config.locate(idx, src_half) for op in ops for idx in op.reads]
+        write_locs = [config.locate(idx, dst_half) for op in ops for idx in op.reads]
+
+        # RAW hazard: hold the slot until the previous level has written every operand.
+        issue = next_issue
+        earliest = max(ready_at[idx] for op in ops for idx in op.reads)
+        if earliest > issue:
+            for cycle in range(issue, earliest):
+                record(cycle).stall = "hazard"
+            hazards.extend((issue, idx) for op in ops for idx in op.reads if ready_at[idx] > issue)
+            hazard_stalls += earliest - issue
+            issue = earliest
+
+        # Bank conflicts: each bank has one read and one write port per cycle.
+        read_load: Dict[int, int] = {}
+        write_load: Dict[int, int] = {}
+        for bank, _ in read_locs:
+            read_load[bank] = read_load.get(bank, 0) + 1
+        for bank, _ in write_locs:
+            write_load[bank] = write_load.get(bank, 0) + 1
+        occupancy = max(max(read_load.values()), max(write_load.values()))
+        if occupancy > 1:
+            bank_conflicts += sum(v - 1 for v in read_load.values()) + sum(v - 1 for v in write_load.values())
+            conflict_stalls += occupancy - 1
+            for cycle in range(issue + 1, issue + occupancy):
+                record(cycle).stall = "conflict"
+        port_turn: Dict[int, int] = {}
+        for loc in read_locs:
+            turn = port_turn.get(loc[0], 0)
+            port_turn[loc[0]] = turn + 1
+            record(issue + turn).reads.append(loc)
+
+        # Operand data lands in Stage 0 ``read_latency`` cycles after the last read.
+        stage0 = issue + occupancy - 1 + config.read_latency
+        stage1, stage2, stage3 = stage0 + 1, stage0 + 2, stage0 + WRITEBACK_OFFSET
+        for op in ops:
+            if op.zeta is None:
+                (idx,) = op.reads
+                product = _mont_mul(coeffs[idx], INV_N_MONT)
+                record(stage1).stage1.append((product,))
+                record(stage2).stage2.append((product,))
+                coeffs[idx] = product
+                continue
+            j, k = op.reads
+            zeta = rom[op.zeta]
+            record(stage0).twiddles.append(zeta)
+            a, b = coeffs[j], coeffs[k]
+            if not inverse:
+                t = _mont_mul(b, zeta)
+                record(stage1).stage1.append((a, t))
+                a_new, b_new = _mod_add(a, t), _mod_sub(a, t)
+            else:
+                s, d = _mod_add(a, b), _mod_sub(b, a)
+                record(stage1).stage1.append((s, d))
+                a_new, b_new = s, _mont_mul(d, zeta)
+            record(stage2).stage2.append((a_new, b_new))
+            coeffs[j], coeffs[k] = a_new, b_new
+        for idx, loc in zip((idx for op in ops for idx in op.reads), write_locs):
+            record(stage3).writes.append((loc[0], loc[1], coeffs[idx]))
+            # Written data is visible to a read issued on the following cycle.
+            ready_at[idx] = stage3 + 1
+        last_write = max(last_write, stage3)
+        next_issue = issue + occupancy
+
+    trace = [records.get(cycle, CycleRecord(cycle)) for cycle in range(last_write + 1)]
+    return PipelineReport(
+        config=config,
+        inverse=inverse,
+        slots=len(slots),
+        issue_cycles=next_issue,
+        conflict_stalls=conflict_stalls,
+        hazard_stalls=hazard_stalls,
+        bank_conflicts=bank_conflicts,
+        hazards=hazards,
+        latency=last_write + 1,
+        output=coeffs,
+        trace=trace,
+    )
+
+
+def reference_transform(poly: Sequence[int], *, inverse: bool = False) -> List[int]:
+    """Plain modular NTT/INTT (FIPS 203 Alg. 9/10) used to self-check the datapath."""
+    f = [int(c) % KYBER_Q for c in poly]
+    zetas = [pow(KYBER_ZETA, bitrev7(k), KYBER_Q) for k in range(KYBER_N // 2)]
+    if not inverse:
+        k = 1
+        length = 128
+        while length >= 2:
+            for start in range(0, KYBER_N, 2 * length):
+                zeta = zetas[k]
+                k += 1
+                for j in range(start, start + length):
+                    t = zeta * f[j + length] % KYBER_Q
+                    f[j + length] = (f[j] - t) % KYBER_Q
+                    f[j] = (f[j] + t) % KYBER_Q
+            length //= 2
+        return f
+    k = 127
+    length = 2
+    while length <= 128:
+        for start in range(0, KYBER_N, 2 * length):
+            zeta = zetas[k]
+            k -= 1
+            for j in range(start, start + length):
+                t = f[j]
+                f[j] = (t + f[j + length]) % KYBER_Q
+                f[j + length] = zeta * (f[j + length] - t) % KYBER_Q
+        length *= 2
+    return [x * 3303 % KYBER_Q for x in f]
+
+
+def write_trace(report: PipelineReport, path: Path) -> None:
+    """Human-readable per-cycle trace (one line per cycle)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w") as handle:
+        for rec in report.trace:
+            parts = [f"{rec.cycle:5d}", rec.stall or "-"]
+            parts.append("rd=" + ",".join(f"{b}:{a}" for b, a in rec.reads))
+            parts.append("s2=" + ",".join("/".join(f"{v:03x}" for v in vals) for vals in rec.stage2))
+            parts.append("wb=" + ",".join(f"{b}:{a}:{d:03x}" for b, a, d in rec.writes))
+            handle.write(" ".join(parts) + "\n")
+
+
+def write_expected_hex(report: PipelineReport, path: Path) -> None:
+    """Per-cycle Stage 3 writeback words for ``$readmemh``.
+
+    Each line is one cycle holding ``2P`` 32-bit words (port 0 rightmost):
+    ``{valid[31], 3'b0, bank[27:24], addr[23:16], 4'b0, data[11:0]}``.
+    """
+    ports = report.config.banks
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w") as handle:
+        for rec in report.trace:
+            words = [0] * ports
+            for port, (bank, addr, data) in enumerate(rec.writes):
+                words[port % ports] = (1 << 31) | (bank << 24) | (addr << 16) | data
+            handle.write("".join(f"{w:08x}" for w in reversed(words)) + "\n")
+
+
+def sweep(
+    lanes: Sequence[int] = LANE_OPTIONS,
+    mapping: str = "parity",
+    *,
+    inverse: bool = False,
+    seed: int = 0,
+    read_latency: int = 2,
+) -> List[PipelineReport]:
+    """Simulate one random polynomial per LANES setting and check against the reference."""
+    rng = random.Random(seed)
+    poly = [rng.randrange(KYBER_Q) for _ in range(KYBER_N)]
+    expected = reference_transform(poly, inverse=inverse)
+    reports = []
+    for lane_count in lanes:
+        cfg = PipelineConfig(lanes=lane_count, bank_mapping=mapping, read_latency=read_latency)
+        report = simulate(poly, cfg, inverse=inverse)
+        if report.output != expected:
+            raise AssertionError(f"Pipeline output mismatch for LANES={lane_count}")
+        reports.append(report)
+    return reports
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cycle-accurate NTT pipeline model")
+    parser.add_argument("--lanes", type=int, nargs="+", default=list(LANE_OPTIONS), choices=LANE_OPTIONS)
+    parser.add_argument("--mapping", default="parity", choices=sorted(BANK_MAPPINGS))
+    parser.add_argument("--inverse", action="store_true", help="Model the INTT instead of the NTT")
+    parser.add_argument("--read-latency", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace-dir", type=Path, help="Write per-cycle traces and $readmemh files here")
+    args = parser.parse_args()
+
+    kind = "intt" if args.inverse else "ntt"
+    reports = sweep(args.lanes, args.mapping, inverse=args.inverse, seed=args.seed, read_latency=args.read_latency)
+    print(f"{'LANES':>5} {'slots':>6} {'cycles':>7} {'latency':>8} {'conflict':>9} {'hazard':>7} {'II':>6}")
+    for report in reports:
+        print(
+            f"{report.config.lanes:>5} {report.slots:>6} {report.issue_cycles:>7} {report.latency:>8} "
+            f"{report.conflict_stalls:>9} {report.hazard_stalls:>7} {report.initiation_interval:>6.3f}"
+        )
+        if args.trace_dir:
+            stem = f"{kind}_p{report.config.lanes}_{args.mapping}"
+            write_trace(report, args.trace_dir / f"{stem}_trace.txt")
+            write_expected_hex(report, args.trace_dir / f"{stem}_wb.hex")
+    for report in reports:
+        status = "PASS" if report.initiation_interval == 1.0 else "INFO"
+        print(f"[{status}] LANES={report.config.lanes} {kind} II={report.initiation_interval:.3f} ({args.mapping} mapping)")
+
+
+if __name__ == "__main__":
+    main()
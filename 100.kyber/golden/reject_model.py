@@ -0,0 +1,178 @@
+"""Cycle-level model of the two-stage rejection sampler pipelines.
+
+Both RTL variants (``3.REJECT/reject_sampler_core.v`` and
+``REJECT_All/REJECT_v1/reject_sampler.v``) register the input bus twice, make
+the per-lane accept decision on stage 1 and register the result, so the output
+at cycle ``t`` is a pure function of the input at cycle ``t - latency``,
+zeroed when that input was not ``random_valid``.  The model therefore
+evaluates every cycle at once as array operations and delays the result by
+``latency`` rows; ``RejectPipeline`` carries the in-flight rows between chunks
+so arbitrarily long traces can be streamed.
+
+Per lane, mode 0 accepts ``cand < q`` (sample = candidate) and mode 1 accepts
+``urnd < threshold`` (sample = candidate, or the accept bit for
+``bernoulli_sample_cand=False`` as in REJECT_v1, which also compares against
+``cand`` instead of a threshold bus).  The uniform compare sees the low
+``q_bits`` of ``q``: ``reject_sampler_core.v`` truncates it to
+``q_stage1[CAND_BITS-1:0]`` (the default), REJECT_v1 compares the whole 16-bit
+port.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from . import compare
+
+KYBER_Q = 3329
+
+
+@dataclass(frozen=True)
+class RejectConfig:
+    lanes: int = 4
+    cand_bits: int = 12
+    latency: int = 2  # input cycle -> registered output
+    const_time: bool = False  # sample_tvalid follows random_valid instead of "any lane accepted"
+    bernoulli_sample_cand: bool = True
+    q_bits: Optional[int] = None  # width of q in the uniform compare; None = cand_bits
+    vector_path: Optional[Path] = None  # stimulus written by the golden script
+    expected_path: Optional[Path] = None  # golden output trace
+    output_path: Optional[Path] = None  # RTL dump
+
+    @property
+    def out_bits(self) -> int:
+        return self.lanes * self.cand_bits
+
+
+@dataclass
+class RejectStimulus:
+    """Per-cycle inputs; lane arrays are ``(cycles, lanes)``."""
+
+    valid: np.ndarray
+    q: np.ndarray
+    cand: np.ndarray
+    urnd: np.ndarray
+    threshold: np.ndarray
+    mode: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.valid)
+
+
+@dataclass
+class RejectTrace:
+    """Per-cycle outputs: ``sample_tvalid``, ``acc_bus`` and packed ``sample_tdata``."""
+
+    valid: np.ndarray
+    accept: np.ndarray
+    sample: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.valid)
+
+    def lines(self, cfg: RejectConfig) -> bytes:
+        """``valid acc sample`` per cycle as fixed-width hex."""
+        return compare.format_hex_rows(
+            [self.valid, self.accept, self.sample], [1, -(-cfg.lanes // 4), -(-cfg.out_bits // 4)]
+        )
+
+
+def pack_lanes(values: np.ndarray, bits: int) -> np.ndarray:
+    """Pack ``(cycles, lanes)`` lane values little-endian into one uint64 per cycle."""
+    values = np.asarray(values, dtype=np.uint64)
+    if values.shape[1] * bits > 64:
+        raise ValueError("Packed lanes must fit in 64 bits")
+    shifts = np.arange(values.shape[1], dtype=np.uint64) * np.uint64(bits)
+    return np.bitwise_or.reduce(values << shifts, axis=1)
+
+
+def unpack_lanes(words: np.ndarray, bits: int, lanes: int) -> np.ndarray:
+    words = np.asarray(words, dtype=np.uint64)[:, np.newaxis]
+    shifts = np.arange(lanes, dtype=np.uint64) * np.uint64(bits)
+    return ((words >> shifts) & np.uint64((1 << bits) - 1)).astype(np.int64)
+
+
+def evaluate(cfg: RejectConfig, stim: RejectStimulus) -> RejectTrace:
+    """Output of every input cycle before the pipeline delay is applied."""
+    cand = np.asarray(stim.cand, dtype=np.int64)
+    mode = np.broadcast_to(np.asarray(stim.mode, dtype=bool).reshape(len(stim), -1), cand.shape)
+    q = np.asarray(stim.q, dtype=np.int64).reshape(-1, 1) & ((1 << (cfg.q_bits or cfg.cand_bits)) - 1)
+    bernoulli = np.asarray(stim.urnd, dtype=np.int64) < np.asarray(stim.threshold, dtype=np.int64)
+    valid = np.asarray(stim.valid, dtype=bool)
+    accept = np.where(mode, bernoulli, cand < q) & valid[:, np.newaxis]
+    if cfg.bernoulli_sample_cand:
+        sample = np.where(accept, cand, 0)
+    else:
+        sample = np.where(accept, np.where(mode, 1, cand), 0)
+    accept_mask = pack_lanes(accept, 1)
+    out_valid = valid if cfg.const_time else accept.any(axis=1)
+    return RejectTrace(out_valid.astype(np.uint8), accept_mask, pack_lanes(sample, cfg.cand_bits))
+
+
+class RejectPipeline:
+    """Streams stimulus chunks through the ``latency``-deep pipeline (reset state: all zero)."""
+
+    def __init__(self, cfg: RejectConfig) -> None:
+        self.cfg = cfg
+        self._pending = _zeros(cfg.latency)
+
+    def step(self, stim: RejectStimulus) -> RejectTrace:
+        """Outputs observed on the same cycles as ``stim`` is applied."""
+        current = evaluate(self.cfg, stim)
+        joined = _concat(self._pending, current)
+        self._pending = _slice(joined, len(stim), None)
+        return _slice(joined, 0, len(stim))
+
+    def drain(self, cycles: Optional[int] = None) -> RejectTrace:
+        """Idle cycles (``random_valid`` low) after the last chunk; defaults to ``latency``."""
+        cycles = self.cfg.latency if cycles is None else cycles
+        joined = _concat(self._pending, _zeros(cycles))
+        self._pending = _slice(joined, cycles, None)
+        return _slice(joined, 0, cycles)
+
+
+def simulate(cfg: RejectConfig, stim: RejectStimulus, drain: Optional[int] = None) -> RejectTrace:
+    """Whole-trace convenience wrapper: outputs for every stimulus cycle plus ``drain`` idle cycles."""
+    pipeline = RejectPipeline(cfg)
+    return _concat(pipeline.step(stim), pipeline.drain(drain))
+
+
+def random_stimulus(
+    cfg: RejectConfig,
+    cycles: int,
+    rng: np.random.Generator,
+    *,
+    valid_prob: float = 1.0,
+    q: int = KYBER_Q,
+    per_lane_mode: bool = True,
+) -> RejectStimulus:
+    """Uniform lane inputs with ``random_valid`` high with probability ``valid_prob`` (back-pressure)."""
+    shape = (cycles, cfg.lanes)
+    limit = 1 << cfg.cand_bits
+    return RejectStimulus(
+        valid=(rng.random(cycles) < valid_prob).astype(np.uint8),
+        q=np.full(cycles, q, dtype=np.int64),
+        cand=rng.integers(0, limit, size=shape),
+        urnd=rng.integers(0, limit, size=shape),
+        threshold=rng.integers(0, limit, size=shape),
+        mode=rng.integers(0, 2, size=shape if per_lane_mode else (cycles, 1)),
+    )
+
+
+def _zeros(cycles: int) -> RejectTrace:
+    return RejectTrace(np.zeros(cycles, dtype=np.uint8), np.zeros(cycles, dtype=np.uint64), np.zeros(cycles, dtype=np.uint64))
+
+
+def _concat(first: RejectTrace, second: RejectTrace) -> RejectTrace:
+    return RejectTrace(
+        np.concatenate([first.valid, second.valid]),
+        np.concatenate([first.accept, second.accept]),
+        np.concatenate([first.sample, second.sample]),
+    )
+
+
+def _slice(trace: RejectTrace, start: int, stop: Optional[int]) -> RejectTrace:
+    return RejectTrace(trace.valid[start:stop], trace.accept[start:stop], trace.sample[start:stop])
@@ -0,0 +1,45 @@
+"""Run a module's test script with ``golden`` and ``scripts`` importable.
+
+The per-module harnesses (``0.SHAKE/test/shake_golden.py``,
+``1.CBD/test/cbd_golden.py``, ``3.REJECT/test/reject_sampler_golden.py``,
+``REJECT_All/REJECT_v1/test/gen_vectors.py``,
+``GAUSS_All/GAUSS_v1/test/gauss_stats.py``, ``NTT_All/NTT_v1/test/run_tests.py``)
+import the shared models as ``from golden import ...``.  This is their one
+entry point: it puts ``100.kyber`` and the script's own directory on
+``sys.path`` and runs the script as ``__main__`` with the remaining
+arguments::
+
+    python 100.kyber/golden/run.py 1.CBD/test/cbd_golden.py --verify
+    python -m golden.run ../1.CBD/test/cbd_golden.py --verify     # from 100.kyber
+"""
+from __future__ import annotations
+
+import runpy
+import sys
+from pathlib import Path
+from typing import Optional, Sequence
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def run(script: Path, argv: Sequence[str] = ()) -> None:
+    """Execute ``script`` as ``__main__`` with ``argv`` as its arguments."""
+    script = Path(script).resolve()
+    if not script.is_file():
+        raise SystemExit(f"[FAIL] no such script: {script}")
+    # Run as a file, sys.path[0] is golden/ itself, whose module names would shadow the script's.
+    sys.path[:] = [str(script.parent), str(ROOT), *(p for p in sys.path if Path(p or ".").resolve() != ROOT / "golden")]
+    sys.argv = [str(script), *argv]
+    runpy.run_path(str(script), run_name="__main__")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        print(__doc__)
+        raise SystemExit(0 if argv else 2)
+    run(Path(argv[0]), argv[1:])
+
+
+if __name__ == "__main__":
+    main()
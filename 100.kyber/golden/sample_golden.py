@@ -2,10 +2,21 @@
 from __future__ import annotations
 
 import hashlib
+import math
+import random
 from dataclasses import dataclass
 from typing import Iterable, List, Tuple
 
+from . import fips203
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
 KYBER_Q = 3329
+KYBER_N = 256
+CBD_ETAS = (2, 3)
 
 
 @dataclass
@@ -22,23 +33,61 @@ def shake128(data: bytes, outlen: int) -> bytes:
 
 
 def cbd(bytes_in: bytes, eta: int) -> List[int]:
-    """Center binomial distribution sampler."""
-    n_coeffs = 256
+    """Center binomial distribution sampler (FIPS 203 SamplePolyCBD).
+
+    Reads the first ``64 * eta`` bytes as a little-endian bit string; each
+    coefficient is the popcount of ``eta`` bits minus that of the next ``eta``.
+    """
+    if eta not in CBD_ETAS:
+        raise ValueError(f"Unsupported eta={eta}")
+    if len(bytes_in) < 64 * eta:
+        raise ValueError("Insufficient randomness for CBD")
+    t = int.from_bytes(bytes_in[: 64 * eta], "little")
+    mask = (1 << eta) - 1
     coeffs: List[int] = []
-    buf_idx = 0
-    while len(coeffs) < n_coeffs:
-        if eta == 2:
-            if buf_idx + 3 > len(bytes_in):
-                raise ValueError("Insufficient randomness for CBD")
-            t = int.from_bytes(bytes_in[buf_idx : buf_idx + 3], "little")
-            buf_idx += 3
-            for j in range(0, 24, 6):
-                a = (t >> j) & 0x7
-                b = (t >> (j + eta)) & 0x7
-                coeffs.append((a - b) % KYBER_Q)
-        else:
-            raise NotImplementedError("Eta other than 2 not yet supported")
-    return coeffs[:n_coeffs]
+    for i in range(KYBER_N):
+        a = bin((t >> (2 * eta * i)) & mask).count("1")
+        b = bin((t >> (2 * eta * i + eta)) & mask).count("1")
+        coeffs.append((a - b) % KYBER_Q)
+    return coeffs
+
+
+def _cbd_table(eta: int) -> "np.ndarray":
+    """Coefficient (mod q) for every ``2 * eta``-bit field value."""
+    fields = np.arange(1 << (2 * eta))
+    popcount = np.array([bin(v).count("1") for v in range(1 << eta)], dtype=np.int64)
+    mask = (1 << eta) - 1
+    return (popcount[fields & mask] - popcount[fields >> eta]) % KYBER_Q
+
+
+def cbd_many(buf, eta: int) -> "np.ndarray":
+    """Batched CBD: ``(m, 64 * eta)`` bytes -> ``(m, 256)`` coefficients mod q.
+
+    Row ``i`` equals ``cbd(buf[i], eta)``.  Bytes are grouped into the smallest
+    whole number of ``2 * eta``-bit fields (1 byte for eta=2, 3 bytes for eta=3)
+    and every field is mapped through a popcount-difference table.
+    """
+    if np is None:
+        raise RuntimeError("NumPy is required for batched CBD")
+    if eta not in CBD_ETAS:
+        raise ValueError(f"Unsupported eta={eta}")
+    if isinstance(buf, (bytes, bytearray, memoryview)):
+        data = np.frombuffer(buf, dtype=np.uint8).reshape(-1, 64 * eta)
+    else:
+        data = np.asarray(buf, dtype=np.uint8)
+        if data.ndim == 1:
+            data = data[np.newaxis, :]
+    if data.ndim != 2 or data.shape[1] != 64 * eta:
+        raise ValueError(f"Expected an array of shape (m, {64 * eta})")
+    field_bits = 2 * eta
+    group_bytes = math.lcm(8, field_bits) // 8
+    groups = data.reshape(len(data), -1, group_bytes).astype(np.uint32)
+    words = np.zeros(groups.shape[:2], dtype=np.uint32)
+    for byte in range(group_bytes):
+        words |= groups[:, :, byte] << np.uint32(8 * byte)
+    shifts = np.arange(0, 8 * group_bytes, field_bits, dtype=np.uint32)
+    fields = (words[:, :, np.newaxis] >> shifts) & np.uint32((1 << field_bits) - 1)
+    return _cbd_table(eta)[fields].reshape(len(data), KYBER_N)
 
 
 def uniform(bytes_in: bytes, bound: int) -> List[int]:
@@ -60,3 +109,26 @@ def decompress(values: Iterable[int], d: int) -> List[int]:
 
 def compress(values: Iterable[int], d: int) -> List[int]:
     return [((v << d) + (1 << 12)) >> 13 for v in values]
+
+
+def self_check(count: int = 32, seed: int = 0) -> None:
+    """Compare cbd and cbd_many with the FIPS 203 golden ``samplePolyCBD`` for every eta."""
+    fips = fips203.load().auxiliary_function
+    rng = random.Random(seed)
+    for eta in CBD_ETAS:
+        length = 64 * eta
+        batch = [bytes(length), b"\xff" * length]
+        batch += [bytes(rng.randrange(256) for _ in range(length)) for _ in range(count)]
+        expected = [list(fips.samplePolyCBD(buf, eta).cs) for buf in batch]
+        for buf, want in zip(batch, expected):
+            if cbd(buf, eta) != want:
+                raise AssertionError(f"cbd() disagrees with FIPS 203 SamplePolyCBD for eta={eta}")
+        if np is not None:
+            rows = np.frombuffer(b"".join(batch), dtype=np.uint8).reshape(len(batch), length)
+            if cbd_many(rows, eta).tolist() != expected:
+                raise AssertionError(f"cbd_many() disagrees with FIPS 203 SamplePolyCBD for eta={eta}")
+
+
+if __name__ == "__main__":
+    self_check()
+    print("[PASS] sample_golden CBD matches the FIPS 203 golden model")
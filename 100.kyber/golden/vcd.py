@@ -0,0 +1,412 @@
+"""Streaming VCD (IEEE 1364 value change dump) reader.
+
+Dumps from long Icarus/ModelSim runs reach gigabytes, so the reader never
+holds the file in memory: it tokenises fixed-size chunks, parses the header
+(scopes, ``$var`` declarations, timescale) and then yields the body one
+timestamp block at a time, optionally filtered to a set of identifier codes.
+
+Values are kept as the raw VCD bytes (``b"1"``, ``b"0101"``, ``b"x"``);
+``to_int`` converts them, returning ``None`` for values with x/z bits.
+
+``SignalIndex.build`` uses the same single pass to record, for each selected
+signal, sorted change-time and value arrays (saved/loaded as ``.npz``).  The
+index answers point queries (value of X at T), clock-edge sampling, ready/valid
+handshake events and extraction of data words on an output bus::
+
+    python -m golden.vcd index  ntt_tb.vcd --signal 'ntt_tb.dut.*' --out ntt_tb.npz
+    python -m golden.vcd value  ntt_tb.npz ntt_tb.dut.done 12345
+    python -m golden.vcd stream ntt_tb.vcd --data dout --valid dout_valid --lane-bits 16 --out ntt_hw.hex
+"""
+from __future__ import annotations
+
+import argparse
+import fnmatch
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+CHUNK_BYTES = 1 << 20
+UNKNOWN = -1  # indexed value of a signal holding x/z bits (narrow signals)
+NARROW_BITS = 63  # wider signals are indexed as Python ints in object arrays
+_SCALAR_VALUES = frozenset(b"01xzXZ")
+_VECTOR_PREFIXES = frozenset(b"bBrR")
+_TIME_UNITS = {b"s": 1.0, b"ms": 1e-3, b"us": 1e-6, b"ns": 1e-9, b"ps": 1e-12, b"fs": 1e-15}
+
+Block = Tuple[int, List[Tuple[bytes, bytes]]]  # (time, [(code, value), ...])
+
+
+@dataclass
+class VcdVar:
+    code: bytes
+    name: str  # full hierarchical name, e.g. ``tb.dut.s_axis_ct_tvalid``
+    width: int
+    kind: str
+
+    @property
+    def leaf(self) -> str:
+        return self.name.rsplit(".", 1)[-1]
+
+    @property
+    def scope(self) -> str:
+        return self.name.rsplit(".", 1)[0] if "." in self.name else ""
+
+    @property
+    def depth(self) -> int:
+        return self.name.count(".")
+
+
+@dataclass
+class VcdHeader:
+    timescale: float = 1e-9  # seconds per time unit
+    vars: Dict[str, VcdVar] = field(default_factory=dict)  # by full name
+
+    def find(self, pattern: str) -> List[VcdVar]:
+        """Variables whose full name (or leaf name, for dot-free patterns) matches ``pattern``."""
+        key = (lambda var: var.name) if "." in pattern else (lambda var: var.leaf)
+        return sorted(
+            (var for var in self.vars.values() if fnmatch.fnmatchcase(key(var), pattern)),
+            key=lambda var: (var.depth, var.name),
+        )
+
+    def resolve(self, pattern: str) -> VcdVar:
+        """The unique shallowest match of ``pattern``; ``KeyError`` if none or ambiguous."""
+        matches = self.find(pattern)
+        if not matches:
+            raise KeyError(f"No VCD signal matches {pattern!r}")
+        if len(matches) > 1 and matches[1].depth == matches[0].depth:
+            names = ", ".join(var.name for var in matches[:4])
+            raise KeyError(f"Signal pattern {pattern!r} is ambiguous: {names}")
+        return matches[0]
+
+
+def to_int(value: bytes) -> Optional[int]:
+    """Integer value of a VCD scalar/vector, ``None`` if any bit is x/z."""
+    try:
+        return int(value, 2)
+    except ValueError:
+        return None
+
+
+def _tokens(handle: BinaryIO, chunk_bytes: int) -> Iterator[bytes]:
+    tail = b""
+    while True:
+        chunk = handle.read(chunk_bytes)
+        if not chunk:
+            break
+        data = tail + chunk
+        # Only split up to the last whitespace so no token straddles two chunks.
+        cut = max(data.rfind(b" "), data.rfind(b"\n"), data.rfind(b"\t"), data.rfind(b"\r"))
+        if cut < 0:
+            tail = data
+            continue
+        tail = data[cut + 1 :]
+        yield from data[:cut].split()
+    yield from tail.split()
+
+
+def _until_end(tokens: Iterator[bytes]) -> List[bytes]:
+    body = []
+    for token in tokens:
+        if token == b"$end":
+            break
+        body.append(token)
+    return body
+
+
+def _parse_timescale(words: List[bytes]) -> float:
+    text = b"".join(words)
+    digits = text.rstrip(b"abcdefghijklmnopqrstuvwxyz")
+    return float(digits or b"1") * _TIME_UNITS[text[len(digits) :]]
+
+
+def _parse_header(tokens: Iterator[bytes]) -> VcdHeader:
+    header = VcdHeader()
+    scope: List[str] = []
+    for token in tokens:
+        if token == b"$enddefinitions":
+            _until_end(tokens)
+            break
+        if token == b"$scope":
+            scope.append(_until_end(tokens)[-1].decode())
+        elif token == b"$upscope":
+            _until_end(tokens)
+            scope.pop()
+        elif token == b"$var":
+            words = _until_end(tokens)
+            kind, width, code, ref = words[0].decode(), int(words[1]), words[2], words[3].decode()
+            name = ".".join(scope + [ref])
+            header.vars[name] = VcdVar(code, name, width, kind)
+        elif token == b"$timescale":
+            header.timescale = _parse_timescale(_until_end(tokens))
+        elif token.startswith(b"$"):
+            _until_end(tokens)  # $date, $version, $comment
+    return header
+
+
+class VcdReader:
+    """Header plus a one-pass iterator over the value changes of a VCD file."""
+
+    def __init__(self, path: Union[str, Path], chunk_bytes: int = CHUNK_BYTES) -> None:
+        self.path = Path(path)
+        self._handle: Optional[BinaryIO] = self.path.open("rb")
+        self._tokens = _tokens(self._handle, chunk_bytes)
+        self.header = _parse_header(self._tokens)
+        self._consumed = False
+
+    def blocks(self, codes: Optional[Iterable[bytes]] = None) -> Iterator[Block]:
+        """Yield ``(time, changes)`` per timestamp, keeping only ``codes`` if given.
+
+        The body can be iterated once; open a new reader for another pass.
+        """
+        if self._consumed:
+            raise RuntimeError("VCD body already consumed; open a new VcdReader")
+        self._consumed = True
+        wanted = None if codes is None else frozenset(codes)
+        tokens = self._tokens
+        time = 0
+        changes: List[Tuple[bytes, bytes]] = []
+        for token in tokens:
+            lead = token[0]
+            if lead == 0x23:  # '#'
+                if changes:
+                    yield time, changes
+                    changes = []
+                time = int(token[1:])
+                continue
+            if lead in _SCALAR_VALUES:
+                code, value = token[1:], token[:1]
+            elif lead in _VECTOR_PREFIXES:
+                code, value = next(tokens), token[1:]
+            elif token == b"$comment":
+                _until_end(tokens)
+                continue
+            else:
+                continue  # $dumpvars / $dumpall / $dumpon / $dumpoff / $end
+            if wanted is None or code in wanted:
+                changes.append((code, value))
+        if changes:
+            yield time, changes
+        self.close()
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def __enter__(self) -> "VcdReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+# ---------------------------------------------------------------------------
+# Signal-change index
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class SignalTrace:
+    """Change history of one signal: ``values[i]`` holds from ``times[i]`` on."""
+
+    var: VcdVar
+    times: np.ndarray  # int64, non-decreasing
+    values: np.ndarray  # int64 (UNKNOWN for x/z) or object (int / None) for wide signals
+
+    def _index(self, times, before: bool) -> np.ndarray:
+        return np.searchsorted(self.times, times, side="left" if before else "right") - 1
+
+    def value_at(self, time: int, before: bool = False) -> Optional[int]:
+        """Value at ``time`` (``before=True``: just before changes at ``time``); None if unknown."""
+        index = int(self._index(time, before))
+        if index < 0:
+            return None
+        value = self.values[index]
+        if value is None or (self.values.dtype != object and value == UNKNOWN):
+            return None
+        return int(value)
+
+    def sample(self, times, before: bool = True) -> np.ndarray:
+        """Values at each of ``times`` (UNKNOWN / None before the first change)."""
+        index = self._index(np.asarray(times, dtype=np.int64), before)
+        fill = None if self.values.dtype == object else UNKNOWN
+        out = self.values[np.clip(index, 0, None)] if len(self.values) else np.full(len(index), fill)
+        out = np.array(out, dtype=self.values.dtype)
+        out[index < 0] = fill
+        return out
+
+    def rising_edges(self) -> np.ndarray:
+        """Times at which the signal goes from 0 to 1."""
+        high = self.values == 1
+        return self.times[1:][high[1:] & (self.values[:-1] == 0)]
+
+
+class SignalIndex:
+    """Per-signal change arrays for a VCD, built in one streaming pass."""
+
+    def __init__(self, header: VcdHeader, traces: Dict[bytes, SignalTrace], end_time: int) -> None:
+        self.header = header
+        self._traces = traces  # by identifier code
+        self.end_time = end_time
+
+    @classmethod
+    def build(
+        cls, path: Union[str, Path], signals: Optional[Sequence[str]] = None, chunk_bytes: int = CHUNK_BYTES
+    ) -> "SignalIndex":
+        """Index ``signals`` (patterns as in ``VcdHeader.find``; default all)."""
+        reader = VcdReader(path, chunk_bytes)
+        header = reader.header
+        if signals is None:
+            selected = list(header.vars.values())
+        else:
+            selected = [var for pattern in signals for var in header.find(pattern)]
+            if not selected:
+                raise KeyError(f"No VCD signal matches {list(signals)}")
+        by_code = {var.code: var for var in selected}
+        times: Dict[bytes, List[int]] = {code: [] for code in by_code}
+        values: Dict[bytes, List[bytes]] = {code: [] for code in by_code}
+        end_time = 0
+        for time, changes in reader.blocks(by_code):
+            end_time = time
+            for code, value in changes:
+                times[code].append(time)
+                values[code].append(value)
+        traces = {code: _make_trace(var, times[code], values[code]) for code, var in by_code.items()}
+        return cls(header, traces, end_time)
+
+    def __len__(self) -> int:
+        return len(self._traces)
+
+    def trace(self, pattern: str) -> SignalTrace:
+        var = self.header.resolve(pattern) if pattern not in self.header.vars else self.header.vars[pattern]
+        if var.code not in self._traces:
+            raise KeyError(f"Signal {var.name} was not indexed")
+        trace = self._traces[var.code]
+        return trace if trace.var is var else SignalTrace(var, trace.times, trace.values)
+
+    def value_at(self, signal: str, time: int) -> Optional[int]:
+        return self.trace(signal).value_at(time)
+
+    def clock_edges(self, clock: str = "clk") -> np.ndarray:
+        return self.trace(clock).rising_edges()
+
+    def handshakes(self, valid: str, ready: Optional[str] = None, clock: str = "clk") -> np.ndarray:
+        """Rising clock edges at which ``valid`` (and ``ready``, if given) were high."""
+        edges = self.clock_edges(clock)
+        fire = self.trace(valid).sample(edges) == 1
+        if ready is not None:
+            fire &= self.trace(ready).sample(edges) == 1
+        return edges[fire]
+
+    def bus_stream(
+        self,
+        data: str,
+        valid: str,
+        ready: Optional[str] = None,
+        clock: str = "clk",
+        lane_bits: Optional[int] = None,
+        lanes: Optional[int] = None,
+    ) -> np.ndarray:
+        """Words on ``data`` at each handshake, as ``(beats, lanes)`` for ``golden.compare``."""
+        trace = self.trace(data)
+        words = trace.sample(self.handshakes(valid, ready, clock))
+        if lane_bits is None:
+            return np.array([UNKNOWN if word is None else word for word in words], dtype=np.int64)[:, np.newaxis]
+        lanes = lanes or -(-trace.var.width // lane_bits)
+        mask = (1 << lane_bits) - 1
+        split = [
+            [UNKNOWN] * lanes if word is None or word == UNKNOWN else [(int(word) >> (i * lane_bits)) & mask for i in range(lanes)]
+            for word in words
+        ]
+        return np.array(split, dtype=np.int64).reshape(len(split), lanes)
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Write the index (header and arrays) as ``.npz``."""
+        arrays = {}
+        names = []
+        for index, (code, trace) in enumerate(self._traces.items()):
+            arrays[f"t{index}"] = trace.times
+            arrays[f"v{index}"] = trace.values
+            names.append([code.decode("latin-1"), trace.var.name, trace.var.width, trace.var.kind])
+        aliases = [[var.code.decode("latin-1"), var.name, var.width, var.kind] for var in self.header.vars.values()]
+        np.savez_compressed(
+            path,
+            meta=np.array([self.header.timescale, self.end_time], dtype=np.float64),
+            traces=np.array(names, dtype=object),
+            vars=np.array(aliases, dtype=object),
+            **arrays,
+        )
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "SignalIndex":
+        with np.load(path, allow_pickle=True) as data:
+            timescale, end_time = data["meta"]
+            header = VcdHeader(timescale=float(timescale))
+            for code, name, width, kind in data["vars"]:
+                header.vars[name] = VcdVar(code.encode("latin-1"), name, int(width), kind)
+            traces = {}
+            for index, (code, name, width, kind) in enumerate(data["traces"]):
+                var = header.vars[name]
+                traces[var.code] = SignalTrace(var, data[f"t{index}"], data[f"v{index}"])
+        return cls(header, traces, int(end_time))
+
+
+def _make_trace(var: VcdVar, times: List[int], raw: List[bytes]) -> SignalTrace:
+    if var.width > NARROW_BITS:
+        values = np.array([to_int(value) for value in raw], dtype=object)
+    else:
+        values = np.array([UNKNOWN if (v := to_int(value)) is None else v for value in raw], dtype=np.int64)
+    return SignalTrace(var, np.array(times, dtype=np.int64), values)
+
+
+def open_index(path: Union[str, Path], signals: Optional[Sequence[str]] = None) -> SignalIndex:
+    """Load a saved ``.npz`` index or build one from a ``.vcd`` file."""
+    path = Path(path)
+    return SignalIndex.load(path) if path.suffix == ".npz" else SignalIndex.build(path, signals)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    index = sub.add_parser("index", help="build and save a signal-change index")
+    index.add_argument("vcd", type=Path)
+    index.add_argument("--signal", action="append", help="signal pattern to index (default: all)")
+    index.add_argument("--out", type=Path, required=True)
+    value = sub.add_parser("value", help="value of a signal at a time")
+    value.add_argument("source", type=Path, help=".vcd or saved .npz index")
+    value.add_argument("signal")
+    value.add_argument("time", type=int)
+    stream = sub.add_parser("stream", help="extract handshaked bus words as $readmemh hex")
+    stream.add_argument("source", type=Path)
+    stream.add_argument("--clock", default="clk")
+    stream.add_argument("--data", required=True)
+    stream.add_argument("--valid", required=True)
+    stream.add_argument("--ready")
+    stream.add_argument("--lane-bits", type=int)
+    stream.add_argument("--lanes", type=int)
+    stream.add_argument("--out", type=Path, required=True)
+    args = parser.parse_args(argv)
+
+    if args.command == "index":
+        built = SignalIndex.build(args.vcd, args.signal)
+        built.save(args.out)
+        print(f"[INFO] indexed {len(built)} signals up to t={built.end_time} -> {args.out}")
+    elif args.command == "value":
+        result = open_index(args.source, [args.signal]).value_at(args.signal, args.time)
+        print("x" if result is None else f"0x{result:x} ({result})")
+    else:
+        patterns = [args.clock, args.data, args.valid] + ([args.ready] if args.ready else [])
+        words = open_index(args.source, patterns).bus_stream(
+            args.data, args.valid, args.ready, args.clock, args.lane_bits, args.lanes
+        )
+        digits = args.lane_bits // 4 if args.lane_bits else None
+        with args.out.open("w") as handle:
+            for row in words:
+                handle.write(" ".join("x" if w == UNKNOWN else (f"{w:0{digits}x}" if digits else f"{w:x}") for w in row) + "\n")
+        print(f"[INFO] {len(words)} beats -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+"""Memory-mapped binary vector container (``.kvec``).
+
+Simulator stimulus and golden dumps are exchanged as text across the repo
+(one hex word per line for ``$readmemh``, decimal coefficients in
+``test/*.txt``).  ``.kvec`` stores the same words in binary with an offset
+index so any vector can be read zero-copy through ``mmap`` / ``numpy.memmap``.
+
+Layout (all integers little-endian)::
+
+    header  128 bytes   magic "KVEC", version, flags, word_bits, record_words,
+                        count, data_offset, index_offset, module[16], params[16]
+                        (zero padded)
+    data     records back to back, words stored little-endian
+    index    (count + 1) x uint64 byte offsets of each record relative to data
+
+``record_words == 0`` marks variable-length records (the index then gives each
+record's extent); otherwise records have a fixed stride.  Words wider than 64
+bits (e.g. the 128-bit packed NTT words) are stored as ``word_bits / 8`` bytes.
+
+CLI (from ``100.kyber``)::
+
+    python -m golden.vecfile pack  --from hex ntt_input.hex ntt_input.kvec --word-bits 128 --record-words 32
+    python -m golden.vecfile unpack ntt_input.kvec out.hex --to hex
+    python -m golden.vecfile info  ntt_input.kvec
+"""
+from __future__ import annotations
+
+import argparse
+import mmap
+import struct
+from pathlib import Path
+from typing import BinaryIO, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+MAGIC = b"KVEC"
+VERSION = 1
+HEADER_BYTES = 128
+FLAG_SIGNED = 0x1
+_HEADER = struct.Struct("<4sHHHHIQQQ16s16s")
+
+WORD_DTYPES = {8: "u1", 16: "u2", 32: "u4", 64: "u8"}
+
+
+def _name_field(text: str) -> bytes:
+    raw = text.encode("ascii")
+    if len(raw) > 16:
+        raise ValueError(f"Name {text!r} longer than 16 bytes")
+    return raw.ljust(16, b"\0")
+
+
+def word_dtype(word_bits: int, signed: bool = False) -> np.dtype:
+    """NumPy dtype of one stored word; wide words are raw little-endian bytes."""
+    if word_bits in WORD_DTYPES:
+        code = WORD_DTYPES[word_bits]
+        return np.dtype("<" + (code.replace("u", "i") if signed else code))
+    if word_bits % 8 or word_bits < 8:
+        raise ValueError("word_bits must be a multiple of 8")
+    if signed:
+        raise ValueError("Signed storage is only supported up to 64-bit words")
+    return np.dtype((np.uint8, word_bits // 8))
+
+
+class VectorFileWriter:
+    """Streams records into a ``.kvec`` file; the index is written on close."""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        *,
+        module: str,
+        word_bits: int,
+        record_words: Optional[int] = None,
+        params: str = "",
+        signed: bool = False,
+    ) -> None:
+        self.path = Path(path)
+        self.module = module
+        self.params = params
+        self.word_bits = word_bits
+        self.record_words = record_words or 0
+        self.signed = signed
+        self.dtype = word_dtype(word_bits, signed)
+        self._offsets: List[int] = [0]
+        self._handle: Optional[BinaryIO] = self.path.open("wb")
+        self._handle.write(b"\0" * HEADER_BYTES)
+
+    def append(self, record: Union[Sequence[int], np.ndarray]) -> None:
+        """Append one record (a sequence of words)."""
+        data = self._encode(record)
+        if self.record_words and len(data) != self.record_words * self.dtype.itemsize:
+            raise ValueError(f"Record must hold {self.record_words} words")
+        self._handle.write(data)
+        self._offsets.append(self._offsets[-1] + len(data))
+
+    def extend(self, records: np.ndarray) -> None:
+        """Append a ``(count, record_words)`` block of fixed-stride records in one write."""
+        if not self.record_words:
+            for record in records:
+                self.append(record)
+            return
+        base_dtype = self.dtype.base if self.dtype.subdtype is not None else self.dtype
+        block = np.ascontiguousarray(records, dtype=base_dtype)
+        if block.shape != (len(block), self.record_words) + self.dtype.shape:
+            raise ValueError(f"Records must have shape (count, {self.record_words})")
+        self._handle.write(block.tobytes())
+        stride = self.record_words * self.dtype.itemsize
+        base = self._offsets[-1]
+        self._offsets.extend(base + stride * (i + 1) for i in range(len(block)))
+
+    def _encode(self, record: Union[Sequence[int], np.ndarray]) -> bytes:
+        if self.dtype.subdtype is None:
+            return np.asarray(record, dtype=self.dtype).tobytes()
+        width = self.word_bits // 8
+        return b"".join(int(word).to_bytes(width, "little") for word in record)
+
+    def close(self) -> None:
+        if self._handle is None:
+            return
+        data_bytes = self._offsets[-1]
+        index_offset = HEADER_BYTES + data_bytes
+        self._handle.write(np.asarray(self._offsets, dtype="<u8").tobytes())
+        header = _HEADER.pack(
+            MAGIC,
+            VERSION,
+            FLAG_SIGNED if self.signed else 0,
+            self.word_bits,
+            0,
+            self.record_words,
+            len(self._offsets) - 1,
+            HEADER_BYTES,
+            index_offset,
+            _name_field(self.module),
+            _name_field(self.params),
+        )
+        self._handle.seek(0)
+        self._handle.write(header)
+        self._handle.close()
+        self._handle = None
+
+    def __enter__(self) -> "VectorFileWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class VectorFile:
+    """Read-only, zero-copy view of a ``.kvec`` file."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        self._file = self.path.open("rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        fields = _HEADER.unpack_from(self._mmap, 0)
+        magic, version, flags, self.word_bits, _, self.record_words, self.count, data_offset, index_offset = fields[:9]
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a KVEC v{VERSION} file")
+        self.module = fields[9].rstrip(b"\0").decode("ascii")
+        self.params = fields[10].rstrip(b"\0").decode("ascii")
+        self.signed = bool(flags & FLAG_SIGNED)
+        self.dtype = word_dtype(self.word_bits, self.signed)
+        self.data_offset = data_offset
+        self.index = np.frombuffer(self._mmap, dtype="<u8", count=self.count + 1, offset=index_offset)
+        self._array: Optional[np.memmap] = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def array(self) -> np.memmap:
+        """Fixed-stride records as a ``(count, record_words)`` memmap."""
+        if not self.record_words:
+            raise ValueError("Variable-length records have no 2-D view; index records individually")
+        if self._array is None:
+            self._array = np.memmap(
+                self.path, dtype=self.dtype, mode="r", offset=self.data_offset, shape=(self.count, self.record_words)
+            )
+        return self._array
+
+    def __getitem__(self, index: int) -> np.ndarray:
+        """Record ``index`` as a read-only array view into the mapped file."""
+        if not -self.count <= index < self.count:
+            raise IndexError(index)
+        index %= self.count
+        start, stop = int(self.index[index]), int(self.index[index + 1])
+        words = (stop - start) // self.dtype.itemsize
+        return np.frombuffer(self._mmap, dtype=self.dtype, count=words, offset=self.data_offset + start)
+
+    def record_ints(self, index: int) -> List[int]:
+        """Record ``index`` as Python ints (also for words wider than 64 bits)."""
+        record = self[index]
+        if self.dtype.subdtype is None:
+            return record.tolist()
+        return [int.from_bytes(word.tobytes(), "little") for word in record]
+
+    def words(self) -> np.ndarray:
+        """All words of all records as one flat view."""
+        total = int(self.index[-1]) // self.dtype.itemsize
+        return np.frombuffer(self._mmap, dtype=self.dtype, count=total, offset=self.data_offset)
+
+    def close(self) -> None:
+        self._array = None
+        self.index = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Record views handed out by __getitem__ still reference the mapping;
+            # it is released once they are garbage collected.
+            pass
+        self._file.close()
+
+    def __enter__(self) -> "VectorFile":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+# ---------------------------------------------------------------------------
+# Text converters
+# ---------------------------------------------------------------------------
+
+
+_HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+_HEX_VALUE = np.full(256, 0xFF, dtype=np.uint8)
+_HEX_VALUE[np.frombuffer(b"0123456789abcdef", dtype=np.uint8)] = np.arange(16)
+_HEX_VALUE[np.frombuffer(b"ABCDEF", dtype=np.uint8)] = np.arange(10, 16)
+
+
+def _fixed_width_hex(data: bytes, width: int) -> Optional[np.ndarray]:
+    """Decode a file of fixed-width hex lines entirely in NumPy; None if irregular."""
+    digits = 2 * width
+    if not data.endswith(b"\n"):
+        data += b"\n"
+    for eol in (b"\n", b"\r\n"):
+        stride = digits + len(eol)
+        if len(data) % stride:
+            continue
+        rows = np.frombuffer(data, dtype=np.uint8).reshape(-1, stride)
+        if not (rows[:, digits:] == np.frombuffer(eol, dtype=np.uint8)).all():
+            continue
+        nibbles = _HEX_VALUE[rows[:, :digits]]
+        if (nibbles == 0xFF).any():
+            return None
+        big_endian = (nibbles[:, 0::2] << 4) | nibbles[:, 1::2]
+        return np.ascontiguousarray(big_endian[:, ::-1])
+    return None
+
+
+def _hex_lines(path: Path) -> List[bytes]:
+    lines = []
+    for line in path.read_bytes().splitlines():
+        line = line.split(b"//", 1)[0].strip()
+        if not line:
+            continue
+        if line.startswith(b"@"):
+            raise ValueError(f"{path}: $readmemh address directives are not supported")
+        if line.startswith((b"0x", b"0X")):
+            line = line[2:]
+        lines.append(line)
+    return lines
+
+
+def read_hex_words(path: Union[str, Path], word_bits: int) -> np.ndarray:
+    """Parse a one-word-per-line ``$readmemh`` file into stored-word layout."""
+    path = Path(path)
+    width = word_bits // 8
+    # Fast path: fixed-width lines as written by $writememh / write_hex_words.
+    raw = _fixed_width_hex(path.read_bytes(), width)
+    if raw is None:
+        lines = _hex_lines(path)
+        raw = np.frombuffer(
+            b"".join(int(line, 16).to_bytes(width, "little") for line in lines), dtype=np.uint8
+        ).reshape(-1, width)
+    if word_dtype(word_bits).subdtype is not None:
+        return raw  # (words, word_bits / 8) little-endian bytes
+    return raw.view(word_dtype(word_bits)).reshape(len(raw))
+
+
+def write_hex_words(path: Union[str, Path], words: np.ndarray, word_bits: int) -> None:
+    """Write words one per line as fixed-width hex (two's complement for signed words)."""
+    width = word_bits // 8
+    raw = np.ascontiguousarray(words).view(np.uint8).reshape(-1, width)[:, ::-1]
+    text = np.empty((len(raw), 2 * width + 1), dtype=np.uint8)
+    text[:, 0:-1:2] = _HEX_DIGITS[raw >> 4]
+    text[:, 1:-1:2] = _HEX_DIGITS[raw & 0xF]
+    text[:, -1] = ord("\n")
+    Path(path).write_bytes(text.tobytes())
+
+
+def read_txt_words(path: Union[str, Path], word_bits: int, signed: bool = True) -> np.ndarray:
+    """Parse one decimal value per line (e.g. ``test/*.txt`` coefficient dumps).
+
+    Raises ``ValueError`` for values that do not fit (e.g. negatives with ``signed=False``).
+    """
+    values = np.array(Path(path).read_text().split(), dtype=np.int64)
+    dtype = word_dtype(word_bits, signed)
+    info = np.iinfo(dtype)
+    if len(values) and (values.min() < info.min or values.max() > info.max):
+        kind = "signed" if signed else "unsigned"
+        raise ValueError(f"{path}: values outside the {kind} {word_bits}-bit range [{info.min}, {info.max}]")
+    return values.astype(dtype)
+
+
+def write_txt_words(path: Union[str, Path], words: np.ndarray) -> None:
+    Path(path).write_text("".join(f"{value}\n" for value in np.asarray(words).tolist()))
+
+
+def pack(
+    src: Union[str, Path],
+    dst: Union[str, Path],
+    *,
+    fmt: str,
+    word_bits: int,
+    record_words: Optional[int] = None,
+    module: str = "",
+    params: str = "",
+    signed: bool = False,
+) -> int:
+    """Convert a ``.hex`` / ``.txt`` file to ``.kvec``; returns the record count."""
+    if fmt == "hex":
+        words = read_hex_words(src, word_bits)
+        if signed:
+            words = words.view(word_dtype(word_bits, True))
+    elif fmt == "txt":
+        words = read_txt_words(src, word_bits, signed)
+    else:
+        raise ValueError(f"Unknown text format {fmt!r}")
+    per_record = record_words or len(words)
+    if len(words) % per_record:
+        raise ValueError(f"{src}: {len(words)} words is not a multiple of record_words={per_record}")
+    with VectorFileWriter(
+        dst, module=module or Path(src).stem[:16], word_bits=word_bits, record_words=per_record,
+        params=params, signed=signed,
+    ) as writer:
+        writer.extend(words.reshape(len(words) // per_record, per_record, *words.shape[1:]))
+    return len(words) // per_record
+
+
+def unpack(src: Union[str, Path], dst: Union[str, Path], *, fmt: str) -> None:
+    """Convert a ``.kvec`` file back to one-word-per-line ``.hex`` or ``.txt``."""
+    with VectorFile(src) as vf:
+        if fmt == "hex":
+            write_hex_words(dst, vf.words(), vf.word_bits)
+        elif fmt == "txt":
+            if vf.dtype.subdtype is not None:
+                raise ValueError("Decimal output is only supported up to 64-bit words")
+            write_txt_words(dst, vf.words())
+        else:
+            raise ValueError(f"Unknown text format {fmt!r}")
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="KVEC binary vector container tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_pack = sub.add_parser("pack", help="Convert .hex/.txt to .kvec")
+    p_pack.add_argument("src", type=Path)
+    p_pack.add_argument("dst", type=Path)
+    p_pack.add_argument("--from", dest="fmt", choices=("hex", "txt"), required=True)
+    p_pack.add_argument("--word-bits", type=int, default=16)
+    p_pack.add_argument("--record-words", type=int, help="Words per record (default: whole file)")
+    p_pack.add_argument("--module", default="")
+    p_pack.add_argument("--params", default="")
+    p_pack.add_argument(
+        "--signed", action=argparse.BooleanOptionalAction, default=None,
+        help="Two's complement words (default: signed for --from txt, unsigned for --from hex)",
+    )
+    p_unpack = sub.add_parser("unpack", help="Convert .kvec to .hex/.txt")
+    p_unpack.add_argument("src", type=Path)
+    p_unpack.add_argument("dst", type=Path)
+    p_unpack.add_argument("--to", dest="fmt", choices=("hex", "txt"), required=True)
+    p_info = sub.add_parser("info", help="Print header fields")
+    p_info.add_argument("src", type=Path)
+    args = parser.parse_args(argv)
+
+    if args.command == "pack":
+        count = pack(
+            args.src, args.dst, fmt=args.fmt, word_bits=args.word_bits, record_words=args.record_words,
+            module=args.module, params=args.params,
+            signed=args.fmt == "txt" if args.signed is None else args.signed,
+        )
+        print(f"[INFO] {args.src} -> {args.dst} ({count} records)")
+    elif args.command == "unpack":
+        unpack(args.src, args.dst, fmt=args.fmt)
+        print(f"[INFO] {args.src} -> {args.dst}")
+    else:
+        with VectorFile(args.src) as vf:
+            print(
+                f"module={vf.module} params={vf.params} count={vf.count} word_bits={vf.word_bits} "
+                f"record_words={vf.record_words or 'variable'} signed={vf.signed}"
+            )
+
+
+if __name__ == "__main__":
+    main()
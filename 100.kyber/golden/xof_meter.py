@@ -0,0 +1,401 @@
+"""Keccak usage meter for the FIPS 203 / FIPS 204 golden models.
+
+``HashMeter.instrument`` swaps the ``SHAKE128`` / ``SHAKE256`` / ``hashlib``
+names inside a model's ``auxiliary_function`` module for metered stand-ins,
+so every ``XOF``/``PRF``/``J``/``G``/``H``/``KDF`` (ML-KEM) and
+``G``/``H`` (ML-DSA) context is recorded without touching the model: the
+function that created it, its caller (mapped to the sampler block it feeds,
+see ``SAMPLERS``), the bytes absorbed and squeezed and hence the number of
+Keccak-f[1600] calls.  ``HashMeter.operation`` labels the calls made inside
+it (KeyGen, Encaps, ...).
+
+From the per-operation averages, ``core_requirement`` gives the
+permutations per clock cycle an operation rate needs and how many Keccak
+cores (at a given rounds per cycle) provide them, and ``sampler_demand``
+the bytes and permutations per cycle each sampler pulls at a given
+coefficient rate::
+
+    python -m golden.xof_meter --scheme ml-kem --level 768 --ops-per-second 100000 --clock-mhz 200
+    python -m golden.xof_meter --scheme ml-dsa --level 65 --runs 5 --json dsa_hash.json
+    python -m golden.xof_meter --self-check
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import sys
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from . import fips203, fips204, keccak
+
+RATES = {**keccak.RATES, "sha3_256": 136, "sha3_512": 72}
+DIGEST_BYTES = {"sha3_256": 32, "sha3_512": 64}
+POLY_COEFFS = 256
+PERMUTE_OVERHEAD = 2  # shake_core.v: permute_start and the WAIT_PERM capture cycle
+
+# Caller of the hash function -> hardware block consuming its output.
+SAMPLERS = {
+    "sampleMatrix": "uniform",  # ML-KEM XOF -> SampleNTT
+    "sampleNoise": "cbd",  # ML-KEM PRF -> SamplePolyCBD
+    "RejNTTPoly": "uniform",  # ML-DSA ExpandA
+    "RejBoundedPoly": "reject",  # ML-DSA ExpandS
+    "ExpandMask": "mask",
+    "SampleInBall": "ball",
+}
+# Samplers that do not fill a whole polynomial: coefficients drawn, counted from the result.
+DRAWN = {"SampleInBall": lambda poly: sum(1 for coeff in poly.cs if coeff)}  # tau nonzero coefficients
+KEM_LEVELS = {512: 2, 768: 3, 1024: 4}
+
+
+@dataclass
+class HashCall:
+    operation: str
+    function: str  # XOF, PRF, G, ...
+    caller: str
+    mode: str
+    absorbed: int = 0
+    squeezed: int = 0
+    coefficients: int = POLY_COEFFS  # drawn by the sampler from this context
+
+    @property
+    def sampler(self) -> str:
+        return SAMPLERS.get(self.caller, "hash")
+
+    @property
+    def permutations(self) -> int:
+        """Absorb blocks (the last one holds the padding) plus every squeeze block after the first."""
+        rate = RATES[self.mode]
+        return self.absorbed // rate + 1 + max(-(-self.squeezed // rate) - 1, 0)
+
+
+class _MeteredHash:
+    """Wraps a pycryptodome SHAKE or hashlib object and counts the bytes through it."""
+
+    def __init__(self, inner, call: HashCall) -> None:
+        self._inner = inner
+        self._call = call
+
+    def update(self, data):
+        self._call.absorbed += len(data)
+        self._inner.update(data)
+        return self
+
+    def read(self, length):
+        self._call.squeezed += length
+        return self._inner.read(length)
+
+    def digest(self, length=None):
+        if length is None:
+            self._call.squeezed += DIGEST_BYTES[self._call.mode]
+            return self._inner.digest()
+        self._call.squeezed += length
+        return self._inner.digest(length)
+
+    def hexdigest(self, length=None):
+        return self.digest(length).hex()
+
+
+class _ShakeModule:
+    """Stands in for ``Crypto.Hash.SHAKE128`` / ``SHAKE256``."""
+
+    def __init__(self, meter: "HashMeter", mode: str, original) -> None:
+        self._meter, self._mode, self._original = meter, mode, original
+
+    def new(self, data=None):
+        hashed = _MeteredHash(self._original.new(), self._meter._open(self._mode, sys._getframe(1)))
+        return hashed if data is None else hashed.update(data)
+
+
+class _Hashlib:
+    """Stands in for ``hashlib``: SHA-3 / SHAKE constructors are metered, the rest passes through."""
+
+    def __init__(self, meter: "HashMeter") -> None:
+        self._meter = meter
+
+    def _new(self, mode, data, frame):
+        hashed = _MeteredHash(getattr(hashlib, mode.replace("shake", "shake_"))(), self._meter._open(mode, frame))
+        return hashed.update(data) if data else hashed
+
+    def sha3_256(self, data=b""):
+        return self._new("sha3_256", data, sys._getframe(1))
+
+    def sha3_512(self, data=b""):
+        return self._new("sha3_512", data, sys._getframe(1))
+
+    def shake_128(self, data=b""):
+        return self._new("shake128", data, sys._getframe(1))
+
+    def shake_256(self, data=b""):
+        return self._new("shake256", data, sys._getframe(1))
+
+    def __getattr__(self, name):
+        return getattr(hashlib, name)
+
+
+class HashMeter:
+    def __init__(self) -> None:
+        self.calls: List[HashCall] = []
+        self.operations: Counter = Counter()
+        self._operation = "-"
+
+    def _open(self, mode: str, frame) -> HashCall:
+        outer = frame.f_back
+        caller = outer.f_code.co_name if outer is not None else "-"
+        if caller.startswith("<"):
+            # A comprehension or generator expression: name the function it is written in
+            # (a generator's f_back is whoever resumes it, e.g. Vec.__init__).
+            caller = getattr(outer.f_code, "co_qualname", caller).split(".<locals>")[0]
+        call = HashCall(self._operation, frame.f_code.co_name, caller, mode)
+        self.calls.append(call)
+        return call
+
+    @contextmanager
+    def operation(self, name: str) -> Iterator[None]:
+        previous, self._operation = self._operation, name
+        self.operations[name] += 1
+        try:
+            yield
+        finally:
+            self._operation = previous
+
+    def _count_drawn(self, name: str, function):
+        count = DRAWN[name]
+
+        def wrapper(*args, **kwargs):
+            first = len(self.calls)
+            result = function(*args, **kwargs)
+            for call in self.calls[first:]:
+                if call.caller == name:
+                    call.coefficients = count(result)
+            return result
+
+        return wrapper
+
+    @contextmanager
+    def instrument(self, module, *importers) -> Iterator["HashMeter"]:
+        """Meter every hash context created by functions of ``module`` while active.
+
+        ``importers`` are modules that ``from module import *`` the ``DRAWN``
+        samplers; their bindings are wrapped too so the coefficient counts see every call.
+        """
+        patches = [(module, "hashlib", _Hashlib(self))] if hasattr(module, "hashlib") else []
+        for name, mode in (("SHAKE128", "shake128"), ("SHAKE256", "shake256")):
+            if hasattr(module, name):
+                patches.append((module, name, _ShakeModule(self, mode, getattr(module, name))))
+        for name in DRAWN:
+            original = getattr(module, name, None)
+            if original is not None:
+                wrapped = self._count_drawn(name, original)
+                patches += [(target, name, wrapped) for target in (module, *importers) if getattr(target, name, None) is original]
+        saved = [(target, name, getattr(target, name)) for target, name, _ in patches]
+        for target, name, value in patches:
+            setattr(target, name, value)
+        try:
+            yield self
+        finally:
+            for target, name, value in saved:
+                setattr(target, name, value)
+
+    def summary(self) -> Dict[str, List[dict]]:
+        """Per operation, one row per (function, caller, mode), averaged over the runs of the operation."""
+        groups: Dict[tuple, Counter] = {}
+        for call in self.calls:
+            key = (call.operation, call.function, call.caller, call.sampler, call.mode)
+            totals = groups.setdefault(key, Counter())
+            totals.update(calls=1, absorbed=call.absorbed, squeezed=call.squeezed, permutations=call.permutations)
+        report: Dict[str, List[dict]] = {}
+        for (operation, function, caller, sampler, mode), totals in groups.items():
+            runs = self.operations.get(operation, 1)
+            row = {"function": function, "caller": caller, "sampler": sampler, "mode": mode}
+            row.update({field: totals[field] / runs for field in ("calls", "absorbed", "squeezed", "permutations")})
+            report.setdefault(operation, []).append(row)
+        return report
+
+    def permutations_per_operation(self) -> Dict[str, float]:
+        totals: Counter = Counter()
+        for call in self.calls:
+            totals[call.operation] += call.permutations
+        return {operation: totals[operation] / runs for operation, runs in self.operations.items()}
+
+
+def cycles_per_permutation(rounds_per_cycle: int = 1, overhead: int = PERMUTE_OVERHEAD) -> int:
+    return -(-keccak.ROUNDS // rounds_per_cycle) + overhead
+
+
+def core_requirement(
+    meter: HashMeter, ops_per_second: float, clock_hz: float, rounds_per_cycle: int = 1, overhead: int = PERMUTE_OVERHEAD
+) -> Dict[str, dict]:
+    """Permutations per cycle each operation needs at ``ops_per_second``, and the Keccak cores that takes."""
+    per_cycle_capacity = 1 / cycles_per_permutation(rounds_per_cycle, overhead)
+    out = {}
+    for operation, perms in meter.permutations_per_operation().items():
+        demand = perms * ops_per_second / clock_hz
+        out[operation] = {
+            "permutations": perms,
+            "permutations_per_cycle": demand,
+            "core_utilisation": demand / per_cycle_capacity,
+            "cores": max(math.ceil(demand / per_cycle_capacity), 1),
+        }
+    return out
+
+
+def sampler_demand(meter: HashMeter, coeffs_per_cycle: float) -> Dict[str, dict]:
+    """Squeezed bytes per coefficient per sampler, and the bytes / permutations per cycle at ``coeffs_per_cycle``.
+
+    Coefficients are those each call actually drew (``HashCall.coefficients``), e.g. tau for SampleInBall.
+    """
+    totals: Dict[tuple, Counter] = {}
+    for call in meter.calls:
+        if call.sampler == "hash":
+            continue
+        entry = totals.setdefault((call.sampler, call.mode), Counter())
+        entry.update(calls=1, squeezed=call.squeezed, permutations=call.permutations, coefficients=call.coefficients)
+    out = {}
+    for (sampler, mode), entry in totals.items():
+        per_coeff = entry["squeezed"] / entry["coefficients"]
+        bytes_per_cycle = per_coeff * coeffs_per_cycle
+        out[f"{sampler}/{mode}"] = {
+            "bytes_per_coeff": per_coeff,
+            "bytes_per_cycle": bytes_per_cycle,
+            "permutations_per_poly": entry["permutations"] / entry["calls"],
+            "permutations_per_cycle": entry["permutations"] / entry["coefficients"] * coeffs_per_cycle,
+        }
+    return out
+
+
+def run_ml_kem(meter: HashMeter, level: int, runs: int, rng: random.Random) -> None:
+    model = fips203.load()
+    params = fips203.params_for(KEM_LEVELS[level])
+    with meter.instrument(model.auxiliary_function):
+        for _ in range(runs):
+            with meter.operation("KeyGen"):
+                ek, dk = model.internal.ML_KEM_KeyGen_internal(rng.randbytes(64), params)
+            with meter.operation("Encaps"):
+                shared, ciphertext = model.internal.ML_KEM_Encaps_internal(ek, rng.randbytes(32), params)
+            with meter.operation("Decaps"):
+                if model.internal.ML_KEM_Decaps_internal(dk, ciphertext, params) != shared:
+                    raise AssertionError("ML-KEM golden model: Decaps disagrees with Encaps")
+
+
+def run_ml_dsa(meter: HashMeter, level: int, runs: int, rng: random.Random) -> None:
+    model = fips204.load()
+    params = fips204.params_for(level)
+    with meter.instrument(model.auxiliary_function, model.internal):
+        for _ in range(runs):
+            message = bytes(2) + rng.randbytes(64)  # pure ML-DSA M' with an empty context
+            with meter.operation("KeyGen"):
+                pk, sk = model.internal.KeyGen_internal(rng.randbytes(32), params)
+            with meter.operation("Sign"):
+                signature = model.internal.Sign_internal(sk, message, rng.randbytes(32), params)
+            with meter.operation("Verify"):
+                if not model.internal.Verify_internal(pk, message, signature, params):
+                    raise AssertionError("ML-DSA golden model: signature does not verify")
+
+
+SCHEMES = {"ml-kem": (run_ml_kem, 768), "ml-dsa": (run_ml_dsa, 65)}
+
+
+def self_check(seed: int = 0) -> None:
+    """Metered Decaps (including implicit rejection) and KDF, and SampleInBall coefficient counts."""
+    rng = random.Random(seed)
+    model = fips203.load()
+    params = fips203.params_for(2)
+    ek, dk = model.internal.ML_KEM_KeyGen_internal(rng.randbytes(64), params)
+    shared, ciphertext = model.internal.ML_KEM_Encaps_internal(ek, rng.randbytes(32), params)
+    tampered = bytes([ciphertext[0] ^ 1]) + ciphertext[1:]
+    meter = HashMeter()
+    with meter.instrument(model.auxiliary_function):
+        with meter.operation("Decaps"):
+            if model.internal.ML_KEM_Decaps_internal(dk, ciphertext, params) != shared:
+                raise AssertionError("Metered Decaps disagrees with Encaps")
+            if model.internal.ML_KEM_Decaps_internal(dk, tampered, params) == shared:
+                raise AssertionError("Metered Decaps accepted a tampered ciphertext")
+        with meter.operation("KDF"):
+            if model.auxiliary_function.KDF(b"kdf") != hashlib.shake_256(b"kdf").digest(32):
+                raise AssertionError("Metered KDF output differs from hashlib")
+    kdf = [call for call in meter.calls if call.function == "KDF"]
+    if len(kdf) != 1 or (kdf[0].mode, kdf[0].squeezed) != ("shake256", 32):
+        raise AssertionError(f"KDF metered as {kdf}")
+    if len([call for call in meter.calls if call.function == "J"]) != 2:
+        raise AssertionError("Decaps J calls not metered")
+
+    dsa = fips204.load()
+    dsa_params = fips204.params_for(44)
+    meter = HashMeter()
+    run_ml_dsa(meter, 44, 1, rng)
+    ball = [call for call in meter.calls if call.caller == "SampleInBall"]
+    if not ball or any(call.coefficients != dsa_params.tau for call in ball):
+        raise AssertionError(f"SampleInBall coefficients {[call.coefficients for call in ball]}, expected tau")
+    if dsa.auxiliary_function.SampleInBall is not dsa.internal.SampleInBall:
+        raise AssertionError("instrument() did not restore SampleInBall")
+
+
+def print_report(meter: HashMeter, requirement: Dict[str, dict], demand: Dict[str, dict]) -> None:
+    for operation, rows in meter.summary().items():
+        print(f"{operation} (x{meter.operations[operation]}):")
+        print(f"  {'function':<9} {'caller':<24} {'sampler':<8} {'mode':<9} {'calls':>7} {'absorbed':>9} {'squeezed':>9} {'perms':>7}")
+        for row in rows:
+            print(
+                f"  {row['function']:<9} {row['caller']:<24} {row['sampler']:<8} {row['mode']:<9} {row['calls']:>7.1f} "
+                f"{row['absorbed']:>9.1f} {row['squeezed']:>9.1f} {row['permutations']:>7.1f}"
+            )
+    for operation, entry in requirement.items():
+        print(
+            f"[INFO] {operation}: {entry['permutations']:.1f} permutations/op -> {entry['permutations_per_cycle']:.4f}/cycle, "
+            f"{entry['core_utilisation']:.1%} of one core, {entry['cores']} core(s)"
+        )
+    for sampler, entry in demand.items():
+        print(
+            f"[INFO] {sampler}: {entry['bytes_per_coeff']:.3f} B/coeff -> {entry['bytes_per_cycle']:.2f} B/cycle, "
+            f"{entry['permutations_per_cycle']:.4f} permutations/cycle"
+        )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scheme", choices=sorted(SCHEMES), default="ml-kem")
+    parser.add_argument("--level", type=int, default=None, help="512/768/1024 (ML-KEM) or 44/65/87 (ML-DSA)")
+    parser.add_argument("--runs", type=int, default=3, help="Operations of each kind to average over")
+    parser.add_argument("--seed", type=int, default=2024)
+    parser.add_argument("--ops-per-second", type=float, default=1e5, help="Target rate of each operation")
+    parser.add_argument("--clock-mhz", type=float, default=200.0)
+    parser.add_argument("--rounds-per-cycle", type=int, default=1, help="Keccak rounds per cycle of one core")
+    parser.add_argument("--coeffs-per-cycle", type=float, default=4, help="Sampler output rate")
+    parser.add_argument("--json", type=argparse.FileType("w"), default=None, help="Write the report as JSON")
+    parser.add_argument("--self-check", action="store_true", help="Check the meter against the golden models and exit")
+    args = parser.parse_args(argv)
+
+    if args.self_check:
+        self_check(args.seed)
+        print("[PASS] xof_meter meters Decaps, KDF and SampleInBall")
+        return
+
+    runner, default_level = SCHEMES[args.scheme]
+    meter = HashMeter()
+    runner(meter, args.level or default_level, args.runs, random.Random(args.seed))
+    requirement = core_requirement(meter, args.ops_per_second, args.clock_mhz * 1e6, args.rounds_per_cycle)
+    demand = sampler_demand(meter, args.coeffs_per_cycle)
+    print_report(meter, requirement, demand)
+    if args.json:
+        json.dump(
+            {
+                "scheme": args.scheme,
+                "level": args.level or default_level,
+                "operations": meter.summary(),
+                "requirement": requirement,
+                "samplers": demand,
+                "calls": [dict(asdict(call), permutations=call.permutations) for call in meter.calls],
+            },
+            args.json,
+            indent=2,
+        )
+
+
+if __name__ == "__main__":
+    main()
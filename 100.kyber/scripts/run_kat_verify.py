@@ -1,12 +1,17 @@
 #!/usr/bin/env python3
-"""System-level NIST KAT verification harness."""
+"""System-level NIST KAT verification harness.
+
+With ``--vcd`` / ``--log`` from the RTL run, start-to-done latency, busy ratio,
+AXI-Stream stall cycles and throughput are reported via ``golden.metrics``;
+``--baseline`` fails the run on regressions against an earlier report.
+"""
 from __future__ import annotations
 
 import argparse
 import json
 from pathlib import Path
 
-from golden import kem_golden
+from golden import kem_golden, kyber_ref, metrics
 
 ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = ROOT / "test" / "data"
@@ -26,17 +31,37 @@ def load_vectors(path: Path) -> kem_golden.KatVector:
 def main() -> None:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument("--kat", default="mlkem512.json", help="KAT file name")
+    parser.add_argument("--vcd", type=Path, help="VCD dump of the RTL run for latency/throughput metrics")
+    parser.add_argument("--log", type=Path, help="Simulator log with [METRIC] key=value lines")
+    parser.add_argument("--metrics-out", type=Path, help="Write the metrics report (JSON) here")
+    parser.add_argument("--baseline", type=Path, help="Metrics report of a previous commit to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.02, help="Allowed relative metric regression")
     args = parser.parse_args()
 
+    kyber_ref.self_check()
+    print("[PASS] Reference backend follows FIPS 203 key generation")
+
     kat_db = kem_golden.KatDatabase()
     path = DATA_DIR / args.kat
     vector = load_vectors(path)
     kat_db.register(2, vector)
-    artifacts = kem_golden.run_reference_flow(2)
+    artifacts = kem_golden.run_reference_flow(2, vector.seed)
     if artifacts.ciphertext != vector.ct or artifacts.shared_secret != vector.ss:
         raise SystemExit("Reference mismatch against supplied KAT")
     print("[PASS] Reference implementation matches KAT")
 
+    if args.vcd or args.log:
+        report = metrics.collect(args.vcd, args.log)
+        print(report.summary())
+        if args.metrics_out:
+            metrics.write_report(report, args.metrics_out)
+        if args.baseline:
+            regressions = metrics.diff_reports(metrics.load_report(args.baseline), report, args.tolerance)
+            for line in regressions:
+                print(f"[FAIL] {line}")
+            if regressions:
+                raise SystemExit("Performance regression against baseline")
+
 
 if __name__ == "__main__":
     main()
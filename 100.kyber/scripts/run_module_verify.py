@@ -1,16 +1,40 @@
 #!/usr/bin/env python3
-"""Automation helper to run module-level verification for Kyber accelerator."""
+"""Automation helper to run module-level verification for Kyber accelerator.
+
+Each testbench is compiled once with ``iverilog`` into ``<build>/cache`` under a
+name derived from a hash of its sources (testbench, extra sources, every HDL
+file in the include directories and the compiler arguments), so unchanged
+modules reuse the cached ``vvp`` image.  Every (module, seed) job then runs in
+its own work directory ``<build>/work/<module>/seed_<n>`` and independent jobs
+are executed concurrently (``<build>`` defaults to ``sim/``).  Per-job wall
+time and pass/fail are written to a JSON report and a JUnit XML file for CI.
+"""
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
 import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import List
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
 ROOT = Path(__file__).resolve().parents[1]
 SIM_DIR = ROOT / "sim"
 TEST_DIR = ROOT / "test"
 GOLDEN_DIR = ROOT / "golden"
+RTL_DIR = ROOT / "rtl"
+
+HDL_SUFFIXES = (".v", ".sv", ".vh", ".svh")
+# A testbench reports failure through a non-zero exit ($fatal) or one of these words in its log.
+FAIL_PATTERN = re.compile(r"\b(FAIL(ED)?|ERROR|FATAL)\b")
 
 
 MODULE_TESTS = {
@@ -23,25 +47,254 @@ MODULE_TESTS = {
 }
 
 
-def run_sim(tb: Path, extra_args: List[str]) -> int:
-    cmd = ["iverilog", "-g2012", "-I", str(ROOT / "rtl"), "-o", str(SIM_DIR / tb.stem), str(tb)]
-    cmd.extend(extra_args)
-    subprocess.check_call(cmd)
-    subprocess.check_call(["vvp", str(SIM_DIR / tb.stem)])
-    return 0
+@dataclass
+class Testbench:
+    """One compilable testbench plus optional per-seed stimulus/check hooks."""
+
+    name: str
+    testbench: Path
+    sources: Tuple[Path, ...] = ()
+    include_dirs: Tuple[Path, ...] = (RTL_DIR,)
+    top: Optional[str] = None
+    plusargs: Tuple[str, ...] = ()
+    # prepare(workdir, seed) writes stimulus; check(workdir, seed) raises AssertionError on mismatch.
+    prepare: Optional[Callable[[Path, int], None]] = None
+    check: Optional[Callable[[Path, int], None]] = None
+
+    def inputs(self) -> List[Path]:
+        files = {self.testbench.resolve(), *(src.resolve() for src in self.sources)}
+        for directory in self.include_dirs:
+            if directory.is_dir():
+                files.update(path.resolve() for path in directory.rglob("*") if path.suffix in HDL_SUFFIXES)
+        return sorted(files)
+
+
+@dataclass
+class CompileResult:
+    module: str
+    image: Optional[str]
+    cached: bool
+    wall_time: float
+    error: Optional[str] = None
+
+
+@dataclass
+class JobResult:
+    module: str
+    seed: int
+    status: str  # "pass", "fail" or "error"
+    wall_time: float
+    workdir: str
+    message: str = ""
+
+
+@dataclass
+class Report:
+    compiles: List[CompileResult] = field(default_factory=list)
+    jobs: List[JobResult] = field(default_factory=list)
+    wall_time: float = 0.0
+
+    @property
+    def passed(self) -> bool:
+        return all(job.status == "pass" for job in self.jobs) and all(c.error is None for c in self.compiles)
+
+
+# ---------------------------------------------------------------------------
+# Compile cache
+# ---------------------------------------------------------------------------
+
+
+def source_digest(bench: Testbench, extra_args: Sequence[str] = ()) -> str:
+    """SHA-256 over the testbench inputs (path and contents) and compiler arguments."""
+    digest = hashlib.sha256()
+    for path in bench.inputs():
+        digest.update(str(path).encode() + b"\0")
+        # A missing file still changes the hash; iverilog then reports it as a compile error.
+        digest.update(path.read_bytes() if path.is_file() else b"<missing>")
+    digest.update("\0".join([bench.top or "", *extra_args]).encode())
+    return digest.hexdigest()
+
+
+def compile_testbench(
+    bench: Testbench, extra_args: Sequence[str] = (), force: bool = False, build_dir: Path = SIM_DIR
+) -> CompileResult:
+    """Compile ``bench`` unless an image for the same source hash is already cached."""
+    start = time.perf_counter()
+    cache_dir = build_dir / "cache"
+    image = cache_dir / f"{bench.name}-{source_digest(bench, extra_args)[:16]}.vvp"
+    if image.exists() and not force:
+        return CompileResult(bench.name, str(image), True, time.perf_counter() - start)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    staging = image.with_suffix(f".{os.getpid()}.tmp")
+    cmd = ["iverilog", "-g2012"]
+    for directory in bench.include_dirs:
+        cmd += ["-I", str(directory)]
+    if bench.top:
+        cmd += ["-s", bench.top]
+    cmd += ["-o", str(staging), str(bench.testbench), *(str(src) for src in bench.sources), *extra_args]
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+    except OSError as exc:
+        return CompileResult(bench.name, None, False, time.perf_counter() - start, str(exc))
+    if proc.returncode != 0:
+        staging.unlink(missing_ok=True)
+        return CompileResult(bench.name, None, False, time.perf_counter() - start, proc.stderr.strip() or proc.stdout)
+    staging.replace(image)
+    return CompileResult(bench.name, str(image), False, time.perf_counter() - start)
+
+
+# ---------------------------------------------------------------------------
+# Job execution
+# ---------------------------------------------------------------------------
+
+
+def run_job(
+    bench: Testbench, image: str, seed: int, timeout: Optional[float] = None, build_dir: Path = SIM_DIR
+) -> JobResult:
+    """Run one seed of ``bench`` in an isolated work directory."""
+    workdir = build_dir / "work" / bench.name / f"seed_{seed}"
+    shutil.rmtree(workdir, ignore_errors=True)
+    workdir.mkdir(parents=True)
+    start = time.perf_counter()
+
+    def result(status: str, message: str = "") -> JobResult:
+        return JobResult(bench.name, seed, status, time.perf_counter() - start, str(workdir), message)
+
+    try:
+        if bench.prepare is not None:
+            bench.prepare(workdir, seed)
+        proc = subprocess.run(
+            ["vvp", "-n", image, f"+seed={seed}", *bench.plusargs],
+            cwd=workdir,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+    except subprocess.TimeoutExpired:
+        return result("error", f"timeout after {timeout} s")
+    except Exception as exc:  # noqa: BLE001 - reported per job
+        return result("error", f"{type(exc).__name__}: {exc}")
+    log = proc.stdout + proc.stderr
+    (workdir / "sim.log").write_text(log)
+    if proc.returncode != 0:
+        return result("fail", f"vvp exited with {proc.returncode}")
+    match = FAIL_PATTERN.search(log)
+    if match:
+        line = log[log.rfind("\n", 0, match.start()) + 1 :].split("\n", 1)[0]
+        return result("fail", line.strip())
+    if bench.check is not None:
+        try:
+            bench.check(workdir, seed)
+        except AssertionError as exc:
+            return result("fail", str(exc))
+        except Exception as exc:  # noqa: BLE001
+            return result("error", f"{type(exc).__name__}: {exc}")
+    return result("pass")
+
+
+def run_regression(
+    benches: Sequence[Testbench],
+    seeds: Iterable[int],
+    *,
+    jobs: Optional[int] = None,
+    extra_args: Sequence[str] = (),
+    force: bool = False,
+    timeout: Optional[float] = None,
+    build_dir: Path = SIM_DIR,
+) -> Report:
+    """Compile every bench (cached, in parallel), then run all (bench, seed) jobs concurrently."""
+    seeds = list(seeds)
+    jobs = jobs or os.cpu_count() or 1
+    report = Report()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        report.compiles = list(pool.map(lambda bench: compile_testbench(bench, extra_args, force, build_dir), benches))
+        for compiled in report.compiles:
+            state = "error" if compiled.error else ("cached" if compiled.cached else "compiled")
+            print(f"[INFO] {compiled.module}: {state} ({compiled.wall_time:.2f} s)")
+        images: Dict[str, Optional[str]] = {c.module: c.image for c in report.compiles}
+        futures = []
+        for bench in benches:
+            for seed in seeds:
+                if images[bench.name] is None:
+                    report.jobs.append(JobResult(bench.name, seed, "error", 0.0, "", "compile failed"))
+                else:
+                    futures.append(pool.submit(run_job, bench, images[bench.name], seed, timeout, build_dir))
+        for future in futures:
+            job = future.result()
+            tag = "PASS" if job.status == "pass" else "FAIL"
+            print(f"[{tag}] {job.module} seed {job.seed} ({job.wall_time:.2f} s){': ' + job.message if job.message else ''}")
+            report.jobs.append(job)
+    report.wall_time = time.perf_counter() - start
+    return report
+
+
+# ---------------------------------------------------------------------------
+# Reports
+# ---------------------------------------------------------------------------
+
+
+def write_json(report: Report, path: Path) -> None:
+    payload = {
+        "passed": report.passed,
+        "wall_time": report.wall_time,
+        "compiles": [asdict(c) for c in report.compiles],
+        "jobs": [asdict(job) for job in report.jobs],
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2))
+
+
+def write_junit(report: Report, path: Path, suite: str = "module_verify") -> None:
+    failures = sum(job.status == "fail" for job in report.jobs)
+    errors = sum(job.status == "error" for job in report.jobs)
+    root = ET.Element(
+        "testsuite",
+        name=suite,
+        tests=str(len(report.jobs)),
+        failures=str(failures),
+        errors=str(errors),
+        time=f"{report.wall_time:.3f}",
+    )
+    for job in report.jobs:
+        case = ET.SubElement(root, "testcase", classname=job.module, name=f"seed_{job.seed}", time=f"{job.wall_time:.3f}")
+        if job.status != "pass":
+            ET.SubElement(case, "failure" if job.status == "fail" else "error", message=job.message[:200]).text = job.message
+    path.parent.mkdir(parents=True, exist_ok=True)
+    ET.ElementTree(root).write(path, encoding="utf-8", xml_declaration=True)
+
+
+def module_benches(names: Iterable[str]) -> List[Testbench]:
+    return [Testbench(name=name, testbench=ROOT / MODULE_TESTS[name]) for name in names]
 
 
 def main() -> None:
-    parser = argparse.ArgumentParser(description=__doc__)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
     parser.add_argument("modules", nargs="*", help="Subset of modules to run")
     parser.add_argument("--iverilog-arg", action="append", default=[], help="Additional args")
+    parser.add_argument("--seeds", type=int, default=1, help="Number of seeds per module (passed as +seed=N)")
+    parser.add_argument("--seed-base", type=int, default=0, help="First seed")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="Concurrent jobs (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Recompile even if the source hash is cached")
+    parser.add_argument("--timeout", type=float, default=None, help="Per-job timeout in seconds")
+    parser.add_argument("--report", type=Path, default=SIM_DIR / "report.json", help="JSON report path")
+    parser.add_argument("--junit", type=Path, default=SIM_DIR / "report.xml", help="JUnit XML report path")
     args = parser.parse_args()
 
-    selected = args.modules or MODULE_TESTS.keys()
-    for name in selected:
-        tb_path = ROOT / MODULE_TESTS[name]
-        print(f"[INFO] Running {name} using {tb_path}")
-        run_sim(tb_path, args.iverilog_arg)
+    selected = args.modules or list(MODULE_TESTS)
+    report = run_regression(
+        module_benches(selected),
+        range(args.seed_base, args.seed_base + args.seeds),
+        jobs=args.jobs,
+        extra_args=args.iverilog_arg,
+        force=args.force,
+        timeout=args.timeout,
+    )
+    write_json(report, args.report)
+    write_junit(report, args.junit)
+    passed = sum(job.status == "pass" for job in report.jobs)
+    print(f"[INFO] {passed}/{len(report.jobs)} jobs passed in {report.wall_time:.2f} s -> {args.report}")
+    sys.exit(0 if report.passed else 1)
 
 
 if __name__ == "__main__":
@@ -14,7 +14,7 @@ def k_PKE_KeyGen(seed, params):
     输出: 加密密钥ek_pke,解密密钥dk_pke
     """
     assert len(seed) == 32
-    rho, sigma = G(seed+bytes(params.k))
+    rho, sigma = G(seed+bytes([params.k]))
     A_hat= sampleMatrix(rho, params.k)
     s = sampleNoise(sigma, params.eta1, 0, params.k) 
     e = sampleNoise(sigma, params.eta1, params.k, params.k) #N在内部变换，offset为params.k
@@ -0,0 +1,151 @@
+"""
+@Descripttion: SPHINCS+ benchmark（KeyGen / Sign / Verify 计时 + 哈希调用计数）
+@version: V0.6
+@Author: GoldenModel-Team
+@Date: 2025-04-16 12:00
+
+每个参数集先做 count 次不插桩的计时，再各做一次 HashProfiler 插桩运行，
+得到确定性的哈希调用次数与 FORS / WOTS+ / L-tree / Merkle 分阶段耗时，
+结果以 JSON 输出，便于跨提交对比缓存与并行化改动。
+
+示例：
+    python Benchmark_SPHINCS_plus.py --params sha256-128f shake256-128f --count 3 --output bench.json
+    python Benchmark_SPHINCS_plus.py --params sha256-128f --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import time
+from statistics import mean
+from typing import Dict, List, Sequence
+
+from SPHINCS_plus import KeyGen, Sign, Verify
+from sphincs_params import get_params_by_name, list_param_sets
+from sphincs_profile import HashProfiler
+
+_OPERATIONS = ("KeyGen", "Sign", "Verify")
+
+
+def _summarize(samples: Sequence[float]) -> Dict[str, float]:
+    return {"mean": mean(samples), "min": min(samples), "max": max(samples)}
+
+
+def benchmark_param_set(
+    name: str,
+    count: int,
+    *,
+    profile: bool = True,
+    workers: int | None = None,
+) -> Dict[str, object]:
+    """
+    对单个参数集计时并（可选）统计哈希调用。
+
+    输入：
+        name: 参数集名称，如 "sha256-128s"。
+        count: 计时轮数。
+        profile: 是否追加一次插桩运行。
+        workers: KeyGen / Sign 的 WOTS+ 线程数，None 为串行。
+    输出：
+        Dict[str, object]: 包含 timing / hash_calls / stages 的结果字典。
+    """
+
+    params = get_params_by_name(name)
+    n = int(params["n"])
+    seed = bytes(range(3 * n))
+    message = b"SPHINCS+ benchmark message"
+    samples: Dict[str, List[float]] = {op: [] for op in _OPERATIONS}
+    failures = 0
+
+    for round_idx in range(count):
+        round_seed = bytes((byte + round_idx) & 0xFF for byte in seed)
+        t0 = time.perf_counter()
+        pk, sk = KeyGen(params, seed=round_seed, workers=workers)
+        t1 = time.perf_counter()
+        signature = Sign(sk, message, params, workers=workers)
+        t2 = time.perf_counter()
+        ok = Verify(pk, message, signature, params)
+        t3 = time.perf_counter()
+        samples["KeyGen"].append(t1 - t0)
+        samples["Sign"].append(t2 - t1)
+        samples["Verify"].append(t3 - t2)
+        failures += 0 if ok else 1
+
+    result: Dict[str, object] = {
+        "name": name,
+        "count": count,
+        "workers": workers,
+        "failures": failures,
+        "signature_bytes": len(signature) if count else None,
+        "timing": {op: _summarize(values) for op, values in samples.items() if values},
+    }
+
+    if profile:
+        profiles: Dict[str, object] = {}
+        with HashProfiler() as profiler:
+            pk, sk = KeyGen(params, seed=seed, workers=workers)
+            profiles["KeyGen"] = profiler.snapshot()
+            profiler.reset()
+            signature = Sign(sk, message, params, workers=workers)
+            profiles["Sign"] = profiler.snapshot()
+            profiler.reset()
+            Verify(pk, message, signature, params)
+            profiles["Verify"] = profiler.snapshot()
+        result["profile"] = profiles
+    return result
+
+
+def _print_result(result: Dict[str, object]) -> None:
+    print("-" * 40)
+    print(f"  {result['name']} | ({result['count']} rounds)")
+    print("-" * 40)
+    timing = result["timing"]
+    for op in _OPERATIONS:
+        if op in timing:
+            print(f"{op:<7} average: {timing[op]['mean']:.3f} s")
+    profiles = result.get("profile", {})
+    for op in _OPERATIONS:
+        if op not in profiles:
+            continue
+        calls = profiles[op]["hash_calls"]
+        summary = ", ".join(f"{key}={value}" for key, value in calls.items())
+        print(f"{op:<7} hash calls: {summary}")
+    print(f"Fail number: {result['failures']}")
+
+
+def main(argv: Sequence[str] | None = None) -> Dict[str, object]:
+    parser = argparse.ArgumentParser(description="SPHINCS+ golden model benchmark")
+    parser.add_argument(
+        "--params",
+        nargs="+",
+        default=["sha256-128f", "shake256-128f"],
+        choices=list_param_sets(),
+        help="parameter set names",
+    )
+    parser.add_argument("--count", type=int, default=1, help="timed rounds per parameter set")
+    parser.add_argument("--output", help="write JSON report to this path")
+    parser.add_argument("--workers", type=int, help="WOTS+ threads for KeyGen / Sign (default: serial)")
+    parser.add_argument("--no-profile", action="store_true", help="skip the instrumented run")
+    args = parser.parse_args(argv)
+
+    report: Dict[str, object] = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": [],
+    }
+    for name in args.params:
+        result = benchmark_param_set(name, args.count, profile=not args.no_profile, workers=args.workers)
+        _print_result(result)
+        report["results"].append(result)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,23 @@
 """
-@Descripttion: SPHINCS+ 主流程实现（Stage-4 版本）
-@version: V0.4
+@Descripttion: SPHINCS+ 主流程实现（Stage-6 版本）
+@version: V0.6
 @Author: GoldenModel-Team
-@Date: 2025-03-30 12:00
+@Date: 2025-04-14 12:00
 
-实现 SHA256 Level-1 参数下的确定性 KeyGen/Sign/Verify 流程，
-复用 Stage 1~3 已完成的哈希、地址与基元模块。
+实现确定性 KeyGen/Sign/Verify 流程，复用 Stage 1~3 已完成的哈希、地址与基元模块。
+Verify 以 memoryview 零拷贝切分签名；verify_many 面向同一公钥的批量验签，
+共享 PK.seed 哈希上下文并可分发到进程池。
 """
 
 from __future__ import annotations
 
 import secrets
-from typing import Dict, Iterable, List, Mapping, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
 
 from auxiliary_function import ADDR_TYPE_WOTSPK, concat_bytes, ensure_bytes
 from sphincs_fors import fors_pk_from_sig, fors_sign
-from sphincs_hash import H_msg, PRF_msg
+from sphincs_hash import H_msg, PRF_msg, seeded_hash
 from sphincs_merkle import (
     compute_root_from_auth_path,
     compute_subtree_authentication,
@@ -23,7 +25,7 @@ from sphincs_merkle import (
     l_tree,
 )
 from sphincs_utils import bind_address_type, derive_fors_tree_address, derive_tree_hash_address, derive_wots_address
-from sphincs_wots import wots_gen_pk, wots_pk_from_sig, wots_sign
+from sphincs_wots import wots_gen_pk_many, wots_pk_from_sig, wots_sign
 
 Params = Mapping[str, int | str]
 PublicKey = Dict[str, bytes]
@@ -49,21 +51,35 @@ def _make_leaf_generator(
     pub_seed: bytes,
     layer: int,
     tree_idx: int,
+    workers: int | None = None,
 ):
-    """生成用于 Merkle 子树的叶节点闭包。"""
+    """生成用于 Merkle 子树的叶节点闭包（首次调用时批量生成整棵子树的叶子）。"""
+
+    leaf_count = 1 << int(params["tree_height"])
+    leaves: List[bytes] = []
 
     def leaf_func(leaf_index: int, _leaf_addr: Iterable[int]) -> bytes:
-        base_address = derive_wots_address(layer, tree_idx, leaf_index, 0, 0)
-        wots_pk = wots_gen_pk(params, sk_seed, pub_seed, base_address)
-        pk_address = bind_address_type(base_address, ADDR_TYPE_WOTSPK)
-        return l_tree(params, pub_seed, pk_address, wots_pk)
+        if not leaves:
+            base_addresses = [derive_wots_address(layer, tree_idx, idx, 0, 0) for idx in range(leaf_count)]
+            wots_pks = wots_gen_pk_many(params, sk_seed, pub_seed, base_addresses, workers=workers)
+            for base_address, wots_pk in zip(base_addresses, wots_pks):
+                pk_address = bind_address_type(base_address, ADDR_TYPE_WOTSPK)
+                leaves.append(l_tree(params, pub_seed, pk_address, wots_pk))
+        return leaves[leaf_index]
 
     return leaf_func
 
 
-def KeyGen(params: Params, seed: bytes | None = None) -> Tuple[PublicKey, SecretKey]:
+def KeyGen(
+    params: Params,
+    seed: bytes | None = None,
+    *,
+    workers: int | None = None,
+) -> Tuple[PublicKey, SecretKey]:
     """
     生成 SPHINCS+ 公钥与密钥对（确定性，供 Stage-4 测试使用）。
+
+    workers: 透传给 wots_chains_batch 的线程数，结果与串行一致；默认串行。
     """
 
     n = int(params["n"])
@@ -74,7 +90,7 @@ def KeyGen(params: Params, seed: bytes | None = None) -> Tuple[PublicKey, Secret
     current_root = b"\x00" * n
     for layer in range(d):
         tree_addr = derive_tree_hash_address(layer, 0, 0, 0)
-        leaf_generator = _make_leaf_generator(params, sk_seed, pub_seed, layer, 0)
+        leaf_generator = _make_leaf_generator(params, sk_seed, pub_seed, layer, 0, workers)
         current_root = compute_subtree_root(
             params,
             pub_seed,
@@ -99,9 +115,12 @@ def Sign(
     params: Params,
     *,
     optrand: bytes | None = None,
+    workers: int | None = None,
 ) -> bytes:
     """
     生成确定性 SPHINCS+ 签名（Stage-4：固定 optrand=0 以便回归测试）。
+
+    workers: 各层子树叶子生成所用的 WOTS+ 线程数，含义同 KeyGen。
     """
 
     n = int(params["n"])
@@ -131,7 +150,7 @@ def Sign(
         wots_signature = wots_sign(params, current_root, sk_seed, pub_seed, wots_address)
         signature_parts.append(wots_signature)
 
-        leaf_generator = _make_leaf_generator(params, sk_seed, pub_seed, layer, current_tree)
+        leaf_generator = _make_leaf_generator(params, sk_seed, pub_seed, layer, current_tree, workers)
         tree_address = derive_tree_hash_address(layer, current_tree, 0, 0)
         auth_path, root = compute_subtree_authentication(
             params,
@@ -152,50 +171,61 @@ def Sign(
     return b"".join(signature_parts)
 
 
-def Verify(public_key: PublicKey, message: bytes, signature: bytes, params: Params) -> bool:
-    """验证签名是否与给定公钥、消息匹配。"""
+SignatureLayer = Tuple[memoryview, List[memoryview]]
+
+
+def _split_signature(
+    params: Params,
+    signature: bytes | bytearray | memoryview,
+) -> Tuple[memoryview, memoryview, List[SignatureLayer]] | None:
+    """
+    以 memoryview 零拷贝切分签名：(R, FORS 签名, [(WOTS 签名, 认证路径)] × d)。
+
+    长度不符时返回 None。
+    """
 
     n = int(params["n"])
     tree_height = int(params["tree_height"])
     d = int(params["d"])
-    fors_height = int(params["fors_height"])
-    fors_trees = int(params["fors_trees"])
-
-    pk_seed = ensure_bytes(public_key["seed"], length=n)
-    pk_root = ensure_bytes(public_key["root"], length=n)
-    sig_bytes = ensure_bytes(signature)
-
     wots_len = int(params["len"]) * n
     auth_len = tree_height * n
-    fors_len = fors_trees * (fors_height + 1) * n
-    expected_len = n + fors_len + d * (wots_len + auth_len)
-    if len(sig_bytes) != expected_len:
-        return False
+    fors_len = int(params["fors_trees"]) * (int(params["fors_height"]) + 1) * n
+
+    view = memoryview(signature)
+    if len(view) != n + fors_len + d * (wots_len + auth_len):
+        return None
+    randomness = view[:n]
+    fors_sig = view[n : n + fors_len]
+    offset = n + fors_len
+    layers: List[SignatureLayer] = []
+    for _ in range(d):
+        wots_sig = view[offset : offset + wots_len]
+        offset += wots_len
+        auth_path = [view[offset + level * n : offset + (level + 1) * n] for level in range(tree_height)]
+        offset += auth_len
+        layers.append((wots_sig, auth_path))
+    return randomness, fors_sig, layers
 
-    offset = 0
-    randomness = sig_bytes[offset : offset + n]
-    offset += n
-    fors_sig = sig_bytes[offset : offset + fors_len]
-    offset += fors_len
 
-    pk_bytes = concat_bytes(pk_seed, pk_root)
+def _verify_split(
+    params: Params,
+    pk_seed: bytes,
+    pk_root: bytes,
+    message: bytes,
+    parts: Tuple[memoryview, memoryview, List[SignatureLayer]],
+) -> bool:
+    tree_height = int(params["tree_height"])
+    d = int(params["d"])
+    randomness, fors_sig, layers = parts
+
+    pk_bytes = pk_seed + pk_root
     digest, tree_idx, leaf_idx = H_msg(params, randomness, pk_bytes, message)
     fors_address = derive_fors_tree_address(0, tree_idx, leaf_idx)
-    fors_pk = fors_pk_from_sig(params, fors_sig, digest, pk_seed, fors_address)
-
-    current_root = fors_pk
+    current_root = fors_pk_from_sig(params, fors_sig, digest, pk_seed, fors_address)
     current_leaf = leaf_idx
     current_tree = tree_idx
 
-    for layer in range(d):
-        wots_sig = sig_bytes[offset : offset + wots_len]
-        offset += wots_len
-        auth_path = [
-            sig_bytes[offset + level * n : offset + (level + 1) * n]
-            for level in range(tree_height)
-        ]
-        offset += auth_len
-
+    for layer, (wots_sig, auth_path) in enumerate(layers):
         wots_address = derive_wots_address(layer, current_tree, current_leaf, 0, 0)
         wots_pk = wots_pk_from_sig(params, wots_sig, current_root, pk_seed, wots_address)
         pk_address = bind_address_type(wots_address, ADDR_TYPE_WOTSPK)
@@ -219,4 +249,72 @@ def Verify(public_key: PublicKey, message: bytes, signature: bytes, params: Para
     return current_root == pk_root
 
 
-__all__ = ["KeyGen", "Sign", "Verify"]
+def Verify(public_key: PublicKey, message: bytes, signature: bytes, params: Params) -> bool:
+    """验证签名是否与给定公钥、消息匹配。"""
+
+    n = int(params["n"])
+    pk_seed = ensure_bytes(public_key["seed"], length=n)
+    pk_root = ensure_bytes(public_key["root"], length=n)
+    parts = _split_signature(params, signature)
+    if parts is None:
+        return False
+    return _verify_split(params, pk_seed, pk_root, message, parts)
+
+
+def _verify_chunk(
+    public_key: PublicKey,
+    params: Params,
+    items: Sequence[Tuple[bytes, bytes]],
+) -> List[bool]:
+    """同一公钥下串行验证一组 (message, signature)，共享 PK.seed 哈希上下文。"""
+
+    n = int(params["n"])
+    pk_seed = ensure_bytes(public_key["seed"], length=n)
+    pk_root = ensure_bytes(public_key["root"], length=n)
+    seeded_hash(params, pk_seed)
+    results: List[bool] = []
+    for message, signature in items:
+        parts = _split_signature(params, signature)
+        results.append(parts is not None and _verify_split(params, pk_seed, pk_root, message, parts))
+    return results
+
+
+def verify_many(
+    public_key: PublicKey,
+    items: Iterable[Tuple[bytes, bytes]],
+    params: Params,
+    *,
+    workers: int | None = None,
+) -> List[bool]:
+    """
+    批量验证同一公钥下的多个签名，返回逐项结果。
+
+    输入：
+        public_key: 公钥字典（seed / root）。
+        items: (message, signature) 序列；签名以 memoryview 零拷贝切分。
+        params: 参数集合。
+        workers: 进程数；> 1 时将签名分块分发到进程池（各进程各自维护
+            PK.seed 哈希上下文），默认在当前进程串行验证。
+    输出：
+        List[bool]: 与 items 顺序一致的验证结果。
+    """
+
+    batch = list(items)
+    if workers is None or workers <= 1 or len(batch) <= 1:
+        return _verify_chunk(public_key, params, batch)
+
+    key = {"seed": bytes(public_key["seed"]), "root": bytes(public_key["root"])}
+    plain_params = dict(params)
+    chunk_size = -(-len(batch) // workers)
+    chunks = [
+        [(bytes(message), bytes(signature)) for message, signature in batch[start : start + chunk_size]]
+        for start in range(0, len(batch), chunk_size)
+    ]
+    results: List[bool] = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+        for chunk_result in executor.map(_verify_chunk, [key] * len(chunks), [plain_params] * len(chunks), chunks):
+            results.extend(chunk_result)
+    return results
+
+
+__all__ = ["KeyGen", "Sign", "Verify", "verify_many"]
@@ -11,7 +11,8 @@ from typing import Tuple
 
 import pytest
 
-from SPHINCS_plus import KeyGen, Sign, Verify
+import sphincs_wots
+from SPHINCS_plus import KeyGen, Sign, Verify, verify_many
 from sphincs_params import get_params
 
 
@@ -65,3 +66,47 @@ def test_sign_verify_large_message(sphincs_context) -> None:
     large_message = bytes([i % 251 for i in range(100_000)])
     signature = Sign(sk, large_message, params)
     assert Verify(pk, large_message, signature, params)
+
+
+def test_verify_many_matches_verify() -> None:
+    params = get_params(profile="f")
+    pk, sk = KeyGen(params, seed=bytes(range(3 * int(params["n"]))))
+    messages = [b"batch-%d" % idx for idx in range(3)]
+    signatures = [Sign(sk, message, params) for message in messages]
+    tampered = bytearray(signatures[1])
+    tampered[-1] ^= 0x01
+    items = [
+        (messages[0], signatures[0]),
+        (messages[1], bytes(tampered)),
+        (messages[2], memoryview(signatures[2])),
+        (b"other", signatures[0]),
+        (messages[0], signatures[0][:-1]),
+    ]
+    expected = [True, False, True, False, False]
+    assert [Verify(pk, message, bytes(sig), params) for message, sig in items] == expected
+    assert verify_many(pk, items, params) == expected
+    assert verify_many(pk, items, params, workers=2) == expected
+
+
+def test_keygen_sign_workers_match_serial(monkeypatch) -> None:
+    params = get_params(profile="f")
+    seed = bytes(range(3 * int(params["n"])))
+    message = b"threaded leaves"
+    pk, sk = KeyGen(params, seed=seed)
+    signature = Sign(sk, message, params)
+
+    pools = []
+
+    class CountingPool(sphincs_wots.ThreadPoolExecutor):
+        def __init__(self, *args, **kwargs) -> None:
+            pools.append(kwargs.get("max_workers"))
+            super().__init__(*args, **kwargs)
+
+    # 确认 workers 经 KeyGen / Sign 真正走到了 WOTS+ 线程池
+    monkeypatch.setattr(sphincs_wots, "ThreadPoolExecutor", CountingPool)
+    assert KeyGen(params, seed=seed, workers=3) == (pk, sk)
+    keygen_pools = len(pools)
+    assert keygen_pools == int(params["d"]) and set(pools) == {3}
+    assert Sign(sk, message, params, workers=3) == signature
+    assert len(pools) - keygen_pools == int(params["d"])
+    assert Verify(pk, message, signature, params)
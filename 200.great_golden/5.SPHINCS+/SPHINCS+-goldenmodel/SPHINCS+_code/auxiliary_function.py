@@ -312,7 +312,20 @@ def xor_bytes(lhs: bytes | bytearray | memoryview, rhs: bytes | bytearray | memo
 
     left = ensure_bytes(lhs)
     right = ensure_bytes(rhs, length=len(left))
-    return bytes(a ^ b for a, b in zip(left, right))
+    # 整块转为大整数异或，避免逐字节生成器
+    size = len(left)
+    return (int.from_bytes(left, "little") ^ int.from_bytes(right, "little")).to_bytes(size, "little")
+
+
+def xor_into(dst: bytearray | memoryview, src: bytes | bytearray | memoryview) -> None:
+    """
+    就地异或：dst ^= src（等长），用于 thash 掩码缓冲区复用。
+    """
+
+    size = len(dst)
+    if len(src) != size:
+        raise ValueError(f"Expected {size} bytes, got {len(src)}")
+    dst[:] = (int.from_bytes(dst, "little") ^ int.from_bytes(src, "little")).to_bytes(size, "little")
 
 
 __all__ = [
@@ -351,4 +364,5 @@ __all__ = [
     "address_to_bytes",
     "bytes_to_address",
     "xor_bytes",
+    "xor_into",
 ]
@@ -249,7 +249,9 @@ def fors_pk_from_sig(
     if len(indices) != fors_trees:
         raise ValueError("index extraction mismatch with fors_trees")
     expected_len = fors_trees * (1 + fors_height) * n
-    sig_bytes = ensure_bytes(signature, length=expected_len)
+    sig_bytes = memoryview(signature)
+    if len(sig_bytes) != expected_len:
+        raise ValueError(f"expected length {expected_len}, got {len(sig_bytes)}")
     roots: List[bytes] = []
     leaf_count = 1 << fors_height
     offset = 0
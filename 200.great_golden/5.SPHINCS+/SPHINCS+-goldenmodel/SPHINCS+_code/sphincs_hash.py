@@ -1,23 +1,55 @@
 """
-@Descripttion: SPHINCS+ 哈希接口（SHA256 Level-1）
-@version: V0.5
+@Descripttion: SPHINCS+ 哈希接口（SHA256 / SHAKE256 后端）
+@version: V0.6
 @Author: GoldenModel-Team
-@Date: 2025-04-02 12:00
+@Date: 2025-04-10 12:00
 
 与 Kyber / Dilithium 黄金模型保持一致的注释与结构，
 该版本对齐 NIST 参考实现中的 mgf1/thash/HMAC 细节，
-为 Stage-5 向量对齐提供基础能力。
+并通过 HashBackend 按 params["hash"] 分发到 SHA256 或 SHAKE256 实现。
 """
 
 from __future__ import annotations
 
 import hashlib
-from typing import Iterable, List, Mapping, Sequence, Tuple
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, Mapping, Sequence, Tuple
 
-from auxiliary_function import ADR_BYTES, concat_bytes, ensure_bytes, xor_bytes
+from auxiliary_function import ADR_BYTES, ensure_bytes, xor_into
 
 _SHA256_BLOCK_BYTES = 64
 _SHA256_OUTPUT_BYTES = 32
+_MGF1_FIRST_COUNTER = bytes(4)
+
+_DEFAULT_HASH = "sha256"
+
+# 可选的插桩回调 hook(name, count)；None 时各函数只付出一次全局判空的代价
+_INSTRUMENTATION_HOOK: Callable[[str, int], None] | None = None
+
+
+def set_instrumentation_hook(
+    hook: Callable[[str, int], None] | None,
+) -> Callable[[str, int], None] | None:
+    """
+    安装（或以 None 卸载）哈希调用计数回调，返回此前安装的回调。
+
+    回调以 (name, count) 形式接收 F/H/thash_multi/PRF/PRF_msg/H_msg 等接口调用，
+    以及 _sha256/_shake256/_mgf1 底层原语调用次数。
+    """
+
+    global _INSTRUMENTATION_HOOK
+    previous = _INSTRUMENTATION_HOOK
+    _INSTRUMENTATION_HOOK = hook
+    return previous
+
+
+def notify_hash_calls(name: str, count: int = 1) -> None:
+    """供批量引擎等外部模块一次性上报 count 次调用。"""
+
+    if _INSTRUMENTATION_HOOK is not None:
+        _INSTRUMENTATION_HOOK(name, count)
 
 
 def _truncate_to_n(digest: bytes, params: Mapping[str, int | str]) -> bytes:
@@ -26,24 +58,43 @@ def _truncate_to_n(digest: bytes, params: Mapping[str, int | str]) -> bytes:
 
 
 def _sha256(data: bytes) -> bytes:
-    """hashlib.sha256 包装，便于未来替换 SHAKE/HARAKA 实现。"""
+    """hashlib.sha256 包装，便于统计与替换底层实现。"""
 
-    # TODO(Stage-7/8): 引入 SHAKE256 / Haraka 加速。
+    if _INSTRUMENTATION_HOOK is not None:
+        _INSTRUMENTATION_HOOK("_sha256", 1)
     return hashlib.sha256(data).digest()
 
 
+def _shake256(data: bytes, out_len: int) -> bytes:
+    """hashlib.shake_256 包装，输出 out_len 字节。"""
+
+    if _INSTRUMENTATION_HOOK is not None:
+        _INSTRUMENTATION_HOOK("_shake256", 1)
+    return hashlib.shake_256(data).digest(out_len)
+
+
 def _mgf1(seed: bytes, out_len: int) -> bytes:
     """参照参考实现的 MGF1，用 SHA256 扩展掩码。"""
 
+    if _INSTRUMENTATION_HOOK is not None:
+        _INSTRUMENTATION_HOOK("_mgf1", 1)
     if out_len <= 0:
         return b""
-    counter = 0
-    blocks: List[bytes] = []
-    while len(b"".join(blocks)) < out_len:
-        ctr_bytes = counter.to_bytes(4, "big")
-        blocks.append(_sha256(seed + ctr_bytes))
-        counter += 1
-    return b"".join(blocks)[:out_len]
+    out = bytearray(out_len)
+    _mgf1_into(memoryview(out), seed)
+    return bytes(out)
+
+
+def _mgf1_into(out: memoryview, seed: bytes) -> None:
+    """MGF1 流式写入：按 32 字节计数块直接填充预分配缓冲区。"""
+
+    full_blocks, tail = divmod(len(out), _SHA256_OUTPUT_BYTES)
+    offset = 0
+    for counter in range(full_blocks):
+        out[offset : offset + _SHA256_OUTPUT_BYTES] = _sha256(seed + counter.to_bytes(4, "big"))
+        offset += _SHA256_OUTPUT_BYTES
+    if tail:
+        out[offset:] = _sha256(seed + full_blocks.to_bytes(4, "big"))[:tail]
 
 
 def _pad_key_block(key: bytes) -> bytearray:
@@ -68,23 +119,324 @@ def _hmac_sha256(key: bytes, data: bytes) -> bytes:
     return _sha256(outer)
 
 
+# ---------------------------------------------------------------------------
+# SHA256 后端（hash_sha256.c）
+# ---------------------------------------------------------------------------
+
+
+def _sha256_absorb(pub_seed: bytes) -> "hashlib._Hash":
+    return hashlib.sha256(pub_seed)
+
+
+def _sha256_bitmask_into(state: "hashlib._Hash", address: bytes, out: memoryview) -> None:
+    # MGF1(PK.seed || ADR)：每个计数块都从吸收了 PK.seed 的中间态继续，直接写入 out
+    out_len = len(out)
+    if _INSTRUMENTATION_HOOK is not None:
+        _INSTRUMENTATION_HOOK("_mgf1", 1)
+        _INSTRUMENTATION_HOOK("_sha256", (out_len + _SHA256_OUTPUT_BYTES - 1) // _SHA256_OUTPUT_BYTES)
+    offset = 0
+    counter = 0
+    while offset < out_len:
+        block = state.copy()
+        block.update(address + counter.to_bytes(4, "big"))
+        take = min(_SHA256_OUTPUT_BYTES, out_len - offset)
+        out[offset : offset + take] = block.digest()[:take]
+        offset += take
+        counter += 1
+
+
+def _sha256_bitmask(state: "hashlib._Hash", address: bytes, out_len: int) -> bytes:
+    # 单块（out_len <= 32，即 F 链）直接返回摘要，避免缓冲区往返
+    if out_len > _SHA256_OUTPUT_BYTES:
+        out = bytearray(out_len)
+        _sha256_bitmask_into(state, address, memoryview(out))
+        return bytes(out)
+    if _INSTRUMENTATION_HOOK is not None:
+        _INSTRUMENTATION_HOOK("_mgf1", 1)
+        _INSTRUMENTATION_HOOK("_sha256", 1)
+    block = state.copy()
+    block.update(address + _MGF1_FIRST_COUNTER)
+    return block.digest()[:out_len]
+
+
+def _sha256_compress(n: int, state: "hashlib._Hash", payload: bytes | bytearray | memoryview) -> bytes:
+    if _INSTRUMENTATION_HOOK is not None:
+        _INSTRUMENTATION_HOOK("_sha256", 1)
+    digest = state.copy()
+    digest.update(payload)
+    return digest.digest()[:n]
+
+
+def _sha256_prf(n: int, key: bytes, address: bytes) -> bytes:
+    block = bytearray(_SHA256_BLOCK_BYTES + ADR_BYTES)
+    block[:n] = key
+    # 其余补零，使 key 与地址落在不同的压缩函数调用中
+    block[_SHA256_BLOCK_BYTES : _SHA256_BLOCK_BYTES + ADR_BYTES] = address
+    return _sha256(bytes(block))[:n]
+
+
+def _sha256_prf_msg(n: int, key: bytes, opt_random: bytes, message: bytes) -> bytes:
+    return _hmac_sha256(key, opt_random + message)[:n]
+
+
+def _sha256_msg_expand(randomness: bytes, public_key: bytes, message: bytes, out_len: int) -> bytes:
+    # 先压缩消息再 MGF1 扩展，避免每个计数块重复哈希长消息
+    seed = _sha256(randomness + public_key + message)
+    return _mgf1(seed, out_len)
+
+
+# ---------------------------------------------------------------------------
+# SHAKE256 后端（hash_shake256.c）
+# ---------------------------------------------------------------------------
+
+
+def _shake256_absorb(pub_seed: bytes) -> "hashlib._Hash":
+    return hashlib.shake_256(pub_seed)
+
+
+def _shake256_bitmask_into(state: "hashlib._Hash", address: bytes, out: memoryview) -> None:
+    if _INSTRUMENTATION_HOOK is not None:
+        _INSTRUMENTATION_HOOK("_shake256", 1)
+    xof = state.copy()
+    xof.update(address)
+    out[:] = xof.digest(len(out))
+
+
+def _shake256_bitmask(state: "hashlib._Hash", address: bytes, out_len: int) -> bytes:
+    if _INSTRUMENTATION_HOOK is not None:
+        _INSTRUMENTATION_HOOK("_shake256", 1)
+    xof = state.copy()
+    xof.update(address)
+    return xof.digest(out_len)
+
+
+def _shake256_compress(n: int, state: "hashlib._Hash", payload: bytes | bytearray | memoryview) -> bytes:
+    if _INSTRUMENTATION_HOOK is not None:
+        _INSTRUMENTATION_HOOK("_shake256", 1)
+    xof = state.copy()
+    xof.update(payload)
+    return xof.digest(n)
+
+
+def _shake256_prf(n: int, key: bytes, address: bytes) -> bytes:
+    return _shake256(key + address, n)
+
+
+def _shake256_prf_msg(n: int, key: bytes, opt_random: bytes, message: bytes) -> bytes:
+    return _shake256(key + opt_random + message, n)
+
+
+def _shake256_msg_expand(randomness: bytes, public_key: bytes, message: bytes, out_len: int) -> bytes:
+    return _shake256(randomness + public_key + message, out_len)
+
+
+@dataclass(frozen=True)
+class HashBackend:
+    """
+    哈希后端函数表，F/H/PRF/PRF_msg/H_msg 统一经由此处分发。
+
+    字段：
+        name: 后端名称（与 params["hash"] 对应）。
+        absorb: PK.seed -> 已吸收 PK.seed 的 hashlib 中间态（每个公钥一份）。
+        bitmask: (state, ADR, out_len) -> thash 输入掩码（bytes），供短输入的 F 链使用。
+        bitmask_into: (state, ADR, out) -> 将 thash 输入掩码流式写入 out（仅依赖种子与地址）。
+        compress: (n, state, ADR || masked) -> thash 的 n 字节输出。
+        prf: (n, key, address) -> n 字节输出。
+        prf_msg: (n, sk_prf, opt_random, message) -> n 字节输出。
+        msg_expand: (R, PK, M, out_len) -> H_msg 所需的 out_len 字节缓冲区。
+    """
+
+    name: str
+    absorb: Callable[[bytes], "hashlib._Hash"]
+    bitmask: Callable[["hashlib._Hash", bytes, int], bytes]
+    bitmask_into: Callable[["hashlib._Hash", bytes, memoryview], None]
+    compress: Callable[[int, "hashlib._Hash", bytes | bytearray], bytes]
+    prf: Callable[[int, bytes, bytes], bytes]
+    prf_msg: Callable[[int, bytes, bytes, bytes], bytes]
+    msg_expand: Callable[[bytes, bytes, bytes, int], bytes]
+
+
+_BACKENDS: Dict[str, HashBackend] = {
+    "sha256": HashBackend(
+        name="sha256",
+        absorb=_sha256_absorb,
+        bitmask=_sha256_bitmask,
+        bitmask_into=_sha256_bitmask_into,
+        compress=_sha256_compress,
+        prf=_sha256_prf,
+        prf_msg=_sha256_prf_msg,
+        msg_expand=_sha256_msg_expand,
+    ),
+    "shake256": HashBackend(
+        name="shake256",
+        absorb=_shake256_absorb,
+        bitmask=_shake256_bitmask,
+        bitmask_into=_shake256_bitmask_into,
+        compress=_shake256_compress,
+        prf=_shake256_prf,
+        prf_msg=_shake256_prf_msg,
+        msg_expand=_shake256_msg_expand,
+    ),
+}
+
+
+def get_hash_backend(params: Mapping[str, int | str]) -> HashBackend:
+    """
+    根据参数字典中的 "hash" 字段选择哈希后端。
+
+    输入：
+        params: 参数集合；缺省 "hash" 字段时沿用 SHA256（兼容 Stage-5 字典）。
+    输出：
+        HashBackend: 对应的后端函数表。
+    """
+
+    name = str(params.get("hash", _DEFAULT_HASH)).lower()
+    try:
+        return _BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unsupported hash backend {name!r}") from None
+
+
+_SCRATCH = threading.local()
+
+
+def _scratch(size: int) -> memoryview:
+    """
+    返回当前线程 size 字节的暂存视图。
+
+    SeededHash 按公钥缓存并在 WOTS 线程池间共享，暂存区因此按线程而非按对象持有；
+    扩容时换新的 bytearray 而不是原地 resize，避免与仍被引用的旧视图冲突。
+    """
+
+    buffer = getattr(_SCRATCH, "buffer", None)
+    if buffer is None or len(buffer) < size:
+        buffer = _SCRATCH.buffer = bytearray(size)
+    return memoryview(buffer)[:size]
+
+
+class SeededHash:
+    """
+    绑定单个 PK.seed 的 tweakable hash 上下文。
+
+    构造时按后端吸收 PK.seed 得到 hashlib 中间态，之后每次 thash 只需
+    copy() 中间态并追加 ADR || 输入，同一公钥下的所有 F/H/thash 共享该状态。
+    """
+
+    __slots__ = ("backend", "n", "pub_seed", "_state")
+
+    def __init__(self, backend: HashBackend, n: int, pub_seed: bytes) -> None:
+        self.backend = backend
+        self.n = n
+        self.pub_seed = pub_seed
+        self._state = backend.absorb(pub_seed)
+
+    def bitmask(self, address: bytes, out_len: int) -> bytes:
+        """生成 ADR 对应的 out_len 字节掩码。"""
+
+        return self.backend.bitmask(self._state, address, out_len)
+
+    def compress(self, address: bytes, masked: bytes | bytearray) -> bytes:
+        """对已掩码输入执行压缩，输出 n 字节。"""
+
+        return self.backend.compress(self.n, self._state, address + masked)
+
+    def thash_into(
+        self,
+        out: bytearray | memoryview,
+        address: bytes,
+        data: bytes | bytearray | memoryview,
+    ) -> None:
+        """
+        tweakable hash 写入版：ADR || 掩码写入当前线程复用的暂存缓冲区，掩码就地
+        生成并异或，压缩结果写入 out[:n]；暂存区只在遇到更长输入时重新分配。
+        """
+
+        payload = _scratch(ADR_BYTES + len(data))
+        payload[:ADR_BYTES] = address
+        body = payload[ADR_BYTES:]
+        self.backend.bitmask_into(self._state, address, body)
+        xor_into(body, data)
+        out[: self.n] = self.backend.compress(self.n, self._state, payload)
+
+    def thash(self, address: bytes, data: bytes | bytearray | memoryview) -> bytes:
+        """对拼接好的输入块（k × n 字节）执行 tweakable hash。"""
+
+        out = bytearray(self.n)
+        self.thash_into(out, address, data)
+        return bytes(out)
+
+
+@lru_cache(maxsize=64)
+def _cached_seeded_hash(name: str, n: int, pub_seed: bytes) -> SeededHash:
+    return SeededHash(_BACKENDS[name], n, pub_seed)
+
+
+def seeded_hash(params: Mapping[str, int | str], pub_seed: bytes) -> SeededHash:
+    """
+    获取 PK.seed 对应的共享哈希上下文（按公钥缓存，重复调用返回同一对象）。
+
+    输入：
+        params: 参数集合。
+        pub_seed: 公钥种子（n 字节）。
+    输出：
+        SeededHash: 已吸收 PK.seed 的上下文。
+    """
+
+    n = int(params["n"])
+    backend = get_hash_backend(params)
+    return _cached_seeded_hash(backend.name, n, ensure_bytes(pub_seed, length=n))
+
+
+ThashInputs = Sequence[bytes] | bytes | bytearray | memoryview
+
+
+def _thash_data(n: int, inputs: ThashInputs) -> bytes | bytearray | memoryview:
+    """将 thash 输入规整为连续的 k × n 字节缓冲区；已连续的缓冲区直接透传。"""
+
+    if isinstance(inputs, (bytes, bytearray, memoryview)):
+        if len(inputs) == 0 or len(inputs) % n != 0:
+            raise ValueError("thash input buffer must be a non-empty multiple of n bytes")
+        return inputs
+    if not inputs:
+        raise ValueError("thash requires at least one input block")
+    return b"".join(ensure_bytes(block, length=n) for block in inputs)
+
+
 def _thash(
     params: Mapping[str, int | str],
     pub_seed: bytes,
     address: bytes,
-    inputs: Sequence[bytes],
+    inputs: ThashInputs,
 ) -> bytes:
     """通用 tweakable hash，兼容 F/H/FORS 聚合场景。"""
 
     n = int(params["n"])
-    if not inputs:
-        raise ValueError("thash requires at least one input block")
-    pub_seed_n = ensure_bytes(pub_seed, length=n)
     addr_n = ensure_bytes(address, length=ADR_BYTES)
-    data = b"".join(ensure_bytes(block, length=n) for block in inputs)
-    bitmask = _mgf1(pub_seed_n + addr_n, len(data))
-    masked = xor_bytes(data, bitmask)
-    return _truncate_to_n(_sha256(pub_seed_n + addr_n + masked), params)
+    return seeded_hash(params, pub_seed).thash(addr_n, _thash_data(n, inputs))
+
+
+def thash_into(
+    out_buffer: bytearray | memoryview,
+    params: Mapping[str, int | str],
+    pub_seed: bytes,
+    address: bytes,
+    inputs: ThashInputs,
+) -> None:
+    """
+    tweakable hash 写入版，结果写入 out_buffer[:n]。
+
+    输入：
+        out_buffer: 可写缓冲区（长度 >= n），可为更大缓冲区的 memoryview 切片。
+        inputs: n 字节块序列，或已拼接好的 k × n 字节缓冲区（直接透传，不再复制）。
+    """
+
+    n = int(params["n"])
+    if len(out_buffer) < n:
+        raise ValueError("out_buffer shorter than n bytes")
+    if _INSTRUMENTATION_HOOK is not None:
+        _INSTRUMENTATION_HOOK("thash_into", 1)
+    addr_n = ensure_bytes(address, length=ADR_BYTES)
+    seeded_hash(params, pub_seed).thash_into(out_buffer, addr_n, _thash_data(n, inputs))
 
 
 def _fors_msg_bytes(params: Mapping[str, int | str]) -> int:
@@ -102,6 +454,8 @@ def F(
 ) -> bytes:
     """SPHINCS+ tweakable hash F。"""
 
+    if _INSTRUMENTATION_HOOK is not None:
+        _INSTRUMENTATION_HOOK("F", 1)
     return _thash(params, pub_seed, address, [message])
 
 
@@ -114,6 +468,8 @@ def H(
 ) -> bytes:
     """SPHINCS+ tweakable hash H（两输入 Merkle 压缩）。"""
 
+    if _INSTRUMENTATION_HOOK is not None:
+        _INSTRUMENTATION_HOOK("H", 1)
     return _thash(params, pub_seed, address, [left, right])
 
 
@@ -121,10 +477,12 @@ def thash_multi(
     params: Mapping[str, int | str],
     pub_seed: bytes,
     address: bytes,
-    inputs: Sequence[bytes],
+    inputs: ThashInputs,
 ) -> bytes:
-    """外部可用的多输入 tweakable hash。"""
+    """外部可用的多输入 tweakable hash（inputs 可为块序列或已拼接的缓冲区）。"""
 
+    if _INSTRUMENTATION_HOOK is not None:
+        _INSTRUMENTATION_HOOK("thash_multi", 1)
     return _thash(params, pub_seed, address, inputs)
 
 
@@ -135,15 +493,12 @@ def PRF(
 ) -> bytes:
     """SPHINCS+ PRF(SK.prf, ADR)。"""
 
+    if _INSTRUMENTATION_HOOK is not None:
+        _INSTRUMENTATION_HOOK("PRF", 1)
     n = int(params["n"])
     key_n = ensure_bytes(key, length=n)
     addr_n = ensure_bytes(address, length=ADR_BYTES)
-    block = bytearray(_SHA256_BLOCK_BYTES + ADR_BYTES)
-    block[:n] = key_n
-    # 其余补零，无需显式处理
-    block[_SHA256_BLOCK_BYTES : _SHA256_BLOCK_BYTES + ADR_BYTES] = addr_n
-    digest = _sha256(bytes(block))
-    return digest[:n]
+    return get_hash_backend(params).prf(n, key_n, addr_n)
 
 
 def PRF_msg(
@@ -154,12 +509,13 @@ def PRF_msg(
 ) -> bytes:
     """SPHINCS+ PRF_msg(SK.prf, optRand, M)。"""
 
+    if _INSTRUMENTATION_HOOK is not None:
+        _INSTRUMENTATION_HOOK("PRF_msg", 1)
     n = int(params["n"])
     key_n = ensure_bytes(key, length=n)
     opt_rand_n = ensure_bytes(opt_random, length=n)
     msg_bytes = ensure_bytes(message)
-    mac = _hmac_sha256(key_n, opt_rand_n + msg_bytes)
-    return mac[:n]
+    return get_hash_backend(params).prf_msg(n, key_n, opt_rand_n, msg_bytes)
 
 
 def H_msg(
@@ -170,6 +526,8 @@ def H_msg(
 ) -> Tuple[bytes, int, int]:
     """SPHINCS+ H_msg(R, PK, M) -> (digest, tree, leaf_idx)。"""
 
+    if _INSTRUMENTATION_HOOK is not None:
+        _INSTRUMENTATION_HOOK("H_msg", 1)
     n = int(params["n"])
     full_height = int(params["full_height"])
     tree_height = int(params["tree_height"])
@@ -183,8 +541,9 @@ def H_msg(
     pk_n = ensure_bytes(public_key)
     msg_bytes = ensure_bytes(message)
 
-    seed = _sha256(rand_n + pk_n + msg_bytes)
-    buf = _mgf1(seed, digest_bytes + tree_bytes + leaf_bytes)
+    buf = get_hash_backend(params).msg_expand(
+        rand_n, pk_n, msg_bytes, digest_bytes + tree_bytes + leaf_bytes
+    )
     digest = buf[:digest_bytes]
     offset = digest_bytes
 
@@ -197,4 +556,18 @@ def H_msg(
     return digest, tree, leaf
 
 
-__all__ = ["F", "H", "PRF", "PRF_msg", "H_msg", "thash_multi"]
+__all__ = [
+    "F",
+    "H",
+    "PRF",
+    "PRF_msg",
+    "H_msg",
+    "thash_multi",
+    "thash_into",
+    "HashBackend",
+    "SeededHash",
+    "get_hash_backend",
+    "notify_hash_calls",
+    "seeded_hash",
+    "set_instrumentation_hook",
+]
@@ -5,7 +5,13 @@
 @Date: 2025-03-18 12:00
 """
 
-from sphincs_hash import F, H, H_msg, PRF, PRF_msg
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from auxiliary_function import xor_bytes, xor_into
+from sphincs_hash import F, H, H_msg, PRF, PRF_msg, _mgf1, seeded_hash, thash_into, thash_multi
 from sphincs_params import get_params
 
 
@@ -57,3 +63,73 @@ def test_h_msg_vector():
     assert digest == bytes.fromhex(expected_digest)
     assert tree == 0x0D410EB91FA4B7
     assert leaf == 0x00A3
+
+
+@pytest.mark.parametrize("out_len", [0, 1, 31, 32, 33, 64, 565])
+def test_mgf1_matches_naive(out_len):
+    seed = bytes(range(48))
+    naive = b"".join(
+        hashlib.sha256(seed + counter.to_bytes(4, "big")).digest() for counter in range(out_len // 32 + 1)
+    )[:out_len]
+    assert _mgf1(seed, out_len) == naive
+
+
+@pytest.mark.parametrize("variant", ["sha256", "shake256"])
+def test_thash_into_matches_thash(variant):
+    params = get_params(variant=variant)
+    n = params["n"]
+    pub_seed = bytes.fromhex("00112233445566778899aabbccddeeff")
+    address = bytes(range(32))
+    blocks = [bytes([idx]) * n for idx in range(params["len"])]
+    # 写入更大缓冲区的切片，验证只覆盖 n 字节
+    out = bytearray(b"\xa5" * (3 * n))
+    thash_into(memoryview(out)[n : 2 * n], params, pub_seed, address, blocks)
+    assert bytes(out[n : 2 * n]) == thash_multi(params, pub_seed, address, blocks)
+    assert out[:n] == b"\xa5" * n and out[2 * n :] == b"\xa5" * n
+    # 连续缓冲区透传与块序列等价
+    assert thash_multi(params, pub_seed, address, b"".join(blocks)) == thash_multi(params, pub_seed, address, blocks)
+    single = bytearray(n)
+    thash_into(single, params, pub_seed, address, blocks[:1])
+    assert bytes(single) == F(params, pub_seed, address, blocks[0])
+    with pytest.raises(ValueError):
+        thash_into(bytearray(n), params, pub_seed, address, b"\x00" * (n + 1))
+
+
+
+@pytest.mark.parametrize("variant", ["sha256", "shake256"])
+def test_thash_into_reuses_scratch_across_sizes_and_threads(variant):
+    params = get_params(variant=variant)
+    n = params["n"]
+    hasher = seeded_hash(params, bytes(range(n)))
+    address = bytes(range(32))
+
+    def reference(data):
+        return hasher.compress(address, xor_bytes(hasher.bitmask(address, len(data)), data))
+
+    def run(seed):
+        # 长短输入交替，暂存区扩容后短输入仍只使用前缀
+        results = []
+        for blocks in (params["len"], 1, 2, params["len"], 1):
+            data = bytes((seed + idx) & 0xFF for idx in range(blocks * n))
+            out = bytearray(n)
+            hasher.thash_into(out, address, data)
+            results.append(bytes(out) == reference(data))
+        return all(results)
+
+    assert run(0)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        assert all(pool.map(run, range(16)))
+
+
+def test_xor_helpers():
+    left = bytes(range(40))
+    right = bytes(reversed(range(40)))
+    expected = bytes(a ^ b for a, b in zip(left, right))
+    assert xor_bytes(left, right) == expected
+    buffer = bytearray(left)
+    xor_into(memoryview(buffer)[:], right)
+    assert bytes(buffer) == expected
+    with pytest.raises(ValueError):
+        xor_bytes(left, right[:-1])
+    with pytest.raises(ValueError):
+        xor_into(bytearray(4), b"\x00" * 5)
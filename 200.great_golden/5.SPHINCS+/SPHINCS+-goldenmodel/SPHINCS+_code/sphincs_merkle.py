@@ -65,14 +65,14 @@ def l_tree(
     pk_bytes = ensure_bytes(wots_pk)
     if len(pk_bytes) % n != 0:
         raise ValueError("wots_pk length must be a multiple of n")
-    nodes: List[bytes] = [pk_bytes[i : i + n] for i in range(0, len(pk_bytes), n)]
-    if not nodes:
+    if not pk_bytes:
         raise ValueError("wots_pk must contain at least one chunk")
     base_words = _normalize_address(base_address)
     set_type(base_words, ADDR_TYPE_WOTSPK)
     # Stage-5（SHA256-L1）直接使用 tweakable hash 压缩整个 WOTS+ 公钥，
     # 与参考实现的 thash 调用保持一致。
-    return thash_multi(params, pub_seed_n, address_to_bytes(base_words), nodes)
+    # 整个公钥缓冲区直接透传给 thash，不再切分为 len 个 n 字节块后重新拼接
+    return thash_multi(params, pub_seed_n, address_to_bytes(base_words), pk_bytes)
 
 
 def compute_subtree_authentication(
@@ -1,48 +1,123 @@
 """
-@Descripttion: SPHINCS+ 参数集合（Stage-0 占位版）
-@version: V0.1
+@Descripttion: SPHINCS+ 参数集合（Stage-6 多参数集版本）
+@version: V0.6
 @Author: GoldenModel-Team
-@Date: 2025-03-15 12:00
+@Date: 2025-04-10 12:00
+
+参数表对齐 NIST 第一轮提交（NIST-PQ-Submission-SPHINCS-20171130）中的
+params.h：覆盖 SHA256 / SHAKE256 两种哈希后端与 128/192/256 × s/f 六种
+安全等级/速度组合，派生字段（len_1/len_2/tree_height 等）按参考实现公式计算。
 """
 
 from __future__ import annotations
 
-from typing import Dict
-
-_SHA256_LEVEL1_PARAMS: Dict[str, int | str] = {
-    "name": "sha256-128s",
-    "n": 16,
-    "h": 64,
-    "full_height": 64,
-    "d": 8,
-    "tree_height": 8,
-    "w": 16,
-    "len_1": 32,
-    "len_2": 3,
-    "len": 35,
-    "k": 10,
-    "a": 15,
-    "fors_height": 15,
-    "fors_trees": 10,
-    "optrand_bytes": 32,
+from typing import Dict, List, Tuple
+
+_WOTS_W = 16
+_OPTRAND_BYTES = 32
+
+# (n, full_height, d, fors_height, fors_trees)，键为 (level, profile)
+_BASE_PARAMS: Dict[Tuple[int, str], Tuple[int, int, int, int, int]] = {
+    (1, "s"): (16, 64, 8, 15, 10),
+    (1, "f"): (16, 60, 20, 9, 30),
+    (3, "s"): (24, 64, 8, 16, 14),
+    (3, "f"): (24, 66, 22, 8, 33),
+    (5, "s"): (32, 64, 8, 14, 22),
+    (5, "f"): (32, 68, 17, 10, 30),
 }
 
+_LEVEL_BITS = {1: 128, 3: 192, 5: 256}
+
+_HASH_VARIANTS = ("sha256", "shake256")
+
+_VARIANT_ALIASES = {
+    "sha256": "sha256",
+    "sha2": "sha256",
+    "shake256": "shake256",
+    "shake": "shake256",
+}
+
+
+def _wots_lengths(n: int, w: int) -> Tuple[int, int]:
+    """按参考实现计算 WOTS+ 的 len_1 / len_2。"""
+
+    log_w = w.bit_length() - 1
+    len_1 = 8 * n // log_w
+    max_checksum = len_1 * (w - 1)
+    len_2 = (max_checksum.bit_length() - 1) // log_w + 1
+    return len_1, len_2
+
+
+def _build_params(variant: str, level: int, profile: str) -> Dict[str, int | str]:
+    n, full_height, d, fors_height, fors_trees = _BASE_PARAMS[(level, profile)]
+    len_1, len_2 = _wots_lengths(n, _WOTS_W)
+    return {
+        "name": f"{variant}-{_LEVEL_BITS[level]}{profile}",
+        "hash": variant,
+        "level": level,
+        "profile": profile,
+        "n": n,
+        "h": full_height,
+        "full_height": full_height,
+        "d": d,
+        "tree_height": full_height // d,
+        "w": _WOTS_W,
+        "len_1": len_1,
+        "len_2": len_2,
+        "len": len_1 + len_2,
+        "k": fors_trees,
+        "a": fors_height,
+        "fors_height": fors_height,
+        "fors_trees": fors_trees,
+        "optrand_bytes": _OPTRAND_BYTES,
+    }
 
-def get_params(level: int = 1, variant: str = "sha256") -> Dict[str, int | str]:
+
+_PARAM_SETS: Dict[str, Dict[str, int | str]] = {}
+for _variant in _HASH_VARIANTS:
+    for (_level, _profile) in _BASE_PARAMS:
+        _entry = _build_params(_variant, _level, _profile)
+        _PARAM_SETS[str(_entry["name"])] = _entry
+
+
+def get_params(level: int = 1, variant: str = "sha256", profile: str = "s") -> Dict[str, int | str]:
     """
-    根据安全等级与哈希后端获取参数集合。
+    根据安全等级、哈希后端与速度档位获取参数集合。
 
     输入：
-        level (int): 安全等级编号，目前仅支持 1。
-        variant (str): 哈希后端标识，阶段 0 限定为 "sha256"。
+        level (int): 安全等级编号，支持 1 / 3 / 5（对应 128 / 192 / 256 bit）。
+        variant (str): 哈希后端标识，支持 "sha256" / "shake256"（兼容 "sha2" / "shake" 简写）。
+        profile (str): "s"（小签名）或 "f"（快速签名），默认 "s"。
     输出：
         Dict[str, int | str]: 对应参数字典的浅拷贝，用于后续模块初始化。
     """
-    if level != 1:
-        raise ValueError("Only level 1 parameters are available in Stage 0")
-    if variant.lower() != "sha256":
-        raise ValueError("Only sha256 variant is available in Stage 0")
-    return dict(_SHA256_LEVEL1_PARAMS)
+
+    if level not in _LEVEL_BITS:
+        raise ValueError(f"Unsupported security level {level}; expected one of 1, 3, 5")
+    backend = _VARIANT_ALIASES.get(variant.lower())
+    if backend is None:
+        raise ValueError(f"Unsupported hash variant {variant!r}; expected sha256 or shake256")
+    profile_key = profile.lower()
+    if profile_key not in ("s", "f"):
+        raise ValueError(f"Unsupported profile {profile!r}; expected 's' or 'f'")
+    return dict(_PARAM_SETS[f"{backend}-{_LEVEL_BITS[level]}{profile_key}"])
+
+
+def get_params_by_name(name: str) -> Dict[str, int | str]:
+    """按参数集名称（如 "shake256-192f"）获取参数字典副本。"""
+
+    key = name.lower()
+    if key.startswith("sphincs-"):
+        key = key[len("sphincs-") :]
+    if key not in _PARAM_SETS:
+        raise ValueError(f"Unknown SPHINCS+ parameter set {name!r}")
+    return dict(_PARAM_SETS[key])
+
+
+def list_param_sets() -> List[str]:
+    """列出全部可用参数集名称。"""
+
+    return list(_PARAM_SETS)
 
 
-__all__ = ["get_params"]
+__all__ = ["get_params", "get_params_by_name", "list_param_sets"]
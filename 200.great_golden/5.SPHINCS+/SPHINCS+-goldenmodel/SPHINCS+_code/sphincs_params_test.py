@@ -0,0 +1,72 @@
+"""
+@Descripttion: SPHINCS+ 参数集合测试（Stage-6）
+@version: V0.6
+@Author: GoldenModel-Team
+@Date: 2025-04-10 12:00
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from sphincs_hash import F, get_hash_backend
+from sphincs_params import get_params, get_params_by_name, list_param_sets
+
+
+def _signature_length(params: dict[str, int | str]) -> int:
+    n = int(params["n"])
+    wots_len = int(params["len"]) * n
+    auth_len = int(params["tree_height"]) * n
+    fors_len = int(params["fors_trees"]) * (int(params["fors_height"]) + 1) * n
+    return n + fors_len + int(params["d"]) * (wots_len + auth_len)
+
+
+@pytest.mark.parametrize(
+    "level, profile, expected_len, expected_sig",
+    [
+        (1, "s", 35, 8080),
+        (1, "f", 35, 16976),
+        (3, "s", 51, 17064),
+        (3, "f", 51, 35664),
+        (5, "s", 67, 29792),
+        (5, "f", 67, 49216),
+    ],
+)
+@pytest.mark.parametrize("variant", ["sha256", "shake256"])
+def test_param_table_sizes(variant: str, level: int, profile: str, expected_len: int, expected_sig: int) -> None:
+    params = get_params(level=level, variant=variant, profile=profile)
+    assert params["hash"] == variant
+    assert int(params["len"]) == expected_len
+    assert int(params["tree_height"]) * int(params["d"]) == int(params["full_height"])
+    assert _signature_length(params) == expected_sig
+    assert get_params_by_name(str(params["name"])) == params
+
+
+def test_default_params_unchanged() -> None:
+    params = get_params()
+    assert params["name"] == "sha256-128s"
+    assert (params["n"], params["d"], params["tree_height"], params["len"]) == (16, 8, 8, 35)
+    assert len(list_param_sets()) == 12
+
+
+def test_invalid_selection_rejected() -> None:
+    with pytest.raises(ValueError):
+        get_params(level=2)
+    with pytest.raises(ValueError):
+        get_params(variant="haraka")
+    with pytest.raises(ValueError):
+        get_params(profile="x")
+    with pytest.raises(ValueError):
+        get_params_by_name("sha256-512s")
+
+
+def test_backend_dispatch() -> None:
+    sha_params = get_params(variant="sha256")
+    shake_params = get_params(variant="shake")
+    assert get_hash_backend(sha_params).name == "sha256"
+    assert get_hash_backend(shake_params).name == "shake256"
+    pub_seed = bytes(range(16))
+    address = bytes(32)
+    message = b"\x0f" * 16
+    assert F(sha_params, pub_seed, address, message) != F(shake_params, pub_seed, address, message)
+    assert len(F(shake_params, pub_seed, address, message)) == 16
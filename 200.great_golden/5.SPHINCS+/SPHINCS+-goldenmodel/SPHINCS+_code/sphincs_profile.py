@@ -0,0 +1,125 @@
+"""
+@Descripttion: SPHINCS+ 哈希调用计数与阶段耗时插桩（Stage-6）
+@version: V0.6
+@Author: GoldenModel-Team
+@Date: 2025-04-16 12:00
+
+HashProfiler 为可选插桩：进入上下文时通过 sphincs_hash.set_instrumentation_hook
+安装计数回调，并临时包装 SPHINCS_plus 命名空间中的 FORS / WOTS+ / L-tree /
+Merkle 基元以统计各阶段的独占耗时；退出时全部复原，不影响常规调用路径。
+"""
+
+from __future__ import annotations
+
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Tuple
+
+import SPHINCS_plus
+from sphincs_hash import set_instrumentation_hook
+
+# 阶段名 -> SPHINCS_plus 模块中被包装的函数名
+STAGE_FUNCTIONS: Dict[str, Tuple[str, ...]] = {
+    "message": ("PRF_msg", "H_msg"),
+    "fors": ("fors_sign", "fors_pk_from_sig"),
+    "wots": ("wots_gen_pk_many", "wots_sign", "wots_pk_from_sig"),
+    "l_tree": ("l_tree",),
+    "merkle": ("compute_subtree_authentication", "compute_subtree_root", "compute_root_from_auth_path"),
+}
+
+OTHER_STAGE = "other"
+
+
+class HashProfiler:
+    """
+    哈希调用计数 + 分阶段独占耗时统计。
+
+    用法：
+        with HashProfiler() as profiler:
+            Sign(sk, message, params)
+        report = profiler.snapshot()
+
+    嵌套阶段（例如 Merkle 叶节点回调内部的 WOTS+ / L-tree）只计入最内层阶段，
+    各阶段耗时之和等于上下文内的总耗时。verify_many 分发到子进程的部分不计入。
+    """
+
+    def __init__(self) -> None:
+        self.counts: Counter[str] = Counter()
+        self.stage_counts: Dict[str, Counter[str]] = {}
+        self.stage_seconds: Dict[str, float] = {}
+        self._stack: List[str] = [OTHER_STAGE]
+        self._mark = 0.0
+        self._saved: Dict[str, Callable] = {}
+        self._previous_hook: Callable[[str, int], None] | None = None
+
+    def reset(self) -> None:
+        """清空已累计的计数与耗时（保持插桩状态）。"""
+
+        self.counts.clear()
+        self.stage_counts.clear()
+        self.stage_seconds.clear()
+        self._mark = time.perf_counter()
+
+    def _record(self, name: str, count: int) -> None:
+        self.counts[name] += count
+        stage = self._stack[-1]
+        self.stage_counts.setdefault(stage, Counter())[name] += count
+
+    def _charge(self) -> None:
+        now = time.perf_counter()
+        stage = self._stack[-1]
+        self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + (now - self._mark)
+        self._mark = now
+
+    def _wrap(self, stage: str, func: Callable) -> Callable:
+        def wrapper(*args, **kwargs):
+            self._charge()
+            self._stack.append(stage)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._charge()
+                self._stack.pop()
+
+        wrapper.__wrapped__ = func  # type: ignore[attr-defined]
+        return wrapper
+
+    def __enter__(self) -> "HashProfiler":
+        for stage, names in STAGE_FUNCTIONS.items():
+            for name in names:
+                original = getattr(SPHINCS_plus, name)
+                self._saved[name] = original
+                setattr(SPHINCS_plus, name, self._wrap(stage, original))
+        self._previous_hook = set_instrumentation_hook(self._record)
+        self._stack = [OTHER_STAGE]
+        self._mark = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._charge()
+        set_instrumentation_hook(self._previous_hook)
+        for name, original in self._saved.items():
+            setattr(SPHINCS_plus, name, original)
+        self._saved.clear()
+
+    def snapshot(self) -> Dict[str, object]:
+        """
+        导出 JSON 友好的统计结果。
+
+        输出：
+            {"hash_calls": {...}, "stages": {stage: {"seconds": float, "hash_calls": {...}}}}
+        """
+
+        stages: Dict[str, Dict[str, object]] = {}
+        for stage in set(self.stage_seconds) | set(self.stage_counts):
+            stages[stage] = {
+                "seconds": self.stage_seconds.get(stage, 0.0),
+                "hash_calls": dict(sorted(self.stage_counts.get(stage, Counter()).items())),
+            }
+        return {
+            "hash_calls": dict(sorted(self.counts.items())),
+            "stages": dict(sorted(stages.items())),
+        }
+
+
+__all__ = ["HashProfiler", "STAGE_FUNCTIONS", "OTHER_STAGE"]
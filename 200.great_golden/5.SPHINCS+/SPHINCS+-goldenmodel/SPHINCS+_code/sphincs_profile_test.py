@@ -0,0 +1,73 @@
+"""
+@Descripttion: SPHINCS+ 插桩与 benchmark 测试（Stage-6）
+@version: V0.6
+@Author: GoldenModel-Team
+@Date: 2025-04-16 12:00
+"""
+
+from __future__ import annotations
+
+import json
+
+import SPHINCS_plus
+from Benchmark_SPHINCS_plus import main as benchmark_main
+from sphincs_hash import F, set_instrumentation_hook
+from sphincs_params import get_params
+from sphincs_profile import HashProfiler
+from sphincs_utils import derive_wots_address
+from sphincs_wots import wots_gen_pk
+
+
+def test_wots_keygen_hash_counts() -> None:
+    params = get_params()
+    n = int(params["n"])
+    length = int(params["len"])
+    w = int(params["w"])
+    with HashProfiler() as profiler:
+        wots_gen_pk(params, bytes(n), bytes(range(n)), derive_wots_address(0, 0, 0, 0, 0))
+    calls = profiler.snapshot()["hash_calls"]
+    assert calls["PRF"] == length
+    assert calls["F"] == length * (w - 1)
+    # 每次 F：一次 MGF1 掩码块 + 一次压缩
+    assert calls["_sha256"] == length + 2 * length * (w - 1)
+
+
+def test_profiler_stage_breakdown_and_restore() -> None:
+    params = get_params(profile="f")
+    original_l_tree = SPHINCS_plus.l_tree
+    pk, sk = SPHINCS_plus.KeyGen(params, seed=bytes(3 * int(params["n"])))
+    signature = SPHINCS_plus.Sign(sk, b"profile", params)
+    with HashProfiler() as profiler:
+        assert SPHINCS_plus.Verify(pk, b"profile", signature, params)
+    report = profiler.snapshot()
+    stages = report["stages"]
+    assert {"fors", "wots", "l_tree", "merkle", "message"} <= set(stages)
+    assert stages["wots"]["hash_calls"]["F"] == report["hash_calls"]["F"] - int(params["fors_trees"])
+    assert stages["l_tree"]["hash_calls"]["thash_multi"] == int(params["d"])
+    assert stages["merkle"]["hash_calls"]["H"] == int(params["d"]) * int(params["tree_height"])
+    assert SPHINCS_plus.l_tree is original_l_tree
+    assert set_instrumentation_hook(None) is None
+
+
+def test_instrumentation_hook_is_opt_in() -> None:
+    seen = []
+    params = get_params()
+    previous = set_instrumentation_hook(lambda name, count: seen.append((name, count)))
+    try:
+        F(params, bytes(16), bytes(32), bytes(16))
+    finally:
+        set_instrumentation_hook(previous)
+    assert ("F", 1) in seen
+    F(params, bytes(16), bytes(32), bytes(16))
+    assert len([entry for entry in seen if entry[0] == "F"]) == 1
+
+
+def test_benchmark_json_report(tmp_path) -> None:
+    output = tmp_path / "bench.json"
+    benchmark_main(["--params", "shake256-128f", "--count", "1", "--output", str(output)])
+    report = json.loads(output.read_text(encoding="utf-8"))
+    result = report["results"][0]
+    assert result["name"] == "shake256-128f"
+    assert result["failures"] == 0
+    assert set(result["timing"]) == {"KeyGen", "Sign", "Verify"}
+    assert result["profile"]["Verify"]["hash_calls"]["_shake256"] > 0
@@ -1,27 +1,34 @@
 """
-@Descripttion: SPHINCS+ WOTS+ 基元实现（Stage-2 版本）
-@version: V0.3
+@Descripttion: SPHINCS+ WOTS+ 基元实现（Stage-6 批量链版本）
+@version: V0.4
 @Author: GoldenModel-Team
-@Date: 2025-03-20 12:00
+@Date: 2025-04-12 12:00
 
 对齐 CRYSTALS-Kyber / Dilithium 黄金模型的注释与接口风格，
 提供链函数、密钥生成、签名与验证流程。
+密钥生成 / 签名 / 公钥恢复统一走批量链引擎：同一 WOTS+ 密钥（或整棵子树
+全部密钥）的所有链按哈希位置同步推进，地址与掩码按位置批量准备。
 """
 
 from __future__ import annotations
 
-from typing import List, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Mapping, Sequence
 
 from auxiliary_function import (
     ADR_BYTES,
+    ADR_WORD_BYTES,
     address_to_bytes,
     bytes_to_address,
     copy_address,
     ensure_bytes,
-    set_chain_addr,
     set_hash_addr,
 )
-from sphincs_hash import F, PRF
+from sphincs_hash import F, SeededHash, get_hash_backend, notify_hash_calls, seeded_hash
+
+# 地址第 6 个字（chain）起始偏移与第 7 个字（hash）起始偏移
+_CHAIN_WORD_OFFSET = ADR_BYTES - 2 * ADR_WORD_BYTES
+_HASH_WORD_OFFSET = ADR_BYTES - ADR_WORD_BYTES
 
 
 def _log_w(params: Mapping[str, int | str]) -> tuple[int, int]:
@@ -116,14 +123,158 @@ def wots_chain(
     return result
 
 
-def _generate_secret_element(
+def _run_chains(
+    hasher: SeededHash,
+    addr_prefixes: Sequence[bytes],
+    values: Sequence[bytes],
+    start_indices: Sequence[int],
+    steps: Sequence[int],
+) -> List[bytes]:
+    """
+    批量链引擎核心：所有链按哈希位置同步推进。
+
+    每一轮先为仍在推进的链批量生成 ADR 与掩码（掩码只依赖地址，
+    与链值无关），再逐链完成异或与压缩；PK.seed 由共享上下文预吸收。
+    """
+
+    n = hasher.n
+    current = list(values)
+    max_steps = max(steps, default=0)
+    hash_words = [idx.to_bytes(ADR_WORD_BYTES, "big") for idx in range(max(start_indices, default=0) + max_steps + 1)]
+    active = list(range(len(current)))
+    for step in range(max_steps):
+        active = [idx for idx in active if steps[idx] > step]
+        notify_hash_calls("F", len(active))
+        addrs = [addr_prefixes[idx] + hash_words[start_indices[idx] + step] for idx in active]
+        masks = [hasher.bitmask(addr, n) for addr in addrs]
+        for idx, addr, mask in zip(active, addrs, masks):
+            masked = (int.from_bytes(current[idx], "big") ^ int.from_bytes(mask, "big")).to_bytes(n, "big")
+            current[idx] = hasher.compress(addr, masked)
+    return current
+
+
+def wots_chains_batch(
+    params: Mapping[str, int | str],
+    pub_seed: bytes,
+    addresses: Sequence[bytes],
+    values: Sequence[bytes],
+    start_indices: Sequence[int],
+    steps: Sequence[int],
+    *,
+    workers: int | None = None,
+) -> List[bytes]:
+    """
+    批量 WOTS+ 链函数，逐条结果与 wots_chain 完全一致。
+
+    输入：
+        params: 参数集合。
+        pub_seed: 公钥种子（n 字节）。
+        addresses: 每条链的 32 字节地址（hash 字段由引擎覆盖）。
+        values: 每条链的起始值（n 字节）。
+        start_indices: 每条链的起始位置。
+        steps: 每条链需迭代的次数。
+        workers: 线程数；> 1 时按链划分到线程池。hashlib 仅在输入
+            超过 2 KiB 时释放 GIL，单次 F 输入很短，默认串行执行。
+    输出：
+        List[bytes]: 每条链的终点值（n 字节）。
+    """
+
+    n = int(params["n"])
+    w = int(params["w"])
+    count = len(addresses)
+    if not len(values) == len(start_indices) == len(steps) == count:
+        raise ValueError("batch inputs must have equal lengths")
+    for start_idx, step_count in zip(start_indices, steps):
+        if start_idx < 0 or step_count < 0:
+            raise ValueError("start index and steps must be non-negative")
+        if start_idx + step_count > w - 1:
+            raise ValueError("start_idx + steps exceeds chain length")
+    addr_prefixes = [ensure_bytes(address, length=ADR_BYTES)[:_HASH_WORD_OFFSET] for address in addresses]
+    start_values = [ensure_bytes(value, length=n) for value in values]
+    hasher = seeded_hash(params, pub_seed)
+
+    if workers is None or workers <= 1 or count <= 1:
+        return _run_chains(hasher, addr_prefixes, start_values, start_indices, steps)
+
+    groups = [list(range(offset, count, workers)) for offset in range(min(workers, count))]
+    results: List[bytes] = [b""] * count
+    with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+        futures = [
+            executor.submit(
+                _run_chains,
+                hasher,
+                [addr_prefixes[idx] for idx in group],
+                [start_values[idx] for idx in group],
+                [start_indices[idx] for idx in group],
+                [steps[idx] for idx in group],
+            )
+            for group in groups
+        ]
+        for group, future in zip(groups, futures):
+            for idx, value in zip(group, future.result()):
+                results[idx] = value
+    return results
+
+
+def _chain_addresses(
+    params: Mapping[str, int | str],
+    base_address: bytes,
+) -> List[bytes]:
+    """为单个 WOTS+ 密钥的 len 条链批量构造地址（hash 字段置 0）。"""
+
+    length = int(params["len"])
+    base_words = copy_address(bytes_to_address(ensure_bytes(base_address, length=ADR_BYTES)))
+    prefix = address_to_bytes(base_words)[:_CHAIN_WORD_OFFSET]
+    zero_hash = bytes(ADR_WORD_BYTES)
+    return [prefix + chain_idx.to_bytes(ADR_WORD_BYTES, "big") + zero_hash for chain_idx in range(length)]
+
+
+def _generate_secret_elements(
     params: Mapping[str, int | str],
     sk_seed: bytes,
-    address_words: List[int],
-) -> bytes:
+    chain_addresses: Sequence[bytes],
+) -> List[bytes]:
     n = int(params["n"])
     sk_seed_n = ensure_bytes(sk_seed, length=n)
-    return PRF(params, sk_seed_n, address_to_bytes(address_words))
+    backend = get_hash_backend(params)
+    notify_hash_calls("PRF", len(chain_addresses))
+    return [backend.prf(n, sk_seed_n, address) for address in chain_addresses]
+
+
+def wots_gen_pk_many(
+    params: Mapping[str, int | str],
+    sk_seed: bytes,
+    pub_seed: bytes,
+    base_addresses: Sequence[bytes],
+    *,
+    workers: int | None = None,
+) -> List[bytes]:
+    """
+    批量生成多个 WOTS+ 公钥（如一棵子树的全部叶子），所有链同步推进。
+
+    输入：
+        base_addresses: 每个密钥的 WOTS 基地址。
+        workers: 透传给 wots_chains_batch 的线程数。
+    输出：
+        List[bytes]: 与 base_addresses 一一对应的公钥（len × n 字节）。
+    """
+
+    length = int(params["len"])
+    w = int(params["w"])
+    addresses: List[bytes] = []
+    for base_address in base_addresses:
+        addresses.extend(_chain_addresses(params, base_address))
+    secrets_ = _generate_secret_elements(params, sk_seed, addresses)
+    ends = wots_chains_batch(
+        params,
+        pub_seed,
+        addresses,
+        secrets_,
+        [0] * len(addresses),
+        [w - 1] * len(addresses),
+        workers=workers,
+    )
+    return [b"".join(ends[idx : idx + length]) for idx in range(0, len(ends), length)]
 
 
 def wots_gen_pk(
@@ -136,25 +287,7 @@ def wots_gen_pk(
     基于种子生成 WOTS+ 公钥（len × n 字节）。
     """
 
-    length = int(params["len"])
-    base_words = copy_address(bytes_to_address(ensure_bytes(base_address, length=ADR_BYTES)))
-    pk_chunks: List[bytes] = []
-    for chain_idx in range(length):
-        addr_words = copy_address(base_words)
-        set_chain_addr(addr_words, chain_idx)
-        set_hash_addr(addr_words, 0)
-        sk_element = _generate_secret_element(params, sk_seed, addr_words)
-        pk_chunks.append(
-            wots_chain(
-                params,
-                sk_element,
-                0,
-                int(params["w"]) - 1,
-                pub_seed,
-                address_to_bytes(addr_words),
-            )
-        )
-    return b"".join(pk_chunks)
+    return wots_gen_pk_many(params, sk_seed, pub_seed, [base_address])[0]
 
 
 def wots_sign(
@@ -169,24 +302,17 @@ def wots_sign(
     """
 
     chain_lengths = _chain_lengths(params, message)
-    base_words = copy_address(bytes_to_address(ensure_bytes(base_address, length=ADR_BYTES)))
-    signature_chunks: List[bytes] = []
-    for chain_idx, steps in enumerate(chain_lengths):
-        addr_words = copy_address(base_words)
-        set_chain_addr(addr_words, chain_idx)
-        set_hash_addr(addr_words, 0)
-        sk_element = _generate_secret_element(params, sk_seed, addr_words)
-        signature_chunks.append(
-            wots_chain(
-                params,
-                sk_element,
-                0,
-                steps,
-                pub_seed,
-                address_to_bytes(addr_words),
-            )
-        )
-    return b"".join(signature_chunks)
+    addresses = _chain_addresses(params, base_address)
+    secrets_ = _generate_secret_elements(params, sk_seed, addresses)
+    ends = wots_chains_batch(
+        params,
+        pub_seed,
+        addresses,
+        secrets_,
+        [0] * len(addresses),
+        chain_lengths,
+    )
+    return b"".join(ends)
 
 
 def wots_pk_from_sig(
@@ -202,29 +328,21 @@ def wots_pk_from_sig(
 
     n = int(params["n"])
     length = int(params["len"])
+    w = int(params["w"])
     if len(signature) != length * n:
         raise ValueError("invalid signature length")
     chain_lengths = _chain_lengths(params, message)
-    base_words = copy_address(bytes_to_address(ensure_bytes(base_address, length=ADR_BYTES)))
-    pk_chunks: List[bytes] = []
-    for chain_idx in range(length):
-        start_idx = chain_lengths[chain_idx]
-        steps = int(params["w"]) - 1 - start_idx
-        addr_words = copy_address(base_words)
-        set_chain_addr(addr_words, chain_idx)
-        set_hash_addr(addr_words, start_idx)
-        element = ensure_bytes(signature[chain_idx * n : (chain_idx + 1) * n], length=n)
-        pk_chunks.append(
-            wots_chain(
-                params,
-                element,
-                start_idx,
-                steps,
-                pub_seed,
-                address_to_bytes(addr_words),
-            )
-        )
-    return b"".join(pk_chunks)
+    sig_view = memoryview(signature)
+    elements = [sig_view[idx * n : (idx + 1) * n] for idx in range(length)]
+    ends = wots_chains_batch(
+        params,
+        pub_seed,
+        _chain_addresses(params, base_address),
+        elements,
+        chain_lengths,
+        [w - 1 - start_idx for start_idx in chain_lengths],
+    )
+    return b"".join(ends)
 
 
 def wots_verify(
@@ -245,7 +363,9 @@ def wots_verify(
 
 __all__ = [
     "wots_chain",
+    "wots_chains_batch",
     "wots_gen_pk",
+    "wots_gen_pk_many",
     "wots_sign",
     "wots_pk_from_sig",
     "wots_verify",
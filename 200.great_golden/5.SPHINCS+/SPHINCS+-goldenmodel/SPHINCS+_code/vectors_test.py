@@ -1,4 +1,4 @@
-"""Stage-5: 官方 KAT 向量对齐测试。"""
+"""Stage-6: 官方 KAT 向量对齐测试（SHA256 / SHAKE256 多参数集）。"""
 
 from __future__ import annotations
 
@@ -9,7 +9,7 @@ from typing import Dict, List
 import pytest
 
 from SPHINCS_plus import Verify
-from sphincs_params import get_params
+from sphincs_params import get_params_by_name
 
 
 @dataclass
@@ -72,12 +72,29 @@ def _parse_rsp(path: Path, limit: int | None = None) -> List[KatVector]:
     return vectors
 
 
-def _vector_path() -> Path:
-    base = Path(__file__).resolve().parent
-    target = base.parent.parent / "1.sphincs+-submission-nist" / "NIST-PQ-Submission-SPHINCS-20171130" / "KAT" / "sphincs-sha256-128s" / "PQCsignKAT_64.rsp"
-    if not target.exists():
-        pytest.skip("官方向量文件未找到，跳过 KAT 对齐测试", allow_module_level=True)
-    return target
+_KAT_ROOT = (
+    Path(__file__).resolve().parent.parent.parent
+    / "0.sphincs+-submission-nist"
+    / "NIST-PQ-Submission-SPHINCS-20171130"
+    / "KAT"
+)
+
+# 仓库中附带 .rsp 响应文件的参数集（其余仅有 .req 请求文件）
+_KAT_SETS = [
+    "sha256-128s",
+    "sha256-128f",
+    "sha256-192s",
+    "shake256-128s",
+    "shake256-128f",
+    "shake256-192s",
+]
+
+
+def _vector_path(name: str) -> Path:
+    matches = sorted((_KAT_ROOT / f"sphincs-{name}").glob("PQCsignKAT_*.rsp"))
+    if not matches:
+        pytest.skip(f"官方向量文件未找到（{name}），跳过 KAT 对齐测试")
+    return matches[0]
 
 
 def _expected_sig_len(params: Dict[str, int | str]) -> int:
@@ -92,9 +109,10 @@ def _expected_sig_len(params: Dict[str, int | str]) -> int:
     return n + fors_len + d * (wots_len + auth_len)
 
 
-@pytest.mark.parametrize("vector", _parse_rsp(_vector_path(), limit=1))
-def test_official_vectors_verify(vector: KatVector) -> None:
-    params = get_params()
+@pytest.mark.parametrize("name", _KAT_SETS)
+def test_official_vectors_verify(name: str) -> None:
+    params = get_params_by_name(name)
+    vector = _parse_rsp(_vector_path(name), limit=1)[0]
     sig_len = _expected_sig_len(params)
     assert sig_len + len(vector.message) == vector.signature_len
 
@@ -116,3 +134,6 @@ def test_official_vectors_verify(vector: KatVector) -> None:
 
     # 验证签名
     assert Verify(public_key, vector.message, signature, params)
+    tampered = bytearray(signature)
+    tampered[int(params["n"])] ^= 0x01
+    assert not Verify(public_key, vector.message, bytes(tampered), params)
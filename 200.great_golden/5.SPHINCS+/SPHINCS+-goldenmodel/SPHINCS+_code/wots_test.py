@@ -1,5 +1,5 @@
 """
-@Descripttion: SPHINCS+ WOTS+ 基元测试（Stage-2）
+@Descripttion: SPHINCS+ WOTS+ 基元测试（Stage-2，Stage-6 补充批量链）
 @version: V0.3
 @Author: GoldenModel-Team
 @Date: 2025-03-20 12:00
@@ -11,7 +11,15 @@ import pytest
 
 from sphincs_params import get_params
 from sphincs_utils import derive_wots_address
-from sphincs_wots import wots_gen_pk, wots_pk_from_sig, wots_sign, wots_verify
+from sphincs_wots import (
+    wots_chain,
+    wots_chains_batch,
+    wots_gen_pk,
+    wots_gen_pk_many,
+    wots_pk_from_sig,
+    wots_sign,
+    wots_verify,
+)
 
 
 @pytest.fixture(name="wots_context")
@@ -46,3 +54,29 @@ def test_wots_pk_length(wots_context):
     params, sk_seed, pub_seed, base_address, _ = wots_context
     pk = wots_gen_pk(params, sk_seed, pub_seed, base_address)
     assert len(pk) == int(params["len"]) * int(params["n"])
+
+
+def test_wots_chains_batch_matches_single_chain(wots_context):
+    params, _, pub_seed, _, _ = wots_context
+    n = int(params["n"])
+    addresses = [derive_wots_address(1, 5, keypair, chain, 0) for keypair in range(2) for chain in range(4)]
+    values = [bytes([idx]) * n for idx in range(len(addresses))]
+    starts = [0, 3, 7, 14, 1, 0, 5, 2]
+    steps = [15, 4, 0, 1, 9, 12, 10, 13]
+    expected = [
+        wots_chain(params, value, start, step, pub_seed, derive_wots_address(1, 5, keypair, chain, start))
+        for value, start, step, (keypair, chain) in zip(
+            values, starts, steps, [(k, c) for k in range(2) for c in range(4)]
+        )
+    ]
+    assert wots_chains_batch(params, pub_seed, addresses, values, starts, steps) == expected
+    assert wots_chains_batch(params, pub_seed, addresses, values, starts, steps, workers=3) == expected
+
+
+def test_wots_gen_pk_many_matches_single(wots_context):
+    params, sk_seed, pub_seed, _, _ = wots_context
+    base_addresses = [derive_wots_address(0, 0, leaf, 0, 0) for leaf in range(4)]
+    pks = wots_gen_pk_many(params, sk_seed, pub_seed, base_addresses)
+    assert pks == [wots_gen_pk(params, sk_seed, pub_seed, address) for address in base_addresses]
+    with pytest.raises(ValueError):
+        wots_chains_batch(params, pub_seed, base_addresses[:1], [bytes(int(params["n"]))], [10], [6])
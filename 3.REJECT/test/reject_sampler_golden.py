@@ -1,180 +1,104 @@
-"""Python golden model for the rejection sampler core."""
+"""Python golden model for the rejection sampler core.
+
+The cycle model itself is shared with REJECT_v1 in
+``100.kyber/golden/reject_model.py``; this script only owns the stimulus file
+format of ``reject_sampler_tb.v`` and the verification of its output dump.
+``--cycles N --valid-prob P`` writes an N-cycle stress trace with random
+``random_valid`` gaps, streamed in chunks.
+
+Run through ``100.kyber/golden/run.py`` (``python 100.kyber/golden/run.py
+3.REJECT/test/reject_sampler_golden.py [options]``), which makes ``golden``
+importable.
+"""
 
 import argparse
 import pathlib
-import random
-from dataclasses import dataclass
-from typing import List
+
+import numpy as np
+
+from golden import compare, reject_model
 
 LANES = 4
 CAND_BITS = 12
 VECTORS = 80
 Q_VALUE = 3329  # Kyber modulus for uniform sampling
+FLUSH_CYCLES = 5  # idle cycles the testbench records after the last vector
+
+BASE_DIR = pathlib.Path(__file__).resolve().parent
+
+CONFIG = reject_model.RejectConfig(
+    lanes=LANES,
+    cand_bits=CAND_BITS,
+    latency=2,
+    const_time=True,
+    bernoulli_sample_cand=True,
+    vector_path=BASE_DIR / "reject_vectors.txt",
+    output_path=BASE_DIR / "hw_output.txt",
+)
+LANE_DIGITS = LANES * CAND_BITS // 4
+
+
+def format_vectors(stim: reject_model.RejectStimulus, random_in: np.ndarray) -> bytes:
+    """Stimulus lines ``valid q cand urnd threshold mode random_in`` as read by the testbench."""
+    return compare.format_hex_rows(
+        [
+            stim.valid,
+            stim.q,
+            reject_model.pack_lanes(stim.cand, CAND_BITS),
+            reject_model.pack_lanes(stim.urnd, CAND_BITS),
+            reject_model.pack_lanes(stim.threshold, CAND_BITS),
+            reject_model.pack_lanes(stim.mode, 1),
+            random_in,
+        ],
+        [1, 4, LANE_DIGITS, LANE_DIGITS, LANE_DIGITS, LANES // 4 + 1, 32],
+    )
 
-VECTOR_PATH = pathlib.Path("D:/desktopnew/Vivado_Projects/0.Kyber/3.REJECT/test/reject_vectors.txt")
-HW_OUTPUT_PATH = pathlib.Path("D:/desktopnew/Vivado_Projects/0.Kyber/3.REJECT/test/hw_output.txt")
-
-random.seed(2024)
-
-
-@dataclass
-class Stimulus:
-    random_valid: int
-    q: int
-    cand: List[int]
-    urnd: List[int]
-    threshold: List[int]
-    mode: List[int]
-    random_in: int
-
-
-@dataclass
-class StageState:
-    cand: List[int]
-    urnd: List[int]
-    threshold: List[int]
-    mode: List[int]
-    q: int
-
-
-@dataclass
-class PipelineRegs:
-    stage0: StageState
-    stage1: StageState
-    random_valid_d0: int
-    random_valid_d1: int
-
-
-def default_stage() -> StageState:
-    return StageState([0] * LANES, [0] * LANES, [0] * LANES, [0] * LANES, 0)
-
-
-def generate_vectors() -> List[Stimulus]:
-    vectors: List[Stimulus] = []
-    for _ in range(VECTORS):
-        random_valid = random.randint(0, 1)
-        cand = [random.randrange(0, 1 << CAND_BITS) for _ in range(LANES)]
-        urnd = [random.randrange(0, 1 << CAND_BITS) for _ in range(LANES)]
-        threshold = [random.randrange(0, 1 << CAND_BITS) for _ in range(LANES)]
-        mode = [random.randint(0, 1) for _ in range(LANES)]
-        random_in = random.getrandbits(128)
-        vectors.append(
-            Stimulus(
-                random_valid=random_valid,
-                q=Q_VALUE,
-                cand=cand,
-                urnd=urnd,
-                threshold=threshold,
-                mode=mode,
-                random_in=random_in,
-            )
-        )
-    return vectors
-
-
-def write_vector_file(vectors: List[Stimulus]) -> None:
-    with VECTOR_PATH.open("w", encoding="utf-8") as f:
-        for item in vectors:
-            packed_cand = sum(
-                value << (idx * CAND_BITS) for idx, value in enumerate(item.cand)
-            )
-            packed_urnd = sum(
-                value << (idx * CAND_BITS) for idx, value in enumerate(item.urnd)
-            )
-            packed_threshold = sum(
-                value << (idx * CAND_BITS) for idx, value in enumerate(item.threshold)
-            )
-            packed_mode = sum(bit << idx for idx, bit in enumerate(item.mode))
-            f.write(
-                f"{item.random_valid} {item.q:04x} {packed_cand:0{LANES*CAND_BITS//4}x} "
-                f"{packed_urnd:0{LANES*CAND_BITS//4}x} {packed_threshold:0{LANES*CAND_BITS//4}x} "
-                f"{packed_mode:0{LANES//4+1}x} {item.random_in:032x}\n"
-            )
-
-
-def simulate_pipeline(vectors: List[Stimulus]) -> List[dict]:
-    regs = PipelineRegs(default_stage(), default_stage(), 0, 0)
-    outputs: List[dict] = []
-
-    for item in vectors:
-        # Output corresponds to stage1 registers and delayed valid signal.
-        accept_flags = []
-        for lane in range(LANES):
-            if regs.stage1.mode[lane]:
-                accept = regs.stage1.urnd[lane] < regs.stage1.threshold[lane]
-            else:
-                accept = regs.stage1.cand[lane] < regs.stage1.q
-            accept_flags.append(1 if (accept and regs.random_valid_d1) else 0)
-
-        sample_values = [regs.stage1.cand[lane] if accept_flags[lane] else 0 for lane in range(LANES)]
-        sample_valid = 1 if regs.random_valid_d1 else 0
-        packed_sample = sum(value << (lane * CAND_BITS) for lane, value in enumerate(sample_values))
-        packed_accept = sum(flag << lane for lane, flag in enumerate(accept_flags))
-        outputs.append({"accept": packed_accept, "sample": packed_sample, "valid": sample_valid})
-
-        # Sequential updates (stage1 gets previous stage0, valid shifts)
-        prev_stage0 = regs.stage0
-        prev_random_valid_d0 = regs.random_valid_d0
-
-        regs.stage1 = StageState(
-            prev_stage0.cand[:],
-            prev_stage0.urnd[:],
-            prev_stage0.threshold[:],
-            prev_stage0.mode[:],
-            prev_stage0.q,
-        )
-        regs.random_valid_d1 = prev_random_valid_d0
-
-        # Update stage0 only when random_valid asserted
-        if item.random_valid:
-            regs.stage0 = StageState(
-                item.cand[:],
-                item.urnd[:],
-                item.threshold[:],
-                item.mode[:],
-                item.q,
-            )
-        regs.random_valid_d0 = item.random_valid
-
-    # Final drain cycle
-    accept_flags = []
-    for lane in range(LANES):
-        if regs.stage1.mode[lane]:
-            accept = regs.stage1.urnd[lane] < regs.stage1.threshold[lane]
-        else:
-            accept = regs.stage1.cand[lane] < regs.stage1.q
-        accept_flags.append(1 if (accept and regs.random_valid_d1) else 0)
-    sample_values = [regs.stage1.cand[lane] if accept_flags[lane] else 0 for lane in range(LANES)]
-    sample_valid = 1 if regs.random_valid_d1 else 0
-    packed_sample = sum(value << (lane * CAND_BITS) for lane, value in enumerate(sample_values))
-    packed_accept = sum(flag << lane for lane, flag in enumerate(accept_flags))
-    outputs.append({"accept": packed_accept, "sample": packed_sample, "valid": sample_valid})
-
-    return outputs
-
-
-def verify_outputs(vectors: List[Stimulus]) -> None:
-    if not HW_OUTPUT_PATH.exists():
-        raise FileNotFoundError("Hardware output file was not produced")
 
-    expected = simulate_pipeline(vectors)
-    with HW_OUTPUT_PATH.open("r", encoding="utf-8") as f:
-        lines = [line.strip() for line in f if line.strip()]
+def generate_vectors(cycles: int, seed: int, valid_prob: float, chunk: int = 1 << 16) -> None:
+    rng = np.random.default_rng(seed)
+    with CONFIG.vector_path.open("wb") as fp:
+        for start in range(0, cycles, chunk):
+            count = min(chunk, cycles - start)
+            stim = reject_model.random_stimulus(CONFIG, count, rng, valid_prob=valid_prob, q=Q_VALUE)
+            random_in = rng.integers(0, 1 << 64, size=(count, 2), dtype=np.uint64, endpoint=False)
+            fp.write(format_vectors(stim, random_in))
+    print(f"Wrote {cycles} cycles to {CONFIG.vector_path}")
 
-    if len(lines) < len(expected):
-        raise AssertionError("Hardware output file has fewer entries than expected")
 
-    for idx, (line, exp) in enumerate(zip(lines, expected)):
-        _, acc_hex, sample_hex, valid_str = line.split()
-        hw_accept = int(acc_hex)
-        hw_sample = int(sample_hex, 16)
-        hw_valid = int(valid_str)
+def load_vectors(path: pathlib.Path) -> reject_model.RejectStimulus:
+    columns = compare.load_stream(
+        path,
+        lane_bits=[None, None, CAND_BITS, CAND_BITS, CAND_BITS, None, 64],
+        lanes=[None, None, LANES, LANES, LANES, None, 2],
+    )
+    return reject_model.RejectStimulus(
+        valid=columns[:, 0],
+        q=columns[:, 1],
+        cand=columns[:, 2 : 2 + LANES],
+        urnd=columns[:, 2 + LANES : 2 + 2 * LANES],
+        threshold=columns[:, 2 + 2 * LANES : 2 + 3 * LANES],
+        mode=reject_model.unpack_lanes(columns[:, 2 + 3 * LANES], 1, LANES),
+    )
+
 
-        if hw_accept != exp["accept"] or hw_sample != exp["sample"] or hw_valid != exp["valid"]:
-            raise AssertionError(
-                f"Mismatch at line {idx}: HW=(acc={hw_accept}, sample=0x{hw_sample:x}, valid={hw_valid}) "
-                f"Expected=(acc={exp['accept']}, sample=0x{exp['sample']:x}, valid={exp['valid']})"
-            )
+def verify_outputs(stim: reject_model.RejectStimulus) -> None:
+    if not CONFIG.output_path.exists():
+        raise FileNotFoundError("Hardware output file was not produced")
+
+    trace = reject_model.simulate(CONFIG, stim, drain=FLUSH_CYCLES)
+    expected = np.column_stack(
+        [trace.accept.astype(np.int64), reject_model.unpack_lanes(trace.sample, CAND_BITS, LANES), trace.valid]
+    )
+    # Testbench lines: vector counter, acc_bus (decimal), sample_tdata (hex), sample_tvalid.
+    observed = compare.load_stream(
+        CONFIG.output_path, radix=[10, 10, 16, 10], lane_bits=[None, None, CAND_BITS, None], lanes=[None, None, LANES, None]
+    )[:, 1:]
+    compare.compare(
+        expected,
+        observed,
+        name="reject_sampler_core",
+        lane_names=["acc"] + [f"sample{lane}" for lane in range(LANES)] + ["valid"],
+    ).check()
     print("Hardware outputs match the golden model.")
 
 
@@ -185,44 +109,17 @@ def main() -> None:
         action="store_true",
         help="Verify hardware output against the golden model using the existing vectors.",
     )
+    parser.add_argument("--cycles", type=int, default=VECTORS, help="Stimulus cycles to generate")
+    parser.add_argument("--valid-prob", type=float, default=0.5, help="Probability that random_valid is high")
+    parser.add_argument("--seed", type=int, default=2024, help="Seed for stimulus generation")
     args = parser.parse_args()
 
     if args.verify:
-        if not VECTOR_PATH.exists():
+        if not CONFIG.vector_path.exists():
             raise FileNotFoundError("Vector file missing. Generate vectors before verification.")
-        vectors = []
-        with VECTOR_PATH.open("r", encoding="utf-8") as f:
-            for line in f:
-                fields = line.strip().split()
-                random_valid = int(fields[0])
-                q_val = int(fields[1], 16)
-                packed_cand = int(fields[2], 16)
-                packed_urnd = int(fields[3], 16)
-                packed_threshold = int(fields[4], 16)
-                packed_mode = int(fields[5], 16)
-                random_in = int(fields[6], 16)
-                cand = [(packed_cand >> (idx * CAND_BITS)) & ((1 << CAND_BITS) - 1) for idx in range(LANES)]
-                urnd = [(packed_urnd >> (idx * CAND_BITS)) & ((1 << CAND_BITS) - 1) for idx in range(LANES)]
-                threshold = [
-                    (packed_threshold >> (idx * CAND_BITS)) & ((1 << CAND_BITS) - 1)
-                    for idx in range(LANES)
-                ]
-                mode = [(packed_mode >> idx) & 1 for idx in range(LANES)]
-                vectors.append(
-                    Stimulus(
-                        random_valid=random_valid,
-                        q=q_val,
-                        cand=cand,
-                        urnd=urnd,
-                        threshold=threshold,
-                        mode=mode,
-                        random_in=random_in,
-                    )
-                )
-        verify_outputs(vectors)
+        verify_outputs(load_vectors(CONFIG.vector_path))
     else:
-        vectors = generate_vectors()
-        write_vector_file(vectors)
+        generate_vectors(args.cycles, args.seed, args.valid_prob)
         print("Vector file generated. Run the Verilog simulation next.")
 
 
@@ -0,0 +1,164 @@
+"""Bit-accurate, vectorised model of gauss_sampler.v.
+
+Thresholds are read from the ROM the RTL includes (``src/gauss_cdf_rom.vh``),
+so the model follows the hardware even if the header is hand-edited.  Per
+lane, bits ``[15:0]`` of the 32-bit lane slice are the uniform value ``u``
+and bit 16 the sign; the magnitude is the first ``k`` with ``u < T[k]``,
+else ``15`` when the tail threshold is non-zero and
+``u < (T[15] + tail) mod 2^16``, else the lane is a tail (rejected).  Only
+the low 17 bits of a lane matter, so each sigma is one ``2^17``-entry lookup
+table and a million 128-bit words map to samples in a few milliseconds.
+
+Cycle behaviour: ``coeffs``/``sample_valid`` at cycle ``t + LATENCY`` are the
+word presented with ``random_valid`` at cycle ``t`` (zero when it was not
+valid); ``sample_valid`` needs every lane to be valid and rejected lanes read
+as zero.  Sigma is clamped to 1..8 and sampled one cycle after the word
+(stage 1 decodes ``random_reg0`` against the live ``sigma`` input).
+"""
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+RANDOM_WIDTH = 128
+PARALLELISM = 4
+LANE_WIDTH = RANDOM_WIDTH // PARALLELISM
+GAUSS_MAX_SYMBOLS = 16
+GAUSS_CDF_WIDTH = 16
+VALUE_WIDTH = 13
+# random_valid -> sample_valid: random_reg0, lane_*_s1, lane_*_s2, lane_*_s3, then the
+# sample_valid/coeffs registers.
+LATENCY = 5
+SIGMA_MIN, SIGMA_MAX = 1, 8
+LUT_BITS = GAUSS_CDF_WIDTH + 1  # uniform value plus sign bit
+
+ROM_PATH = Path(__file__).resolve().parents[1] / "src" / "gauss_cdf_rom.vh"
+
+_CASE = re.compile(r"8'd(\d+)\s*:\s*(gauss_cdf_pack|gauss_tail_threshold)\s*=\s*\{?([^;}]*)\}?;")
+
+
+@lru_cache(maxsize=None)
+def load_rom(path: Path = ROM_PATH) -> Dict[int, Tuple[Tuple[int, ...], int]]:
+    """``{sigma: (thresholds T[0..15], tail_threshold)}`` as case items of the ROM header."""
+    packs, tails = {}, {}
+    for index, name, body in _CASE.findall(Path(path).read_text()):
+        values = [int(item.split("'d")[-1]) for item in body.split(",")]
+        if name == "gauss_cdf_pack":
+            packs[int(index)] = tuple(values[::-1])  # concatenation lists T[15] first
+        else:
+            tails[int(index)] = values[0]
+    return {sigma: (packs[sigma], tails[sigma]) for sigma in packs}
+
+
+def clamp_sigma(sigma):
+    return np.clip(sigma, SIGMA_MIN, SIGMA_MAX)
+
+
+@lru_cache(maxsize=None)
+def magnitude_lut(sigma: int, path: Path = ROM_PATH) -> np.ndarray:
+    """Magnitude per 16-bit uniform value, ``-1`` for a tail, exactly as the priority scan."""
+    thresholds, tail = load_rom(path)[int(clamp_sigma(sigma))]
+    u = np.arange(1 << GAUSS_CDF_WIDTH, dtype=np.int64)
+    below = u[:, np.newaxis] < np.asarray(thresholds, dtype=np.int64)
+    magnitude = np.where(below.any(axis=1), below.argmax(axis=1), -1)
+    if tail:
+        extended = (thresholds[-1] + tail) & ((1 << GAUSS_CDF_WIDTH) - 1)
+        magnitude[(magnitude < 0) & (u < extended)] = GAUSS_MAX_SYMBOLS - 1
+    return magnitude
+
+
+@lru_cache(maxsize=None)
+def sample_lut(sigma: int, path: Path = ROM_PATH) -> Tuple[np.ndarray, np.ndarray]:
+    """``(value, valid)`` indexed by the low 17 lane bits; rejected lanes read as 0."""
+    magnitude = np.tile(magnitude_lut(sigma, path), 2)
+    sign = np.arange(1 << LUT_BITS) >> GAUSS_CDF_WIDTH
+    valid = magnitude >= 0
+    value = np.where(valid, np.where(sign == 1, -magnitude, magnitude), 0).astype(np.int16)
+    return value, valid
+
+
+def split_lanes(words: np.ndarray) -> np.ndarray:
+    """``(n, 2)`` little-endian uint64 limbs of ``random_in`` -> ``(n, PARALLELISM)`` 32-bit lanes."""
+    words = np.asarray(words, dtype=np.uint64).reshape(-1, RANDOM_WIDTH // 64)
+    low = words & np.uint64(0xFFFFFFFF)
+    high = words >> np.uint64(32)
+    return np.stack([low, high], axis=2).reshape(len(words), PARALLELISM)
+
+
+def lane_samples(words: np.ndarray, sigma, path: Path = ROM_PATH) -> Tuple[np.ndarray, np.ndarray]:
+    """Signed lane values and lane-valid flags for each word; ``sigma`` is a scalar or per word."""
+    keys = (split_lanes(words) & np.uint64((1 << LUT_BITS) - 1)).astype(np.intp)
+    sigma = clamp_sigma(np.asarray(sigma, dtype=np.int64))
+    if sigma.ndim == 0:
+        value, valid = sample_lut(int(sigma), path)
+        return value[keys], valid[keys]
+    values = np.zeros(keys.shape, dtype=np.int16)
+    valid = np.zeros(keys.shape, dtype=bool)
+    for level in np.unique(sigma):
+        rows = sigma == level
+        lut_value, lut_valid = sample_lut(int(level), path)
+        values[rows], valid[rows] = lut_value[keys[rows]], lut_valid[keys[rows]]
+    return values, valid
+
+
+def pack_coeffs(values: np.ndarray) -> np.ndarray:
+    """Pack ``(n, PARALLELISM)`` signed values as the ``coeffs`` bus (13-bit two's complement lanes)."""
+    fields = np.asarray(values, dtype=np.int64).astype(np.uint64) & np.uint64((1 << VALUE_WIDTH) - 1)
+    shifts = np.arange(PARALLELISM, dtype=np.uint64) * np.uint64(VALUE_WIDTH)
+    return np.bitwise_or.reduce(fields << shifts, axis=1)
+
+
+def unpack_coeffs(words: np.ndarray) -> np.ndarray:
+    """Inverse of ``pack_coeffs``: ``coeffs`` words -> ``(n, PARALLELISM)`` signed values."""
+    words = np.asarray(words, dtype=np.uint64)[:, np.newaxis]
+    shifts = np.arange(PARALLELISM, dtype=np.uint64) * np.uint64(VALUE_WIDTH)
+    fields = ((words >> shifts) & np.uint64((1 << VALUE_WIDTH) - 1)).astype(np.int64)
+    return np.where(fields >= 1 << (VALUE_WIDTH - 1), fields - (1 << VALUE_WIDTH), fields)
+
+
+def evaluate(words: np.ndarray, sigma, path: Path = ROM_PATH) -> Tuple[np.ndarray, np.ndarray]:
+    """``(sample_valid, coeffs)`` for each word, before the pipeline delay."""
+    values, valid = lane_samples(words, sigma, path)
+    return valid.all(axis=1), pack_coeffs(values)
+
+
+def decode_sigma(sigma: np.ndarray) -> np.ndarray:
+    """Sigma each cycle's word is decoded with: the next cycle's input, the last one held."""
+    sigma = np.asarray(sigma, dtype=np.int64)
+    return np.append(sigma[1:], sigma[-1:])
+
+
+def simulate(
+    random_valid: np.ndarray, words: np.ndarray, sigma, path: Path = ROM_PATH, drain: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-cycle ``(sample_valid, coeffs)`` from reset for per-cycle inputs, plus ``drain`` idle cycles.
+
+    ``sigma`` is the per-cycle ``sigma`` input (held after the last cycle);
+    the word accepted at cycle ``t`` is decoded with ``sigma[t + 1]``.
+    """
+    random_valid = np.asarray(random_valid, dtype=bool)
+    cycles = len(random_valid)
+    sigma = np.broadcast_to(np.asarray(sigma, dtype=np.int64), (cycles,))
+    sample_valid, coeffs = evaluate(words, decode_sigma(sigma), path)
+    sample_valid &= random_valid
+    coeffs = np.where(random_valid, coeffs, np.uint64(0))
+    drain = LATENCY if drain is None else drain
+    pad = np.zeros(LATENCY, dtype=bool)
+    valid_out = np.concatenate([pad, sample_valid, np.zeros(drain, dtype=bool)])[: cycles + drain]
+    coeffs_out = np.concatenate([pad.astype(np.uint64), coeffs, np.zeros(drain, dtype=np.uint64)])[: cycles + drain]
+    return valid_out, coeffs_out
+
+
+def produced_counts(sigma: int, path: Path = ROM_PATH) -> np.ndarray:
+    """Exact number of 17-bit lane patterns giving each value ``-15..15`` (index ``v + 15``)."""
+    value, valid = sample_lut(sigma, path)
+    return np.bincount(value[valid].astype(np.int64) + GAUSS_MAX_SYMBOLS - 1, minlength=2 * GAUSS_MAX_SYMBOLS - 1)
+
+
+def random_words(rng: np.random.Generator, count: int) -> np.ndarray:
+    """``count`` uniform 128-bit ``random_in`` words as ``(count, 2)`` uint64 limbs."""
+    return rng.integers(0, np.iinfo(np.uint64).max, size=(count, RANDOM_WIDTH // 64), dtype=np.uint64, endpoint=True)
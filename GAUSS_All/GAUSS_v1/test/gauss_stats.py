@@ -0,0 +1,284 @@
+"""Large-sample statistical tests for the Gaussian sampler.
+
+Draws uniform ``random_in`` words, runs them through the bit-accurate model
+(``gauss_model``) and tests the accepted samples of each sigma with
+
+* a chi-square goodness-of-fit test (tail bins pooled to >= 5 expected),
+* a Kolmogorov-Smirnov test on the discrete CDF (conservative p-value),
+* z-tests of the mean and variance, plus the kurtosis,
+
+against two references: the distribution the ROM produces exactly
+(``[PASS]``/``[FAIL]``: a failure means the sampler is broken) and the ideal
+discrete Gaussian (``[INFO]``: with enough samples this resolves the table's
+quantisation error, which ``generate_cdf_tables.py`` reports analytically).
+Samples are streamed in chunks, so ``--samples 100000000`` (the default)
+needs no more memory than a short run.
+
+For simulator output, ``--write-vectors`` writes a ``word sigma`` stimulus
+file for ``tb_gauss_sampler.v +vectors=<file> +dump=<file>``; ``--vectors``
+with ``--sim-output`` checks the dumped ``coeffs`` bit-exactly against the
+model and runs the same tests on the simulated samples.
+
+Run through ``100.kyber/golden/run.py`` (``python 100.kyber/golden/run.py
+GAUSS_All/GAUSS_v1/test/gauss_stats.py [options]``), which makes ``golden``
+importable.
+"""
+import argparse
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+
+import gauss_model
+import gauss_tables
+from golden import compare
+
+SIGMA_VALUES = list(range(gauss_model.SIGMA_MIN, gauss_model.SIGMA_MAX + 1))
+SAMPLES = 10**8
+CHUNK_WORDS = 1 << 20
+ALPHA = 1e-3
+MIN_EXPECTED = 5.0
+OFFSET = gauss_model.GAUSS_MAX_SYMBOLS - 1  # histogram bin of value v is v + OFFSET
+VALUES = np.arange(-OFFSET, OFFSET + 1)
+
+
+def ideal_pmf(sigma):
+    """Ideal probabilities of ``-15..15`` and the mass outside that range."""
+    mags, tail = gauss_tables.ideal_magnitudes(sigma, OFFSET + 1)
+    half = [float(mag) / 2 for mag in mags[1:]]
+    return np.array(half[::-1] + [float(mags[0])] + half), float(tail)
+
+
+def ideal_moments(sigma):
+    """``(mean, variance, fourth central moment)`` of the untruncated discrete Gaussian."""
+    symbols = int(20 * sigma) + 1
+    mags, _ = gauss_tables.ideal_magnitudes(sigma, symbols)
+    k = np.arange(symbols, dtype=np.float64)
+    mags = np.array([float(mag) for mag in mags])
+    return 0.0, float((mags * k**2).sum()), float((mags * k**4).sum())
+
+
+def produced_pmf(sigma):
+    counts = gauss_model.produced_counts(sigma).astype(np.float64)
+    return counts / counts.sum()
+
+
+def pmf_moments(pmf):
+    mean = float((pmf * VALUES).sum())
+    centred = VALUES - mean
+    return mean, float((pmf * centred**2).sum()), float((pmf * centred**4).sum())
+
+
+def model_histogram(sigma, samples, rng, chunk=CHUNK_WORDS):
+    """Histogram of ``samples`` accepted model outputs (whole words, so rounded up to 4)."""
+    counts = np.zeros(len(VALUES), dtype=np.int64)
+    needed = -(-samples // gauss_model.PARALLELISM)
+    words = 0
+    while needed > 0:
+        values, valid = gauss_model.lane_samples(gauss_model.random_words(rng, chunk), sigma)
+        accepted = values[valid.all(axis=1)][:needed]
+        counts += np.bincount(accepted.ravel().astype(np.int64) + OFFSET, minlength=len(VALUES))
+        needed -= len(accepted)
+        words += chunk
+    return counts, words
+
+
+def chi2_sf(x, dof):
+    """Upper tail of the chi-square distribution (regularised incomplete gamma ``Q(dof/2, x/2)``)."""
+    a, x = dof / 2.0, x / 2.0
+    if x <= 0:
+        return 1.0
+    scale = math.exp(-x + a * math.log(x) - math.lgamma(a))
+    if x < a + 1:
+        term = total = 1.0 / a
+        n = a
+        while abs(term) > abs(total) * 1e-15:
+            n += 1
+            term *= x / n
+            total += term
+        return max(0.0, 1.0 - total * scale)
+    tiny = 1e-300
+    b = x + 1 - a
+    c, d = 1 / tiny, 1 / b
+    h = d
+    for i in range(1, 1000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return scale * h
+
+
+def kolmogorov_sf(lam):
+    """``P(sqrt(n) D > lam)`` from the asymptotic Kolmogorov distribution."""
+    if lam < 0.2:
+        return 1.0
+    total = sum((-1) ** (k - 1) * math.exp(-2 * k * k * lam * lam) for k in range(1, 101))
+    return min(1.0, max(0.0, 2 * total))
+
+
+def chi_square(counts, pmf, outside=0.0, min_expected=MIN_EXPECTED):
+    """``(statistic, dof, p)``; the ``outside`` mass is split over two empty end bins."""
+    n = counts.sum()
+    observed = np.concatenate([[0], counts, [0]]).astype(np.float64)
+    expected = n * np.concatenate([[outside / 2], pmf, [outside / 2]])
+    pooled_obs, pooled_exp = [], []
+    run_obs = run_exp = 0.0
+    for obs, exp in zip(observed, expected):
+        run_obs, run_exp = run_obs + obs, run_exp + exp
+        if run_exp >= min_expected:
+            pooled_obs.append(run_obs)
+            pooled_exp.append(run_exp)
+            run_obs = run_exp = 0.0
+    if pooled_exp:
+        pooled_obs[-1] += run_obs
+        pooled_exp[-1] += run_exp
+    pooled_obs, pooled_exp = np.array(pooled_obs), np.array(pooled_exp)
+    stat = float(((pooled_obs - pooled_exp) ** 2 / pooled_exp).sum())
+    dof = max(len(pooled_exp) - 1, 1)
+    return stat, dof, chi2_sf(stat, dof)
+
+
+def ks_test(counts, pmf, outside=0.0):
+    """``(D, p)`` for the empirical CDF against ``pmf`` (half of ``outside`` lies below -15)."""
+    n = counts.sum()
+    empirical = np.cumsum(counts) / n
+    reference = outside / 2 + np.cumsum(pmf)
+    distance = float(np.abs(empirical - reference).max())
+    return distance, kolmogorov_sf(math.sqrt(n) * distance)
+
+
+def moment_test(counts, reference):
+    """z-scores of the sample mean and variance, and both kurtoses (``mu4 / var^2``)."""
+    n = counts.sum()
+    mean, var, mu4 = pmf_moments(counts / n)
+    ref_mean, ref_var, ref_mu4 = reference
+    z_mean = (mean - ref_mean) / math.sqrt(ref_var / n)
+    z_var = (var - ref_var) / math.sqrt((ref_mu4 - ref_var**2) / n)
+    return {
+        "mean": mean,
+        "var": var,
+        "kurtosis": mu4 / var**2,
+        "ref_kurtosis": ref_mu4 / ref_var**2,
+        "z_mean": z_mean,
+        "z_var": z_var,
+        "p": min(math.erfc(abs(z_mean) / math.sqrt(2)), math.erfc(abs(z_var) / math.sqrt(2))),
+    }
+
+
+def run_tests(counts, sigma):
+    """Every test of one histogram against the produced and the ideal distribution."""
+    produced = produced_pmf(sigma)
+    ideal, outside = ideal_pmf(sigma)
+    return {
+        "produced": {
+            "chi2": chi_square(counts, produced),
+            "ks": ks_test(counts, produced),
+            "moments": moment_test(counts, pmf_moments(produced)),
+        },
+        "ideal": {
+            "chi2": chi_square(counts, ideal, outside),
+            "ks": ks_test(counts, ideal, outside),
+            "moments": moment_test(counts, ideal_moments(sigma)),
+        },
+    }
+
+
+def print_results(label, counts, results, alpha=ALPHA):
+    """Print one sigma's results; returns False when a test against the produced distribution fails."""
+    ok = True
+    print(f"{label}: {counts.sum()} samples, histogram {dict(zip(VALUES[counts > 0].tolist(), counts[counts > 0].tolist()))}")
+    for reference, tests in results.items():
+        stat, dof, chi_p = tests["chi2"]
+        distance, ks_p = tests["ks"]
+        moments = tests["moments"]
+        line = (
+            f"vs {reference:<8} chi2={stat:.1f}/{dof} p={chi_p:.3g}  KS D={distance:.2e} p={ks_p:.3g}  "
+            f"mean={moments['mean']:+.5f} (z={moments['z_mean']:+.2f})  var={moments['var']:.5f} "
+            f"(z={moments['z_var']:+.2f})  kurt={moments['kurtosis']:.4f}/{moments['ref_kurtosis']:.4f}"
+        )
+        passed = min(chi_p, ks_p, moments["p"]) >= alpha
+        if reference == "produced":
+            ok &= passed
+            print(f"  [{'PASS' if passed else 'FAIL'}] {line}")
+        else:
+            print(f"  [INFO] {line}{'' if passed else '  (resolves the table error)'}")
+    return ok
+
+
+def write_vectors(path, sigmas, words_per_sigma, rng):
+    """Back-to-back stimulus: ``words_per_sigma`` random words for each sigma in turn."""
+    with Path(path).open("wb") as fp:
+        for sigma in sigmas:
+            for start in range(0, words_per_sigma, CHUNK_WORDS):
+                count = min(CHUNK_WORDS, words_per_sigma - start)
+                words = gauss_model.random_words(rng, count)
+                fp.write(compare.format_hex_rows([words, np.full(count, sigma)], [32, 2]))
+    print(f"Wrote {len(sigmas) * words_per_sigma} words to {path}")
+
+
+def check_simulation(vector_path, dump_path, alpha=ALPHA):
+    """Compare a ``+dump`` file with the model for a ``+vectors`` run, then test its samples."""
+    columns = compare.load_stream(vector_path, lane_bits=[64, None], lanes=[2, None])
+    words, sigma = columns[:, :2].view(np.uint64), columns[:, 2]
+    # The testbench streams one word per cycle with random_valid held high.
+    sample_valid, coeffs = gauss_model.simulate(np.ones(len(words), dtype=bool), words, sigma)
+    expected = gauss_model.unpack_coeffs(coeffs[sample_valid])
+    observed = gauss_model.unpack_coeffs(compare.load_stream(dump_path)[:, 0].view(np.uint64))
+    report = compare.compare(
+        expected, observed, name="gauss_sampler", lane_names=[f"coeff{lane}" for lane in range(gauss_model.PARALLELISM)]
+    )
+    print(report.summary())
+    ok = report.passed
+    accepted = sample_valid[gauss_model.LATENCY :]
+    decoded = gauss_model.clamp_sigma(gauss_model.decode_sigma(sigma))[accepted][: len(observed)]
+    for level in np.unique(decoded):
+        rows = observed[decoded == level].ravel()
+        outside = np.abs(rows) > OFFSET
+        if outside.any():
+            print(f"[FAIL] sigma={level}: {int(outside.sum())} simulated samples outside -{OFFSET}..{OFFSET} dropped")
+            rows, ok = rows[~outside], False
+        counts = np.bincount(rows + OFFSET, minlength=len(VALUES))
+        ok &= print_results(f"simulator sigma={level}", counts, run_tests(counts, int(level)), alpha)
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sigmas", type=int, nargs="+", default=SIGMA_VALUES)
+    parser.add_argument("--samples", type=int, default=SAMPLES, help="Accepted samples per sigma")
+    parser.add_argument("--seed", type=int, default=2024)
+    parser.add_argument("--alpha", type=float, default=ALPHA, help="Significance level of each test")
+    parser.add_argument("--write-vectors", type=Path, default=None, help="Write a simulator stimulus file and exit")
+    parser.add_argument("--words", type=int, default=4096, help="Stimulus words per sigma for --write-vectors")
+    parser.add_argument("--vectors", type=Path, default=None, help="Stimulus file of the simulator run")
+    parser.add_argument("--sim-output", type=Path, default=None, help="coeffs dump of the simulator run")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    if args.write_vectors is not None:
+        write_vectors(args.write_vectors, args.sigmas, args.words, rng)
+        return
+    if args.sim_output is not None:
+        if args.vectors is None:
+            parser.error("--sim-output needs --vectors")
+        sys.exit(0 if check_simulation(args.vectors, args.sim_output, args.alpha) else 1)
+
+    ok = True
+    for sigma in args.sigmas:
+        counts, words = model_histogram(sigma, args.samples, rng)
+        print(f"[INFO] sigma={sigma}: {words} words drawn")
+        ok &= print_results(f"model sigma={sigma}", counts, run_tests(counts, sigma), args.alpha)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""Exact CDF table engine for the discrete Gaussian sampler.
+
+Ideal probabilities are computed with ``decimal`` at ``DIGITS`` significant
+digits for any (non-integer) sigma; quantised tables are integer counts out of
+``2**precision`` so the distribution a table actually produces is exact
+(``fractions.Fraction``).  Tables are described by magnitude counts: count ``k``
+is the number of uniform values mapped to ``|x| = k`` (the sign comes from a
+separate bit), and ``rejected`` is the number of values the sampler discards.
+
+Quality metrics compare the produced distribution with the ideal one over the
+whole integer line (mass the table cannot produce counts as error):
+
+* ``statistical_distance``: total variation distance;
+* ``renyi_divergence``: ``R_a(P || D) = (sum P^a / D^(a-1))^(1/(a-1))``.
+
+Both are the same on signed values and on magnitudes, since both
+distributions split every non-zero magnitude evenly between the two signs.
+
+ROM layouts (``rom_bits``): ``cdt`` (the ``precision``-bit threshold per
+symbol that gauss_sampler.v scans), ``cdt-bytes`` (the same thresholds
+stored MSB-first as bytes for a byte-serial comparator, trailing saturated
+entries dropped) and ``knuth-yao`` (the probability matrix of a DDG-tree
+walker, one ``symbols``-bit column per random bit level, all-zero levels
+dropped).
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from decimal import Decimal, localcontext
+from fractions import Fraction
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+DIGITS = 60
+LAYOUTS = ("cdt", "cdt-bytes", "knuth-yao")
+Number = Union[int, float, str, Decimal]
+
+
+def _decimal(value: Number) -> Decimal:
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def ideal_magnitudes(sigma: Number, symbols: int, digits: int = DIGITS) -> tuple[List[Decimal], Decimal]:
+    """``P(|x| = k)`` for ``k < symbols`` under D_sigma over Z, and ``P(|x| >= symbols)``."""
+    sigma = _decimal(sigma)
+    with localcontext() as ctx:
+        ctx.prec = digits + 10
+        two_var = 2 * sigma * sigma
+        # Beyond this magnitude every term is below 10^-(digits + 10).
+        bound = int(sigma * Decimal(2 * (digits + 10) * math.log(10)).sqrt()) + 2
+        weights = [(-Decimal(k * k) / two_var).exp() * (1 if k == 0 else 2) for k in range(max(bound, symbols) + 1)]
+        norm = sum(weights)
+        mags = [weight / norm for weight in weights[:symbols]]
+        tail = sum(weights[symbols:]) / norm
+    return mags, tail
+
+
+@dataclass
+class Table:
+    """A quantised magnitude table for one sigma."""
+
+    sigma: Decimal
+    precision: int
+    counts: List[int]
+    rejected: int = 0
+    tail_threshold: int = 0  # part of the last count reached through gauss_tail_threshold
+    metrics: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def symbols(self) -> int:
+        return len(self.counts)
+
+    @property
+    def thresholds(self) -> List[int]:
+        """Cumulative thresholds: ``|x| = k`` iff ``thresholds[k-1] <= u < thresholds[k]``."""
+        out, total = [], 0
+        for count in self.counts:
+            total += count
+            out.append(total)
+        return out
+
+    @property
+    def rom_thresholds(self) -> List[int]:
+        """Thresholds as stored in gauss_cdf_rom.vh (the tail fold excluded)."""
+        thresholds = self.thresholds
+        thresholds[-1] -= self.tail_threshold
+        return thresholds
+
+    def distribution(self) -> List[Fraction]:
+        """Exact produced ``P(|x| = k)`` after rejection."""
+        accepted = sum(self.counts)
+        return [Fraction(count, accepted) for count in self.counts]
+
+
+def cdf_table(sigma: Number, precision: int, symbols: int, *, digits: int = DIGITS) -> Table:
+    """Floor-of-CDF thresholds, forced strictly increasing until saturating at ``2^p - 1``.
+
+    This is the rule gauss_sampler.v's ROM has always used: ``u < T[k]`` selects
+    ``k``, the last symbol additionally absorbs ``[T[-1], 2^p - 1)`` through the
+    tail threshold, and ``u = 2^p - 1`` is rejected.
+    """
+    mags, _ = ideal_magnitudes(sigma, symbols, digits)
+    top = (1 << precision) - 1
+    thresholds, accum, prev = [], Decimal(0), -1
+    with localcontext() as ctx:
+        ctx.prec = digits + 10
+        for prob in mags:
+            accum += prob
+            scaled = min(int(accum * (1 << precision)), top)
+            if scaled <= prev:
+                scaled = min(prev + 1, top)
+            thresholds.append(scaled)
+            prev = scaled
+    counts = [thresholds[0]] + [b - a for a, b in zip(thresholds, thresholds[1:])]
+    tail = top - thresholds[-1]  # gauss_tail_threshold folds the remainder into the last symbol
+    counts[-1] += tail
+    return Table(_decimal(sigma), precision, counts, rejected=1, tail_threshold=tail)
+
+
+def dyadic_table(sigma: Number, precision: int, symbols: int, *, digits: int = DIGITS) -> Table:
+    """Counts summing to exactly ``2^p`` (no rejection), rounded by largest remainder.
+
+    The mass of the ideal tail beyond ``symbols`` is renormalised away first.
+    """
+    mags, tail = ideal_magnitudes(sigma, symbols, digits)
+    total = 1 << precision
+    with localcontext() as ctx:
+        ctx.prec = digits + 10
+        scaled = [prob / (1 - tail) * total for prob in mags]
+    counts = [int(value) for value in scaled]
+    order = sorted(range(symbols), key=lambda k: scaled[k] - counts[k], reverse=True)
+    for k in order[: total - sum(counts)]:
+        counts[k] += 1
+    return Table(_decimal(sigma), precision, counts)
+
+
+QUANTIZERS = {"cdf": cdf_table, "dyadic": dyadic_table}
+
+
+def statistical_distance(table: Table, digits: int = DIGITS) -> Decimal:
+    mags, tail = ideal_magnitudes(table.sigma, table.symbols, digits)
+    with localcontext() as ctx:
+        ctx.prec = digits + 10
+        produced = [Decimal(p.numerator) / Decimal(p.denominator) for p in table.distribution()]
+        return (sum(abs(p - q) for p, q in zip(produced, mags)) + tail) / 2
+
+
+def renyi_divergence(table: Table, order: Number = 2, digits: int = DIGITS) -> Decimal:
+    """``R_a(produced || ideal)``; 1 means identical (finite since the ideal has full support)."""
+    order = _decimal(order)
+    mags, _ = ideal_magnitudes(table.sigma, table.symbols, digits)
+    with localcontext() as ctx:
+        ctx.prec = digits + 10
+        total = Decimal(0)
+        for p, q in zip(table.distribution(), mags):
+            if p:
+                p = Decimal(p.numerator) / Decimal(p.denominator)
+                total += (order * p.ln() - (order - 1) * q.ln()).exp()
+        return (total.ln() / (order - 1)).exp()
+
+
+def ky_matrix(table: Table) -> List[int]:
+    """Knuth-Yao probability matrix columns (bit ``k`` set: symbol ``k`` terminates at that level).
+
+    Requires a dyadic table; column ``j`` is random-bit level ``j + 1``.
+    """
+    if sum(table.counts) != 1 << table.precision:
+        raise ValueError("Knuth-Yao needs counts summing to 2^precision (use the dyadic quantiser)")
+    return [
+        sum(((count >> (table.precision - 1 - level)) & 1) << k for k, count in enumerate(table.counts))
+        for level in range(table.precision)
+    ]
+
+
+def ky_expected_bits(table: Table) -> Fraction:
+    """Expected uniform bits per magnitude drawn by the DDG-tree walk."""
+    return sum(
+        (Fraction((level + 1) * bin(column).count("1"), 1 << (level + 1)) for level, column in enumerate(ky_matrix(table))),
+        Fraction(0),
+    )
+
+
+def rom_bits(table: Table, layout: str) -> int:
+    if layout == "cdt":
+        return table.symbols * table.precision
+    if layout == "cdt-bytes":
+        # The first symbol whose threshold reaches the total is the scan's fall-through: not stored.
+        thresholds = table.thresholds
+        used = thresholds.index(thresholds[-1])
+        return used * 8 * -(-table.precision // 8)
+    if layout == "knuth-yao":
+        return sum(1 for column in ky_matrix(table) if column) * table.symbols
+    raise ValueError(f"Unknown layout {layout!r}; expected one of {LAYOUTS}")
+
+
+def rom_words(table: Table, layout: str) -> List[int]:
+    """ROM contents in the given layout (bytes for ``cdt-bytes``)."""
+    if layout == "cdt":
+        return table.rom_thresholds
+    if layout == "cdt-bytes":
+        width = -(-table.precision // 8)
+        used = rom_bits(table, layout) // (8 * width)
+        return [(value >> (8 * (width - 1 - byte))) & 0xFF for value in table.thresholds[:used] for byte in range(width)]
+    if layout == "knuth-yao":
+        return [column for column in ky_matrix(table) if column]
+    raise ValueError(f"Unknown layout {layout!r}; expected one of {LAYOUTS}")
+
+
+def evaluate(table: Table, renyi_order: Number = 2, digits: int = DIGITS) -> Table:
+    """Fill ``table.metrics`` with SD, Renyi divergence and ROM sizes."""
+    sd = statistical_distance(table, digits)
+    renyi = renyi_divergence(table, renyi_order, digits)
+    table.metrics = {
+        "statistical_distance": float(sd),
+        "log2_sd": float(sd.ln() / Decimal(2).ln()) if sd else float("-inf"),
+        "renyi_order": float(renyi_order),
+        "renyi_divergence": float(renyi),
+        "log2_renyi_excess": float((renyi - 1).ln() / Decimal(2).ln()) if renyi > 1 else float("-inf"),
+    }
+    for layout in LAYOUTS:
+        try:
+            table.metrics[f"rom_bits_{layout}"] = rom_bits(table, layout)
+        except ValueError:
+            continue
+    return table
+
+
+def smallest_table(
+    sigma: Number,
+    *,
+    max_sd: Optional[float] = None,
+    max_renyi: Optional[float] = None,
+    renyi_order: Number = 2,
+    precisions: Iterable[int] = range(8, 65),
+    tail_cuts: Sequence[float] = (4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14),
+    layout: str = "knuth-yao",
+    quantizer: str = "dyadic",
+    digits: int = DIGITS,
+) -> Optional[Table]:
+    """Smallest-ROM table (in ``layout``) meeting the SD and/or Renyi targets, or ``None``."""
+    sigma = _decimal(sigma)
+    best: Optional[Table] = None
+    for precision in precisions:
+        for cut in tail_cuts:
+            symbols = int(sigma * _decimal(cut)) + 1
+            table = QUANTIZERS[quantizer](sigma, precision, symbols, digits=digits)
+            if best is not None and rom_bits(table, layout) >= best.metrics[f"rom_bits_{layout}"]:
+                continue
+            evaluate(table, renyi_order, digits)
+            if max_sd is not None and table.metrics["statistical_distance"] > max_sd:
+                continue
+            if max_renyi is not None and table.metrics["renyi_divergence"] > max_renyi:
+                continue
+            best = table
+    return best
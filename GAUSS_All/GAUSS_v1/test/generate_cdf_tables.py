@@ -1,58 +1,48 @@
-import math
+"""Generate gauss_cdf_rom.vh and report table quality.
+
+Tables come from ``gauss_tables`` (exact ``decimal``/``Fraction`` arithmetic),
+so the ROM no longer depends on float64 rounding.  Without options this
+regenerates the ROM for the sampler's fixed sigma 1..8 / 16-bit / 16-symbol
+configuration, as before.  ``--sigmas``, ``--precision`` and ``--symbols`` (or
+``--tail-cut``) evaluate other grids; ``--search`` finds the smallest ROM per
+sigma that meets ``--max-sd`` / ``--max-renyi``; ``--layout`` with ``--rom-out``
+writes the ROM contents in another layout as a ``$readmemh`` file.  The
+Knuth-Yao layout needs dyadic tables: without ``--quantizer`` its ROM is built
+with the dyadic quantiser (the report and header keep the CDF tables), and
+``--quantizer cdf`` is rejected for it.
+"""
+import argparse
+import json
+from decimal import Decimal
 from pathlib import Path
 
+import gauss_tables
+
 PRECISION = 16
 GAUSS_CDF_WIDTH = PRECISION
 MAX_SYMBOLS = 16
-TAIL_MAX = 256
 SIGMA_VALUES = list(range(1, 9))
 DEFAULT_SIGMA = 4
 
+HEADER_PATH = Path(__file__).resolve().parents[1] / "src" / "gauss_cdf_rom.vh"
+STATS_PATH = Path(__file__).resolve().with_suffix(".json")
 
-def discrete_gaussian_prob(k: int, sigma: float) -> float:
-    return math.exp(-(k * k) / (2.0 * sigma * sigma))
 
+def build_tables(sigmas=SIGMA_VALUES, precision=PRECISION, symbols=MAX_SYMBOLS, quantizer="cdf", renyi_order=2):
+    """``{sigma: Table}`` with metrics filled in."""
+    build = gauss_tables.QUANTIZERS[quantizer]
+    return {sigma: gauss_tables.evaluate(build(sigma, precision, symbols), renyi_order) for sigma in sigmas}
+
+
+def emit_verilog_header(tables, path: Path, default_sigma=DEFAULT_SIGMA):
+    """Write the ``gauss_cdf_pack`` / ``gauss_tail_threshold`` functions; sigma ``i``-th in the grid is case ``i + 1``."""
+    sigmas = list(tables)
+    width = next(iter(tables.values())).precision
+    default = tables[default_sigma] if default_sigma in tables else tables[sigmas[0]]
+
+    def pack(table):
+        return ", ".join(f"{width}'d{value}" for value in table.rom_thresholds[::-1])
 
-def build_tables():
-    tables = {}
-    tail_probs = {}
-    for sigma in SIGMA_VALUES:
-        sigma_f = float(sigma)
-        norm = 0.0
-        for k in range(-TAIL_MAX, TAIL_MAX + 1):
-            norm += discrete_gaussian_prob(k, sigma_f)
-        pmf_abs = []
-        for k in range(MAX_SYMBOLS):
-            if k == 0:
-                prob = 1.0 / norm
-            else:
-                prob = 2.0 * discrete_gaussian_prob(k, sigma_f) / norm
-            pmf_abs.append(prob)
-        accum = 0.0
-        thresholds = []
-        prev_scaled = -1
-        for prob in pmf_abs:
-            accum += prob
-            scaled = int(math.floor(accum * (1 << PRECISION)))
-            if scaled > (1 << PRECISION) - 1:
-                scaled = (1 << PRECISION) - 1
-            if scaled <= prev_scaled:
-                scaled = prev_scaled + 1
-                if scaled > (1 << PRECISION) - 1:
-                    scaled = (1 << PRECISION) - 1
-            thresholds.append(scaled)
-            prev_scaled = scaled
-        tail_mass = max(0.0, 1.0 - accum)
-        tail_scaled = (1 << PRECISION) - 1 - thresholds[-1]
-        tables[sigma] = thresholds
-        tail_probs[sigma] = {
-            "probability": tail_mass,
-            "scaled": max(0, tail_scaled),
-        }
-    return tables, tail_probs
-
-
-def emit_verilog_header(tables, tail_probs, path: Path):
     lines = []
     lines.append("// This file is auto-generated. Do not edit manually.\n")
     lines.append("// Generated by generate_cdf_tables.py\n")
@@ -61,14 +51,10 @@ def emit_verilog_header(tables, tail_probs, path: Path):
     lines.append("    input [7:0] sigma;\n")
     lines.append("    begin\n")
     lines.append("        case (sigma)\n")
-    for sigma in SIGMA_VALUES:
-        thresholds = tables[sigma]
-        vec = ", ".join(f"{GAUSS_CDF_WIDTH}'d{value}" for value in thresholds[::-1])
-        lines.append(f"            8'd{sigma}: gauss_cdf_pack = {{{vec}}};\n")
-    default_vec = ", ".join(
-        f"{GAUSS_CDF_WIDTH}'d{value}" for value in tables[DEFAULT_SIGMA][::-1]
-    )
-    lines.append(f"            default: gauss_cdf_pack = {{{default_vec}}};\n")
+    for index, sigma in enumerate(sigmas, start=1):
+        note = "" if Decimal(str(sigma)) == index else f"  // sigma = {sigma}"
+        lines.append(f"            8'd{index}: gauss_cdf_pack = {{{pack(tables[sigma])}}};{note}\n")
+    lines.append(f"            default: gauss_cdf_pack = {{{pack(default)}}};\n")
     lines.append("        endcase\n")
     lines.append("    end\n")
     lines.append("endfunction\n\n")
@@ -76,26 +62,107 @@ def emit_verilog_header(tables, tail_probs, path: Path):
     lines.append("    input [7:0] sigma;\n")
     lines.append("    begin\n")
     lines.append("        case (sigma)\n")
-    for sigma in SIGMA_VALUES:
-        tail_scaled = tail_probs[sigma]["scaled"]
-        lines.append(f"            8'd{sigma}: gauss_tail_threshold = {GAUSS_CDF_WIDTH}'d{tail_scaled};\n")
-    default_tail = tail_probs[DEFAULT_SIGMA]["scaled"]
-    lines.append(f"            default: gauss_tail_threshold = {GAUSS_CDF_WIDTH}'d{default_tail};\n")
+    for index, sigma in enumerate(sigmas, start=1):
+        lines.append(f"            8'd{index}: gauss_tail_threshold = {width}'d{tables[sigma].tail_threshold};\n")
+    lines.append(f"            default: gauss_tail_threshold = {width}'d{default.tail_threshold};\n")
     lines.append("        endcase\n")
     lines.append("    end\n")
     lines.append("endfunction\n")
     path.write_text("".join(lines))
 
 
+def emit_rom(tables, layout: str, path: Path):
+    """One ``$readmemh`` file holding every sigma's ROM in ``layout``, separated by comments."""
+    lines = []
+    for sigma, table in tables.items():
+        words = gauss_tables.rom_words(table, layout)
+        digits = 2 if layout == "cdt-bytes" else -(-(table.symbols if layout == "knuth-yao" else table.precision) // 4)
+        lines.append(f"// sigma={sigma} precision={table.precision} symbols={table.symbols} words={len(words)}\n")
+        lines.extend(f"{word:0{digits}x}\n" for word in words)
+    path.write_text("".join(lines))
+
+
+def stats(tables):
+    return {
+        "tables": {str(sigma): table.rom_thresholds for sigma, table in tables.items()},
+        "tails": {
+            str(sigma): {
+                "probability": float(gauss_tables.ideal_magnitudes(sigma, table.symbols)[1]),
+                "scaled": table.tail_threshold,
+            }
+            for sigma, table in tables.items()
+        },
+        "metrics": {str(sigma): table.metrics for sigma, table in tables.items()},
+    }
+
 
-def main():
-    tables, tail_probs = build_tables()
-    header_path = Path(__file__).resolve().parents[1] / "src" / "gauss_cdf_rom.vh"
-    emit_verilog_header(tables, tail_probs, header_path)
-    stats_path = Path(__file__).resolve().with_suffix(".json")
-    import json
+def print_report(tables):
+    print(f"{'sigma':>6} {'prec':>4} {'syms':>4} {'log2 SD':>9} {'log2(R-1)':>9} {'cdt':>6} {'cdt-bytes':>9} {'knuth-yao':>9}")
+    for sigma, table in tables.items():
+        metrics = table.metrics
+        print(
+            f"{str(sigma):>6} {table.precision:>4} {table.symbols:>4} {metrics['log2_sd']:>9.2f} "
+            f"{metrics['log2_renyi_excess']:>9.2f} {metrics.get('rom_bits_cdt', '-'):>6} "
+            f"{metrics.get('rom_bits_cdt-bytes', '-'):>9} {metrics.get('rom_bits_knuth-yao', '-'):>9}"
+        )
 
-    stats_path.write_text(json.dumps({"tables": tables, "tails": tail_probs}, indent=2))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sigmas", nargs="+", default=None, help="Sigma grid (decimal strings allowed)")
+    parser.add_argument("--precision", type=int, default=PRECISION, help="Threshold width in bits")
+    parser.add_argument("--symbols", type=int, default=None, help="Magnitudes per table")
+    parser.add_argument("--tail-cut", type=float, default=None, help="Symbols = floor(tail_cut * sigma) + 1")
+    parser.add_argument(
+        "--quantizer", choices=sorted(gauss_tables.QUANTIZERS), default=None, help="Default: cdf (dyadic for a Knuth-Yao ROM)"
+    )
+    parser.add_argument("--renyi-order", type=float, default=2.0)
+    parser.add_argument("--search", action="store_true", help="Smallest ROM per sigma meeting the targets")
+    parser.add_argument("--max-sd", type=float, default=None, help="Statistical distance target")
+    parser.add_argument("--max-renyi", type=float, default=None, help="Renyi divergence target")
+    parser.add_argument("--layout", choices=gauss_tables.LAYOUTS, default="knuth-yao")
+    parser.add_argument("--rom-out", type=Path, default=None, help="Write ROM contents in --layout to this file")
+    args = parser.parse_args(argv)
+    if args.rom_out is not None and args.layout == "knuth-yao" and args.quantizer not in (None, "dyadic"):
+        parser.error("--layout knuth-yao needs dyadic tables; drop --quantizer or use --quantizer dyadic")
+    quantizer = args.quantizer or "cdf"
+
+    sigmas = [Decimal(value) for value in args.sigmas] if args.sigmas else SIGMA_VALUES
+    if args.search:
+        if args.max_sd is None and args.max_renyi is None:
+            parser.error("--search needs --max-sd and/or --max-renyi")
+        tables = {}
+        for sigma in sigmas:
+            table = gauss_tables.smallest_table(
+                sigma,
+                max_sd=args.max_sd,
+                max_renyi=args.max_renyi,
+                renyi_order=args.renyi_order,
+                layout=args.layout,
+                quantizer="dyadic" if args.layout == "knuth-yao" else quantizer,
+            )
+            if table is None:
+                print(f"sigma={sigma}: no table within the searched precisions/tail cuts meets the target")
+            else:
+                tables[sigma] = table
+        print_report(tables)
+        rom_tables = tables
+    else:
+        custom = args.sigmas or args.symbols or args.tail_cut or args.precision != PRECISION or quantizer != "cdf"
+        rom_quantizer = "dyadic" if args.layout == "knuth-yao" else quantizer
+        tables, rom_tables = {}, {}
+        for sigma in sigmas:
+            symbols = args.symbols or (int(Decimal(str(sigma)) * Decimal(str(args.tail_cut))) + 1 if args.tail_cut else MAX_SYMBOLS)
+            tables.update(build_tables([sigma], args.precision, symbols, quantizer, args.renyi_order))
+            if args.rom_out is not None and rom_quantizer != quantizer:
+                rom_tables.update(build_tables([sigma], args.precision, symbols, rom_quantizer, args.renyi_order))
+        rom_tables = rom_tables or tables
+        print_report(tables)
+        if not custom:
+            emit_verilog_header(tables, HEADER_PATH)
+            STATS_PATH.write_text(json.dumps(stats(tables), indent=2))
+    if args.rom_out is not None:
+        emit_rom(rom_tables, args.layout, args.rom_out)
 
 
 if __name__ == "__main__":
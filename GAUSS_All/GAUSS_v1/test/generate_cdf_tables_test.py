@@ -0,0 +1,43 @@
+"""generate_cdf_tables CLI: ROM export in the default Knuth-Yao layout."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+import gauss_tables
+import generate_cdf_tables
+
+
+REPO_HEADER = Path(generate_cdf_tables.__file__).resolve().parents[1] / "src" / "gauss_cdf_rom.vh"
+
+
+@pytest.fixture(name="outputs")
+def fixture_outputs(tmp_path, monkeypatch):
+    monkeypatch.setattr(generate_cdf_tables, "HEADER_PATH", tmp_path / "gauss_cdf_rom.vh")
+    monkeypatch.setattr(generate_cdf_tables, "STATS_PATH", tmp_path / "generate_cdf_tables.json")
+    return tmp_path
+
+
+def test_default_rom_out_uses_dyadic_tables(outputs):
+    rom = outputs / "rom.hex"
+    generate_cdf_tables.main(["--rom-out", str(rom)])
+
+    lines = rom.read_text().splitlines()
+    headers = [line for line in lines if line.startswith("//")]
+    assert len(headers) == len(generate_cdf_tables.SIGMA_VALUES)
+    sigma = generate_cdf_tables.SIGMA_VALUES[0]
+    table = gauss_tables.dyadic_table(sigma, generate_cdf_tables.PRECISION, generate_cdf_tables.MAX_SYMBOLS)
+    expected = gauss_tables.rom_words(table, "knuth-yao")
+    first = lines[1 : 1 + len(expected)]
+    assert [int(word, 16) for word in first] == expected
+    # The report and the RTL header still come from the CDF tables.
+    assert (outputs / "gauss_cdf_rom.vh").read_text() == REPO_HEADER.read_text()
+
+
+def test_knuth_yao_rom_rejects_cdf_quantizer(outputs):
+    with pytest.raises(SystemExit) as excinfo:
+        generate_cdf_tables.main(["--quantizer", "cdf", "--rom-out", str(outputs / "rom.hex")])
+    assert excinfo.value.code == 2
+    assert not (outputs / "rom.hex").exists()
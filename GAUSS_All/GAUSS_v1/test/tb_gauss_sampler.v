@@ -180,19 +180,62 @@ module tb_gauss_sampler;
         rst = 1'b0;
     end
 
+    // Optional stream mode for gauss_stats.py: +vectors=<file> drives one
+    // "word sigma" hex line per cycle and +dump=<file> records every valid
+    // coeffs word; the built-in vectors and checks are skipped.
+    reg stream_mode;
+    reg stream_done;
+    reg [8*256-1:0] vector_file;
+    reg [8*256-1:0] dump_file;
+    integer vector_fd;
+    integer dump_fd;
+    integer scan_count;
+    reg [RANDOM_WIDTH-1:0] stream_word;
+    reg [7:0] stream_sigma;
+
+    initial begin
+        stream_mode = $value$plusargs("vectors=%s", vector_file);
+        stream_done = 1'b0;
+        dump_fd = 0;
+        if ($value$plusargs("dump=%s", dump_file)) begin
+            dump_fd = $fopen(dump_file, "w");
+        end
+    end
+
     integer stim_idx;
     initial begin
         stim_idx = 0;
         @(negedge rst);
         @(posedge clk);
-        while (stim_idx < NUM_VECTORS) begin
-            random_in <= random_words[stim_idx];
-            sigma_in <= sigma_words[stim_idx];
-            random_valid <= 1'b1;
-            @(posedge clk);
+        if (stream_mode) begin
+            vector_fd = $fopen(vector_file, "r");
+            if (vector_fd == 0) begin
+                $display("TEST FAILED: cannot open vector file");
+                $fatal(1);
+            end
+            scan_count = $fscanf(vector_fd, "%h %h\n", stream_word, stream_sigma);
+            while (scan_count == 2) begin
+                random_in <= stream_word;
+                sigma_in <= stream_sigma;
+                random_valid <= 1'b1;
+                @(posedge clk);
+                stim_idx = stim_idx + 1;
+                scan_count = $fscanf(vector_fd, "%h %h\n", stream_word, stream_sigma);
+            end
             random_valid <= 1'b0;
-            stim_idx = stim_idx + 1;
-            @(posedge clk);
+            $fclose(vector_fd);
+            repeat (8) @(posedge clk);
+            stream_done = 1'b1;
+        end else begin
+            while (stim_idx < NUM_VECTORS) begin
+                random_in <= random_words[stim_idx];
+                sigma_in <= sigma_words[stim_idx];
+                random_valid <= 1'b1;
+                @(posedge clk);
+                random_valid <= 1'b0;
+                stim_idx = stim_idx + 1;
+                @(posedge clk);
+            end
         end
     end
 
@@ -207,7 +250,10 @@ module tb_gauss_sampler;
         @(negedge rst);
         forever begin
             @(posedge clk);
-            if (sample_valid) begin
+            if (sample_valid && dump_fd != 0) begin
+                $fdisplay(dump_fd, "%h", coeffs);
+            end
+            if (sample_valid && !stream_mode) begin
                 integer next_ptr;
                 next_ptr = pointer;
                 while (next_ptr < NUM_VECTORS && !expected_valid[next_ptr]) begin
@@ -231,6 +277,14 @@ module tb_gauss_sampler;
 
     initial begin
         @(negedge rst);
+        if (stream_mode) begin
+            wait (stream_done);
+            if (dump_fd != 0) begin
+                $fclose(dump_fd);
+            end
+            $display("Streamed %0d words", stim_idx);
+            $finish;
+        end
         repeat (200) @(posedge clk);
         if (error_flag) begin
             $display("TEST FAILED: mismatches detected");
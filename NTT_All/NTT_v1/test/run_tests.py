@@ -1,26 +1,39 @@
 #!/usr/bin/env python3
-"""Run Kyber NTT/INTT hardware verification against a Python golden model."""
+"""Run Kyber NTT/INTT hardware verification against a Python golden model.
+
+Both testbenches are compiled once (skipped while their sources are
+unchanged) and every seed runs in its own work directory under ``build/``,
+with NTT and INTT jobs executed concurrently via
+``100.kyber/scripts/run_module_verify``.  Run it through
+``python 100.kyber/golden/run.py NTT_All/NTT_v1/test/run_tests.py``, which
+makes ``golden`` and ``scripts`` importable.
+"""
 from __future__ import annotations
 
 import math
 import random
-import subprocess
 import sys
 from pathlib import Path
 from typing import Iterable, List
 
+from golden import compare
+from scripts.run_module_verify import Testbench, run_regression, write_json, write_junit
+
 KYBER_Q = 3329
 KYBER_N = 256
 
-ROOT = Path(__file__).resolve().parents[2]
-NTT_DIR = ROOT / "5.NTT"
+NTT_DIR = Path(__file__).resolve().parents[1]
 TEST_DIR = NTT_DIR / "test"
 BUILD_DIR = TEST_DIR / "build"
 
-NTT_INPUT = TEST_DIR / "ntt_input.hex"
-NTT_OUTPUT = TEST_DIR / "ntt_output_hw.hex"
-INTT_INPUT = TEST_DIR / "intt_input.hex"
-INTT_OUTPUT = TEST_DIR / "intt_output_hw.hex"
+# File names the testbenches read/write, relative to each job's work directory.
+NTT_INPUT = "ntt_input.hex"
+NTT_OUTPUT = "ntt_output_hw.hex"
+INTT_INPUT = "intt_input.hex"
+INTT_OUTPUT = "intt_output_hw.hex"
+WORD_LANES = 8  # 16-bit coefficients per 128-bit memory word
+SEEDS = (1, 7, 42)
+SOURCES = (NTT_DIR / "kyber_ntt.v", NTT_DIR / "kyber_intt.v", NTT_DIR / "zetas_rom.v")
 
 
 def ensure_build_dir() -> None:
@@ -131,22 +144,12 @@ def read_hex(path: Path) -> List[int]:
     return words
 
 
-def build_tb(top: str, sources: Iterable[Path], output: Path) -> None:
-    cmd = [
-        "iverilog",
-        "-g2012",
-        "-I",
-        str(NTT_DIR),
-        "-s",
-        top,
-        "-o",
-        str(output),
-    ] + [str(src) for src in sources]
-    subprocess.run(cmd, check=True, cwd=ROOT)
-
-
-def run_vvp(executable: Path, workdir: Path) -> None:
-    subprocess.run(["vvp", str(executable)], check=True, cwd=workdir)
+def check_output(name: str, path: Path, expected: List[int]) -> List[int]:
+    """Compare a hardware dump with ``expected`` coefficients; return the dump's coefficients."""
+    observed = compare.load_stream(path, lane_bits=16, lanes=WORD_LANES)
+    rows = [expected[i : i + WORD_LANES] for i in range(0, KYBER_N, WORD_LANES)]
+    compare.compare(rows, observed, name=name, record_rows=KYBER_N // WORD_LANES).check()
+    return observed.ravel().tolist()
 
 
 def chi_square(values: Iterable[int], bins: int = 16) -> float:
@@ -160,61 +163,54 @@ def chi_square(values: Iterable[int], bins: int = 16) -> float:
     return sum(((count - expected) ** 2) / expected for count in counts)
 
 
-def verify_once(seed: int) -> None:
+def seed_coeffs(seed: int) -> List[int]:
     rng = random.Random(seed)
-    coeffs = [rng.randrange(KYBER_Q) for _ in range(KYBER_N)]
-
-    words = pack_words(coeffs)
-    write_hex(NTT_INPUT, words)
-
-    expected_ntt = ntt(coeffs)
-    build_tb(
-        "ntt_tb",
-        [
-            NTT_DIR / "kyber_ntt.v",
-            NTT_DIR / "kyber_intt.v",
-            NTT_DIR / "zetas_rom.v",
-            TEST_DIR / "ntt_tb.v",
-        ],
-        BUILD_DIR / "ntt_tb.out",
-    )
-    run_vvp(BUILD_DIR / "ntt_tb.out", TEST_DIR)
-    hw_ntt_words = read_hex(NTT_OUTPUT)
-    hw_ntt = unpack_words(hw_ntt_words)
-    if hw_ntt != expected_ntt:
-        raise AssertionError("NTT hardware result mismatch")
-
-    write_hex(INTT_INPUT, pack_words(expected_ntt))
-    expected_intt = intt(expected_ntt)
-    build_tb(
-        "intt_tb",
-        [
-            NTT_DIR / "kyber_ntt.v",
-            NTT_DIR / "kyber_intt.v",
-            NTT_DIR / "zetas_rom.v",
-            TEST_DIR / "intt_tb.v",
-        ],
-        BUILD_DIR / "intt_tb.out",
-    )
-    run_vvp(BUILD_DIR / "intt_tb.out", TEST_DIR)
-    hw_intt_words = read_hex(INTT_OUTPUT)
-    hw_intt = unpack_words(hw_intt_words)
-    if hw_intt != expected_intt:
-        raise AssertionError("INTT hardware result mismatch")
-
-    recovered = [x % KYBER_Q for x in coeffs]
-    if hw_intt != recovered:
+    return [rng.randrange(KYBER_Q) for _ in range(KYBER_N)]
+
+
+def prepare_ntt(workdir: Path, seed: int) -> None:
+    write_hex(workdir / NTT_INPUT, pack_words(seed_coeffs(seed)))
+
+
+def check_ntt(workdir: Path, seed: int) -> None:
+    coeffs = seed_coeffs(seed)
+    check_output(f"ntt seed {seed}", workdir / NTT_OUTPUT, ntt(coeffs))
+    print(f"Seed {seed}: chi-square statistic for input coefficients = {chi_square(coeffs):.2f}")
+
+
+def prepare_intt(workdir: Path, seed: int) -> None:
+    write_hex(workdir / INTT_INPUT, pack_words(ntt(seed_coeffs(seed))))
+
+
+def check_intt(workdir: Path, seed: int) -> None:
+    coeffs = seed_coeffs(seed)
+    hw_intt = check_output(f"intt seed {seed}", workdir / INTT_OUTPUT, intt(ntt(coeffs)))
+    if hw_intt != [x % KYBER_Q for x in coeffs]:
         raise AssertionError("Inverse transform failed to recover coefficients")
 
-    chi_val = chi_square(coeffs)
-    print(f"Seed {seed}: chi-square statistic for input coefficients = {chi_val:.2f}")
+
+def testbenches() -> List[Testbench]:
+    common = dict(sources=SOURCES, include_dirs=(NTT_DIR,))
+    return [
+        Testbench("ntt_tb", TEST_DIR / "ntt_tb.v", top="ntt_tb", prepare=prepare_ntt, check=check_ntt, **common),
+        Testbench("intt_tb", TEST_DIR / "intt_tb.v", top="intt_tb", prepare=prepare_intt, check=check_intt, **common),
+    ]
 
 
 def main() -> int:
+    benches = testbenches()
+    needed = dict.fromkeys(path for bench in benches for path in (bench.testbench, *bench.sources))
+    missing = [path for path in needed if not path.is_file()]
+    if not SOURCES or missing:
+        print(f"[FAIL] NTT sources not found under {NTT_DIR}: {', '.join(map(str, missing)) or 'no sources'}")
+        return 1
     ensure_build_dir()
-    seeds = [1, 7, 42]
-    for seed in seeds:
-        verify_once(seed)
+    report = run_regression(benches, SEEDS, build_dir=BUILD_DIR)
+    write_json(report, BUILD_DIR / "report.json")
+    write_junit(report, BUILD_DIR / "report.xml", suite="ntt_v1")
+    if not report.passed:
+        print("NTT/INTT hardware checks failed; see build/report.json.")
+        return 1
     print("All NTT/INTT hardware checks passed.")
     return 0
 
@@ -1,12 +1,19 @@
 #!/usr/bin/env python3
-"""Test vector generator and golden model for the reject_sampler module."""
+"""Test vector generator and golden model for the reject_sampler module.
+
+Run through ``100.kyber/golden/run.py`` (``python 100.kyber/golden/run.py
+REJECT_All/REJECT_v1/test/gen_vectors.py [options]``), which makes ``golden``
+importable.
+"""
 
 from __future__ import annotations
 
 import argparse
 import pathlib
-import random
-from typing import List
+
+import numpy as np
+
+from golden import compare, reject_model
 
 LANES = 4
 CAND_BITS = 12
@@ -18,123 +25,61 @@ FINAL_FLUSH_CYCLES = 4  # idle cycles while the pipeline drains
 OUT_BITS = LANES * CAND_BITS
 BASE_DIR = pathlib.Path(__file__).resolve().parent
 
-
-def pack_words(words: List[int], width: int) -> int:
-    """Pack little-endian lane words into a single integer."""
-    value = 0
-    mask = (1 << width) - 1
-    for idx, word in enumerate(words):
-        value |= (word & mask) << (idx * width)
-    return value
-
-
-def format_hex(value: int, width_bits: int) -> str:
-    if value == 0:
-        return "0"
-    return f"{value:x}"
-
-
-def bernoulli_sample(accepted: int) -> int:
-    if CAND_BITS == 1:
-        return accepted & 0x1
-    return accepted & 0x1
+CONFIG = reject_model.RejectConfig(
+    lanes=LANES,
+    cand_bits=CAND_BITS,
+    latency=PIPELINE_LATENCY,
+    const_time=False,
+    bernoulli_sample_cand=False,
+    q_bits=16,  # reject_sampler.v compares the zero-extended candidate with the whole q port
+    expected_path=BASE_DIR / "expected_output.txt",
+    output_path=BASE_DIR / "rtl_output.txt",
+)
 
 
 def generate_vectors(seed: int = 2024) -> None:
-    rng = random.Random(seed)
-
-    cand_lines: List[str] = []
-    urnd_lines: List[str] = []
-    mode_lines: List[str] = []
-
-    expected_valid: List[int] = []
-    expected_acc: List[int] = []
-    expected_samples: List[int] = []
-
-    for vec_idx in range(NUM_VECTORS):
-        cand_lane = [rng.getrandbits(CAND_BITS) for _ in range(LANES)]
-        urnd_lane = [rng.getrandbits(CAND_BITS) for _ in range(LANES)]
-
-        mode = 0 if vec_idx < NUM_VECTORS // 2 else 1
-
-        cand_lines.append(format_hex(pack_words(cand_lane, CAND_BITS), OUT_BITS))
-        urnd_lines.append(format_hex(pack_words(urnd_lane, CAND_BITS), OUT_BITS))
-        mode_lines.append(f"{mode:x}")
-
-        if mode == 0:
-            accept = [1 if cand < Q_VALUE else 0 for cand in cand_lane]
-            sample_words = [cand if acc else 0 for cand, acc in zip(cand_lane, accept)]
-        else:
-            accept = [1 if urnd < cand else 0 for urnd, cand in zip(urnd_lane, cand_lane)]
-            sample_words = [bernoulli_sample(acc) for acc in accept]
-
-        acc_value = pack_words(accept, 1)
-        sample_value = pack_words(sample_words, CAND_BITS)
-
-        expected_acc.append(acc_value)
-        expected_samples.append(sample_value)
-        expected_valid.append(1 if acc_value != 0 else 0)
-
-    total_cycles = RESET_CYCLES + NUM_VECTORS + FINAL_FLUSH_CYCLES - 1
-    expected_lines: List[str] = []
-
-    for cycle in range(total_cycles):
-        if (
-            RESET_CYCLES + PIPELINE_LATENCY
-            <= cycle
-            < RESET_CYCLES + PIPELINE_LATENCY + NUM_VECTORS
-        ):
-            idx = cycle - (RESET_CYCLES + PIPELINE_LATENCY)
-            valid = expected_valid[idx]
-            acc = expected_acc[idx]
-            sample = expected_samples[idx]
-        else:
-            valid = 0
-            acc = 0
-            sample = 0
-        expected_lines.append(
-            f"{valid:d} {format_hex(acc, LANES):s} {format_hex(sample, OUT_BITS):s}"
-        )
-
-    (BASE_DIR / "cand.mem").write_text("\n".join(cand_lines) + "\n", encoding="utf-8")
-    (BASE_DIR / "urnd.mem").write_text("\n".join(urnd_lines) + "\n", encoding="utf-8")
-    (BASE_DIR / "mode.mem").write_text("\n".join(mode_lines) + "\n", encoding="utf-8")
-    (BASE_DIR / "expected_output.txt").write_text(
-        "\n".join(expected_lines) + "\n", encoding="utf-8"
-    )
+    rng = np.random.default_rng(seed)
+    stim = reject_model.random_stimulus(CONFIG, NUM_VECTORS, rng, valid_prob=1.0, q=Q_VALUE, per_lane_mode=False)
+    # The first half of the vectors exercises uniform mode, the second half Bernoulli mode.
+    stim.mode = (np.arange(NUM_VECTORS) >= NUM_VECTORS // 2).astype(np.int64)[:, np.newaxis]
+    # reject_sampler.v compares urnd against the candidate itself in Bernoulli mode.
+    stim.threshold = stim.cand
+
+    pipeline = reject_model.RejectPipeline(CONFIG)
+    reset = pipeline.drain(RESET_CYCLES)
+    trace = pipeline.step(stim)
+    flush = pipeline.drain(FINAL_FLUSH_CYCLES - 1)
+
+    cand_words = reject_model.pack_lanes(stim.cand, CAND_BITS)
+    urnd_words = reject_model.pack_lanes(stim.urnd, CAND_BITS)
+    (BASE_DIR / "cand.mem").write_bytes(compare.format_hex_rows([cand_words], [OUT_BITS // 4]))
+    (BASE_DIR / "urnd.mem").write_bytes(compare.format_hex_rows([urnd_words], [OUT_BITS // 4]))
+    (BASE_DIR / "mode.mem").write_bytes(compare.format_hex_rows([stim.mode[:, 0]], [1]))
+    with CONFIG.expected_path.open("wb") as fp:
+        for part in (reset, trace, flush):
+            fp.write(part.lines(CONFIG))
 
     print("Generated test vectors and golden reference.")
 
 
 def verify_results() -> None:
-    rtl_path = BASE_DIR / "rtl_output.txt"
-    expected_path = BASE_DIR / "expected_output.txt"
+    rtl_path = CONFIG.output_path
+    expected_path = CONFIG.expected_path
 
     if not rtl_path.exists():
         raise FileNotFoundError(f"RTL output {rtl_path} not found. Run the simulation first.")
     if not expected_path.exists():
         raise FileNotFoundError("Expected output file is missing. Generate vectors first.")
 
-    rtl_lines = [line.strip() for line in rtl_path.read_text(encoding="utf-8").splitlines()]
-    expected_lines = [
-        line.strip() for line in expected_path.read_text(encoding="utf-8").splitlines()
-    ]
-
-    if len(rtl_lines) != len(expected_lines):
-        raise AssertionError(
-            f"Line count mismatch: RTL={len(rtl_lines)} Expected={len(expected_lines)}"
-        )
-
-    mismatches = [
-        (idx, rtl_line, golden_line)
-        for idx, (rtl_line, golden_line) in enumerate(zip(rtl_lines, expected_lines))
-        if rtl_line != golden_line
-    ]
-
-    if mismatches:
-        for idx, rtl_line, golden_line in mismatches[:10]:
-            print(f"Mismatch at line {idx}: RTL={rtl_line} Golden={golden_line}")
-        raise AssertionError(f"Found {len(mismatches)} mismatching lines between RTL and golden.")
+    # Columns: valid, accept mask, then one CAND_BITS-wide sample per lane.
+    lane_spec = dict(lane_bits=[None, None, CAND_BITS], lanes=[None, None, LANES])
+    report = compare.compare(
+        compare.load_stream(expected_path, **lane_spec),
+        compare.load_stream(rtl_path, **lane_spec),
+        name="reject_sampler",
+        lane_names=["valid", "acc"] + [f"sample{lane}" for lane in range(LANES)],
+    )
+    report.check()
 
     print("RTL output matches the golden model.")
 
@@ -1,4 +1,9 @@
 // true dual port RAM
+// hash_stub flag/bank directory, overridden by +hash_dir=
+`ifndef HASH_STUB_DIR
+`define HASH_STUB_DIR "sim_hash_stub"
+`endif
+
 module dual_ram #(parameter DEPTH = 8, WIDTH = 16)(
   input clk,
   input wire we_1, // write enable
@@ -39,22 +44,18 @@ end
 
 
 // this is used for stub modules
+// synthesis translate_off
+reg [8*256-1:0] hash_dir;
+reg [8*256-1:0] mem_path;
+initial begin
+  if(!$value$plusargs("hash_dir=%s", hash_dir)) hash_dir = `HASH_STUB_DIR;
+end
+// synthesis translate_on
+
 task load_mem(input [1:0] type);
   begin
-    case (type)
-      0: begin
-        $readmemh("/!Github_coding/project-kyber/sim_hash_stub/mem0_hash_stub.hex", mem);
-      end
-      1: begin
-        $readmemh("/!Github_coding/project-kyber/sim_hash_stub/mem1_hash_stub.hex", mem);
-      end
-      2: begin
-        $readmemh("/!Github_coding/project-kyber/sim_hash_stub/mem2_hash_stub.hex", mem);
-      end
-      3: begin
-        $readmemh("/!Github_coding/project-kyber/sim_hash_stub/mem3_hash_stub.hex", mem);
-      end
-    endcase
+    $sformat(mem_path, "%0s/mem%0d_hash_stub.hex", hash_dir, type);
+    $readmemh(mem_path, mem);
   end
 endtask
 
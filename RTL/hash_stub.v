@@ -6,6 +6,11 @@ let's deal with the cbd hashes for now..
 
 */
 
+// hash_stub flag/bank directory, overridden by +hash_dir=
+`ifndef HASH_STUB_DIR
+`define HASH_STUB_DIR "sim_hash_stub"
+`endif
+
 module hash_stub(
   input clk,
   input set,
@@ -156,10 +161,18 @@ integer fd2;
 integer fd3;
 
 // synthesis translate_off
+// +hash_dir=<dir>: directory shared with python -m golden.hash_streams serve --sim-dir <dir>
+reg [8*256-1:0] hash_dir;
+reg [8*256-1:0] hash_path;
 initial begin
-  fd1 = $fopen("D:/!Github_coding/project-kyber/sim_hash_stub/test-hash_stub.txt","w");
-  fd2 = $fopen("D:/!Github_coding/project-kyber/sim_hash_stub/hash.flag","w");
-  fd3 = $fopen("D:/!Github_coding/project-kyber/sim_hash_stub/hash2.flag","r");
+  if(!$value$plusargs("hash_dir=%s", hash_dir)) hash_dir = `HASH_STUB_DIR;
+  $sformat(hash_path, "%0s/test-hash_stub.txt", hash_dir);
+  fd1 = $fopen(hash_path,"w");
+  $sformat(hash_path, "%0s/hash.flag", hash_dir);
+  fd2 = $fopen(hash_path,"w");
+  $sformat(hash_path, "%0s/hash2.flag", hash_dir);
+  fd3 = $fopen(hash_path,"r");
+  if(fd3 == 0) $display("ERROR: cannot open %0s (start hash_streams serve first)", hash_path);
 end
 // synthesis translate_on
 
@@ -34,10 +34,20 @@ always begin
   #5 clk = ~clk;
 end
 
-reg [7:0] mem [255:0]; // match kyber_din
+reg [7:0] mem [0:(1<<17)-1]; // match kyber_din, up to 4096 ops of coins
+
+// +din=<coins.hex> +op=<n> (required): feed the coins r of operation n from
+// python -m golden.hash_streams generate (serve answers the stub, see +hash_dir=)
+reg [8*256-1:0] din_path;
+integer op = 0;
 
 initial begin
-  $readmemh("D:/!Github_coding/project-kyber/poly_test.hex", mem);
+  if(!$value$plusargs("din=%s", din_path)) begin
+    $display("ERROR: +din=<coins.hex> required (python -m golden.hash_streams generate writes sim/hash_streams/coins.hex)");
+    $finish;
+  end
+  if(!$value$plusargs("op=%d", op)) op = 0;
+  $readmemh(din_path, mem);
   
   #15 reset <= 1;
   #5 reset <= 0;
@@ -54,7 +64,7 @@ always @(posedge clk) begin
   if(readin_ok & readin) begin
     index <= index + 1;
     in_index <= index;
-    din <= mem[index] + 2; 
+    din <= mem[op*32 + index];
                 //$random & 'hff;
   end
   if(index == (1<<5)) begin
@@ -1,9 +1,29 @@
-"""Golden model and stimulus generator for the uniform_sampler module."""
+"""Golden model and stimulus generator for the uniform_sampler module.
+
+``--analyze`` sizes the sampler instead of generating vectors: for every q in
+a range it gives the exact per-lane acceptance probability of the
+``candidate < q * floor(2^CAND_BITS / q)`` rule, the expected samples per
+cycle, and the distribution of cycles needed for one 256-coefficient
+polynomial (mean and tail percentiles, by dynamic programming over the
+accepted count).  ``--monte-carlo`` cross-checks those numbers against the
+bit-accurate lane model on random candidates.
+
+``--verify-barrett`` exhaustively checks the hardware Barrett path (``mu`` and
+``floor`` from the bit-serial dividers, one quotient estimate and at most two
+add / two subtract corrections) for every q in the range and every 16-bit
+candidate, and lists the q values whose result diverges from ``% q``.
+"""
 from __future__ import annotations
 
+import argparse
+import math
+import os
 import random
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import numpy as np
+
 LANES = 8
 CAND_BITS = 16
 Q_BITS = 16
@@ -18,6 +38,10 @@ EXT_WIDTH = CAND_BITS + Q_BITS + 1
 
 DATA_DIR = Path(__file__).resolve().parent / "data"
 
+KYBER_Q = 3329
+POLY_COEFFS = 256
+PERCENTILES = (0.5, 0.99, 0.999, 0.999999)
+
 
 def compute_barrett_mu(q_val: int) -> int:
     if q_val == 0:
@@ -142,5 +166,232 @@ def generate_vectors(seed: int = 2024) -> None:
     )
 
 
+def barrett_reduce_array(values: np.ndarray, q_val: np.ndarray, mu_val: np.ndarray) -> np.ndarray:
+    """Array form of ``barrett_reduce`` (candidates and ``mu`` fit in int64 products)."""
+    values = np.asarray(values, dtype=np.int64)
+    q_val = np.asarray(q_val, dtype=np.int64)
+    approx_mul = ((values * np.asarray(mu_val, dtype=np.int64)) >> BARRETT_WIDTH) * q_val
+    value_ext = values + q_val * ((values < approx_mul).astype(np.int64) + (values + q_val < approx_mul))
+    corrected = value_ext - approx_mul
+    corrected -= q_val * ((corrected >= q_val).astype(np.int64) + (corrected >= 2 * q_val))
+    return np.where(q_val != 0, corrected & MASK_CAND, 0)
+
+
+def barrett_params(q_values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Array form of ``compute_barrett_mu`` / ``compute_candidate_floor`` (0 for q=0)."""
+    q_values = np.asarray(q_values, dtype=np.int64)
+    safe = np.maximum(q_values, 1)
+    mu = np.where(q_values != 0, (1 << (BARRETT_WIDTH - 1)) // safe, 0)
+    floor = np.where(q_values != 0, (1 << (FLOOR_WIDTH - 1)) // safe, 0)
+    return mu, floor
+
+
+def _barrett_block(q_start: int, q_stop: int) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Quotient error range, failing-candidate count and first failing candidate for q in [start, stop)."""
+    q_values = np.arange(q_start, q_stop, dtype=np.int64)[:, np.newaxis]
+    mu, _ = barrett_params(q_values)
+    cand = np.arange(1 << CAND_BITS, dtype=np.int64)[np.newaxis, :]
+    # Remainder before correction; the two adds and two subtracts fix it iff -2q <= r < 3q.
+    remainder = cand - ((cand * mu) >> BARRETT_WIDTH) * q_values
+    low = remainder.min(axis=1)
+    high = remainder.max(axis=1)
+    bad = (remainder < -2 * q_values) | (remainder >= 3 * q_values)
+    first = np.where(bad.any(axis=1), bad.argmax(axis=1), -1)
+    q_flat = q_values[:, 0]
+    return low // q_flat, high // q_flat, bad.sum(axis=1), first
+
+
+def verify_barrett(q_min: int = 1, q_max: int = (1 << Q_BITS) - 1, chunk: int = 64, jobs: int = 1) -> dict[str, np.ndarray]:
+    """Exhaustive Barrett check over ``q_min..q_max`` x every candidate.
+
+    ``min_correction`` / ``max_correction`` are the most negative / positive
+    number of q multiples the hardware would have to add / subtract after the
+    quotient estimate (it supports -2..+2); ``failures`` counts candidates whose
+    reduced value differs from ``candidate % q``.
+    """
+    q_values = np.arange(q_min, q_max + 1, dtype=np.int64)
+    mu, floor = barrett_params(q_values)
+    for q_val, mu_val, floor_val in zip(q_values.tolist(), mu.tolist(), floor.tolist()):
+        if (compute_barrett_mu(q_val), compute_candidate_floor(q_val)) != (mu_val, floor_val):
+            raise AssertionError(f"Bit-serial divider disagrees with integer division for q={q_val}")
+    starts = list(range(q_min, q_max + 1, chunk))
+    stops = [min(start + chunk, q_max + 1) for start in starts]
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            blocks = list(pool.map(_barrett_block, starts, stops))
+    else:
+        blocks = [_barrett_block(start, stop) for start, stop in zip(starts, stops)]
+    low, high, failures, first = (np.concatenate(column) for column in zip(*blocks))
+    return {"q": q_values, "mu": mu, "min_correction": low, "max_correction": high, "failures": failures, "first": first}
+
+
+def print_barrett(result: dict[str, np.ndarray], limit: int = 20) -> bool:
+    failing = np.flatnonzero(result["failures"])
+    cases = len(result["q"]) << CAND_BITS
+    print(
+        f"Barrett: {len(result['q'])} q values x {1 << CAND_BITS} candidates ({cases:,} cases), "
+        f"corrections needed {int(result['min_correction'].min())}..{int(result['max_correction'].max())} (hardware: -2..2)"
+    )
+    if not failing.size:
+        print("[PASS] Barrett reduction matches % q for every q and candidate")
+        return True
+    print(
+        f"[FAIL] {failing.size} q values diverge from % q "
+        f"({int(result['failures'].sum()):,} cases), q={int(result['q'][failing[0]])}..{int(result['q'][failing[-1]])}"
+    )
+    for row in failing[:limit]:
+        print(
+            f"  q={int(result['q'][row])} mu={int(result['mu'][row])}: corrections "
+            f"{int(result['min_correction'][row])}..{int(result['max_correction'][row])}, "
+            f"{int(result['failures'][row])} failing candidates, first {int(result['first'][row])}"
+        )
+    return False
+
+
+def acceptance_probability(q_values: np.ndarray) -> np.ndarray:
+    """Exact per-lane acceptance probability for each q (candidates uniform on CAND_BITS)."""
+    q_values = np.asarray(q_values, dtype=np.int64)
+    return ((1 << CAND_BITS) // q_values) * q_values / float(1 << CAND_BITS)
+
+
+def cycles_distribution(
+    accept: np.ndarray, lanes: int, percentiles=PERCENTILES, coeffs: int = POLY_COEFFS, tail: float = 1e-12
+) -> tuple[np.ndarray, np.ndarray]:
+    """Mean and percentiles of the cycles needed to accept ``coeffs`` samples with ``lanes`` lanes.
+
+    ``accept`` holds one acceptance probability per row.  Every cycle the
+    accepted count grows by Binomial(lanes, p); the distribution of the count is
+    propagated until fewer than ``tail`` of the mass has not yet finished.
+    Returns ``(mean, table)`` with ``table[:, i]`` the ``percentiles[i]`` cycle count.
+    """
+    accept = np.asarray(accept, dtype=np.float64)
+    step = np.stack(
+        [math.comb(lanes, k) * accept**k * (1.0 - accept) ** (lanes - k) for k in range(lanes + 1)], axis=1
+    )
+    active = np.zeros((len(accept), coeffs))
+    active[:, 0] = 1.0
+    mean = np.zeros(len(accept))
+    table = np.zeros((len(accept), len(percentiles)), dtype=np.int64)
+    cycle = 0
+    while True:
+        remaining = active.sum(axis=1)
+        mean += remaining  # E[T] = sum over N >= 0 of P(T > N)
+        if remaining.max() < tail:
+            break
+        cycle += 1
+        nxt = active * step[:, :1]
+        for k in range(1, lanes + 1):
+            nxt[:, k:] += active[:, : coeffs - k] * step[:, k : k + 1]
+        active = nxt
+        done = 1.0 - active.sum(axis=1)
+        for index, pct in enumerate(percentiles):
+            table[:, index] = np.where((table[:, index] == 0) & (done >= pct), cycle, table[:, index])
+    return mean, table
+
+
+def analyze(q_values: np.ndarray, lanes: int, block: int = 4096) -> dict[str, np.ndarray]:
+    """Per-q acceptance, samples per cycle and cycles-per-polynomial statistics."""
+    q_values = np.asarray(q_values, dtype=np.int64)
+    accept = acceptance_probability(q_values)
+    mean = np.empty(len(q_values))
+    table = np.empty((len(q_values), len(PERCENTILES)), dtype=np.int64)
+    for start in range(0, len(q_values), block):
+        rows = slice(start, start + block)
+        mean[rows], table[rows] = cycles_distribution(accept[rows], lanes)
+    return {"q": q_values, "accept": accept, "samples_per_cycle": lanes * accept, "mean_cycles": mean, "percentiles": table}
+
+
+def monte_carlo(q_val: int, lanes: int, polys: int, rng: np.random.Generator) -> dict[str, float]:
+    """Run random candidates through the bit-accurate lane model until ``polys`` polynomials complete.
+
+    Also reports how often the hardware Barrett output of an accepted candidate
+    differs from ``candidate mod q`` (``mu`` is computed from ``2^(BARRETT_WIDTH-1)``).
+    """
+    mu_val = compute_barrett_mu(q_val)
+    floor_val = compute_candidate_floor(q_val)
+    threshold = q_val * floor_val
+    accept_rate = max(acceptance_probability(np.array([q_val]))[0], 1.0 / (1 << CAND_BITS))
+    cycles = int(POLY_COEFFS / (lanes * accept_rate) * 1.5) + 64
+    while True:
+        cand = rng.integers(0, 1 << CAND_BITS, size=(polys, cycles, lanes), dtype=np.int64)
+        accepted = (cand < threshold) & (floor_val != 0)
+        reduced = barrett_reduce_array(cand[accepted], q_val, mu_val)
+        spot = cand[accepted][:256].tolist()
+        if reduced[:256].tolist() != [barrett_reduce(value, q_val, mu_val) for value in spot]:
+            raise AssertionError(f"Array Barrett model disagrees with barrett_reduce for q={q_val}")
+        totals = np.cumsum(accepted.sum(axis=2), axis=1)
+        if (totals[:, -1] >= POLY_COEFFS).all():
+            break
+        cycles *= 2
+    needed = np.argmax(totals >= POLY_COEFFS, axis=1) + 1
+    return {
+        "accept": float(accepted.mean()),
+        "mean_cycles": float(needed.mean()),
+        "not_mod_q": float((reduced != cand[accepted] % q_val).mean()) if reduced.size else 0.0,
+        **{f"p{pct * 100:g}": float(np.quantile(needed, pct, method="inverted_cdf")) for pct in PERCENTILES[:2]},
+    }
+
+
+def print_analysis(result: dict[str, np.ndarray], lanes: int) -> None:
+    headers = ["q", "accept", "samples/cycle", "mean cycles"] + [f"p{pct * 100:g}" for pct in PERCENTILES]
+    print(f"LANES={lanes}, {POLY_COEFFS} coefficients per polynomial")
+    rows = range(len(result["q"]))
+    if len(result["q"]) > 16:
+        worst = int(np.argmax(result["mean_cycles"]))
+        rows = sorted({0, worst, len(result["q"]) - 1, *np.flatnonzero(result["q"] == KYBER_Q).tolist()})
+        print(
+            f"{len(result['q'])} q values: samples/cycle {result['samples_per_cycle'].min():.3f}.."
+            f"{result['samples_per_cycle'].max():.3f}, worst q={int(result['q'][worst])}"
+        )
+    print("  ".join(f"{name:>13}" for name in headers))
+    for row in rows:
+        values = [
+            f"{int(result['q'][row])}",
+            f"{result['accept'][row]:.6f}",
+            f"{result['samples_per_cycle'][row]:.4f}",
+            f"{result['mean_cycles'][row]:.3f}",
+        ] + [str(value) for value in result["percentiles"][row]]
+        print("  ".join(f"{value:>13}" for value in values))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=2024, help="Seed for stimulus generation")
+    parser.add_argument("--analyze", action="store_true", help="Report acceptance and cycles per polynomial")
+    parser.add_argument("--verify-barrett", action="store_true", help="Exhaustive Barrett check (default q range: all 16-bit q)")
+    parser.add_argument("--q-min", type=int, default=None, help="First q of the range (default: 3329 for --analyze)")
+    parser.add_argument("--q-max", type=int, default=None, help="Last q (default: q-min for --analyze)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes for --verify-barrett")
+    parser.add_argument("--lanes", type=int, nargs="+", default=[LANES], help="Lane counts to compare")
+    parser.add_argument("--monte-carlo", type=int, default=0, metavar="POLYS", help="Cross-check with POLYS random polynomials per q")
+    args = parser.parse_args()
+
+    if args.verify_barrett:
+        result = verify_barrett(args.q_min or 1, args.q_max or (1 << Q_BITS) - 1, jobs=args.jobs)
+        raise SystemExit(0 if print_barrett(result) else 1)
+    if not args.analyze:
+        generate_vectors(args.seed)
+        return
+    q_min = args.q_min or KYBER_Q
+    q_values = np.arange(q_min, (args.q_max or q_min) + 1)
+    rng = np.random.default_rng(args.seed)
+    for lanes in args.lanes:
+        result = analyze(q_values, lanes)
+        print_analysis(result, lanes)
+        if args.monte_carlo:
+            checked = q_values if len(q_values) <= 4 else rng.choice(q_values, size=4, replace=False)
+            for q_val in checked:
+                row = int(np.flatnonzero(q_values == q_val)[0])
+                measured = monte_carlo(int(q_val), lanes, args.monte_carlo, rng)
+                print(
+                    f"  Monte Carlo q={int(q_val)}: accept {measured['accept']:.6f} (exact {result['accept'][row]:.6f}), "
+                    f"mean cycles {measured['mean_cycles']:.3f} (exact {result['mean_cycles'][row]:.3f}), "
+                    f"p50 {measured['p50']:g} / p99 {measured['p99']:g} "
+                    f"(exact {result['percentiles'][row][0]} / {result['percentiles'][row][1]}), "
+                    f"reduced != cand mod q on {measured['not_mod_q']:.2%} of samples"
+                )
+        print()
+
+
 if __name__ == "__main__":
-    generate_vectors()
+    main()